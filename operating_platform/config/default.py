@@ -24,8 +24,8 @@ class DatasetConfig:
     # You may provide a list of datasets here. `train.py` creates them all and concatenates them. Note: only data
     # keys common between the datasets are kept. Each dataset gets and additional transform that inserts the
     # "dataset_index" into the returned item. The index mapping is made according to the order in which the
-    # datasets are provided.
-    repo_id: str
+    # datasets are provided. With a list, `root` is the directory containing the datasets (root/<repo_id>).
+    repo_id: str | list[str]
     # Root directory where the dataset will be stored (e.g. 'dataset/path').
     root: str | None = None
     episodes: list[int] | None = None
@@ -33,6 +33,15 @@ class DatasetConfig:
     revision: str | None = None
     use_imagenet_stats: bool = False
     video_backend: str = "pyav"
+    # Decoded video frames cached per DataLoader worker (MB), 0 disables the cache
+    video_cache_mb: int = 256
+    # Read numeric features from memory-mapped .npy columns (meta/columns/) instead of parquet/arrow
+    column_store: bool = False
+    # Read video frames from frame_cache/ when the dataset has one (scripts/build_frame_cache.py)
+    frame_cache: bool = True
+    # Relative probability of drawing a training sample from each dataset of a `repo_id` list. Defaults to
+    # the number of frames of each dataset (all frames equally likely).
+    weights: list[float] | None = None
 
 
 @dataclass
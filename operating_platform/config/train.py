@@ -52,12 +52,27 @@ class TrainPipelineConfig(HubMixin):
     # Number of workers for the dataloader.
     num_workers: int = 4
     batch_size: int = 16
+    # Batches copied to the device ahead of the training step, on a side stream (CUDA/NPU). 0 copies each
+    # batch when the step takes it.
+    prefetch_batches: int = 2
+    # How the training frames are shuffled (see dataset/sampler.py): "full" random permutation, or
+    # "block"/"episode" to shuffle blocks of `sampler_block_size` frames / whole episodes and mix the
+    # frames of `sampler_window` blocks at a time, which keeps video decoding local.
+    sampler_shuffle_mode: str = "full"
+    sampler_block_size: int = 256
+    sampler_window: int = 8
+    # Give each dataloader worker its own episodes, so its video decoders stay warm
+    sampler_worker_affinity: bool = False
     steps: int = 10_000
     eval_freq: int = 5_000
     log_freq: int = 200
     save_checkpoint: bool = True
     # Checkpoint is saved every `save_freq` training iterations and after the last training step.
     save_freq: int = 5_000
+    # Write checkpoints on a background thread: training resumes once the states are copied to CPU memory.
+    # At most `max_pending_checkpoints` copies wait to be written, further saves block until one is done.
+    async_checkpoint: bool = False
+    max_pending_checkpoints: int = 1
     use_policy_training_preset: bool = True
     optimizer: OptimizerConfig | None = None
     scheduler: LRSchedulerConfig | None = None
@@ -105,8 +120,10 @@ class TrainPipelineConfig(HubMixin):
             train_dir = f"{now:%Y-%m-%d}/{now:%H-%M-%S}_{self.job_name}"
             self.output_dir = Path("outputs/train") / train_dir
 
-        if isinstance(self.dataset.repo_id, list):
-            raise NotImplementedError("LeRobotMultiDataset is not currently implemented.")
+        if isinstance(self.dataset.repo_id, list) and self.dataset.episodes is not None:
+            raise ValueError("`dataset.episodes` can't be used with several datasets (`dataset.repo_id` list).")
+        if self.dataset.weights is not None and not isinstance(self.dataset.repo_id, list):
+            raise ValueError("`dataset.weights` requires several datasets (`dataset.repo_id` list).")
 
         if not self.use_policy_training_preset and (self.optimizer is None or self.scheduler is None):
             raise ValueError("Optimizer and Scheduler must be set when the policy presets are not used.")
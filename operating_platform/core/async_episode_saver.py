@@ -12,11 +12,14 @@ Key features:
 - Immediate metadata return (<100ms)
 - Background queue processing
 - Thread-safe episode index allocation
+- Several workers saving episodes in parallel, metadata committed in episode order
 - Retry logic for failed saves
 - Status monitoring and error tracking
 """
 
+import contextlib
 import copy
+import itertools
 import logging
 import queue
 import threading
@@ -26,6 +29,8 @@ from dataclasses import dataclass
 from pathlib import Path
 from typing import Optional
 
+from operating_platform.dataset.image_writer import ImageWriteError
+
 
 @dataclass
 class EpisodeSaveTask:
@@ -78,7 +83,7 @@ class EpisodeMetadata:
 
 class AsyncEpisodeSaver:
     """
-    Handles asynchronous episode saving with background worker thread.
+    Handles asynchronous episode saving with background worker threads.
 
     This class provides immediate metadata return while actual save operations
     (image writing, video encoding, metadata updates) happen in the background.
@@ -86,11 +91,14 @@ class AsyncEpisodeSaver:
     The design ensures:
     - Data format compatibility (uses existing save_episode() method)
     - Thread safety (locks for shared state)
+    - Ordered commits: with several workers, waiting for images and encoding videos
+      overlap between episodes, but the metadata part of save_episode() (global frame
+      indices, tasks, stats, meta/*.jsonl) runs in episode order
     - Error resilience (retry logic)
     - Progress monitoring (status tracking)
 
     Usage:
-        saver = AsyncEpisodeSaver(max_queue_size=10)
+        saver = AsyncEpisodeSaver(max_queue_size=10, num_workers=2)
         saver.start(initial_episode_index=0)
 
         # Quick return, no blocking
@@ -101,21 +109,32 @@ class AsyncEpisodeSaver:
         saver.stop()
     """
 
-    def __init__(self, max_queue_size: int = 10):
+    def __init__(self, max_queue_size: int = 10, num_workers: int = 1):
         """
         Initialize the async episode saver.
 
         Args:
             max_queue_size: Maximum number of episodes that can be queued.
                            If full, new saves will fail immediately.
+            num_workers: Number of episodes saved in parallel. Concurrent video encodes
+                         are still bounded by the NPU/CPU encoder semaphores.
         """
+        if num_workers < 1:
+            raise ValueError(f"num_workers must be >= 1, got {num_workers}")
         self.max_queue_size = max_queue_size
-        self.save_queue = queue.Queue(maxsize=max_queue_size)
-        self.worker_thread: Optional[threading.Thread] = None
+        self.num_workers = num_workers
+        # Lowest episode index first, so the workers pick up episodes in the order they commit
+        self.save_queue = queue.PriorityQueue(maxsize=max_queue_size)
+        self._queue_seq = itertools.count()
+        self.worker_thread: Optional[threading.Thread] = None  # First worker (compatibility)
+        self.worker_threads: list[threading.Thread] = []
         self.running = False
 
         # Thread-safe state tracking
         self._lock = threading.Lock()
+        # Notified whenever an episode leaves _saving
+        self._commit_cond = threading.Condition(self._lock)
+        self._saving: set[int] = set()  # Episodes currently being saved by a worker
         self._episode_index_counter = 0  # Atomic episode index allocation
         self._pending_saves: dict[int, EpisodeSaveTask] = {}
         self._completed_saves: dict[int, dict] = {}  # ep_index -> result
@@ -129,7 +148,8 @@ class AsyncEpisodeSaver:
             "total_retries": 0,
         }
 
-        logging.info("[AsyncEpisodeSaver] Initialized with max_queue_size=%d", max_queue_size)
+        logging.info("[AsyncEpisodeSaver] Initialized with max_queue_size=%d, num_workers=%d",
+                     max_queue_size, num_workers)
 
     def allocate_next_index(self) -> int:
         """
@@ -150,7 +170,7 @@ class AsyncEpisodeSaver:
 
     def start(self, initial_episode_index: int = 0):
         """
-        Start the background worker thread.
+        Start the background worker threads.
 
         Args:
             initial_episode_index: Starting episode index (usually meta.total_episodes)
@@ -159,14 +179,15 @@ class AsyncEpisodeSaver:
             self._episode_index_counter = initial_episode_index
             self.running = True
 
-        self.worker_thread = threading.Thread(
-            target=self._worker_loop,
-            name="AsyncEpisodeSaver-Worker",
-            daemon=True
-        )
-        self.worker_thread.start()
-        logging.info("[AsyncEpisodeSaver] Background worker started (initial_ep_idx=%d)",
-                    initial_episode_index)
+        self.worker_threads = []
+        for i in range(self.num_workers):
+            name = "AsyncEpisodeSaver-Worker" if i == 0 else f"AsyncEpisodeSaver-Worker-{i}"
+            thread = threading.Thread(target=self._worker_loop, name=name, daemon=True)
+            thread.start()
+            self.worker_threads.append(thread)
+        self.worker_thread = self.worker_threads[0]
+        logging.info("[AsyncEpisodeSaver] %d background worker(s) started (initial_ep_idx=%d)",
+                    self.num_workers, initial_episode_index)
 
     def queue_save(
         self,
@@ -181,7 +202,7 @@ class AsyncEpisodeSaver:
 
         This is the main API called by Record.save(). It:
         1. Uses the pre-allocated episode_index from the buffer (allocated at start of recording)
-        2. Deep copies the episode buffer to avoid race conditions
+        2. Deep copies the episode buffer to avoid race conditions (unless it is a sealed EpisodeBuffer)
         3. Queues the save task for background processing
         4. Returns metadata immediately (non-blocking)
 
@@ -216,8 +237,12 @@ class AsyncEpisodeSaver:
             self._stats["total_queued"] += 1
 
         # 2. Create deep copy of episode_buffer (avoid shared state issues)
-        # This is critical for thread safety!
-        buffer_copy = copy.deepcopy(episode_buffer)
+        # This is critical for thread safety! A sealed EpisodeBuffer was already swapped out
+        # of the recording thread by Record.save_async, so it is handed over without copying.
+        if getattr(episode_buffer, "sealed", False):
+            buffer_copy = episode_buffer
+        else:
+            buffer_copy = copy.deepcopy(episode_buffer)
 
         # 4. Create save task
         task = EpisodeSaveTask(
@@ -237,7 +262,7 @@ class AsyncEpisodeSaver:
         # 6. Queue for background processing
         task_queued = True
         try:
-            self.save_queue.put(task, timeout=5.0)
+            self.save_queue.put((episode_index, next(self._queue_seq), task), timeout=5.0)
             elapsed_ms = (time.time() - start_time) * 1000
             logging.info(
                 "[AsyncEpisodeSaver] ✓ Queued episode %d (queue_pos=%d, frames=%d, elapsed=%.1fms)",
@@ -272,10 +297,13 @@ class AsyncEpisodeSaver:
         while self.running or not self.save_queue.empty():
             try:
                 # Get next task (with timeout to check running flag periodically)
-                task = self.save_queue.get(timeout=1.0)
+                _, _, task = self.save_queue.get(timeout=1.0)
             except queue.Empty:
                 continue
 
+            with self._lock:
+                self._saving.add(task.episode_index)
+
             try:
                 self._execute_save(task)
             except Exception as e:
@@ -289,6 +317,29 @@ class AsyncEpisodeSaver:
 
         logging.info("[AsyncEpisodeSaver] Worker loop exited")
 
+    @contextlib.contextmanager
+    def _commit_turn(self, episode_index: int):
+        """
+        Passed to save_episode() as `commit_order`: waits until every lower episode that
+        another worker is saving has finished, so metadata is committed in episode order.
+
+        Only episodes already picked up by a worker are waited for, never queued ones,
+        so a worker can't block on an episode that no free worker is left to save.
+        """
+        with self._commit_cond:
+            waited = False
+            while any(i < episode_index for i in self._saving):
+                waited = True
+                self._commit_cond.wait()
+        if waited:
+            logging.debug("[AsyncEpisodeSaver] Episode %d waited for earlier episodes to commit", episode_index)
+        yield
+
+    def _release_commit_turn(self, episode_index: int):
+        with self._commit_cond:
+            self._saving.discard(episode_index)
+            self._commit_cond.notify_all()
+
     def _execute_save(self, task: EpisodeSaveTask):
         """
         Execute the actual save operation (blocking).
@@ -315,22 +366,30 @@ class AsyncEpisodeSaver:
         # Step 1: Save episode to parquet + encode videos
         # This uses the EXISTING save_episode() method to ensure format compatibility
         logging.debug("[AsyncEpisodeSaver] Calling dataset.save_episode (ep %d)", ep_idx)
-        save_start = time.time()
-        actual_ep_idx = task.dataset.save_episode(episode_data=task.episode_buffer, skip_encoding=task.skip_encoding)
-        save_time = time.time() - save_start
-        logging.debug("[AsyncEpisodeSaver] save_episode done (ep %d, %.2fs)",
-                     ep_idx, save_time)
-
-        # Step 3: Update JSON metadata files (dataid.json, common_record.json)
-        from operating_platform.utils.data_file import (
-            update_dataid_json,
-            update_common_record_json
-        )
+        try:
+            save_start = time.time()
+            actual_ep_idx = task.dataset.save_episode(
+                episode_data=task.episode_buffer,
+                skip_encoding=task.skip_encoding,
+                commit_order=self._commit_turn(ep_idx),
+            )
+            save_time = time.time() - save_start
+            logging.debug("[AsyncEpisodeSaver] save_episode done (ep %d, %.2fs)",
+                         ep_idx, save_time)
+
+            # Step 3: Update JSON metadata files (dataid.json, common_record.json)
+            from operating_platform.utils.data_file import (
+                update_dataid_json,
+                update_common_record_json
+            )
 
-        update_dataid_json(task.record_cfg.root, actual_ep_idx, task.record_cmd)
+            update_dataid_json(task.record_cfg.root, actual_ep_idx, task.record_cmd)
 
-        if actual_ep_idx == 0 and task.dataset.meta.total_episodes == 1:
-            update_common_record_json(task.record_cfg.root, task.record_cmd)
+            if actual_ep_idx == 0 and task.dataset.meta.total_episodes == 1:
+                update_common_record_json(task.record_cfg.root, task.record_cmd)
+        finally:
+            # Also on failure: a retry is re-queued and must not hold back later episodes
+            self._release_commit_turn(ep_idx)
 
         # Step 4: Mark as completed
         elapsed = time.time() - start_time
@@ -364,7 +423,8 @@ class AsyncEpisodeSaver:
         """
         ep_idx = task.episode_index
 
-        if task.retry_count < task.max_retries:
+        # Images that failed to be written won't appear on a retry
+        if task.retry_count < task.max_retries and not isinstance(error, ImageWriteError):
             task.retry_count += 1
             backoff_time = 2 ** task.retry_count
             logging.warning(
@@ -377,7 +437,7 @@ class AsyncEpisodeSaver:
 
             # Re-queue with exponential backoff
             time.sleep(backoff_time)
-            self.save_queue.put(task)
+            self.save_queue.put((ep_idx, next(self._queue_seq), task))
         else:
             logging.error(
                 "[AsyncEpisodeSaver] ✗ Episode %d failed after %d retries",
@@ -471,10 +531,11 @@ class AsyncEpisodeSaver:
 
         self.running = False
 
-        if self.worker_thread and self.worker_thread.is_alive():
-            self.worker_thread.join(timeout=10.0)
-            if self.worker_thread.is_alive():
-                logging.warning("[AsyncEpisodeSaver] Worker thread did not stop gracefully")
+        for thread in self.worker_threads:
+            if thread.is_alive():
+                thread.join(timeout=10.0)
+                if thread.is_alive():
+                    logging.warning("[AsyncEpisodeSaver] Worker thread %s did not stop gracefully", thread.name)
 
         # Log final statistics
         final_stats = self.get_status()
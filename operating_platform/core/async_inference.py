@@ -0,0 +1,177 @@
+"""
+Asynchronous inference: policy compute decoupled from the control loop.
+
+With action chunking policies (ACT, diffusion, pi0, smolvla...) `select_action` returns queued actions
+most of the time, but every `n_action_steps` it runs the model, and the control loop misses the ticks
+the inference takes (the arm stutters at each refill).
+
+`AsyncInferenceRunner` keeps the chunk queue itself. The control loop calls `step(observation)` once
+per tick and gets the next action of the queue right away, while a worker thread computes the next
+chunk from a recent observation:
+
+- when `refill_threshold` actions or fewer are left, the observation of the tick is handed to the
+  worker (one inference at a time)
+- when the new chunk is ready, its first actions were meant for the ticks that elapsed during the
+  inference: with `latency_compensation` they are dropped, and the rest of the chunk replaces the
+  remaining actions of the previous one. The last action of the chunk is always kept, so policies
+  returning one action per inference (e.g. ACT with temporal ensembling) still drive the robot
+
+`refill_threshold` should cover the inference latency in ticks (e.g. 150 ms at 30 fps is 5 ticks),
+otherwise the queue runs dry and `step` returns None until the chunk arrives.
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+
+import numpy as np
+
+
+class AsyncInferenceRunner:
+    """Chunk queue fed by a background inference thread.
+
+    Args:
+        compute_chunk: Observation -> (num_actions, action_dim) array of the actions to run from the tick
+            of the observation on. Runs on the worker thread.
+        refill_threshold: Request the next chunk when this many actions or fewer are left in the queue.
+        latency_compensation: Drop the actions of a new chunk for the ticks elapsed since its observation,
+            keeping at least its last action.
+    """
+
+    def __init__(
+        self,
+        compute_chunk: Callable[[dict], np.ndarray],
+        refill_threshold: int = 10,
+        latency_compensation: bool = True,
+    ):
+        self.compute_chunk = compute_chunk
+        self.refill_threshold = max(int(refill_threshold), 0)
+        self.latency_compensation = latency_compensation
+
+        self.actions: deque[np.ndarray] = deque()
+        self.tick = 0
+        # Ticks without an action to send, and latency of the last inference
+        self.starved_ticks = 0
+        self.last_inference_s = None
+
+        self._lock = threading.Lock()
+        self._request = threading.Condition(self._lock)
+        self._pending: tuple[dict, int, int] | None = None  # observation, tick, generation
+        self._inflight = False
+        self._result: tuple[np.ndarray, int, int] | None = None  # chunk, tick, generation
+        self._error: BaseException | None = None
+        self._generation = 0
+        self._running = False
+        self._thread: threading.Thread | None = None
+        # Held while computing, so that `reset` doesn't run in the middle of an inference
+        self._compute_lock = threading.Lock()
+
+    def start(self) -> None:
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._worker, name="async_inference", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        with self._lock:
+            self._running = False
+            self._request.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def reset(self, on_reset: Callable[[], None] | None = None) -> None:
+        """Drop the queued actions and any inference in flight, e.g. between episodes.
+
+        `on_reset` (e.g. `policy.reset`) runs once no inference is running.
+        """
+        with self._compute_lock:
+            with self._lock:
+                self._generation += 1
+                self._pending = None
+                self._result = None
+                self._inflight = False
+                self.actions.clear()
+                self.tick = 0
+                self.starved_ticks = 0
+            if on_reset is not None:
+                on_reset()
+
+    def step(self, observation: dict | None) -> np.ndarray | None:
+        """Next action to send, for the control tick of `observation`. None if no action is available yet.
+
+        Never waits for the policy: requests the next chunk when the queue runs low, and switches to the
+        latest computed chunk.
+        """
+        with self._lock:
+            if self._error is not None:
+                error, self._error = self._error, None
+                raise RuntimeError("[AsyncInference] Inference failed") from error
+
+            if self._result is not None:
+                chunk, obs_tick, generation = self._result
+                self._result = None
+                if generation == self._generation:
+                    self._switch_to(chunk, obs_tick)
+
+            if (
+                observation is not None
+                and len(self.actions) <= self.refill_threshold
+                and not self._inflight
+                and self._pending is None
+            ):
+                self._pending = (observation, self.tick, self._generation)
+                self._request.notify()
+
+            action = self.actions.popleft() if self.actions else None
+            if action is None:
+                self.starved_ticks += 1
+            self.tick += 1
+            return action
+
+    def _switch_to(self, chunk: np.ndarray, obs_tick: int) -> None:
+        elapsed = self.tick - obs_tick if self.latency_compensation else 0
+        if elapsed >= len(chunk):
+            # Single actions (e.g. temporal ensembling) always arrive at least a tick late
+            if len(chunk) > 1:
+                logging.warning(
+                    f"[AsyncInference] Chunk of {len(chunk)} actions arrived {elapsed} ticks after its "
+                    "observation, keeping its last action (increase refill_threshold or the chunk size)"
+                )
+            # The newest action is still closer to the current tick than an empty queue
+            elapsed = len(chunk) - 1
+        self.actions = deque(chunk[elapsed:])
+
+    def _worker(self) -> None:
+        while True:
+            with self._lock:
+                while self._running and self._pending is None:
+                    self._request.wait()
+                if not self._running:
+                    return
+                observation, obs_tick, generation = self._pending
+                self._pending = None
+                self._inflight = True
+
+            with self._compute_lock:
+                start = time.perf_counter()
+                try:
+                    chunk = np.atleast_2d(np.asarray(self.compute_chunk(observation)))
+                except Exception as e:  # surfaced in the control loop by `step`
+                    chunk, error = None, e
+                else:
+                    error = None
+                elapsed_s = time.perf_counter() - start
+
+            with self._lock:
+                self._inflight = False
+                if generation != self._generation:
+                    continue
+                if error is not None:
+                    self._error = error
+                    continue
+                self.last_inference_s = elapsed_s
+                self._result = (chunk, obs_tick, generation)
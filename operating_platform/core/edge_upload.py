@@ -410,7 +410,8 @@ class EdgeUploader:
 
         try:
             # Use subprocess for progress visibility
-            # tar cf (no compression - PNG is already compressed)
+            # tar cf (no compression - PNG/JPEG/lz4 frames are already compressed,
+            # compressing raw .npy frames here would cost more time than it saves on upload)
             cmd = [
                 "tar", "cf", str(tar_path),
                 "-C", str(local_path.parent),  # Change to parent dir
@@ -1,6 +1,8 @@
 import cv2
 import logging
+import os
 import time
+from collections.abc import Callable
 from dataclasses import asdict, dataclass
 from pathlib import Path
 from pprint import pformat
@@ -8,7 +10,10 @@ from functools import cache
 import traceback
 import draccus
 
+from operating_platform.core.async_inference import AsyncInferenceRunner
 from operating_platform.core.daemon import Daemon
+from operating_platform.core.observation_stager import ObservationStager
+from operating_platform.core.policy_server import PolicyClient
 
 from operating_platform.dataset.dorobot_dataset import DoRobotDataset
 from operating_platform.robot.robots.utils import (
@@ -26,6 +31,7 @@ from operating_platform.utils.utils import (
 from operating_platform.utils import parser
 import queue
 import threading
+from collections import deque
 from operating_platform.dataset.visual.visual_dataset import visualize_dataset
 from operating_platform.policy.factory import make_policy
 from operating_platform.utils.dataset import (
@@ -74,6 +80,22 @@ class InferenceConfig:
     policy_path: str | Path | None = None
     countdown_seconds: int = 3
     single_task: str = "TEST: no task description. Example: Pick apple."
+    # Compute action chunks on a background thread while the control loop keeps sending actions
+    # (see core/async_inference.py)
+    async_inference: bool = False
+    # Request the next chunk when this many actions or fewer are left, should cover the inference latency
+    refill_threshold: int = 10
+    # Drop the actions of a new chunk that were meant for the ticks elapsed during its inference
+    latency_compensation: bool = True
+    # Preprocess observations into reused (pinned) buffers, with the normalization of the cameras folded in
+    # (see core/observation_stager.py)
+    stage_observations: bool = True
+    # Get the action chunks from a policy server shared by the robots of this machine instead of loading the
+    # policy, e.g. "ipc:///tmp/dorobot-policy-server" (see core/policy_server.py). Chunks are consumed
+    # through the async inference runner.
+    policy_server: str | None = None
+    # Identifies this robot on the policy server (default: robot type and process id)
+    robot_id: str | None = None
 
 
 def predict_action(
@@ -83,27 +105,33 @@ def predict_action(
     use_amp: bool,
     task: str | None = None,
     robot_type: str | None = None,
+    stager: ObservationStager | None = None,
 ):
-    observation = copy(observation)
     with (
         torch.inference_mode(),
         torch.autocast(device_type=device.type) if device.type == "cuda" and use_amp else nullcontext(),
     ):
-        # Convert to pytorch format: channel first and float32 in [0,1] with batch dimension
-        for name in observation:
-            observation[name] = torch.from_numpy(observation[name])
-            if "image" in name:
-                observation[name] = observation[name].type(torch.float32) / 255
-                observation[name] = observation[name].permute(2, 0, 1).contiguous()
-            observation[name] = observation[name].unsqueeze(0)
-            observation[name] = observation[name].to(device)
+        if stager is not None:
+            # Same format, in reused buffers and normalized already for the keys the policy normalizes
+            observation = stager.stage(observation)
+        else:
+            observation = copy(observation)
+            # Convert to pytorch format: channel first and float32 in [0,1] with batch dimension
+            for name in observation:
+                observation[name] = torch.from_numpy(observation[name])
+                if "image" in name:
+                    observation[name] = observation[name].type(torch.float32) / 255
+                    observation[name] = observation[name].permute(2, 0, 1).contiguous()
+                observation[name] = observation[name].unsqueeze(0)
+                observation[name] = observation[name].to(device)
 
         observation["task"] = task if task else ""
         observation["robot_type"] = robot_type if robot_type else ""
 
         # Compute the next action with the policy
         # based on the current observation
-        action = policy.select_action(observation)
+        with stager.prenormalized() if stager is not None else nullcontext():
+            action = policy.select_action(observation)
 
         # Remove batch dimension
         action = action.squeeze(0)
@@ -113,6 +141,43 @@ def predict_action(
 
     return action
 
+def _policy_action_queue(policy: PreTrainedPolicy) -> deque | None:
+    """Queue in which the policy keeps the actions of its current chunk, None without one."""
+    action_queue = getattr(policy, "_action_queue", None)
+    if action_queue is None:
+        action_queue = getattr(policy, "_queues", {}).get("action")
+    return action_queue
+
+
+def predict_action_chunk(
+    observation: dict[str, np.ndarray],
+    policy: PreTrainedPolicy,
+    device: torch.device,
+    use_amp: bool,
+    task: str | None = None,
+    robot_type: str | None = None,
+    stager: ObservationStager | None = None,
+) -> torch.Tensor:
+    """Actions of a whole chunk for `observation`, (n_actions, action_dim) on cpu.
+
+    The chunk is the one `select_action` would queue from this observation (same preprocessing and
+    `n_action_steps`). Policies without an action queue (e.g. ACT with temporal ensembling) give a
+    single action.
+    """
+    action_queue = _policy_action_queue(policy)
+    if action_queue is not None:
+        # `select_action` computes a new chunk when its queue is empty, and returns its first action
+        action_queue.clear()
+    first = predict_action(
+        observation, policy, device, use_amp, task=task, robot_type=robot_type, stager=stager
+    )
+    actions = [first]
+    if action_queue is not None:
+        actions.extend(action.squeeze(0).to("cpu") for action in action_queue)
+        action_queue.clear()
+    return torch.stack(actions)
+
+
 # @draccus.wrap()
 def inference(cfg: InferenceConfig, policy_cfg: PreTrainedConfig,daemon: Daemon):
     dataset = DoRobotDataset(
@@ -127,17 +192,78 @@ def inference(cfg: InferenceConfig, policy_cfg: PreTrainedConfig,daemon: Daemon)
     #     )
     # sanity_check_dataset_robot_compatibility(dataset, robot, cfg.dataset.fps, dataset_features)
 
+    if cfg.policy_server is not None:
+        robot_id = cfg.robot_id or f"{daemon.robot.robot_type}-{os.getpid()}"
+        client = PolicyClient(cfg.policy_server, robot_id=robot_id)
+        runner = AsyncInferenceRunner(
+            lambda observation_frame: client.predict_chunk(
+                observation_frame, task=cfg.single_task, robot_type=daemon.robot.robot_type
+            ),
+            refill_threshold=cfg.refill_threshold,
+            latency_compensation=cfg.latency_compensation,
+        )
+        runner.start()
+        try:
+            _inference_loop(cfg, daemon, dataset, None, runner, reset_policy=client.reset)
+        finally:
+            runner.stop()
+            client.close()
+        return
+
     policy = None if policy_cfg is None else make_policy(policy_cfg, ds_meta=dataset.meta)
     if policy is None:
         logging.error("Policy cannot be None")
 
+    stager = None
+    if cfg.stage_observations and policy is not None:
+        stager = ObservationStager.for_policy(policy, get_safe_torch_device(policy.config.device))
+
+    runner = None
+    if cfg.async_inference and policy is not None:
+        device = get_safe_torch_device(policy.config.device)
+        runner = AsyncInferenceRunner(
+            lambda observation_frame: predict_action_chunk(
+                observation_frame,
+                policy,
+                device,
+                policy.config.use_amp,
+                task=cfg.single_task,
+                robot_type=daemon.robot.robot_type,
+                stager=stager,
+            ).numpy(),
+            refill_threshold=cfg.refill_threshold,
+            latency_compensation=cfg.latency_compensation,
+        )
+        runner.start()
+
+    try:
+        _inference_loop(cfg, daemon, dataset, policy, runner, stager=stager)
+    finally:
+        if runner is not None:
+            runner.stop()
+
+
+def _inference_loop(
+    cfg: InferenceConfig,
+    daemon: Daemon,
+    dataset: DoRobotDataset,
+    policy: PreTrainedPolicy | None,
+    runner: AsyncInferenceRunner | None,
+    stager: ObservationStager | None = None,
+    reset_policy: Callable[[], None] | None = None,
+):
+    if reset_policy is None and policy is not None:
+        reset_policy = policy.reset
+
     while True:
         logging.info("="*30)
         logging.info(f"Starting inference")
         logging.info("="*30)
 
-        if policy is not None:
-            policy.reset()
+        if runner is not None:
+            runner.reset(on_reset=reset_policy)
+        elif reset_policy is not None:
+            reset_policy()
         
         # 8. 开始记录（带倒计时）
         if cfg.countdown_seconds > 0:
@@ -159,7 +285,13 @@ def inference(cfg: InferenceConfig, policy_cfg: PreTrainedConfig,daemon: Daemon)
             if policy is not None or dataset is not None:
                 observation_frame = build_dataset_frame(dataset.features, observation, prefix="observation")
 
-            if policy is not None:
+            if runner is not None:
+                # The next action of the current chunk, the policy runs on the runner's thread
+                action_values = runner.step(observation_frame)
+                if action_values is not None:
+                    action = dict(zip(daemon.robot.action_features, action_values.tolist()))
+                    daemon.robot.send_action(action)
+            elif policy is not None:
                 action_values = predict_action(
                     observation_frame,
                     policy,
@@ -167,6 +299,7 @@ def inference(cfg: InferenceConfig, policy_cfg: PreTrainedConfig,daemon: Daemon)
                     policy.config.use_amp,
                     task=cfg.single_task,
                     robot_type=daemon.robot.robot_type,
+                    stager=stager,
                 )
                 action = {key: action_values[i].item() for i, key in enumerate(daemon.robot.action_features)}
                 print(f"action:{action}")
@@ -240,8 +373,8 @@ class ControlPipelineConfig:
             self.policy = PreTrainedConfig.from_pretrained(policy_path, cli_overrides=cli_overrides)
             self.policy.pretrained_path = policy_path
 
-        if self.teleop is None and self.policy is None:
-            raise ValueError("Choose a policy, a teleoperator or both to control the robot")
+        if self.teleop is None and self.policy is None and self.inference.policy_server is None:
+            raise ValueError("Choose a policy, a policy server, a teleoperator or both to control the robot")
         
     @classmethod
     def __get_path_fields__(cls) -> list[str]:
@@ -40,6 +40,8 @@ from operating_platform.core.daemon import Daemon
 from operating_platform.core.record import Record, RecordConfig
 from operating_platform.core.replay import DatasetReplayConfig, ReplayConfig, replay
 from operating_platform.utils.camera_display import CameraDisplay
+from operating_platform.utils.frame_format import list_frames
+from operating_platform.utils.video import encode_video_frames
 from operating_platform.core.cloud_train import CloudTrainer, run_cloud_training
 from operating_platform.core.edge_upload import EdgeUploader, run_edge_upload, EdgeConfig
 import getpass
@@ -245,7 +247,7 @@ class VideoEncoderThread(threading.Thread):
             print(f"[VideoEncoderThread] Directory not found: {img_dir}")
             return
 
-        images = sorted([p for p in img_dir.glob("*.png")])
+        images = list_frames(img_dir)
         if not images:
             print(f"[VideoEncoderThread] No images found in {img_dir}")
             return
@@ -253,25 +255,9 @@ class VideoEncoderThread(threading.Thread):
         output_path.parent.mkdir(parents=True, exist_ok=True)
         print(f"[{threading.current_thread().name}] Encoding {len(images)} frames -> {output_path}")
 
-        cmd = [
-            "ffmpeg",
-            "-y",
-            "-framerate", str(fps),
-            "-pattern_type", "glob",
-            "-i", "*.png",
-            "-c:v", "libx264",
-            "-pix_fmt", "yuv420p",
-            str(output_path),
-        ]
-
         try:
-            subprocess.run(
-                cmd,
-                cwd=str(img_dir),
-                stdout=subprocess.DEVNULL,
-                stderr=subprocess.DEVNULL,
-                check=True,
-            )
+            # Handles every intermediate frame format (PNG/JPEG sequences, raw/lz4 .npy)
+            encode_video_frames(img_dir, output_path, fps, vcodec="libx264", overwrite=True)
             print(f"[{threading.current_thread().name}] Finished: {output_path}")
         except subprocess.CalledProcessError as e:
             print(f"[{threading.current_thread().name}] ffmpeg failed for {img_dir}: {e}")
@@ -380,7 +366,16 @@ def record_loop(cfg: ControlPipelineConfig, daemon: Daemon):
         async_save_queue_size=cfg.record.async_save_queue_size,
         async_save_timeout_s=cfg.record.async_save_timeout_s,
         async_save_max_retries=cfg.record.async_save_max_retries,
+        async_save_workers=cfg.record.async_save_workers,
         cloud_offload=skip_encoding,  # True if cloud_offload is 1 or 2
+        sync_mode=cfg.record.sync_mode,
+        sync_latency_ms=cfg.record.sync_latency_ms,
+        streaming_encoding=cfg.record.streaming_encoding,
+        image_writer_max_queue_mb=cfg.record.image_writer_max_queue_mb,
+        image_writer_overflow_policy=cfg.record.image_writer_overflow_policy,
+        frame_format=cfg.record.frame_format,
+        frame_jpeg_quality=cfg.record.frame_jpeg_quality,
+        frame_png_compress_level=cfg.record.frame_png_compress_level,
     )
 
     # Track the actual offload mode (0, 1, or 2)
@@ -507,6 +502,14 @@ def record_loop(cfg: ControlPipelineConfig, daemon: Daemon):
             frame_counter += 1
             if frame_counter % MEMORY_CHECK_INTERVAL == 0:
                 should_stop, current_gb, limit_gb = should_auto_stop_for_memory()
+                image_writer = record.dataset.image_writer
+                if image_writer is not None:
+                    writer_stats = image_writer.get_stats()
+                    logging.debug(
+                        f"Image writer: {writer_stats['queue_depth']} frames, "
+                        f"{writer_stats['bytes_in_flight'] / 1024**2:.0f} MB in memory, "
+                        f"{writer_stats['spilled_bytes'] / 1024**2:.0f} MB spilled"
+                    )
                 if should_stop:
                     logging.warning("=" * 50)
                     logging.warning(f"MEMORY LIMIT REACHED: {current_gb:.2f} GB >= {limit_gb:.1f} GB")
@@ -0,0 +1,164 @@
+"""
+Observation preprocessing for `predict_action` into reused buffers.
+
+Converting an observation frame for the policy allocated new tensors for every key at every control
+tick: `torch.from_numpy`, the float32 copy of each camera, its division by 255, the channel first
+copy, the device copy, and then the normalization of the policy allocates its output again. At 30 Hz
+with a few cameras that is a steady churn of large allocations.
+
+`ObservationStager` allocates its buffers on the first observation and reuses them:
+
+- the arrays of the observation are packed into one pinned host buffer per dtype (all uint8 cameras
+  end up in one buffer), copied to the device in one transfer per dtype
+- cameras are converted to float32 channel first on the device, straight into their output buffers,
+  with the scaling to [0, 1] and the normalization of the policy (`Normalize.affine`) folded into
+  one multiply-add; the policy then leaves these keys as they are (`Normalize.prenormalized`)
+
+Policies that keep past observations (`n_obs_steps` > 1, e.g. diffusion) hold references to the
+staged tensors, so the device buffers rotate over `history + 1` sets.
+"""
+
+import logging
+from contextlib import nullcontext
+
+import numpy as np
+import torch
+
+from operating_platform.policy.normalize import Normalize
+from operating_platform.utils.device_prefetcher import _stream_backend
+
+
+class ObservationStager:
+    """Observation frames (numpy arrays, cameras as (H, W, C)) to batched tensors on `device`, in the
+    format `select_action` expects.
+
+    Args:
+        device: Device of the policy.
+        normalize: `policy.normalize_inputs`, to fold the normalization of the keys it normalizes into
+            the staging. None leaves the normalization to the policy.
+        history: Staged observations the policy may still reference when the next one is staged.
+        pin_memory: Stage the arrays in pinned host memory, for asynchronous copies to the device.
+    """
+
+    def __init__(
+        self,
+        device: torch.device | str,
+        normalize: Normalize | None = None,
+        history: int = 1,
+        pin_memory: bool = True,
+    ):
+        self.device = torch.device(device)
+        self.normalize = normalize
+        self.num_slots = max(int(history), 1) + 1
+        self.backend = _stream_backend(self.device)
+        self.pin_memory = pin_memory and self.backend is not None
+
+        # Keys whose staged tensors are normalized already
+        self.normalized_keys: frozenset[str] = frozenset()
+        self._signature = None
+        self._next_slot = 0
+        self._copy_done = None
+
+    @classmethod
+    def for_policy(cls, policy, device: torch.device | str, pin_memory: bool = True) -> "ObservationStager":
+        normalize = getattr(policy, "normalize_inputs", None)
+        return cls(
+            device,
+            normalize=normalize if isinstance(normalize, Normalize) else None,
+            history=getattr(policy.config, "n_obs_steps", 1),
+            pin_memory=pin_memory,
+        )
+
+    def prenormalized(self):
+        """Context in which the policy skips the normalization of the keys staged normalized."""
+        if self.normalize is None or not self.normalized_keys:
+            return nullcontext()
+        return self.normalize.prenormalized(self.normalized_keys)
+
+    def stage(self, observation: dict[str, np.ndarray]) -> dict[str, torch.Tensor]:
+        """Tensors of `observation` on the device, with a batch dimension. They stay valid until
+        `history` more observations are staged."""
+        signature = tuple((name, value.shape, value.dtype.str) for name, value in observation.items())
+        if signature != self._signature:
+            self._allocate(observation)
+            self._signature = signature
+
+        # The pinned buffers are only rewritten once their previous copy is done
+        if self._copy_done is not None:
+            self._copy_done.synchronize()
+        for name, value in observation.items():
+            self._host_views[name].copy_(torch.from_numpy(value))
+
+        slot = self._slots[self._next_slot]
+        self._next_slot = (self._next_slot + 1) % self.num_slots
+        for dtype, host in self._host.items():
+            slot["packed"][dtype].copy_(host, non_blocking=self.pin_memory)
+        if self.backend is not None:
+            self._copy_done = self.backend.Event()
+            self._copy_done.record(self.backend.current_stream(self.device))
+
+        with torch.no_grad():
+            for out, src, scale, bias in slot["convert"].values():
+                if scale is None:
+                    torch.div(src, 255, out=out)
+                else:
+                    torch.mul(src, scale, out=out).add_(bias)
+        return dict(slot["outputs"])
+
+    def _allocate(self, observation: dict[str, np.ndarray]) -> None:
+        if self._signature is not None:
+            logging.info("[ObservationStager] Observation layout changed, reallocating the staging buffers")
+
+        # Offsets of the arrays in the packed buffer of their dtype
+        layout = {}
+        sizes = {}
+        for name, value in observation.items():
+            dtype = torch.from_numpy(np.empty(0, dtype=value.dtype)).dtype
+            layout[name] = (dtype, sizes.get(dtype, 0), value.shape)
+            sizes[dtype] = sizes.get(dtype, 0) + value.size
+
+        self._host = {}
+        for dtype, size in sizes.items():
+            try:
+                self._host[dtype] = torch.empty(size, dtype=dtype, pin_memory=self.pin_memory)
+            except RuntimeError as e:
+                logging.warning(f"[ObservationStager] Can't pin memory, staging in pageable memory: {e}")
+                self.pin_memory = False
+                self._host[dtype] = torch.empty(size, dtype=dtype)
+        self._host_views = {
+            name: self._host[dtype][offset : offset + int(np.prod(shape))].view(shape)
+            for name, (dtype, offset, shape) in layout.items()
+        }
+
+        image_keys = {name for name in observation if "image" in name}
+        affines = {}
+        if self.normalize is not None:
+            for name, (dtype, _, _) in layout.items():
+                affine = self.normalize.affine(name)
+                # Other dtypes are left to the policy, whose normalization may promote them differently
+                if affine is not None and (name in image_keys or dtype == torch.float32):
+                    scale, bias = (t.to(self.device, torch.float32) for t in affine)
+                    # Cameras are in [0, 255]
+                    affines[name] = (scale / 255 if name in image_keys else scale, bias)
+        self.normalized_keys = frozenset(affines)
+
+        self._slots = []
+        for _ in range(self.num_slots):
+            packed = {dtype: torch.empty(size, dtype=dtype, device=self.device) for dtype, size in sizes.items()}
+            outputs, convert = {}, {}
+            for name, (dtype, offset, shape) in layout.items():
+                src = packed[dtype][offset : offset + int(np.prod(shape))].view(shape)
+                scale, bias = affines.get(name, (None, None))
+                if name in image_keys:
+                    src = src.permute(2, 0, 1)  # channel first
+                    out = torch.empty(src.shape, dtype=torch.float32, device=self.device)
+                    convert[name] = (out, src, scale, bias)
+                elif scale is not None:
+                    out = torch.empty(shape, dtype=torch.float32, device=self.device)
+                    convert[name] = (out, src, scale, bias)
+                else:
+                    out = src
+                outputs[name] = out.unsqueeze(0)
+            self._slots.append({"packed": packed, "outputs": outputs, "convert": convert})
+        self._next_slot = 0
+        self._copy_done = None
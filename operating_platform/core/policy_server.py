@@ -0,0 +1,472 @@
+"""
+One policy serving several robots of the same machine.
+
+Each robot process used to load its own copy of the policy (`make_policy` in `core/inference.py`), so
+four stations sharing one accelerator held four copies of the weights and ran four forward passes
+with a batch size of 1. `PolicyServer` loads the policy once and answers action chunk requests from
+the robots over a local ZeroMQ socket (`PolicyClient` on the robot side, `--inference.policy_server`):
+
+- requests arriving within `batch_window_s` of each other are batched: observations of the same
+  format go through the policy in one forward pass (up to `max_batch_size`), and each robot gets its
+  own action chunk back
+- each robot has its own session with the per-episode state of the policy (action queues,
+  observation history, ACT temporal ensembler), reset by the robot between episodes
+
+Cross-robot batching uses `predict_action_chunk`, for the policies whose chunk only depends on the
+current observation (`BATCHED_POLICY_TYPES`). Other policies (e.g. diffusion, which keeps an
+observation history) are run robot by robot through `select_action`, with the state of each robot
+swapped in.
+
+Messages are a JSON header followed by the raw buffers of their numpy arrays (dtype and shape in
+the header), nothing received is ever executed. The socket is meant for the processes of the same
+machine: only ipc:// and loopback tcp:// endpoints are accepted.
+
+Usage:
+    python operating_platform/core/policy_server.py \\
+        --repo_id=so101-test --policy.path=~/DoRobot/model --endpoint=ipc:///tmp/dorobot-policy-server
+"""
+
+import copy
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from dataclasses import asdict, dataclass, field
+from pprint import pformat
+
+import numpy as np
+import torch
+import zmq
+
+from operating_platform.config.policies import PreTrainedConfig
+from operating_platform.policy.pretrained import PreTrainedPolicy
+from operating_platform.utils import parser
+from operating_platform.utils.utils import get_safe_torch_device, init_logging
+
+DEFAULT_ENDPOINT = "ipc:///tmp/dorobot-policy-server"
+
+# Policies whose `predict_action_chunk` only depends on the observation it is given
+BATCHED_POLICY_TYPES = ("act",)
+
+# Attributes in which policies keep the state of the current episode (set by `reset`)
+SESSION_STATE_ATTRS = ("_action_queue", "_queues", "temporal_ensembler")
+
+LOOPBACK_HOSTS = ("127.0.0.1", "localhost", "[::1]")
+
+# Kinds of the arrays a message may carry: bool, integers, floats
+_ARRAY_KINDS = "biuf"
+
+
+def check_local_endpoint(endpoint: str) -> None:
+    """Raise ValueError unless `endpoint` can only be reached from this machine."""
+    if endpoint.startswith(("ipc://", "inproc://")):
+        return
+    if endpoint.startswith("tcp://"):
+        host = endpoint.removeprefix("tcp://").rsplit(":", 1)[0]
+        if host in LOOPBACK_HOSTS:
+            return
+    raise ValueError(
+        f"Policy server endpoint {endpoint!r} is not local, use ipc:// or tcp:// on a loopback address "
+        f"({', '.join(LOOPBACK_HOSTS)})."
+    )
+
+
+def encode_message(message: dict) -> list[bytes]:
+    """Frames of `message`: a JSON header, then the buffer of each numpy array of the message.
+
+    Values are JSON values, numpy arrays, or dicts of them (e.g. an observation).
+    """
+    buffers = []
+
+    def encode(value):
+        if isinstance(value, np.ndarray):
+            if value.dtype.kind not in _ARRAY_KINDS:
+                raise TypeError(f"Arrays of dtype {value.dtype} can't be sent to the policy server.")
+            value = np.ascontiguousarray(value)
+            buffers.append(value.data.cast("B"))
+            return {"__array__": len(buffers) - 1, "dtype": value.dtype.str, "shape": list(value.shape)}
+        if isinstance(value, dict):
+            return {key: encode(item) for key, item in value.items()}
+        return value
+
+    header = json.dumps({key: encode(value) for key, value in message.items()}).encode()
+    return [header, *buffers]
+
+
+def decode_message(frames: list[bytes]) -> dict:
+    """Inverse of `encode_message`. Arrays are read-only views of the frames."""
+    header, *buffers = frames
+
+    def decode(value):
+        if isinstance(value, dict) and "__array__" in value:
+            dtype = np.dtype(value["dtype"])
+            if dtype.kind not in _ARRAY_KINDS:
+                raise ValueError(f"Unsupported array dtype {dtype}")
+            shape = tuple(int(n) for n in value["shape"])
+            buffer = memoryview(buffers[value["__array__"]])
+            if buffer.nbytes != dtype.itemsize * int(np.prod(shape)):
+                raise ValueError(f"Array buffer of {buffer.nbytes} bytes doesn't match {dtype}{list(shape)}")
+            return np.frombuffer(buffer, dtype=dtype).reshape(shape)
+        if isinstance(value, dict):
+            return {key: decode(item) for key, item in value.items()}
+        return value
+
+    message = json.loads(header)
+    if not isinstance(message, dict):
+        raise ValueError("A message is a JSON object")
+    return {key: decode(value) for key, value in message.items()}
+
+
+@dataclass
+class RobotSession:
+    robot_id: str
+    # Per-episode state of the policy for this robot, see SESSION_STATE_ATTRS
+    state: dict = field(default_factory=dict)
+    requests: int = 0
+
+
+@dataclass
+class _Request:
+    identity: bytes
+    message: dict
+    reply: dict | None = None
+
+
+def _observation_signature(observation: dict[str, np.ndarray]) -> tuple:
+    return tuple((name, value.shape, value.dtype.str) for name, value in sorted(observation.items()))
+
+
+class PolicyServer:
+    """Serves action chunks of `policy` to the robots connected to `endpoint`.
+
+    Args:
+        policy: Loaded policy, on `device`.
+        device: Device of the policy.
+        endpoint: ZeroMQ endpoint to bind, e.g. "ipc:///tmp/dorobot-policy-server" or "tcp://127.0.0.1:5560"
+            (only local endpoints, see `check_local_endpoint`).
+        batch_window_s: After a first request, wait this long for requests of other robots to batch with.
+        max_batch_size: Observations per forward pass.
+        use_amp: Run the policy under autocast (CUDA).
+    """
+
+    def __init__(
+        self,
+        policy: PreTrainedPolicy,
+        device: torch.device | str,
+        endpoint: str = DEFAULT_ENDPOINT,
+        batch_window_s: float = 0.005,
+        max_batch_size: int = 8,
+        use_amp: bool = False,
+    ):
+        check_local_endpoint(endpoint)
+        self.policy = policy
+        self.device = torch.device(device)
+        self.endpoint = endpoint
+        self.batch_window_s = max(batch_window_s, 0.0)
+        self.max_batch_size = max(int(max_batch_size), 1)
+        self.use_amp = use_amp
+        self.batched = policy.config.type in BATCHED_POLICY_TYPES
+
+        self.sessions: dict[str, RobotSession] = {}
+        # Forward passes and the observations they processed
+        self.forward_passes = 0
+        self.batched_observations = 0
+
+        self._context = zmq.Context.instance()
+        self._socket = None
+        self._running = False
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        """Serve on a background thread."""
+        self._bind()
+        self._thread = threading.Thread(target=self._serve, name="policy_server", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._running = False
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def serve_forever(self) -> None:
+        self._bind()
+        self._serve()
+
+    def _bind(self) -> None:
+        self._socket = self._context.socket(zmq.ROUTER)
+        self._socket.setsockopt(zmq.LINGER, 0)
+        self._socket.bind(self.endpoint)
+        self._running = True
+        mode = "batched across robots" if self.batched else "robot by robot"
+        logging.info(f"[PolicyServer] Serving {self.policy.config.type} on {self.endpoint} ({mode})")
+
+    def _serve(self) -> None:
+        try:
+            while self._running:
+                if not self._socket.poll(100):
+                    continue
+                requests = [self._receive()]
+                # Give the other robots a chance to join the batch
+                deadline = time.perf_counter() + self.batch_window_s
+                while len(requests) < self.max_batch_size:
+                    remaining_ms = (deadline - time.perf_counter()) * 1000
+                    if remaining_ms <= 0 or not self._socket.poll(remaining_ms):
+                        break
+                    requests.append(self._receive())
+
+                self.handle(requests)
+                for request in requests:
+                    self._socket.send_multipart([request.identity, b"", *encode_message(request.reply)])
+        finally:
+            self._socket.close()
+            self._socket = None
+
+    def _receive(self) -> _Request:
+        identity, _, *frames = self._socket.recv_multipart()
+        try:
+            message = decode_message(frames)
+        except Exception as e:
+            return _Request(identity, {}, reply={"error": f"Invalid message: {e!r}"})
+        return _Request(identity, message)
+
+    def handle(self, requests: list[_Request]) -> None:
+        """Sets the reply of each request."""
+        pending = []
+        for request in requests:
+            if request.reply is not None:
+                continue
+            command = request.message.get("command")
+            if not isinstance(request.message.get("robot_id"), str):
+                request.reply = {"error": "Missing robot_id"}
+            elif command == "act":
+                observation = request.message.get("observation")
+                arrays = isinstance(observation, dict) and all(
+                    isinstance(value, np.ndarray) for value in observation.values()
+                )
+                if arrays:
+                    pending.append(request)
+                else:
+                    request.reply = {"error": "The observation must be a dict of arrays"}
+            elif command == "reset":
+                self.sessions.pop(request.message["robot_id"], None)
+                request.reply = {"ok": True}
+            else:
+                request.reply = {"error": f"Unknown command {command!r}"}
+
+        # Observations of the same format go through the policy together
+        groups: dict[tuple, list[_Request]] = {}
+        for request in pending:
+            groups.setdefault(_observation_signature(request.message["observation"]), []).append(request)
+        batch_size = self.max_batch_size if self.batched else 1
+        for group in groups.values():
+            for start in range(0, len(group), batch_size):
+                chunk_requests = group[start : start + batch_size]
+                try:
+                    chunks = self._predict(chunk_requests)
+                except Exception as e:
+                    logging.exception("[PolicyServer] Inference failed")
+                    for request in chunk_requests:
+                        request.reply = {"error": repr(e)}
+                    continue
+                for request, actions in zip(chunk_requests, chunks, strict=True):
+                    request.reply = {"actions": actions}
+
+    def _session(self, robot_id: str) -> RobotSession:
+        session = self.sessions.get(robot_id)
+        if session is None:
+            self.policy.reset()
+            state = {
+                name: copy.deepcopy(getattr(self.policy, name))
+                for name in SESSION_STATE_ATTRS
+                if hasattr(self.policy, name)
+            }
+            session = self.sessions[robot_id] = RobotSession(robot_id, state)
+            logging.info(f"[PolicyServer] New session for robot {robot_id} ({len(self.sessions)} robots)")
+        session.requests += 1
+        return session
+
+    @contextmanager
+    def _swapped_in(self, session: RobotSession):
+        """The per-episode state of the policy is the one of `session` while in this context."""
+        for name, value in session.state.items():
+            setattr(self.policy, name, value)
+        try:
+            yield
+        finally:
+            # `select_action` may assign new objects (e.g. `populate_queues`)
+            for name in session.state:
+                session.state[name] = getattr(self.policy, name)
+
+    def _to_batch(self, requests: list[_Request]) -> dict:
+        """Observations of the requests as one batch, formatted like `predict_action` (core/inference.py)."""
+        observations = [request.message["observation"] for request in requests]
+        batch = {}
+        for name in observations[0]:
+            tensor = torch.from_numpy(np.stack([observation[name] for observation in observations]))
+            if "image" in name:
+                tensor = (tensor.type(torch.float32) / 255).permute(0, 3, 1, 2).contiguous()
+            batch[name] = tensor.to(self.device)
+        tasks = [request.message.get("task") or "" for request in requests]
+        robot_types = [request.message.get("robot_type") or "" for request in requests]
+        batch["task"] = tasks if len(requests) > 1 else tasks[0]
+        batch["robot_type"] = robot_types if len(requests) > 1 else robot_types[0]
+        return batch
+
+    def _predict(self, requests: list[_Request]) -> list[np.ndarray]:
+        """(num_actions, action_dim) actions to run from each observation on."""
+        sessions = [self._session(request.message["robot_id"]) for request in requests]
+        batch = self._to_batch(requests)
+        amp = self.device.type == "cuda" and self.use_amp
+        with torch.inference_mode(), torch.autocast(device_type=self.device.type) if amp else nullcontext():
+            if self.batched:
+                chunks = self._predict_batched(sessions, batch)
+            else:
+                chunks = [self._predict_one(sessions[0], batch)]
+        self.forward_passes += 1
+        self.batched_observations += len(requests)
+        return [chunk.float().numpy() for chunk in chunks]
+
+    def _predict_batched(self, sessions: list[RobotSession], batch: dict) -> list[torch.Tensor]:
+        chunk = self.policy.predict_action_chunk(batch)
+        ensemblers = [session.state.get("temporal_ensembler") for session in sessions]
+        if all(ensembler is not None for ensembler in ensemblers):
+            # Temporal ensembling runs the policy at every step and sends the ensembled action
+            actions = torch.cat(
+                [ensembler.update(chunk[i : i + 1]) for i, ensembler in enumerate(ensemblers)]
+            )
+            return list(actions.to("cpu")[:, None])
+        n_action_steps = getattr(self.policy.config, "n_action_steps", chunk.shape[1])
+        return list(chunk[:, :n_action_steps].to("cpu"))
+
+    def _predict_one(self, session: RobotSession, batch: dict) -> torch.Tensor:
+        with self._swapped_in(session):
+            action_queue = getattr(self.policy, "_action_queue", None)
+            if action_queue is None:
+                action_queue = getattr(self.policy, "_queues", {}).get("action")
+            if action_queue is not None:
+                # `select_action` computes a new chunk when its queue is empty, and returns its first action
+                action_queue.clear()
+            actions = [self.policy.select_action(batch).squeeze(0)]
+            if action_queue is not None:
+                actions.extend(action.squeeze(0) for action in action_queue)
+                action_queue.clear()
+        return torch.stack(actions).to("cpu")
+
+
+class PolicyClient:
+    """Robot side of `PolicyServer`.
+
+    Args:
+        endpoint: Endpoint the server is bound to.
+        robot_id: Identifies the session of this robot on the server.
+        timeout_s: Raise TimeoutError when the server doesn't reply within this time.
+    """
+
+    def __init__(self, endpoint: str = DEFAULT_ENDPOINT, robot_id: str = "robot", timeout_s: float = 5.0):
+        check_local_endpoint(endpoint)
+        self.endpoint = endpoint
+        self.robot_id = robot_id
+        self.timeout_ms = int(timeout_s * 1000)
+        self._context = zmq.Context.instance()
+        self._socket = None
+        self._lock = threading.Lock()
+        self._connect()
+
+    def _connect(self) -> None:
+        self._socket = self._context.socket(zmq.REQ)
+        self._socket.setsockopt(zmq.LINGER, 0)
+        self._socket.setsockopt(zmq.RCVTIMEO, self.timeout_ms)
+        self._socket.connect(self.endpoint)
+
+    def close(self) -> None:
+        if self._socket is not None:
+            self._socket.close()
+            self._socket = None
+
+    def _request(self, message: dict) -> dict:
+        with self._lock:
+            self._socket.send_multipart(encode_message({**message, "robot_id": self.robot_id}))
+            try:
+                reply = decode_message(self._socket.recv_multipart())
+            except zmq.Again:
+                # A REQ socket can't send again before it got its reply, start over with a new one
+                self.close()
+                self._connect()
+                raise TimeoutError(
+                    f"[PolicyClient] No reply from the policy server at {self.endpoint} "
+                    f"within {self.timeout_ms} ms"
+                ) from None
+        if "error" in reply:
+            raise RuntimeError(f"[PolicyClient] Policy server error: {reply['error']}")
+        return reply
+
+    def predict_chunk(
+        self, observation: dict[str, np.ndarray], task: str | None = None, robot_type: str | None = None
+    ) -> np.ndarray:
+        """(num_actions, action_dim) actions to run from the tick of `observation` on."""
+        message = {"command": "act", "observation": observation, "task": task, "robot_type": robot_type}
+        # Writable copy of the received buffer
+        return np.array(self._request(message)["actions"])
+
+    def reset(self) -> None:
+        """Start a new episode: drops the policy state of this robot on the server."""
+        self._request({"command": "reset"})
+
+
+@dataclass
+class PolicyServerConfig:
+    # Dataset the policy was trained on, for its features (by convention '{hf_username}/{dataset_name}')
+    repo_id: str
+    root: str | None = None
+    endpoint: str = DEFAULT_ENDPOINT
+    # Wait this long after a request for the requests of other robots, to run them in one forward pass
+    batch_window_ms: float = 5.0
+    max_batch_size: int = 8
+    policy: PreTrainedConfig | None = None
+
+    def __post_init__(self):
+        # HACK: We parse again the cli args here to get the pretrained path if there was one.
+        policy_path = parser.get_path_arg("policy")
+        if policy_path:
+            cli_overrides = parser.get_cli_overrides("policy")
+            self.policy = PreTrainedConfig.from_pretrained(policy_path, cli_overrides=cli_overrides)
+            self.policy.pretrained_path = policy_path
+        if self.policy is None:
+            raise ValueError("A policy is required, e.g. --policy.path=local/dir")
+
+    @classmethod
+    def __get_path_fields__(cls) -> list[str]:
+        """This enables the parser to load config from the policy using `--policy.path=local/dir`"""
+        return ["policy"]
+
+
+@parser.wrap()
+def main(cfg: PolicyServerConfig):
+    init_logging(level=logging.INFO, force=True)
+    logging.info(pformat(asdict(cfg)))
+
+    from operating_platform.dataset.dorobot_dataset import DoRobotDatasetMetadata
+    from operating_platform.policy.factory import make_policy
+
+    ds_meta = DoRobotDatasetMetadata(cfg.repo_id, root=cfg.root)
+    policy = make_policy(cfg.policy, ds_meta=ds_meta)
+    policy.eval()
+
+    server = PolicyServer(
+        policy,
+        get_safe_torch_device(cfg.policy.device),
+        endpoint=cfg.endpoint,
+        batch_window_s=cfg.batch_window_ms / 1000,
+        max_batch_size=cfg.max_batch_size,
+        use_amp=cfg.policy.use_amp,
+    )
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logging.info("[PolicyServer] Stopped")
+
+
+if __name__ == "__main__":
+    main()
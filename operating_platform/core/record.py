@@ -10,6 +10,8 @@ from operating_platform.robot.robots.utils import Robot, busy_wait, safe_disconn
 from operating_platform.dataset.dorobot_dataset import *
 from operating_platform.core.daemon import Daemon
 from operating_platform.core.async_episode_saver import AsyncEpisodeSaver, EpisodeMetadata
+from operating_platform.robot.robots.stream_sync import SYNC_MODES
+from operating_platform.utils.frame_format import FrameFormat
 import draccus
 from operating_platform.utils import parser
 from operating_platform.utils.utils import has_method, init_logging, log_say, get_current_git_branch, git_branch_log, get_container_ip_from_hosts
@@ -99,6 +101,22 @@ class RecordConfig():
     # Too many threads might cause unstable teleoperation fps due to main thread being blocked.
     # Not enough threads might cause low camera fps.
     num_image_writer_threads_per_camera: int = 4
+    # Memory budget in MB for frames queued for writing (0 = unbounded). When a frame would exceed it:
+    #   "backpressure" = block the recording loop until the writers catch up
+    #   "spill"        = stage the frame in a file under <root>/.image_spill and keep recording
+    #   "degrade"      = write over-budget frames with fast (lossless, larger) PNG compression
+    image_writer_max_queue_mb: int = 0
+    image_writer_overflow_policy: str = "backpressure"
+    # File format of the video frames written until their episode is encoded. Faster formats
+    # reach the target fps with fewer writer threads, at the cost of disk space:
+    #   "png"     = lossless, smallest, slowest (frame_png_compress_level 0-9, empty = PIL default 6)
+    #   "jpeg"    = lossy, fast (frame_jpeg_quality 1-100)
+    #   "npy"     = raw frames, no encoding cost, largest
+    #   "npy.lz4" = raw frames compressed with lz4 (needs the lz4 package)
+    # With cloud/edge offload, the server encoding the uploaded frames must support the format too.
+    frame_format: str = "png"
+    frame_jpeg_quality: int = 95
+    frame_png_compress_level: int | None = None
 
     # Resume recording on an existing dataset.
     resume: bool = False
@@ -112,6 +130,10 @@ class RecordConfig():
     async_save_timeout_s: int = 300
     # Maximum retry attempts for failed saves
     async_save_max_retries: int = 3
+    # Episodes saved in parallel. Image waits and video encoding overlap between episodes,
+    # metadata is still committed in episode order. Concurrent encodes are bounded by the
+    # NPU channel / CPU encoder slots either way.
+    async_save_workers: int = 2
 
     # Cloud offload mode (CLOUD environment variable):
     #   0 = Local only (encode locally, no upload)
@@ -120,6 +142,19 @@ class RecordConfig():
     #   3 = Cloud encoded (encode locally, upload encoded to cloud)
     cloud_offload: int = 0
 
+    # Pipe video frames into one ffmpeg process per camera while recording instead of writing PNGs
+    # and encoding them after the episode. Only used when videos are encoded locally (cloud_offload 0 or 3).
+    streaming_encoding: bool = False
+
+    # Alignment of camera and joint streams to each recording tick:
+    #   "latest"  = use whatever the daemon read last (no alignment)
+    #   "nearest" = per stream, the sample captured closest to the tick
+    #   "linear"  = like nearest, but joint streams are interpolated between the samples around the tick
+    # Requires a robot implementing `synced_step` (so101, piper), otherwise falls back to "latest".
+    sync_mode: str = "latest"
+    # The tick is placed this far in the past so that samples on both sides of it have arrived
+    sync_latency_ms: float = 50.0
+
     record_cmd = None
 
 
@@ -144,6 +179,17 @@ class Record:
         # Pause flag to stop recording during environment reset
         self._recording_paused = False
 
+        # Stream synchronization (per-frame skew is kept for reporting)
+        self.sync_mode = getattr(record_cfg, 'sync_mode', "latest")
+        if self.sync_mode not in SYNC_MODES:
+            raise ValueError(f"Unknown sync_mode '{self.sync_mode}', expected one of {SYNC_MODES}.")
+        if self.sync_mode != "latest" and not has_method(robot, "synced_step"):
+            logging.warning(f"[Record] {robot.robot_type} has no synced_step(), sync_mode falls back to 'latest'")
+            self.sync_mode = "latest"
+        self._sync_latency_ns = int(getattr(record_cfg, 'sync_latency_ms', 50.0) * 1e6)
+        self.last_frame_skew_ms: dict[str, float] = {}
+        self._episode_max_skew_ms: dict[str, float] = {}
+
         # Async save support
         self.use_async_save = getattr(record_cfg, 'use_async_save', True)  # Default to True
         self.async_saver = None
@@ -153,24 +199,41 @@ class Record:
         # Skip encoding for modes 1 (cloud raw) and 2 (edge) - they do encoding remotely
         # Modes 0 (local) and 3 (cloud encoded) do local encoding
         self.skip_encoding = self.cloud_offload in (1, 2)
+        # Streaming encoding produces the mp4 directly, so it can't be used when raw images are uploaded
+        self.streaming_encoding = (
+            getattr(record_cfg, 'streaming_encoding', False) and record_cfg.video and not self.skip_encoding
+        )
         if self.use_async_save:
             max_queue_size = getattr(record_cfg, 'async_save_queue_size', 10)
-            self.async_saver = AsyncEpisodeSaver(max_queue_size=max_queue_size)
+            num_workers = record_cfg.async_save_workers
+            self.async_saver = AsyncEpisodeSaver(max_queue_size=max_queue_size, num_workers=num_workers)
 
         action_features = hw_to_dataset_features(robot.action_features, "action", self.robot.use_videos)
         obs_features = hw_to_dataset_features(robot.observation_features, "observation", self.robot.use_videos)
         dataset_features = {**action_features, **obs_features}
 
+        max_queue_bytes = int(getattr(record_cfg, 'image_writer_max_queue_mb', 0)) * 1024 * 1024 or None
+        overflow_policy = getattr(record_cfg, 'image_writer_overflow_policy', "backpressure")
+        frame_format = FrameFormat(
+            name=getattr(record_cfg, 'frame_format', "png"),
+            jpeg_quality=getattr(record_cfg, 'frame_jpeg_quality', 95),
+            png_compress_level=getattr(record_cfg, 'frame_png_compress_level', None),
+        )
+
         if self.record_cfg.resume:
             self.dataset = DoRobotDataset(
                 record_cfg.repo_id,
                 root=record_cfg.root,
             )
+            self.dataset.frame_format = frame_format
             if len(robot.cameras) > 0:
                 self.dataset.start_image_writer(
                     num_processes=record_cfg.num_image_writer_processes,
                     num_threads=record_cfg.num_image_writer_threads_per_camera * len(robot.cameras),
+                    max_queue_bytes=max_queue_bytes,
+                    overflow_policy=overflow_policy,
                 )
+            self.dataset.streaming_encoding = self.streaming_encoding
             if len(robot.microphones) > 0:
                 self.dataset.start_audio_writer(
                     microphones=robot.microphones,
@@ -189,6 +252,10 @@ class Record:
                 use_audios=len(robot.microphones) > 0,
                 image_writer_processes=record_cfg.num_image_writer_processes,
                 image_writer_threads=record_cfg.num_image_writer_threads_per_camera * len(robot.cameras),
+                streaming_encoding=self.streaming_encoding,
+                image_writer_max_queue_bytes=max_queue_bytes,
+                image_writer_overflow_policy=overflow_policy,
+                frame_format=frame_format,
             )
 
         self.thread = threading.Thread(target=self.process, daemon=True)
@@ -242,7 +309,11 @@ class Record:
         if clear_buffer:
             # Create fresh buffer to ensure no stray frames from reset phase
             with self._buffer_lock:
+                discarded = self.dataset.episode_buffer
                 self.dataset.episode_buffer = self._create_new_episode_buffer()
+            if discarded is not None and discarded.get("size", 0) > 0:
+                self.dataset.abort_episode_streams(discarded["episode_index"])
+            self._episode_max_skew_ms = {}
         self._recording_paused = False
         logging.info("[Record] Recording resumed")
 
@@ -256,8 +327,7 @@ class Record:
             if self.dataset is not None:
                 start_loop_t = time.perf_counter()
 
-                observation = self.daemon.get_observation()
-                action = self.daemon.get_obs_action()
+                observation, action = self._capture()
 
                 if self.dataset is not None:
                     observation_frame = build_dataset_frame(self.dataset.features, observation, prefix="observation")
@@ -273,6 +343,30 @@ class Record:
                     busy_wait(1 / self.fps - dt_s)
 
 
+    def _capture(self) -> tuple[dict, dict]:
+        """Observation and action for the current tick, aligned per `sync_mode`."""
+        if self.sync_mode == "latest":
+            return self.daemon.get_observation(), self.daemon.get_obs_action()
+
+        tick_ns = time.monotonic_ns() - self._sync_latency_ns
+        observation, action, skew_ms = self.robot.synced_step(tick_ns, mode=self.sync_mode)
+
+        self.last_frame_skew_ms = skew_ms
+        for stream, skew in skew_ms.items():
+            self._episode_max_skew_ms[stream] = max(self._episode_max_skew_ms.get(stream, 0.0), abs(skew))
+        logging.debug("[Record] frame skew (ms): " + ", ".join(f"{k}={v:+.1f}" for k, v in skew_ms.items()))
+
+        return observation, action
+
+    def _report_sync_skew(self, episode_index) -> None:
+        """Log the worst per-stream skew of the episode being closed and reset the counters."""
+        if self.sync_mode == "latest":
+            return
+        if self._episode_max_skew_ms:
+            summary = ", ".join(f"{k}={v:.1f}" for k, v in sorted(self._episode_max_skew_ms.items()))
+            logging.info(f"[Record] Episode {episode_index} max |skew| per stream (ms, {self.sync_mode}): {summary}")
+        self._episode_max_skew_ms = {}
+
     def stop(self):
         if self.running == True:
             self.running = False
@@ -308,23 +402,26 @@ class Record:
         Args:
             skip_encoding: If True, skip video encoding (cloud offload mode).
         """
-        import copy
-
         # CRITICAL: Use lock to atomically capture buffer and swap to new one
         # This prevents the recording thread from adding frames during the swap
         with self._buffer_lock:
-            current_ep_idx = self.dataset.episode_buffer.get("episode_index", "?")
+            finished_buffer = self.dataset.episode_buffer
+            current_ep_idx = finished_buffer.get("episode_index", "?")
             logging.info(f"[Record] Queueing episode {current_ep_idx} for async save (skip_encoding={skip_encoding})...")
+            self._report_sync_skew(current_ep_idx)
 
-            # Deep copy the buffer INSIDE the lock (before recording thread can add more frames)
-            buffer_copy = copy.deepcopy(self.dataset.episode_buffer)
-
-            # Create new episode buffer INSIDE the lock
+            # Create new episode buffer INSIDE the lock, the recording thread never sees the old one again
             self.dataset.episode_buffer = self._create_new_episode_buffer()
 
-        # Queue save task with the copied buffer (outside lock to minimize lock hold time)
+        # Seal (no copy): the finished buffer now belongs to the saver
+        finished_buffer.seal()
+
+        # The recording thread now writes to the next episode, let this one's video streams flush
+        self.dataset.close_episode_streams(current_ep_idx)
+
+        # Queue save task with the sealed buffer (outside lock to minimize lock hold time)
         metadata = self.async_saver.queue_save(
-            episode_buffer=buffer_copy,  # Pass the COPY, not the live buffer
+            episode_buffer=finished_buffer,
             dataset=self.dataset,
             record_cfg=self.record_cfg,
             record_cmd=self.record_cmd,
@@ -345,6 +442,7 @@ class Record:
             skip_encoding: If True, skip video encoding (cloud offload mode).
         """
         print(f"will save_episode (skip_encoding={skip_encoding})")
+        self._report_sync_skew(self.dataset.episode_buffer.get("episode_index", "?"))
 
         episode_index = self.dataset.save_episode(skip_encoding=skip_encoding)
 
@@ -26,9 +26,12 @@ from torch.optim import Optimizer
 
 from operating_platform.config import parser
 from operating_platform.config.train import TrainPipelineConfig
+from operating_platform.dataset.dorobot_dataset import MultiDoRobotDataset
 from operating_platform.dataset.factory import make_dataset
-from operating_platform.dataset.sampler import EpisodeAwareSampler
+from operating_platform.dataset.sampler import EpisodeAwareSampler, WeightedDatasetSampler
+from operating_platform.dataset.transforms import BatchImageTransforms
 from operating_platform.utils.dataset import cycle
+from operating_platform.utils.device_prefetcher import DevicePrefetcher
 from operating_platform.envs.factory import make_env
 from operating_platform.optim.factory import make_optimizer_and_scheduler
 from operating_platform.policy.factory import make_policy
@@ -38,6 +41,7 @@ from operating_platform.core.eval import eval_policy
 from operating_platform.utils.logging_utils import AverageMeter, MetricsTracker
 from operating_platform.utils.random_utils import set_seed
 from operating_platform.utils.train_utils import (
+    AsyncCheckpointWriter,
     get_step_checkpoint_dir,
     get_step_identifier,
     load_training_state,
@@ -164,12 +168,42 @@ def train(cfg: TrainPipelineConfig):
     logging.info(f"{num_total_params=} ({format_big_number(num_total_params)})")
 
     # create dataloader for offline training
-    if hasattr(cfg.policy, "drop_n_last_frames"):
-        shuffle = False
-        sampler = EpisodeAwareSampler(
-            dataset.episode_data_index,
-            drop_n_last_frames=cfg.policy.drop_n_last_frames,
+    locality_sampling = cfg.sampler_shuffle_mode != "full" or (
+        cfg.sampler_worker_affinity and cfg.num_workers > 0
+    )
+    episode_aware = hasattr(cfg.policy, "drop_n_last_frames") or locality_sampling
+
+    def episode_sampler(episode_data_index: dict, num_workers: int) -> EpisodeAwareSampler:
+        return EpisodeAwareSampler(
+            episode_data_index,
+            drop_n_last_frames=getattr(cfg.policy, "drop_n_last_frames", 0),
             shuffle=True,
+            shuffle_mode=cfg.sampler_shuffle_mode,
+            block_size=cfg.sampler_block_size,
+            window=cfg.sampler_window,
+            num_workers=num_workers,
+            batch_size=cfg.batch_size,
+        )
+
+    if isinstance(dataset, MultiDoRobotDataset):
+        # Datasets are interleaved by their weights, each one is shuffled by its own sampler
+        if cfg.sampler_worker_affinity:
+            logging.warning("sampler_worker_affinity is not supported with several datasets, ignoring it")
+        shuffle = False
+        sampler = WeightedDatasetSampler(
+            [
+                episode_sampler(ds.episode_data_index, 0)
+                if episode_aware
+                else torch.utils.data.RandomSampler(ds)
+                for ds in dataset.sub_datasets
+            ],
+            dataset.offsets,
+            weights=dataset.weights,
+        )
+    elif episode_aware:
+        shuffle = False
+        sampler = episode_sampler(
+            dataset.episode_data_index, cfg.num_workers if cfg.sampler_worker_affinity else 0
         )
     else:
         shuffle = True
@@ -184,7 +218,12 @@ def train(cfg: TrainPipelineConfig):
         pin_memory=device.type == "cuda",
         drop_last=False,
     )
-    dl_iter = cycle(dataloader)
+    dl_iter = DevicePrefetcher(cycle(dataloader), device, depth=cfg.prefetch_batches)
+
+    # Frames come as uint8 and are augmented (and converted to float) on the device
+    batch_transforms = None
+    if cfg.dataset.image_transforms.enable and cfg.dataset.image_transforms.on_device:
+        batch_transforms = BatchImageTransforms(cfg.dataset.image_transforms).to(device)
 
     policy.train()
 
@@ -200,15 +239,19 @@ def train(cfg: TrainPipelineConfig):
         cfg.batch_size, dataset.num_frames, dataset.num_episodes, train_metrics, initial_step=step
     )
 
+    checkpoint_writer = None
+    if cfg.save_checkpoint and cfg.async_checkpoint:
+        checkpoint_writer = AsyncCheckpointWriter(cfg.max_pending_checkpoints)
+
     logging.info("Start offline training on a fixed dataset")
     for _ in range(step, cfg.steps):
         start_time = time.perf_counter()
         batch = next(dl_iter)
         train_tracker.dataloading_s = time.perf_counter() - start_time
 
-        for key in batch:
-            if isinstance(batch[key], torch.Tensor):
-                batch[key] = batch[key].to(device, non_blocking=device.type == "cuda")
+        if batch_transforms is not None:
+            for key in dataset.meta.camera_keys:
+                batch[key] = batch_transforms(batch[key])
 
         # ===== 新增：打印 batch 信息（仅调试用）=====
         print("\n" + "="*50)
@@ -262,10 +305,21 @@ def train(cfg: TrainPipelineConfig):
         if cfg.save_checkpoint and is_saving_step:
             logging.info(f"Checkpoint policy after step {step}")
             checkpoint_dir = get_step_checkpoint_dir(cfg.output_dir, cfg.steps, step)
-            save_checkpoint(checkpoint_dir, step, cfg, policy, optimizer, lr_scheduler)
-            update_last_checkpoint(checkpoint_dir)
-            if wandb_logger:
-                wandb_logger.log_policy(checkpoint_dir)
+            if checkpoint_writer is not None:
+                checkpoint_writer.save(
+                    checkpoint_dir,
+                    step,
+                    cfg,
+                    policy,
+                    optimizer,
+                    lr_scheduler,
+                    on_done=wandb_logger.log_policy if wandb_logger else None,
+                )
+            else:
+                save_checkpoint(checkpoint_dir, step, cfg, policy, optimizer, lr_scheduler)
+                update_last_checkpoint(checkpoint_dir)
+                if wandb_logger:
+                    wandb_logger.log_policy(checkpoint_dir)
 
         if cfg.env and is_eval_step:
             step_id = get_step_identifier(step, cfg.steps)
@@ -300,6 +354,8 @@ def train(cfg: TrainPipelineConfig):
                 wandb_logger.log_dict(wandb_log_dict, step, mode="eval")
                 wandb_logger.log_video(eval_info["video_paths"][0], step, mode="eval")
 
+    if checkpoint_writer is not None:
+        checkpoint_writer.close()
     if eval_env:
         eval_env.close()
     logging.info("End of training")
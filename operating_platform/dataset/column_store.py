@@ -0,0 +1,132 @@
+"""
+Memory-mapped column store for the numeric features of a dataset.
+
+Reading a row through `hf_dataset` goes through arrow and `hf_transform_to_torch` for every key
+of every sample, and `delta_timestamps` windows add one `hf_dataset.select` per key per sample.
+For state-only policies that is where the data loading time goes. `ColumnStore` materialises the
+numeric parquet columns (state, action, timestamp, indices...) once into contiguous `.npy` files
+under `meta/columns/`, opened with `np.load(mmap_mode="r")`: rows and windows are plain numpy
+fancy indexing, and DataLoader workers share the pages of the files instead of each holding a
+copy.
+
+Columns are stored with the dtypes `hf_transform_to_torch` produces (floats as float32, integers as
+int64), so items are the same as through `hf_dataset`. Rows are in `index` order; the store is
+rebuilt when the parquet files change (see `manifest.json`).
+
+Enabled with `DoRobotDataset(..., column_store=True)` (`DatasetConfig.column_store`).
+"""
+
+import logging
+import shutil
+from pathlib import Path
+
+import numpy as np
+import pyarrow.parquet as pq
+
+from operating_platform.utils.dataset import load_json, write_json
+
+COLUMNS_DIR = "meta/columns"
+MANIFEST_NAME = "manifest.json"
+
+
+def store_columns(features: dict) -> dict[str, dict]:
+    """Features stored as columns: numeric scalars and vectors."""
+    return {
+        key: ft
+        for key, ft in features.items()
+        if ft["dtype"] not in ("image", "video", "audio", "string") and len(ft["shape"]) == 1
+    }
+
+
+def _column_dtype(dtype: str) -> np.dtype:
+    # Same as torch.tensor() on the python values returned by the hf dataset
+    if dtype == "bool":
+        return np.dtype(np.bool_)
+    if np.issubdtype(np.dtype(dtype), np.floating):
+        return np.dtype(np.float32)
+    return np.dtype(np.int64)
+
+
+def _files_signature(root: Path, data_files: list[str]) -> list:
+    signature = []
+    for fpath in data_files:
+        st = (root / fpath).stat()
+        signature.append([fpath, st.st_size, st.st_mtime_ns])
+    return signature
+
+
+class ColumnStore:
+    """Memory-mapped numeric columns of a dataset, rows in `index` order."""
+
+    def __init__(self, columns: dict[str, np.ndarray]):
+        self.columns = columns
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.columns
+
+    def __getitem__(self, key: str) -> np.ndarray:
+        return self.columns[key]
+
+    def keys(self):
+        return self.columns.keys()
+
+    def __len__(self) -> int:
+        return len(next(iter(self.columns.values()))) if self.columns else 0
+
+    @classmethod
+    def load_or_build(cls, root: str | Path, features: dict, data_files: list[str]) -> "ColumnStore":
+        """Open the store of the dataset at `root`, (re)building it if missing or stale.
+
+        `data_files` are the parquet files of all episodes (relative to `root`), in episode order.
+        """
+        root = Path(root)
+        store_dir = root / COLUMNS_DIR
+        columns = store_columns(features)
+        manifest = {
+            "columns": {key: {"dtype": ft["dtype"], "shape": list(ft["shape"])} for key, ft in columns.items()},
+            "files": _files_signature(root, data_files),
+        }
+        manifest_path = store_dir / MANIFEST_NAME
+        if not manifest_path.is_file() or load_json(manifest_path) != manifest:
+            cls.build(root, columns, data_files)
+            write_json(manifest, manifest_path)
+        return cls({key: np.load(store_dir / f"{key}.npy", mmap_mode="r") for key in columns})
+
+    @staticmethod
+    def build(root: Path, columns: dict[str, dict], data_files: list[str]) -> None:
+        store_dir = root / COLUMNS_DIR
+        logging.info(f"[ColumnStore] Building {len(columns)} columns from {len(data_files)} parquet files")
+        if store_dir.exists():
+            shutil.rmtree(store_dir)
+        store_dir.mkdir(parents=True)
+
+        num_rows = sum(pq.ParquetFile(root / fpath).metadata.num_rows for fpath in data_files)
+        arrays = {
+            key: np.lib.format.open_memmap(
+                store_dir / f"{key}.npy",
+                mode="w+",
+                dtype=_column_dtype(ft["dtype"]),
+                shape=(num_rows,) if tuple(ft["shape"]) == (1,) else (num_rows, ft["shape"][0]),
+            )
+            for key, ft in columns.items()
+        }
+        index = np.empty(num_rows, dtype=np.int64)
+        start = 0
+        for fpath in data_files:
+            table = pq.read_table(root / fpath, columns=[key for key in columns])
+            end = start + table.num_rows
+            for key, array in arrays.items():
+                chunk = table.column(key).combine_chunks()
+                if array.ndim == 2:
+                    chunk = chunk.flatten()
+                array[start:end] = chunk.to_numpy(zero_copy_only=False).reshape(array[start:end].shape)
+            index[start:end] = arrays["index"][start:end] if "index" in arrays else np.arange(start, end)
+            start = end
+
+        # Rows in `index` order, so that a dataset index is a row of the store
+        order = np.argsort(index, kind="stable")
+        if not np.array_equal(order, np.arange(num_rows)):
+            for array in arrays.values():
+                array[:] = array[order]
+        for array in arrays.values():
+            array.flush()
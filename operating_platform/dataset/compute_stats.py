@@ -72,6 +72,130 @@ def sample_images(image_paths: list[str]) -> np.ndarray:
     return images
 
 
+class StridedImageSampler:
+    """Evenly spaced, downsampled frames of a stream whose length isn't known in advance.
+
+    Used instead of `sample_images` for frames seen while recording, so image stats don't need the
+    image files (streamed videos have none). Every `stride`-th frame is kept; when `2 * max_samples`
+    frames are kept, every other one is dropped and the stride doubles.
+    """
+
+    def __init__(self, max_samples: int = 256):
+        self.max_samples = max_samples
+        self.stride = 1
+        self._count = 0
+        self._images: list[np.ndarray] = []
+
+    def add(self, image: np.ndarray) -> None:
+        if self._count % self.stride == 0:
+            image = np.asarray(image)
+            if image.shape[-1] == 3 and image.shape[0] != 3:
+                image = image.transpose(2, 0, 1)
+            if image.dtype != np.uint8:
+                image = (image * 255).astype(np.uint8)
+            # Copy, the caller may reuse its frame buffer
+            self._images.append(np.array(auto_downsample_height_width(image), order="C"))
+            if len(self._images) >= 2 * self.max_samples:
+                self._images = self._images[::2]
+                self.stride *= 2
+        self._count += 1
+
+    @property
+    def count(self) -> int:
+        """Number of frames seen (not only the sampled ones)."""
+        return self._count
+
+    def images(self) -> np.ndarray:
+        """Sampled frames as a (N, C, H, W) uint8 array."""
+        return np.stack(self._images)
+
+
+class RunningStats:
+    """Min, max, mean and (population) std of a vector feature, updated one frame at a time.
+
+    Mean and variance use Welford's algorithm in float64, the results have the same shapes as
+    `get_feature_stats(data, axis=0, keepdims=data.ndim == 1)`.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self._mean = None
+        self._m2 = None
+        self._min = None
+        self._max = None
+
+    def add(self, value) -> None:
+        value = np.atleast_1d(np.asarray(value))
+        self.count += 1
+        if self.count == 1:
+            self._mean = value.astype(np.float64)
+            self._m2 = np.zeros_like(self._mean)
+            self._min = value.copy()
+            self._max = value.copy()
+            return
+        delta = value - self._mean
+        self._mean += delta / self.count
+        self._m2 += delta * (value - self._mean)
+        np.minimum(self._min, value, out=self._min)
+        np.maximum(self._max, value, out=self._max)
+
+    def stats(self) -> dict[str, np.ndarray]:
+        return {
+            "min": self._min.copy(),
+            "max": self._max.copy(),
+            "mean": self._mean.copy(),
+            "std": np.sqrt(self._m2 / self.count),
+            "count": np.array([self.count]),
+        }
+
+
+class OnlineEpisodeStats:
+    """Episode stats accumulated while the frames are recorded.
+
+    `add(key, value)` is called by `DoRobotDataset.add_frame` for every value it buffers: vector
+    features go to a `RunningStats`, image and video frames to a `StridedImageSampler`. `finalize`
+    then returns what `compute_episode_stats` would, without reading the image files back.
+    """
+
+    def __init__(self, features: dict, max_image_samples: int = 256):
+        self.features = features
+        self._vectors: dict[str, RunningStats] = {}
+        self._images: dict[str, StridedImageSampler] = {}
+        self._max_image_samples = max_image_samples
+
+    def add(self, key: str, value) -> None:
+        dtype = self.features[key]["dtype"]
+        if dtype in ["string", "audio"]:
+            return
+        if dtype in ["image", "video"]:
+            sampler = self._images.get(key)
+            if sampler is None:
+                sampler = self._images[key] = StridedImageSampler(self._max_image_samples)
+            sampler.add(value)
+        else:
+            running = self._vectors.get(key)
+            if running is None:
+                running = self._vectors[key] = RunningStats()
+            running.add(value)
+
+    def finalize(self, episode_data: dict, episode_length: int) -> dict:
+        """Stats of the episode. Keys that weren't fed frame by frame (e.g. `index`, `task_index`,
+        set by `save_episode`) are computed from `episode_data` with `compute_episode_stats`."""
+        stats_data = {}
+        for key, data in episode_data.items():
+            if key in self._images and self._images[key].count == episode_length:
+                stats_data[key] = self._images[key].images()
+            elif not (key in self._vectors and self._vectors[key].count == episode_length):
+                stats_data[key] = data
+        ep_stats = compute_episode_stats(stats_data, self.features)
+        # Same key order as compute_episode_stats(episode_data)
+        return {
+            key: ep_stats[key] if key in ep_stats else self._vectors[key].stats()
+            for key in episode_data
+            if key in ep_stats or key in self._vectors
+        }
+
+
 def get_feature_stats(array: np.ndarray, axis: tuple, keepdims: bool) -> dict[str, np.ndarray]:
     return {
         "min": np.min(array, axis=axis, keepdims=keepdims),
@@ -88,7 +212,10 @@ def compute_episode_stats(episode_data: dict[str, list[str] | np.ndarray], featu
         if features[key]["dtype"] == "string" or features[key]["dtype"] == "audio":
             continue  # HACK: we should receive np.arrays of strings
         elif features[key]["dtype"] in ["image", "video"]:
-            ep_ft_array = sample_images(data)  # data is a list of image paths
+            if isinstance(data, np.ndarray):
+                ep_ft_array = data  # frames already sampled while recording (N, C, H, W)
+            else:
+                ep_ft_array = sample_images(data)  # data is a list of image paths
             axes_to_reduce = (0, 2, 3)  # keep channel dim
             keepdims = True
         else:
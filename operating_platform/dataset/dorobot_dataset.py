@@ -1,5 +1,7 @@
 import os
+import bisect
 import contextlib
+import copy
 import logging
 import shutil
 import threading
@@ -18,8 +20,12 @@ from huggingface_hub.constants import REPOCARD_NAME
 from huggingface_hub.errors import RevisionNotFoundError
 
 
+from operating_platform.dataset.column_store import COLUMNS_DIR, ColumnStore
+from operating_platform.dataset.frame_cache import FRAME_CACHE_DIR, FrameCache
 from operating_platform.dataset.compute_stats import aggregate_stats, compute_episode_stats
-from operating_platform.dataset.image_writer import AsyncImageWriter, write_image
+from operating_platform.dataset.episode_buffer import EpisodeBuffer, GrowableColumn
+from operating_platform.dataset.meta_store import MetadataStore, get_metadata_store
+from operating_platform.dataset.image_writer import AsyncImageWriter, ImageWriteError, write_image
 from operating_platform.dataset.audio_writer import AsyncAudioWriter
 from operating_platform.dataset.functions import (
     check_version_compatibility,
@@ -28,12 +34,16 @@ from operating_platform.dataset.functions import (
 
 )
 from operating_platform.utils.constants import DOROBOT_DATASET
+from operating_platform.utils.frame_format import FrameFormat
 from operating_platform.utils.dataset import (
     DEFAULT_FEATURES,
     DEFAULT_IMAGE_PATH,
     DEFAULT_AUDIO_PATH,
+    EPISODES_PATH,
+    EPISODES_STATS_PATH,
     INFO_PATH,
     TASKS_PATH,
+    VALIDATION_PATH,
     append_jsonlines,
     backward_compatible_episodes_stats,
     check_delta_timestamps,
@@ -53,22 +63,22 @@ from operating_platform.utils.dataset import (
     load_info,
     load_stats,
     load_tasks,
+    record_timestamps_validated,
+    timestamps_validated,
     validate_episode_buffer,
     validate_frame,
-    write_episode,
-    write_episode_stats,
+    serialize_dict,
     write_info,
     write_json,
-    delete_episode,
-    delete_episode_stats,
     _validate_feature_names,
 )
 from operating_platform.utils.video import (
+    StreamingVideoEncoder,
     VideoFrame,
-    decode_video_frames_torchvision,
     encode_video_frames,
     get_video_info,
 )
+from operating_platform.utils.video_decoder import VideoDecoderPool
 from operating_platform.robot.robots.utils import Robot
 
 
@@ -129,6 +139,11 @@ class DoRobotDatasetMetadata:
             ignore_patterns=ignore_patterns,
         )
 
+    @property
+    def store(self) -> MetadataStore:
+        """Index of the per-episode metadata files (episodes, stats, data ids, sizes)."""
+        return get_metadata_store(self.root)
+
     @property
     def _version(self) -> packaging.version.Version:
         """Codebase version used to create this dataset."""
@@ -316,41 +331,41 @@ class DoRobotDatasetMetadata:
                 "length": episode_length,
             }
             self.episodes[episode_index] = episode_dict
-            write_episode(episode_dict, self.root)
+            self.store.append(EPISODES_PATH, episode_dict)
 
             self.episodes_stats[episode_index] = episode_stats
             self.stats = aggregate_stats([self.stats, episode_stats]) if self.stats else episode_stats
-            write_episode_stats(episode_index, episode_stats, self.root)
+            # We wrap episode_stats in a dictionary since `episode_stats["episode_index"]`
+            # is a dictionary of stats and not an integer.
+            self.store.append(
+                EPISODES_STATS_PATH, {"episode_index": episode_index, "stats": serialize_dict(episode_stats)}
+            )
 
     def remove_episode(self, ep_index: int) -> None:
-    #     episode_tasks: list[str],
-    #     episode_stats: dict[str, dict],
-        self.info["total_episodes"] -= 1
+        """
+        Remove the metadata of an episode. Thread-safe via _meta_lock.
 
-        episode = self.episodes[ep_index]
-        episode_length = episode["length"]
-        self.info["total_frames"] -= episode_length
+        The rows of the episode are found through the metadata store; removing the last episode,
+        the usual case when discarding a recording, only truncates the JSONL files.
+        """
+        with self._meta_lock:
+            self.info["total_episodes"] -= 1
 
-        # chunk = self.get_episode_chunk(ep_index)
-        # if chunk >= self.total_chunks:
-        #     self.info["total_chunks"] += 1
+            episode = self.episodes[ep_index]
+            episode_length = episode["length"]
+            self.info["total_frames"] -= episode_length
 
-        self.info["splits"] = {"train": f"0:{self.info['total_episodes']}"}
-        self.info["total_videos"] -= len(self.video_keys)
+            self.info["splits"] = {"train": f"0:{self.info['total_episodes']}"}
+            self.info["total_videos"] -= len(self.video_keys)
 
-        write_info(self.info, self.root)
+            write_info(self.info, self.root)
 
-    #     episode_dict = {
-    #         "episode_index": episode_index,
-    #         "tasks": episode_tasks,
-    #         "length": episode_length,
-    #     }
-    #     self.episodes[episode_index] = episode_dict
-        delete_episode(ep_index, self.root)
+            del self.episodes[ep_index]
+            self.store.delete(EPISODES_PATH, ep_index)
 
-    #     self.episodes_stats[episode_index] = episode_stats
-    #     self.stats = aggregate_stats([self.stats, episode_stats]) if self.stats else episode_stats
-        delete_episode_stats(ep_index, self.root)
+            self.episodes_stats.pop(ep_index, None)
+            self.store.delete(EPISODES_STATS_PATH, ep_index)
+            self.store.delete_episode_size(ep_index)
 
     def update_video_info(self) -> None:
         """
@@ -445,6 +460,10 @@ class DoRobotDataset(torch.utils.data.Dataset):
         force_cache_sync: bool = False,
         download_videos: bool = True,
         video_backend: str | None = None,
+        video_cache_mb: int = 256,
+        column_store: bool = False,
+        frame_cache: bool = True,
+        uint8_frames: bool = False,
     ):
         """
         2 modes are available for instantiating this class, depending on 2 different use cases:
@@ -546,6 +565,15 @@ class DoRobotDataset(torch.utils.data.Dataset):
                 True.
             video_backend (str | None, optional): Video backend to use for decoding videos. There is currently
                 a single option which is the pyav decoder used by Torchvision. Defaults to pyav.
+            video_cache_mb (int, optional): Size of the decoded video frame cache of each DataLoader worker
+                (see `operating_platform.utils.video_decoder`), 0 disables it. Defaults to 256.
+            column_store (bool, optional): Read the numeric features from memory-mapped `.npy` columns
+                under meta/columns/ instead of the hf_dataset (see `operating_platform.dataset.column_store`).
+                Defaults to False.
+            frame_cache (bool, optional): Read video frames from the pre-decoded frame cache when the dataset
+                has one (see `operating_platform.dataset.frame_cache`). Defaults to True.
+            uint8_frames (bool, optional): Return camera frames as uint8 instead of float32 in [0, 1], for
+                `BatchImageTransforms` to augment and convert them on the training device. Defaults to False.
         """
         super().__init__()
         self.repo_id = repo_id
@@ -556,11 +584,21 @@ class DoRobotDataset(torch.utils.data.Dataset):
         self.tolerance_s = tolerance_s
         self.revision = revision if revision else DOROBOT_DATASET_VERSION
         self.video_backend = video_backend if video_backend else "pyav"
+        self.video_cache_mb = video_cache_mb
+        self._video_decoder = None
         self.delta_indices = None
+        self.column_store = None
+        self._store_rows = None
+        self.frame_cache = None
+        self.uint8_frames = uint8_frames
 
         self.image_writer = None
         self.audio_writer = None
         self.episode_buffer = None
+        self.streaming_encoding = False
+        self.frame_format = FrameFormat()
+        self.video_streams = {}
+        self._video_streams_lock = threading.Lock()
 
         self.root.mkdir(exist_ok=True, parents=True)
 
@@ -596,11 +634,12 @@ class DoRobotDataset(torch.utils.data.Dataset):
 
         self.episode_data_index = get_episode_data_index(self.meta.episodes, self.episodes)
 
-        # Check timestamps
-        timestamps = torch.stack(self.hf_dataset["timestamp"]).numpy()
-        episode_indices = torch.stack(self.hf_dataset["episode_index"]).numpy()
-        ep_data_index_np = {k: t.numpy() for k, t in self.episode_data_index.items()}
-        check_timestamps_sync(timestamps, episode_indices, ep_data_index_np, self.fps, self.tolerance_s)
+        self._check_timestamps()
+
+        if column_store:
+            self.load_column_store()
+        if frame_cache and len(self.meta.video_keys) > 0:
+            self.frame_cache = FrameCache.load(self.root, self.meta.video_keys, self.meta.get_video_file_path)
 
         # Setup delta_indices
         if self.delta_timestamps is not None:
@@ -619,7 +658,9 @@ class DoRobotDataset(torch.utils.data.Dataset):
         upload_large_folder: bool = False,
         **card_kwargs,
     ) -> None:
-        ignore_patterns = ["images/"]
+        # Local files: meta/meta.db, meta/columns/ and meta/validation.json index the metadata and parquet
+        # files, frame_cache/ holds decoded videos
+        ignore_patterns = ["images/", "meta/meta.db*", f"{COLUMNS_DIR}/", f"{FRAME_CACHE_DIR}/", VALIDATION_PATH]
         if not push_videos:
             ignore_patterns.append("videos/")
 
@@ -705,6 +746,22 @@ class DoRobotDataset(torch.utils.data.Dataset):
 
         return fpaths
 
+    def _check_timestamps(self) -> None:
+        """`check_timestamps_sync` on the loaded episodes, skipped when their parquet files haven't
+        changed since they last passed it (see `VALIDATION_PATH`)."""
+        data_files = self.get_parquet_file_paths()
+        if timestamps_validated(self.root, data_files, self.fps, self.tolerance_s):
+            logging.debug(f"[Dataset] Timestamps of {len(data_files)} episodes already validated")
+            return
+
+        # Read the columns straight from arrow, not row by row through hf_transform_to_torch
+        arrow_dataset = self.hf_dataset.with_format("arrow")
+        timestamps = arrow_dataset["timestamp"].to_numpy()
+        episode_indices = arrow_dataset["episode_index"].to_numpy()
+        ep_data_index_np = {k: t.numpy() for k, t in self.episode_data_index.items()}
+        check_timestamps_sync(timestamps, episode_indices, ep_data_index_np, self.fps, self.tolerance_s)
+        record_timestamps_validated(self.root, data_files, self.fps, self.tolerance_s)
+
     def get_parquet_file_paths(self) -> list[str]:
         """Get only parquet file paths (not videos).
 
@@ -726,6 +783,15 @@ class DoRobotDataset(torch.utils.data.Dataset):
         hf_dataset.set_transform(hf_transform_to_torch)
         return hf_dataset
 
+    def load_column_store(self) -> None:
+        """Open (building it if needed) the memory-mapped column store of the numeric features."""
+        data_files = [str(self.meta.get_data_file_path(ep_idx)) for ep_idx in sorted(self.meta.episodes)]
+        self.column_store = ColumnStore.load_or_build(self.root, self.features, data_files)
+        # Store rows are in `index` order, map the rows of hf_dataset (e.g. a subset of episodes) to them
+        hf_index = self.hf_dataset.with_format("arrow")["index"].to_numpy()
+        store_rows = np.searchsorted(self.column_store["index"], hf_index)
+        self._store_rows = None if np.array_equal(store_rows, np.arange(len(hf_index))) else store_rows
+
     def create_hf_dataset(self) -> datasets.Dataset:
         features = get_hf_features_from_features(self.features)
         ft_dict = {col: [] for col in features}
@@ -763,8 +829,10 @@ class DoRobotDataset(torch.utils.data.Dataset):
             return get_hf_features_from_features(self.features)
 
     def _get_query_indices(self, idx: int, ep_idx: int) -> tuple[dict[str, list[int | bool]]]:
-        ep_start = self.episode_data_index["from"][ep_idx]
-        ep_end = self.episode_data_index["to"][ep_idx]
+        # `episode_data_index` only covers the selected episodes, find the one holding `idx`
+        ep_pos = int(np.searchsorted(self.episode_data_index["to"].numpy(), idx, side="right"))
+        ep_start = self.episode_data_index["from"][ep_pos]
+        ep_end = self.episode_data_index["to"][ep_pos]
         query_indices = {
             key: [max(ep_start.item(), min(ep_end.item() - 1, idx + delta)) for delta in delta_idx]
             for key, delta_idx in self.delta_indices.items()
@@ -807,14 +875,30 @@ class DoRobotDataset(torch.utils.data.Dataset):
         """
         item = {}
         for vid_key, query_ts in query_timestamps.items():
-            video_path = self.root / self.meta.get_video_file_path(ep_idx, vid_key)
-            frames = decode_video_frames_torchvision(
-                video_path, query_ts, self.tolerance_s, self.video_backend
-            )
-            item[vid_key] = frames.squeeze(0)
+            item[vid_key] = self._decode_frames(ep_idx, vid_key, query_ts).squeeze(0)
 
         return item
 
+    def _decode_frames(self, ep_idx: int, vid_key: str, timestamps: list[float]) -> torch.Tensor:
+        """Frames of a video at `timestamps`, from the frame cache if it has them, decoded otherwise."""
+        if self.frame_cache is not None and (ep_idx, vid_key) in self.frame_cache:
+            return self.frame_cache.frames(
+                ep_idx, vid_key, timestamps, self.tolerance_s, self.fps, as_uint8=self.uint8_frames
+            )
+        video_path = self.root / self.meta.get_video_file_path(ep_idx, vid_key)
+        return self.video_decoder.decode(
+            (ep_idx, vid_key), video_path, timestamps, self.tolerance_s, self.fps, as_uint8=self.uint8_frames
+        )
+
+    @property
+    def video_decoder(self) -> VideoDecoderPool:
+        """Decoder pool of the current process, so each DataLoader worker keeps its own open videos."""
+        if self._video_decoder is None or self._video_decoder.pid != os.getpid():
+            self._video_decoder = VideoDecoderPool(
+                self.video_backend, cache_bytes=self.video_cache_mb * 1024**2
+            )
+        return self._video_decoder
+
     def _add_padding_keys(self, item: dict, padding: dict[str, list[bool]]) -> dict:
         for key, val in padding.items():
             item[key] = torch.BoolTensor(val)
@@ -824,6 +908,9 @@ class DoRobotDataset(torch.utils.data.Dataset):
         return self.num_frames
 
     def __getitem__(self, idx) -> dict:
+        if self.column_store is not None:
+            return self.__getitems__([idx])[0]
+
         item = self.hf_dataset[idx]
         ep_idx = item["episode_index"].item()
 
@@ -846,12 +933,122 @@ class DoRobotDataset(torch.utils.data.Dataset):
             for cam in image_keys:
                 item[cam] = self.image_transforms(item[cam])
 
+        if self.uint8_frames:
+            self._to_uint8_images(item)
+
         # Add task as a string
         task_idx = item["task_index"].item()
         item["task"] = self.meta.tasks[task_idx]
 
         return item
 
+    def __getitems__(self, indices: list[int]) -> list[dict]:
+        """Batched `__getitem__`, called by the DataLoader with the indices of a whole batch.
+
+        Returns the same items as `[self[idx] for idx in indices]`, but the rows of the batch and
+        of their `delta_timestamps` windows are read with a single `hf_dataset` query, and each
+        video is decoded once for the union of the timestamps the batch needs from it.
+        """
+        indices = [int(idx) for idx in indices]
+        idx_array = np.asarray(indices, dtype=np.int64)
+
+        # Rows needed by the batch: the samples themselves and their delta windows
+        query_indices, padding = {}, {}
+        if self.delta_indices is not None:
+            ep_to = self.episode_data_index["to"].numpy()
+            ep_pos = np.searchsorted(ep_to, idx_array, side="right")
+            ep_start = self.episode_data_index["from"].numpy()[ep_pos][:, None]
+            ep_end = ep_to[ep_pos][:, None]
+            for key, delta_idx in self.delta_indices.items():
+                q_idx = idx_array[:, None] + np.asarray(delta_idx, dtype=np.int64)[None, :]
+                padding[f"{key}_is_pad"] = torch.from_numpy((q_idx < ep_start) | (q_idx >= ep_end))
+                query_indices[key] = np.clip(q_idx, ep_start, ep_end - 1)
+
+        needed = np.unique(np.concatenate([idx_array, *[q.ravel() for q in query_indices.values()]]))
+        rows = self._read_rows(needed)
+        sample_pos = np.searchsorted(needed, idx_array)
+
+        columns = {}
+
+        def column(key: str) -> torch.Tensor:
+            if key not in columns:
+                columns[key] = rows[key] if isinstance(rows[key], torch.Tensor) else torch.stack(rows[key])
+            return columns[key]
+
+        def positions(q_idx: np.ndarray) -> torch.Tensor:
+            # Position of each queried row in `rows` (`needed` is sorted)
+            return torch.from_numpy(np.searchsorted(needed, q_idx))
+
+        items = [{key: values[pos] for key, values in rows.items()} for pos in sample_pos]
+        query_result = {
+            key: column(key)[positions(q_idx)]
+            for key, q_idx in query_indices.items()
+            if key not in self.meta.video_keys
+        }
+        for b, item in enumerate(items):
+            item.update({key: pad[b] for key, pad in padding.items()})
+            item.update({key: val[b] for key, val in query_result.items()})
+
+        if len(self.meta.video_keys) > 0:
+            timestamps = column("timestamp")
+            query_ts = {}
+            for key in self.meta.video_keys:
+                if key in query_indices:
+                    query_ts[key] = timestamps[positions(query_indices[key])].reshape(len(indices), -1)
+                else:
+                    query_ts[key] = timestamps[torch.from_numpy(sample_pos)].reshape(len(indices), 1)
+            video_frames = self._query_videos_batch(query_ts, [item["episode_index"].item() for item in items])
+            items = [{**video_frames[b], **item} for b, item in enumerate(items)]
+
+        for item in items:
+            if self.image_transforms is not None:
+                for cam in self.meta.camera_keys:
+                    item[cam] = self.image_transforms(item[cam])
+            if self.uint8_frames:
+                self._to_uint8_images(item)
+            item["task"] = self.meta.tasks[item["task_index"].item()]
+
+        return items
+
+    def _to_uint8_images(self, item: dict) -> None:
+        # Video frames are decoded as uint8 already, image features come as float from hf_transform_to_torch
+        for cam in self.meta.image_keys:
+            if cam in item and item[cam].is_floating_point():
+                item[cam] = (item[cam] * 255).round_().to(torch.uint8)
+
+    def _read_rows(self, indices: np.ndarray) -> dict:
+        """Columns of the `hf_dataset` rows at `indices`: tensors (stacked rows) for the columns of the
+        column store, lists of per-row values (as `hf_dataset[indices]` returns them) otherwise."""
+        if self.column_store is None:
+            return self.hf_dataset[indices.tolist()]
+
+        store_rows = indices if self._store_rows is None else self._store_rows[indices]
+        other_keys = [key for key in self.hf_dataset.column_names if key not in self.column_store]
+        other = self.hf_dataset.select_columns(other_keys)[indices.tolist()] if other_keys else {}
+        return {
+            key: torch.from_numpy(self.column_store[key][store_rows]) if key in self.column_store else other[key]
+            for key in self.hf_dataset.column_names
+        }
+
+    def _query_videos_batch(self, query_ts: dict[str, torch.Tensor], ep_indices: list[int]) -> list[dict]:
+        """Frames of a batch, `query_ts[key]` being the (batch, n) timestamps queried per sample.
+
+        Each (episode, camera) video is queried once for the union of its timestamps, the decoder pool
+        seeks between the ones far apart.
+        """
+        items = [{} for _ in ep_indices]
+        for vid_key, ts in query_ts.items():
+            by_episode: dict[int, list[int]] = {}
+            for b, ep_idx in enumerate(ep_indices):
+                by_episode.setdefault(ep_idx, []).append(b)
+            for ep_idx, batch_pos in by_episode.items():
+                ep_ts = ts[batch_pos]
+                unique_ts, inverse = torch.unique(ep_ts, return_inverse=True)
+                frames = self._decode_frames(ep_idx, vid_key, unique_ts.tolist())
+                for b, frame_pos in zip(batch_pos, inverse, strict=True):
+                    items[b][vid_key] = frames[frame_pos].squeeze(0)
+        return items
+
     def __repr__(self):
         feature_keys = list(self.features)
         return (
@@ -863,20 +1060,18 @@ class DoRobotDataset(torch.utils.data.Dataset):
             "})',\n"
         )
 
-    def create_episode_buffer(self, episode_index: int | None = None) -> dict:
+    def create_episode_buffer(self, episode_index: int | None = None) -> EpisodeBuffer:
         current_ep_idx = self.meta.total_episodes if episode_index is None else episode_index
-        ep_buffer = {}
-        # size and task are special cases that are not in self.features
-        ep_buffer["size"] = 0
-        ep_buffer["task"] = []
-        for key in self.features:
-            ep_buffer[key] = current_ep_idx if key == "episode_index" else []
-        return ep_buffer
+        # Preallocate one minute of frames, columns double in size when full
+        return EpisodeBuffer(self.features, current_ep_idx, capacity=self.fps * 60)
 
     def _get_image_file_path(self, episode_index: int, image_key: str, frame_index: int) -> Path:
         fpath = DEFAULT_IMAGE_PATH.format(
             image_key=image_key, episode_index=episode_index, frame_index=frame_index
         )
+        if image_key in self.meta.video_keys:
+            # Intermediate video frames are written in the configured frame format
+            fpath = fpath.removesuffix(".png") + self.frame_format.suffix
         return self.root / fpath
     
     def _get_audio_file_path(self, episode_index: int, audio_key: str) -> Path:
@@ -885,19 +1080,25 @@ class DoRobotDataset(torch.utils.data.Dataset):
         )
         return self.root / fpath
 
-    def _save_image(self, image: torch.Tensor | np.ndarray | PIL.Image.Image, fpath: Path) -> None:
+    def _save_image(
+        self,
+        image: torch.Tensor | np.ndarray | PIL.Image.Image,
+        fpath: Path,
+        episode_index: int | None = None,
+        image_key: str | None = None,
+    ) -> None:
         if self.image_writer is None:
             if isinstance(image, torch.Tensor):
                 image = image.cpu().numpy()
-            write_image(image, fpath)
+            write_image(image, fpath, frame_format=self.frame_format)
         else:
-            self.image_writer.save_image(image=image, fpath=fpath)
+            self.image_writer.save_image(image=image, fpath=fpath, episode_index=episode_index, image_key=image_key)
 
     def add_frame(self, frame: dict, task: str) -> None:
         """
         This function only adds the frame to the episode_buffer. Apart from images — which are written in a
-        temporary directory — nothing is written to disk. To save those frames, the 'save_episode()' method
-        then needs to be called.
+        temporary directory, or piped into the episode's video encoders when `streaming_encoding` is on —
+        nothing is written to disk. To save those frames, the 'save_episode()' method then needs to be called.
         """
         # Convert torch to numpy if needed
         for name in frame:
@@ -931,6 +1132,10 @@ class DoRobotDataset(torch.utils.data.Dataset):
         self.episode_buffer["frame_index"].append(frame_index)
         self.episode_buffer["timestamp"].append(timestamp)
         self.episode_buffer["task"].append(task)
+        stats = getattr(self.episode_buffer, "stats", None)
+        if stats is not None:
+            stats.add("frame_index", frame_index)
+            stats.add("timestamp", timestamp)
 
         # Add frame features to episode_buffer
         for key in frame:
@@ -939,20 +1144,33 @@ class DoRobotDataset(torch.utils.data.Dataset):
                     f"An element of the frame is not in the features. '{key}' not in '{self.features.keys()}'."
                 )
 
-            if self.features[key]["dtype"] in ["image", "video"]:
+            if self.features[key]["dtype"] == "video" and self.streaming_encoding:
+                episode_index = self.episode_buffer["episode_index"]
+                stream = self._get_video_stream(episode_index, key)
+                stream.write(frame[key])
+                self.episode_buffer[key].append(str(stream.video_path))
+            elif self.features[key]["dtype"] in ["image", "video"]:
                 img_path = self._get_image_file_path(
                     episode_index=self.episode_buffer["episode_index"], image_key=key, frame_index=frame_index
                 )
                 if frame_index == 0:
                     img_path.parent.mkdir(parents=True, exist_ok=True)
-                self._save_image(frame[key], img_path)
+                self._save_image(frame[key], img_path, self.episode_buffer["episode_index"], key)
                 self.episode_buffer[key].append(str(img_path))
             else:
                 self.episode_buffer[key].append(frame[key])
 
+            if stats is not None:
+                stats.add(key, frame[key])
+
         self.episode_buffer["size"] += 1
 
-    def save_episode(self, episode_data: dict | None = None, skip_encoding: bool = False) -> int:
+    def save_episode(
+        self,
+        episode_data: dict | None = None,
+        skip_encoding: bool = False,
+        commit_order: contextlib.AbstractContextManager | None = None,
+    ) -> int:
         """
         This will save to disk the current episode in self.episode_buffer.
 
@@ -963,12 +1181,15 @@ class DoRobotDataset(torch.utils.data.Dataset):
             skip_encoding (bool, optional): If True, skip video encoding and keep raw PNG images.
                 This is used for cloud offload mode where encoding is done on the cloud server.
                 Defaults to False.
+            commit_order (contextlib.AbstractContextManager | None, optional): Entered around the part of
+                the save that depends on the previous episodes (global frame indices, task indices, parquet,
+                stats and metadata). Waiting for images and encoding videos happen before it, so several
+                episodes can be saved in parallel while their metadata is still committed in episode order.
+                Defaults to None.
         """
-        import copy
-
         if episode_data:
-            # The async saver already deep copies the buffer before queuing.
-            # We don't need another copy here, just use the passed data.
+            # The async saver owns this buffer (sealed by Record.save_async, or deep copied
+            # before queuing). We don't need another copy here, just use the passed data.
             episode_buffer = episode_data
         else:
             episode_buffer = self.episode_buffer
@@ -981,24 +1202,17 @@ class DoRobotDataset(torch.utils.data.Dataset):
         episode_tasks = list(set(tasks))
         episode_index = episode_buffer["episode_index"]
 
-        episode_buffer["index"] = np.arange(self.meta.total_frames, self.meta.total_frames + episode_length)
-        episode_buffer["episode_index"] = np.full((episode_length,), episode_index)
-
-        # Add new tasks to the tasks dictionary
-        for task in episode_tasks:
-            task_index = self.meta.get_task_index(task)
-            if task_index is None:
-                self.meta.add_task(task)
-
-        # Given tasks in natural language, find their corresponding task indices
-        episode_buffer["task_index"] = np.array([self.meta.get_task_index(task) for task in tasks])
-
         for key, ft in self.features.items():
-            # index, episode_index, task_index are already processed above, and image and video
+            # index, episode_index, task_index are processed when committing, and image and video
             # are processed separately by storing image path and frame info as meta data
             if key in ["index", "episode_index", "task_index"] or ft["dtype"] in ["image", "video", "audio"]:
                 continue
-            episode_buffer[key] = np.stack(episode_buffer[key])
+            value = episode_buffer[key]
+            if isinstance(value, (np.ndarray, GrowableColumn)):
+                # Columnar buffer, already one array per feature
+                episode_buffer[key] = np.asarray(value)
+            else:
+                episode_buffer[key] = np.stack(value)
 
         # IMPORTANT: Only stop audio writer in synchronous mode (episode_data is None)
         # When called from async worker (episode_data provided), the recording thread
@@ -1008,24 +1222,49 @@ class DoRobotDataset(torch.utils.data.Dataset):
             self.stop_audio_writer()
             self.wait_audio_writer()
 
+        # Let streamed videos flush while the rest of the episode is being saved
+        self.close_episode_streams(episode_index)
+
         # Wait for THIS episode's images only (not all images in the queue)
         # This is critical for async save to work in parallel during recording
         self._wait_episode_images(episode_index, episode_length)
-        self._save_episode_table(episode_buffer, episode_index)
-        ep_stats = compute_episode_stats(episode_buffer, self.features)
 
+        # Streamed videos already exist once finished, encode_episode_videos skips them
+        self._finish_episode_streams(episode_index)
+
+        video_paths = {}
         if len(self.meta.video_keys) > 0 and not skip_encoding:
             video_paths = self.encode_episode_videos(episode_index)
-            for key in self.meta.video_keys:
-                episode_buffer[key] = video_paths[key]
         elif skip_encoding and len(self.meta.video_keys) > 0:
             logging.info(f"[Dataset] Skipping video encoding for episode {episode_index} (cloud offload mode)")
 
-        # `meta.save_episode` be executed after encoding the videos
-        # Pass skip_encoding to avoid calling update_video_info() when videos weren't created
-        self.meta.save_episode(episode_index, episode_length, episode_tasks, ep_stats, skip_encoding=skip_encoding)
+        with commit_order or contextlib.nullcontext():
+            episode_buffer["index"] = np.arange(self.meta.total_frames, self.meta.total_frames + episode_length)
+            episode_buffer["episode_index"] = np.full((episode_length,), episode_index)
+
+            # Add new tasks to the tasks dictionary
+            for task in episode_tasks:
+                task_index = self.meta.get_task_index(task)
+                if task_index is None:
+                    self.meta.add_task(task)
+
+            # Given tasks in natural language, find their corresponding task indices
+            episode_buffer["task_index"] = np.array([self.meta.get_task_index(task) for task in tasks])
+
+            self._save_episode_table(episode_buffer, episode_index)
+            online_stats = getattr(episode_buffer, "stats", None)
+            if online_stats is not None:
+                # Accumulated by add_frame, no image is read back
+                ep_stats = online_stats.finalize(episode_buffer, episode_length)
+            else:
+                ep_stats = compute_episode_stats(episode_buffer, self.features)
+            episode_buffer.update(video_paths)
+
+            # `meta.save_episode` be executed after encoding the videos
+            # Pass skip_encoding to avoid calling update_video_info() when videos weren't created
+            self.meta.save_episode(episode_index, episode_length, episode_tasks, ep_stats, skip_encoding=skip_encoding)
 
-        ep_data_index = get_episode_data_index(self.meta.episodes, [episode_index])
+            ep_data_index = get_episode_data_index(self.meta.episodes, [episode_index])
         ep_data_index_np = {k: t.numpy() for k, t in ep_data_index.items()}
         check_timestamps_sync(
             episode_buffer["timestamp"],
@@ -1050,6 +1289,10 @@ class DoRobotDataset(torch.utils.data.Dataset):
                 if not episode_video.exists():
                     raise RuntimeError(f"Failed to create video file for episode {episode_index}: {episode_video}")
 
+        # Kept for get_data_size, which would otherwise walk the dataset directories after each save
+        encoded = len(self.meta.video_keys) > 0 and not skip_encoding
+        self.meta.store.set_episode_size(episode_index, self._episode_size_bytes(episode_index, encoded))
+
         # delete images for THIS episode only (not the entire images/ folder!)
         # Image path format: images/{image_key}/episode_{episode_index:06d}/frame_{frame_index:06d}.png
         # We want to delete episode_XXXXXX/ directory, which is .parent of the frame file
@@ -1069,6 +1312,21 @@ class DoRobotDataset(torch.utils.data.Dataset):
 
         return episode_index
 
+    def _episode_size_bytes(self, episode_index: int, encoded: bool) -> int:
+        """Size on disk of the files of a saved episode (frames of unencoded videos included)."""
+        paths = [self.root / self.meta.get_data_file_path(episode_index)]
+        paths += [self.root / self.meta.get_audio_file_path(episode_index, key) for key in self.meta.mic_keys]
+        image_dir_keys = list(self.meta.image_keys)
+        if encoded:
+            paths += [self.root / self.meta.get_video_file_path(episode_index, key) for key in self.meta.video_keys]
+        else:
+            image_dir_keys += self.meta.video_keys
+        for key in image_dir_keys:
+            img_dir = self._get_image_file_path(episode_index=episode_index, image_key=key, frame_index=0).parent
+            if img_dir.is_dir():
+                paths += [Path(entry.path) for entry in os.scandir(img_dir) if entry.is_file()]
+        return sum(path.stat().st_size for path in paths if path.is_file())
+
     def remove_episode(self, ep_idx: int):
         """Remove an episode and all its associated files."""
         logging.info(f"[Dataset] Removing episode {ep_idx}")
@@ -1148,9 +1406,18 @@ class DoRobotDataset(torch.utils.data.Dataset):
     def clear_episode_buffer(self) -> None:
         episode_index = self.episode_buffer["episode_index"]
 
+        self.abort_episode_streams(episode_index)
         self.stop_audio_writer()
         self.wait_audio_writer()
 
+        if self.image_writer is not None:
+            # Let queued writes for this episode land before removing its directories
+            try:
+                self.image_writer.wait_episode(episode_index, timeout=30.0)
+            except ImageWriteError:
+                pass  # The episode is discarded anyway
+            self.image_writer.forget_episode(episode_index)
+
         if episode_index == 0 and self.meta.total_episodes == 0:
             logging.warning(f"[Dataset] Clearing buffer: removing entire directory {self.root}")
             shutil.rmtree(self.root)
@@ -1174,7 +1441,13 @@ class DoRobotDataset(torch.utils.data.Dataset):
             # Reset the buffer
             self.episode_buffer = self.create_episode_buffer()
 
-    def start_image_writer(self, num_processes: int = 0, num_threads: int = 4) -> None:
+    def start_image_writer(
+        self,
+        num_processes: int = 0,
+        num_threads: int = 4,
+        max_queue_bytes: int | None = None,
+        overflow_policy: str = "backpressure",
+    ) -> None:
         if isinstance(self.image_writer, AsyncImageWriter):
             logging.warning(
                 "You are starting a new AsyncImageWriter that is replacing an already existing one in the dataset."
@@ -1183,6 +1456,10 @@ class DoRobotDataset(torch.utils.data.Dataset):
         self.image_writer = AsyncImageWriter(
             num_processes=num_processes,
             num_threads=num_threads,
+            max_queue_bytes=max_queue_bytes,
+            overflow_policy=overflow_policy,
+            spill_dir=self.root / ".image_spill",
+            frame_format=self.frame_format,
         )
 
     def stop_image_writer(self) -> None:
@@ -1205,6 +1482,8 @@ class DoRobotDataset(torch.utils.data.Dataset):
 
         This method waits only for the images of the specified episode, not all images
         in the queue. This is critical for async save to work correctly during recording.
+        The image writer signals each written image, so this returns as soon as the last
+        one is on disk and raises `ImageWriteError` if any of them failed.
 
         Args:
             episode_index: The episode index to wait for
@@ -1220,7 +1499,8 @@ class DoRobotDataset(torch.utils.data.Dataset):
         if episode_length == 0:
             return
 
-        camera_keys = self.meta.camera_keys
+        # Streamed video keys have no PNGs to wait for
+        camera_keys = self.meta.image_keys if self.streaming_encoding else self.meta.camera_keys
         if len(camera_keys) == 0:
             return
 
@@ -1232,42 +1512,69 @@ class DoRobotDataset(torch.utils.data.Dataset):
             timeout_s = max(120.0, num_images * 0.5)
 
         start_time = time.time()
-        poll_interval = 0.1  # Check every 100ms
-
         logging.debug(f"[_wait_episode_images] Waiting for episode {episode_index} images ({episode_length} frames, {len(camera_keys)} cameras, timeout={timeout_s:.0f}s)")
 
-        while time.time() - start_time < timeout_s:
-            all_complete = True
-
-            for key in camera_keys:
-                img_dir = self._get_image_file_path(
-                    episode_index=episode_index, image_key=key, frame_index=0
-                ).parent
-
-                if not img_dir.is_dir():
-                    # Directory not created yet
-                    all_complete = False
-                    break
-
-                # Count PNG files in the directory
-                png_count = len(list(img_dir.glob("*.png")))
-                if png_count < episode_length:
-                    all_complete = False
-                    break
+        try:
+            complete = self.image_writer.wait_episode(
+                episode_index,
+                expected_counts={key: episode_length for key in camera_keys},
+                timeout=timeout_s,
+            )
 
-            if all_complete:
-                elapsed = time.time() - start_time
+            elapsed = time.time() - start_time
+            if complete:
                 logging.debug(f"[_wait_episode_images] Episode {episode_index} images ready (waited {elapsed:.2f}s)")
                 return
 
-            time.sleep(poll_interval)
+            # Timeout reached - log warning but continue anyway
+            progress = self.image_writer.episode_progress(episode_index)
+            logging.warning(
+                f"[_wait_episode_images] Timeout waiting for episode {episode_index} images "
+                f"after {elapsed:.1f}s (written/queued per camera: {progress}). Proceeding with video encoding anyway."
+            )
+        finally:
+            # Also on failure or timeout, the counters would otherwise stay in the writer for the session
+            self.image_writer.forget_episode(episode_index)
+
+    def _get_video_stream(self, episode_index: int, video_key: str) -> StreamingVideoEncoder:
+        with self._video_streams_lock:
+            stream = self.video_streams.get((episode_index, video_key))
+            if stream is None:
+                video_path = self.root / self.meta.get_video_file_path(episode_index, video_key)
+                stream = StreamingVideoEncoder(video_path, self.fps)
+                self.video_streams[(episode_index, video_key)] = stream
+        return stream
+
+    def _pop_episode_streams(self, episode_index: int) -> dict[str, StreamingVideoEncoder]:
+        with self._video_streams_lock:
+            keys = [k for k in self.video_streams if k[0] == episode_index]
+            return {k[1]: self.video_streams.pop(k) for k in keys}
+
+    def close_episode_streams(self, episode_index: int) -> None:
+        """Signal the end of an episode to its video streams so ffmpeg starts flushing (non-blocking)."""
+        with self._video_streams_lock:
+            streams = [s for k, s in self.video_streams.items() if k[0] == episode_index]
+        for stream in streams:
+            stream.close()
+
+    def _finish_episode_streams(self, episode_index: int) -> dict:
+        """Wait for the streamed videos of an episode to be written. Returns their paths per video key."""
+        streams = self._pop_episode_streams(episode_index)
+        video_paths = {}
+        errors = []
+        for key, stream in streams.items():
+            try:
+                video_paths[key] = str(stream.finish())
+            except Exception as e:
+                errors.append(f"{key}: {e}")
+        if errors:
+            raise RuntimeError(f"Streaming encoding failed for episode {episode_index}: " + "; ".join(errors))
+        return video_paths
 
-        # Timeout reached - log warning but continue anyway
-        elapsed = time.time() - start_time
-        logging.warning(
-            f"[_wait_episode_images] Timeout waiting for episode {episode_index} images "
-            f"after {elapsed:.1f}s. Proceeding with video encoding anyway."
-        )
+    def abort_episode_streams(self, episode_index: int) -> None:
+        """Stop the video streams of a discarded episode and delete their partial videos."""
+        for stream in self._pop_episode_streams(episode_index).values():
+            stream.abort()
 
     def encode_videos(self) -> None:
         """
@@ -1281,18 +1588,14 @@ class DoRobotDataset(torch.utils.data.Dataset):
     def encode_episode_videos(self, episode_index: int) -> dict:
         """
         Use ffmpeg to convert frames stored as png into mp4 videos.
-        Note: `encode_video_frames` is a blocking call. Making it asynchronous shouldn't speedup encoding,
-        since video encoding with ffmpeg is already using multithreading.
+        The cameras of the episode are encoded concurrently. How many encodes actually run at once is
+        bounded by the NPU channel and CPU encoder semaphores in `operating_platform.utils.video`.
         """
         import time
+        from concurrent.futures import ThreadPoolExecutor
 
         video_paths = {}
-        num_videos = len(self.meta.video_keys)
-
-        if num_videos > 0:
-            logging.info(f"[VideoEncoder] Encoding {num_videos} videos for episode {episode_index}...")
-            start_time = time.time()
-
+        to_encode = []
         for key in self.meta.video_keys:
             video_path = self.root / self.meta.get_video_file_path(episode_index, key)
             video_paths[key] = str(video_path)
@@ -1303,11 +1606,28 @@ class DoRobotDataset(torch.utils.data.Dataset):
             img_dir = self._get_image_file_path(
                 episode_index=episode_index, image_key=key, frame_index=0
             ).parent
-            encode_video_frames(img_dir, video_path, self.fps, overwrite=True)
+            to_encode.append((img_dir, video_path))
 
-        if num_videos > 0:
-            elapsed = time.time() - start_time
-            logging.info(f"[VideoEncoder] Episode {episode_index} encoding complete ({elapsed:.1f}s)")
+        if not to_encode:
+            return video_paths
+
+        logging.info(f"[VideoEncoder] Encoding {len(to_encode)} videos for episode {episode_index}...")
+        start_time = time.time()
+
+        if len(to_encode) == 1:
+            encode_video_frames(*to_encode[0], self.fps, overwrite=True)
+        else:
+            with ThreadPoolExecutor(max_workers=len(to_encode), thread_name_prefix="VideoEncoder") as pool:
+                futures = [
+                    pool.submit(encode_video_frames, img_dir, video_path, self.fps, overwrite=True)
+                    for img_dir, video_path in to_encode
+                ]
+                # Re-raise the first failure after every encode has finished
+                for future in futures:
+                    future.result()
+
+        elapsed = time.time() - start_time
+        logging.info(f"[VideoEncoder] Episode {episode_index} encoding complete ({elapsed:.1f}s)")
 
         return video_paths
     
@@ -1368,8 +1688,19 @@ class DoRobotDataset(torch.utils.data.Dataset):
         image_writer_processes: int = 0,
         image_writer_threads: int = 0,
         video_backend: str | None = None,
+        streaming_encoding: bool = False,
+        image_writer_max_queue_bytes: int | None = None,
+        image_writer_overflow_policy: str = "backpressure",
+        frame_format: FrameFormat | None = None,
     ) -> "DoRobotDataset":
-        """Create a LeRobot Dataset from scratch in order to record data."""
+        """Create a LeRobot Dataset from scratch in order to record data.
+
+        With `streaming_encoding`, video frames are piped into one ffmpeg process per camera while
+        recording instead of being written as PNGs and encoded in `save_episode`.
+
+        `frame_format` sets the file format of the video frames written until their episode is
+        encoded (PNG by default, see `operating_platform.utils.frame_format`).
+        """
         obj = cls.__new__(cls)
         obj.meta = DoRobotDatasetMetadata.create(
             repo_id=repo_id,
@@ -1387,9 +1718,18 @@ class DoRobotDataset(torch.utils.data.Dataset):
         obj.tolerance_s = tolerance_s
         obj.image_writer = None
         obj.audio_writer = None
+        obj.streaming_encoding = streaming_encoding and use_videos
+        obj.frame_format = frame_format or FrameFormat()
+        obj.video_streams = {}
+        obj._video_streams_lock = threading.Lock()
 
         if image_writer_processes or image_writer_threads:
-            obj.start_image_writer(image_writer_processes, image_writer_threads)
+            obj.start_image_writer(
+                image_writer_processes,
+                image_writer_threads,
+                max_queue_bytes=image_writer_max_queue_bytes,
+                overflow_policy=image_writer_overflow_policy,
+            )
         if len(robot.microphones) > 0:
             obj.start_audio_writer(robot.microphones)
 
@@ -1403,13 +1743,25 @@ class DoRobotDataset(torch.utils.data.Dataset):
         obj.delta_indices = None
         obj.episode_data_index = None
         obj.video_backend = video_backend if video_backend is not None else "pyav"
+        obj.video_cache_mb = 256
+        obj._video_decoder = None
+        obj.column_store = None
+        obj._store_rows = None
+        obj.frame_cache = None
+        obj.uint8_frames = False
         return obj
 
 class MultiDoRobotDataset(torch.utils.data.Dataset):
-    """A dataset consisting of multiple underlying `LeRobotDataset`s.
+    """A dataset consisting of multiple underlying `DoRobotDataset`s.
+
+    The underlying `DoRobotDataset`s are effectively concatenated, and this class adopts much of the API
+    structure of `DoRobotDataset`. Each item gets a "dataset_index" key, the position of its repo in
+    `repo_ids`. Only the features common to all the datasets are kept, and `meta` is the metadata of the
+    first dataset with these features and the stats of all the datasets merged (`aggregate_stats`).
 
-    The underlying `LeRobotDataset`s are effectively concatenated, and this class adopts much of the API
-    structure of `LeRobotDataset`.
+    `weights` are the relative probabilities of drawing a sample from each dataset, used by
+    `WeightedDatasetSampler` (see `operating_platform.dataset.sampler`). By default every frame is as
+    likely to be drawn, whatever its dataset.
     """
 
     def __init__(
@@ -1422,13 +1774,23 @@ class MultiDoRobotDataset(torch.utils.data.Dataset):
         tolerances_s: dict | None = None,
         download_videos: bool = True,
         video_backend: str | None = None,
+        weights: list[float] | None = None,
+        revision: str | None = None,
+        video_cache_mb: int = 256,
+        column_store: bool = False,
+        frame_cache: bool = True,
+        uint8_frames: bool = False,
     ):
         super().__init__()
+        if weights is not None and len(weights) != len(repo_ids):
+            raise ValueError(f"Got {len(weights)} weights for {len(repo_ids)} datasets.")
+        if weights is not None and (min(weights) < 0 or sum(weights) <= 0):
+            raise ValueError(f"Weights must be non-negative and not all zero, got {weights}.")
+
         self.repo_ids = repo_ids
-        self.root = Path(root) if root else DOROBOT_DATASET / repo_id
+        # Datasets are in root/<repo_id>
+        self.root = Path(root) if root else DOROBOT_DATASET
         self.tolerances_s = tolerances_s if tolerances_s else dict.fromkeys(repo_ids, 0.0001)
-        # Construct the underlying datasets passing everything but `transform` and `delta_timestamps` which
-        # are handled by this class.
         self._datasets = [
             DoRobotDataset(
                 repo_id,
@@ -1437,12 +1799,21 @@ class MultiDoRobotDataset(torch.utils.data.Dataset):
                 image_transforms=image_transforms,
                 delta_timestamps=delta_timestamps,
                 tolerance_s=self.tolerances_s[repo_id],
+                revision=revision,
                 download_videos=download_videos,
                 video_backend=video_backend,
+                video_cache_mb=video_cache_mb,
+                column_store=column_store,
+                frame_cache=frame_cache,
+                uint8_frames=uint8_frames,
             )
             for repo_id in repo_ids
         ]
 
+        fps = {repo_id: ds.fps for repo_id, ds in zip(repo_ids, self._datasets, strict=True)}
+        if len(set(fps.values())) > 1:
+            raise ValueError(f"The datasets must have been recorded at the same fps, got {fps}.")
+
         # Disable any data keys that are not common across all of the datasets. Note: we may relax this
         # restriction in future iterations of this class. For now, this is necessary at least for being able
         # to use PyTorch's default DataLoader collate function.
@@ -1457,10 +1828,11 @@ class MultiDoRobotDataset(torch.utils.data.Dataset):
             )
         for repo_id, ds in zip(self.repo_ids, self._datasets, strict=True):
             extra_keys = set(ds.features).difference(intersection_features)
-            logging.warning(
-                f"keys {extra_keys} of {repo_id} were disabled as they are not contained in all the "
-                "other datasets."
-            )
+            if extra_keys:
+                logging.warning(
+                    f"keys {extra_keys} of {repo_id} were disabled as they are not contained in all the "
+                    "other datasets."
+                )
             self.disabled_features.update(extra_keys)
 
         self.image_transforms = image_transforms
@@ -1468,7 +1840,43 @@ class MultiDoRobotDataset(torch.utils.data.Dataset):
         # TODO(rcadene, aliberts): We should not perform this aggregation for datasets
         # with multiple robots of different ranges. Instead we should have one normalization
         # per robot.
-        self.stats = aggregate_stats([dataset.meta.stats for dataset in self._datasets])
+        self.stats = aggregate_stats(
+            [
+                {key: stats for key, stats in dataset.meta.stats.items() if key not in self.disabled_features}
+                for dataset in self._datasets
+            ]
+        )
+
+        # Global index of the first frame of each dataset, a global index is mapped to its dataset by
+        # binary search
+        sizes = [len(ds) for ds in self._datasets]
+        self.offsets = np.concatenate([[0], np.cumsum(sizes)[:-1]]).astype(np.int64).tolist()
+        self._num_frames = sum(sizes)
+        self.weights = [float(w) for w in (weights if weights is not None else sizes)]
+        self.episode_data_index = {
+            key: torch.cat(
+                [
+                    ds.episode_data_index[key] + offset
+                    for ds, offset in zip(self._datasets, self.offsets, strict=True)
+                ]
+            )
+            for key in ("from", "to")
+        }
+
+        # Metadata seen by the policy and the training loop
+        self.meta = copy.copy(self._datasets[0].meta)
+        self.meta.info = {
+            **self.meta.info,
+            "features": {k: ft for k, ft in self.meta.features.items() if k not in self.disabled_features},
+            "total_episodes": self.num_episodes,
+            "total_frames": self.num_frames,
+        }
+        self.meta.stats = self.stats
+
+    @property
+    def sub_datasets(self) -> list[DoRobotDataset]:
+        """The underlying datasets, in the order of `repo_ids`."""
+        return self._datasets
 
     @property
     def repo_id_to_index(self):
@@ -1481,13 +1889,13 @@ class MultiDoRobotDataset(torch.utils.data.Dataset):
     @property
     def repo_index_to_id(self):
         """Return the inverse mapping if repo_id_to_index."""
-        return {v: k for k, v in self.repo_id_to_index}
+        return {v: k for k, v in self.repo_id_to_index.items()}
 
     @property
     def fps(self) -> int:
         """Frames per second used during data collection.
 
-        NOTE: Fow now, this relies on a check in __init__ to make sure all sub-datasets have the same info.
+        NOTE: All sub-datasets have the same fps, this is checked in __init__.
         """
         return self._datasets[0].meta.info["fps"]
 
@@ -1496,10 +1904,8 @@ class MultiDoRobotDataset(torch.utils.data.Dataset):
         """Returns True if this dataset loads video frames from mp4 files.
 
         Returns False if it only loads images from png files.
-
-        NOTE: Fow now, this relies on a check in __init__ to make sure all sub-datasets have the same info.
         """
-        return self._datasets[0].meta.info.get("video", False)
+        return len(self.video_frame_keys) > 0
 
     @property
     def features(self) -> datasets.Features:
@@ -1511,11 +1917,7 @@ class MultiDoRobotDataset(torch.utils.data.Dataset):
     @property
     def camera_keys(self) -> list[str]:
         """Keys to access image and video stream from cameras."""
-        keys = []
-        for key, feats in self.features.items():
-            if isinstance(feats, (datasets.Image, VideoFrame)):
-                keys.append(key)
-        return keys
+        return self.meta.camera_keys
 
     @property
     def video_frame_keys(self) -> list[str]:
@@ -1525,11 +1927,7 @@ class MultiDoRobotDataset(torch.utils.data.Dataset):
         or equal to `self.cameras` if the dataset contains videos only,
         or can even be a subset of `self.cameras` in a case of a mixed image/video dataset.
         """
-        video_frame_keys = []
-        for key, feats in self.features.items():
-            if isinstance(feats, VideoFrame):
-                video_frame_keys.append(key)
-        return video_frame_keys
+        return self.meta.video_keys
 
     @property
     def num_frames(self) -> int:
@@ -1551,40 +1949,50 @@ class MultiDoRobotDataset(torch.utils.data.Dataset):
         return 1 / self.fps - 1e-4
 
     def __len__(self):
-        return self.num_frames
+        return self._num_frames
 
-    def __getitem__(self, idx: int) -> dict[str, torch.Tensor]:
-        if idx >= len(self):
+    def _locate(self, idx: int) -> tuple[int, int]:
+        """(dataset index, index in that dataset) of a global index."""
+        if idx < 0:
+            idx += len(self)
+        if not 0 <= idx < len(self):
             raise IndexError(f"Index {idx} out of bounds.")
-        # Determine which dataset to get an item from based on the index.
-        start_idx = 0
-        dataset_idx = 0
-        for dataset in self._datasets:
-            if idx >= start_idx + dataset.num_frames:
-                start_idx += dataset.num_frames
-                dataset_idx += 1
-                continue
-            break
-        else:
-            raise AssertionError("We expect the loop to break out as long as the index is within bounds.")
-        item = self._datasets[dataset_idx][idx - start_idx]
+        dataset_idx = bisect.bisect_right(self.offsets, idx) - 1
+        return dataset_idx, idx - self.offsets[dataset_idx]
+
+    def _finalize_item(self, item: dict, dataset_idx: int) -> dict:
         item["dataset_index"] = torch.tensor(dataset_idx)
         for data_key in self.disabled_features:
             if data_key in item:
                 del item[data_key]
-
         return item
 
+    def __getitem__(self, idx: int) -> dict[str, torch.Tensor]:
+        dataset_idx, local_idx = self._locate(int(idx))
+        return self._finalize_item(self._datasets[dataset_idx][local_idx], dataset_idx)
+
+    def __getitems__(self, indices: list[int]) -> list[dict]:
+        """Batched `__getitem__`: the indices of each dataset go through its own `__getitems__`."""
+        located = [self._locate(int(idx)) for idx in indices]
+        items = [None] * len(located)
+        for dataset_idx in sorted({dataset_idx for dataset_idx, _ in located}):
+            positions = [i for i, (ds_idx, _) in enumerate(located) if ds_idx == dataset_idx]
+            batch = self._datasets[dataset_idx].__getitems__([located[i][1] for i in positions])
+            for i, item in zip(positions, batch, strict=True):
+                items[i] = self._finalize_item(item, dataset_idx)
+        return items
+
     def __repr__(self):
         return (
             f"{self.__class__.__name__}(\n"
             f"  Repository IDs: '{self.repo_ids}',\n"
             f"  Number of Samples: {self.num_frames},\n"
             f"  Number of Episodes: {self.num_episodes},\n"
+            f"  Sampling Weights: {self.weights},\n"
             f"  Type: {'video (.mp4)' if self.video else 'image (.png)'},\n"
             f"  Recorded Frames per Second: {self.fps},\n"
             f"  Camera Keys: {self.camera_keys},\n"
             f"  Video Frame Keys: {self.video_frame_keys if self.video else 'N/A'},\n"
             f"  Transformations: {self.image_transforms},\n"
             f")"
-        )
\ No newline at end of file
+        )
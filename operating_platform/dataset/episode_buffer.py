@@ -0,0 +1,96 @@
+"""
+Columnar buffer for the episode being recorded.
+
+`DoRobotDataset.add_frame` used to append every value of every frame to Python lists, which
+`save_episode` then re-stacked into arrays, and `Record.save_async` deep copied the whole buffer
+while holding the lock shared with the recording loop. `EpisodeBuffer` keeps one preallocated
+numpy array per numeric feature instead (grown geometrically), and is handed over to the saver
+with `seal()`: the recorded rows become plain array views, no copy is made, and the recording
+loop simply continues in a fresh buffer.
+
+`EpisodeBuffer` is a dict, so code that reads `buffer["size"]`, `buffer["episode_index"]` or a
+feature column keeps working. Its `stats` (an `OnlineEpisodeStats`) are fed by `add_frame` along
+with the columns and travel with the sealed buffer, so `save_episode` only has to finalize them.
+"""
+
+import numpy as np
+
+from operating_platform.dataset.compute_stats import OnlineEpisodeStats
+
+# Features that stay Python lists (file paths, strings)
+LIST_DTYPES = ("image", "video", "audio", "string")
+
+
+class GrowableColumn:
+    """Rows of one feature in a preallocated array that doubles in size when full.
+
+    The row shape and dtype are taken from the first appended value, like `np.stack` would.
+    """
+
+    def __init__(self, capacity: int = 1024):
+        self._capacity = max(int(capacity), 1)
+        self._data: np.ndarray | None = None
+        self._size = 0
+
+    def append(self, value) -> None:
+        value = np.asarray(value)
+        if self._data is None:
+            self._data = np.empty((self._capacity, *value.shape), dtype=value.dtype)
+        elif self._size == len(self._data):
+            grown = np.empty((2 * len(self._data), *self._data.shape[1:]), dtype=self._data.dtype)
+            grown[: self._size] = self._data
+            self._data = grown
+        self._data[self._size] = value
+        self._size += 1
+
+    @property
+    def array(self) -> np.ndarray:
+        """The recorded rows (a view, not a copy)."""
+        if self._data is None:
+            return np.empty((0,))
+        return self._data[: self._size]
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __getitem__(self, idx):
+        return self.array[idx]
+
+    def __iter__(self):
+        return iter(self.array)
+
+    def __array__(self, dtype=None, copy=None):
+        array = self.array
+        return array if dtype is None else array.astype(dtype)
+
+
+class EpisodeBuffer(dict):
+    """Frames of one episode, one `GrowableColumn` per numeric feature."""
+
+    def __init__(self, features: dict, episode_index: int, capacity: int = 1024):
+        super().__init__()
+        self.sealed = False
+        self.stats = OnlineEpisodeStats(features)
+        # size and task are special cases that are not in features
+        self["size"] = 0
+        self["task"] = []
+        for key, ft in features.items():
+            if key == "episode_index":
+                self[key] = episode_index
+            elif ft["dtype"] in LIST_DTYPES:
+                self[key] = []
+            else:
+                self[key] = GrowableColumn(capacity)
+
+    def seal(self) -> "EpisodeBuffer":
+        """Freeze the buffer for the saver: columns are replaced by views of their recorded rows.
+
+        O(number of features), independent of the episode length. The caller must stop appending
+        to the buffer (e.g. swap in a new one) before sealing it.
+        """
+        if not self.sealed:
+            for key, value in self.items():
+                if isinstance(value, GrowableColumn):
+                    self[key] = value.array
+            self.sealed = True
+        return self
@@ -14,6 +14,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 import logging
+from pathlib import Path
 from pprint import pformat
 
 import torch
@@ -72,14 +73,15 @@ def make_dataset(cfg: TrainPipelineConfig) -> DoRobotDataset | MultiDoRobotDatas
     Args:
         cfg (TrainPipelineConfig): A TrainPipelineConfig config which contains a DatasetConfig and a PreTrainedConfig.
 
-    Raises:
-        NotImplementedError: The MultiLeRobotDataset is currently deactivated.
-
     Returns:
-        LeRobotDataset | MultiLeRobotDataset
+        DoRobotDataset | MultiDoRobotDataset
     """
+    # With `on_device`, transforms run on whole batches in train.py (BatchImageTransforms) instead
+    on_device_transforms = cfg.dataset.image_transforms.enable and cfg.dataset.image_transforms.on_device
     image_transforms = (
-        ImageTransforms(cfg.dataset.image_transforms) if cfg.dataset.image_transforms.enable else None
+        ImageTransforms(cfg.dataset.image_transforms)
+        if cfg.dataset.image_transforms.enable and not on_device_transforms
+        else None
     )
 
     if isinstance(cfg.dataset.repo_id, str):
@@ -95,15 +97,29 @@ def make_dataset(cfg: TrainPipelineConfig) -> DoRobotDataset | MultiDoRobotDatas
             image_transforms=image_transforms,
             revision=cfg.dataset.revision,
             video_backend=cfg.dataset.video_backend,
+            video_cache_mb=cfg.dataset.video_cache_mb,
+            column_store=cfg.dataset.column_store,
+            frame_cache=cfg.dataset.frame_cache,
+            uint8_frames=on_device_transforms,
         )
     else:
-        raise NotImplementedError("The MultiLeRobotDataset isn't supported for now.")
-        dataset = MultiLeRobotDataset(
+        # The datasets are in root/<repo_id>. delta_timestamps are resolved from the first one, the others have
+        # the same fps (checked by MultiDoRobotDataset)
+        first_root = Path(cfg.dataset.root) / cfg.dataset.repo_id[0] if cfg.dataset.root else None
+        ds_meta = DoRobotDatasetMetadata(cfg.dataset.repo_id[0], root=first_root, revision=cfg.dataset.revision)
+        delta_timestamps = resolve_delta_timestamps(cfg.policy, ds_meta)
+        dataset = MultiDoRobotDataset(
             cfg.dataset.repo_id,
-            # TODO(aliberts): add proper support for multi dataset
-            # delta_timestamps=delta_timestamps,
+            root=cfg.dataset.root,
             image_transforms=image_transforms,
+            delta_timestamps=delta_timestamps,
             video_backend=cfg.dataset.video_backend,
+            weights=cfg.dataset.weights,
+            revision=cfg.dataset.revision,
+            video_cache_mb=cfg.dataset.video_cache_mb,
+            column_store=cfg.dataset.column_store,
+            frame_cache=cfg.dataset.frame_cache,
+            uint8_frames=on_device_transforms,
         )
         logging.info(
             "Multiple datasets were provided. Applied the following index mapping to the provided datasets: "
@@ -0,0 +1,223 @@
+"""
+Pre-decoded video frames for repeated training runs.
+
+Every training run decodes the H.264 videos of the dataset again, for every sample of every epoch.
+`build_frame_cache` (`scripts/build_frame_cache.py`) decodes all videos of a dataset once, in
+parallel, optionally resized to the input resolution of the policy, and writes the uint8 frames
+into memory-mapped shards, one per video, under `frame_cache/`:
+
+    frame_cache/
+    ├── index.json                        resolution, and for each shard its number of frames and
+    │                                     the signature (size, mtime) of the video it comes from
+    └── observation.images.top/
+        ├── episode_000000.npy            (length, C, H, W) uint8
+        ├── episode_000000.ts.npy         (num_frames,) timestamps of the decoded frames
+        └── ...
+
+`DoRobotDataset` opens the cache when it exists (`FrameCache.load`) and `_query_videos` reads frames
+from it instead of decoding, for every video whose shard is up to date. The cache is local, it is
+not pushed to the hub.
+"""
+
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+import numpy as np
+import torch
+
+from operating_platform.utils.dataset import load_json, write_json
+
+FRAME_CACHE_DIR = "frame_cache"
+INDEX_NAME = "index.json"
+
+
+def _video_signature(video_path: Path) -> list[int]:
+    st = video_path.stat()
+    return [st.st_size, st.st_mtime_ns]
+
+
+def _shard_paths(cache_dir: Path, vid_key: str, ep_idx: int) -> tuple[Path, Path]:
+    return (
+        cache_dir / vid_key / f"episode_{ep_idx:06d}.npy",
+        cache_dir / vid_key / f"episode_{ep_idx:06d}.ts.npy",
+    )
+
+
+def decode_video_to_shard(
+    video_path: Path,
+    frames_path: Path,
+    ts_path: Path,
+    num_frames: int,
+    resolution: tuple[int, int] | None = None,
+) -> int:
+    """Decode the first `num_frames` frames of a video into a (num_frames, C, H, W) uint8 `.npy`
+    file, resized to `resolution` (height, width) if given. Returns the number of decoded frames."""
+    import av
+
+    frames_path.parent.mkdir(parents=True, exist_ok=True)
+    timestamps = []
+    with av.open(str(video_path)) as container:
+        stream = container.streams.video[0]
+        stream.thread_type = "AUTO"
+        height, width = resolution if resolution is not None else (stream.height, stream.width)
+        shard = np.lib.format.open_memmap(
+            frames_path, mode="w+", dtype=np.uint8, shape=(num_frames, 3, height, width)
+        )
+        for frame in container.decode(stream):
+            if len(timestamps) == num_frames:
+                break
+            image = frame.reformat(width=width, height=height, format="rgb24").to_ndarray()
+            shard[len(timestamps)] = image.transpose(2, 0, 1)
+            timestamps.append(float(frame.pts * stream.time_base))
+        shard.flush()
+        del shard
+
+    np.save(ts_path, np.asarray(timestamps, dtype=np.float64))
+    return len(timestamps)
+
+
+def build_frame_cache(
+    root: str | Path,
+    episodes: dict[int, dict],
+    video_keys: list[str],
+    video_path_fn,
+    resolution: tuple[int, int] | None = None,
+    num_workers: int | None = None,
+) -> dict:
+    """
+    Decode the videos of a dataset into `root/frame_cache/`. Up to date shards are kept.
+
+    Args:
+        root: Dataset root.
+        episodes: `meta.episodes` (episode index -> dict with its "length").
+        video_keys: `meta.video_keys`.
+        video_path_fn: `meta.get_video_file_path`, (episode index, video key) -> path relative to root.
+        resolution: (height, width) to resize the frames to, None keeps the video resolution.
+        num_workers: Videos decoded in parallel (PyAV releases the GIL while decoding).
+
+    Returns:
+        The index written to `frame_cache/index.json`.
+    """
+    root = Path(root)
+    cache_dir = root / FRAME_CACHE_DIR
+    index_path = cache_dir / INDEX_NAME
+    resolution = list(resolution) if resolution is not None else None
+
+    index = {"resolution": resolution, "shards": {}}
+    if index_path.is_file():
+        previous = load_json(index_path)
+        if previous.get("resolution") == resolution:
+            index = previous
+
+    jobs = {}
+    for vid_key in video_keys:
+        for ep_idx, episode in episodes.items():
+            name = f"{vid_key}/{ep_idx}"
+            video_path = root / video_path_fn(ep_idx, vid_key)
+            if not video_path.is_file():
+                logging.warning(f"[FrameCache] Missing video {video_path}, skipping")
+                continue
+            signature = _video_signature(video_path)
+            shard = index["shards"].get(name)
+            frames_path = _shard_paths(cache_dir, vid_key, ep_idx)[0]
+            if shard is not None and shard["video"] == signature and frames_path.is_file():
+                continue
+            jobs[name] = (vid_key, ep_idx, video_path, signature, episode["length"])
+
+    logging.info(
+        f"[FrameCache] Decoding {len(jobs)} videos into {cache_dir} (resolution: {resolution or 'original'})"
+    )
+    num_workers = num_workers or max(1, (os.cpu_count() or 1) // 2)
+    with ThreadPoolExecutor(max_workers=num_workers) as executor:
+        futures = {
+            executor.submit(
+                decode_video_to_shard, video_path, *_shard_paths(cache_dir, vid_key, ep_idx), length, resolution
+            ): (name, signature)
+            for name, (vid_key, ep_idx, video_path, signature, length) in jobs.items()
+        }
+        for done, future in enumerate(as_completed(futures), start=1):
+            name, signature = futures[future]
+            index["shards"][name] = {"num_frames": future.result(), "video": signature}
+            if done % 50 == 0 or done == len(futures):
+                logging.info(f"[FrameCache] {done}/{len(futures)} videos decoded")
+
+    write_json(index, index_path)
+    return index
+
+
+class FrameCache:
+    """Read side of the frame cache of a dataset, see `build_frame_cache`."""
+
+    def __init__(self, cache_dir: Path, shards: dict[str, dict]):
+        self.cache_dir = cache_dir
+        self.shards = shards
+        self._arrays: dict[str, tuple[np.ndarray, np.ndarray]] = {}
+
+    # Memory maps would be pickled as arrays (DataLoader workers started with spawn), reopen them instead
+    def __getstate__(self):
+        return {**self.__dict__, "_arrays": {}}
+
+    @classmethod
+    def load(cls, root: str | Path, video_keys: list[str], video_path_fn) -> "FrameCache | None":
+        """Open the frame cache of the dataset at `root`, None if there is none.
+
+        Shards whose video changed since they were decoded are left out (those videos are decoded).
+        """
+        root = Path(root)
+        index_path = root / FRAME_CACHE_DIR / INDEX_NAME
+        if not index_path.is_file():
+            return None
+        shards = {}
+        stale = 0
+        for name, shard in load_json(index_path)["shards"].items():
+            vid_key, ep_idx = name.rsplit("/", 1)
+            if vid_key not in video_keys:
+                continue
+            video_path = root / video_path_fn(int(ep_idx), vid_key)
+            if video_path.is_file() and _video_signature(video_path) == shard["video"]:
+                shards[name] = shard
+            else:
+                stale += 1
+        if stale:
+            logging.warning(f"[FrameCache] {stale} shards are out of date, their videos will be decoded")
+        logging.info(f"[FrameCache] Using {len(shards)} pre-decoded videos from {index_path.parent}")
+        return cls(index_path.parent, shards)
+
+    def __contains__(self, video: tuple[int, str]) -> bool:
+        ep_idx, vid_key = video
+        return f"{vid_key}/{ep_idx}" in self.shards
+
+    def _shard(self, ep_idx: int, vid_key: str) -> tuple[np.ndarray, np.ndarray]:
+        name = f"{vid_key}/{ep_idx}"
+        if name not in self._arrays:
+            frames_path, ts_path = _shard_paths(self.cache_dir, vid_key, ep_idx)
+            self._arrays[name] = (np.load(frames_path, mmap_mode="r"), np.load(ts_path))
+        return self._arrays[name]
+
+    def frames(
+        self,
+        ep_idx: int,
+        vid_key: str,
+        timestamps: list[float],
+        tolerance_s: float,
+        fps: float,
+        as_uint8: bool = False,
+    ) -> torch.Tensor:
+        """Cached frames closest to `timestamps`, as a (N, C, H, W) float32 tensor in [0, 1] (uint8 with
+        `as_uint8`)."""
+        frames, frame_ts = self._shard(ep_idx, vid_key)
+        query_ts = np.asarray(timestamps, dtype=np.float64)
+        # Frames are decoded at 1/fps intervals, the closest one is next to round(ts * fps)
+        idx = np.clip(np.round(query_ts * fps).astype(np.int64), 0, len(frame_ts) - 1)
+        candidates = np.clip(idx[:, None] + np.array([-1, 0, 1]), 0, len(frame_ts) - 1)
+        dist = np.abs(frame_ts[candidates] - query_ts[:, None])
+        closest = candidates[np.arange(len(idx)), dist.argmin(axis=1)]
+        min_dist = dist.min(axis=1)
+        assert (min_dist < tolerance_s).all(), (
+            f"One or several query timestamps unexpectedly violate the tolerance ({min_dist} > {tolerance_s=}) "
+            f"in the frame cache of episode {ep_idx} ({vid_key}).\nqueried timestamps: {timestamps}"
+        )
+        frames = torch.from_numpy(np.ascontiguousarray(frames[closest]))
+        return frames if as_uint8 else frames.type(torch.float32) / 255
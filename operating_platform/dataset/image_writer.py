@@ -13,15 +13,24 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import itertools
+import logging
 import multiprocessing
+import os
 import queue
+import shutil
 import threading
+import time
+from collections import defaultdict
+from dataclasses import dataclass
 from pathlib import Path
 
 import numpy as np
 import PIL.Image
 import torch
 
+from operating_platform.utils.frame_format import FrameFormat, write_frame
+
 
 def safe_stop_image_writer(func):
     def wrapper(*args, **kwargs):
@@ -38,7 +47,7 @@ def safe_stop_image_writer(func):
     return wrapper
 
 
-def image_array_to_pil_image(image_array: np.ndarray, range_check: bool = True) -> PIL.Image.Image:
+def image_array_to_hwc_uint8(image_array: np.ndarray, range_check: bool = True) -> np.ndarray:
     # TODO(aliberts): handle 1 channel and 4 for depth images
     if image_array.ndim != 3:
         raise ValueError(f"The array has {image_array.ndim} dimensions, but 3 is expected for an image.")
@@ -65,40 +74,175 @@ def image_array_to_pil_image(image_array: np.ndarray, range_check: bool = True)
 
         image_array = (image_array * 255).astype(np.uint8)
 
-    return PIL.Image.fromarray(image_array)
+    return image_array
+
+
+def image_array_to_pil_image(image_array: np.ndarray, range_check: bool = True) -> PIL.Image.Image:
+    return PIL.Image.fromarray(image_array_to_hwc_uint8(image_array, range_check))
+
+
+class ImageWriteError(RuntimeError):
+    """One or more images of an episode could not be written."""
+
+
+# What `AsyncImageWriter.save_image` does with a frame that would exceed `max_queue_bytes`:
+#   backpressure: block the caller until enough queued frames have been written
+#   spill:        copy the frame to a staging file on disk, workers read it back through np.memmap
+#   degrade:      keep the frame in memory but write it with the fastest PNG compression so the queue
+#                 drains sooner (lossless, larger files); backpressure past twice the budget. Other
+#                 frame formats are already fast to write and are only subject to the backpressure
+OVERFLOW_POLICIES = ("backpressure", "spill", "degrade")
+
+# PNG compression level used for frames written under the "degrade" policy (PIL default is 6)
+DEGRADED_PNG_COMPRESS_LEVEL = 1
+
+
+@dataclass
+class SpilledImage:
+    """A frame staged in a spill file, see `AsyncImageWriter`."""
+
+    path: str
+    offset: int
+    shape: tuple
+    dtype: str
+
+    def load(self) -> np.ndarray:
+        mapped = np.memmap(self.path, dtype=self.dtype, mode="r", offset=self.offset, shape=self.shape)
+        image = np.array(mapped)
+        del mapped
+        return image
 
 
-def write_image(image: np.ndarray | PIL.Image.Image, fpath: Path):
-    import logging
+class _SpillArena:
+    """Append-only staging files for spilled frames. A file is deleted once all its frames are written.
+
+    Room for a frame is reserved under the lock of the writer (`reserve`), the frame itself is
+    written after releasing it (`write`): a file stays open as long as it has frames pending.
+    """
+
+    def __init__(self, spill_dir: Path, chunk_bytes: int = 256 * 1024**2):
+        self.spill_dir = Path(spill_dir)
+        self.chunk_bytes = chunk_bytes
+        self.bytes_on_disk = 0
+        self._chunk_ids = itertools.count()
+        self._path = None
+        self._used = 0
+        self._fds: dict[str, int] = {}
+        self._pending: dict[str, int] = {}
+        self._sizes: dict[str, int] = {}
+
+    def reserve(self, image: np.ndarray) -> SpilledImage:
+        if self._path is None or self._used + image.nbytes > self.chunk_bytes:
+            self._roll()
+        spilled = SpilledImage(self._path, self._used, image.shape, image.dtype.str)
+        self._used += image.nbytes
+        self._pending[self._path] += 1
+        self._sizes[self._path] = self._used
+        self.bytes_on_disk += image.nbytes
+        return spilled
+
+    def write(self, spilled: SpilledImage, image: np.ndarray) -> None:
+        fd = self._fds[spilled.path]
+        data = image.data.cast("B")
+        written = 0
+        while written < len(data):
+            written += os.pwrite(fd, data[written:], spilled.offset + written)
+
+    def release(self, spilled: SpilledImage) -> None:
+        self._pending[spilled.path] -= 1
+        if self._pending[spilled.path] == 0 and spilled.path != self._path:
+            self._remove(spilled.path)
+
+    def close(self) -> None:
+        for fd in self._fds.values():
+            os.close(fd)
+        self._fds.clear()
+        self._path = None
+        shutil.rmtree(self.spill_dir, ignore_errors=True)
+        self._pending.clear()
+        self._sizes.clear()
+        self.bytes_on_disk = 0
+
+    def _roll(self) -> None:
+        previous = self._path
+        self.spill_dir.mkdir(parents=True, exist_ok=True)
+        self._path = str(self.spill_dir / f"spill_{next(self._chunk_ids):06d}.bin")
+        self._fds[self._path] = os.open(self._path, os.O_RDWR | os.O_CREAT | os.O_TRUNC, 0o600)
+        self._used = 0
+        self._pending[self._path] = 0
+        self._sizes[self._path] = 0
+        if previous is not None and self._pending[previous] == 0:
+            self._remove(previous)
+
+    def _remove(self, path: str) -> None:
+        os.close(self._fds.pop(path))
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        self.bytes_on_disk -= self._sizes.pop(path, 0)
+        del self._pending[path]
+
+
+def _image_nbytes(image) -> int:
+    if isinstance(image, np.ndarray):
+        return image.nbytes
+    if isinstance(image, PIL.Image.Image):
+        return image.width * image.height * len(image.getbands())
+    return 0
+
+
+def _write_image(
+    image: np.ndarray | PIL.Image.Image | SpilledImage,
+    fpath: Path,
+    compress_level: int | None = None,
+    frame_format: FrameFormat | None = None,
+):
+    if isinstance(image, SpilledImage):
+        image = image.load()
+    if isinstance(image, np.ndarray):
+        image = image_array_to_hwc_uint8(image)
+    elif not isinstance(image, PIL.Image.Image):
+        raise TypeError(f"Unsupported image type: {type(image)}")
+    # The suffix of fpath selects the file format, see operating_platform.utils.frame_format
+    write_frame(image, fpath, frame_format, compress_level)
+
+
+def write_image(
+    image: np.ndarray | PIL.Image.Image | SpilledImage,
+    fpath: Path,
+    compress_level: int | None = None,
+    frame_format: FrameFormat | None = None,
+) -> str | None:
+    """Write an image, logging failures. Returns the error message, or None on success."""
     try:
-        if isinstance(image, np.ndarray):
-            img = image_array_to_pil_image(image)
-        elif isinstance(image, PIL.Image.Image):
-            img = image
-        else:
-            raise TypeError(f"Unsupported image type: {type(image)}")
-        img.save(fpath)
+        _write_image(image, fpath, compress_level, frame_format)
     except Exception as e:
         # Log error with full traceback for debugging
         import traceback
         logging.error(f"[ImageWriter] Failed to write image {fpath}: {e}\n{traceback.format_exc()}")
+        return f"{fpath}: {e}"
+    return None
 
 
-def worker_thread_loop(queue: queue.Queue):
+def worker_thread_loop(queue: queue.Queue, on_done=None, frame_format: FrameFormat | None = None):
     while True:
         item = queue.get()
         if item is None:
             queue.task_done()
             break
-        image_array, fpath = item
-        write_image(image_array, fpath)
+        image_array, fpath, item_id, compress_level = item
+        error = write_image(image_array, fpath, compress_level, frame_format)
+        if on_done is not None:
+            on_done(item_id, error)
         queue.task_done()
 
 
-def worker_process(queue: queue.Queue, num_threads: int):
+def worker_process(queue: queue.Queue, num_threads: int, done_queue=None, frame_format: FrameFormat | None = None):
     threads = []
+    on_done = None if done_queue is None else lambda item_id, error: done_queue.put((item_id, error))
     for _ in range(num_threads):
-        t = threading.Thread(target=worker_thread_loop, args=(queue,))
+        t = threading.Thread(target=worker_thread_loop, args=(queue, on_done, frame_format))
         t.daemon = True
         t.start()
         threads.append(t)
@@ -124,49 +268,256 @@ class AsyncImageWriter:
     Bounded queue (v0.2.123) caused blocking which disrupted action-observation timing,
     leading to degraded inference quality. Memory management is now handled by
     auto-stop based on system memory monitoring in the recording loop.
+
+    The queue is still unbounded by default. With `max_queue_bytes`, the raw bytes of frames queued
+    but not yet written are accounted, and frames that would exceed the budget are handled per
+    `overflow_policy` (see `OVERFLOW_POLICIES`): "spill" and "degrade" keep the recording loop
+    running, "backpressure" blocks it. Frame timestamps come from the frame index, so a stall delays
+    the loop but doesn't corrupt the recorded timing; stalls are reported in `get_stats()`.
+
+    Images saved with an `episode_index` and `image_key` are tracked per episode and camera, so that
+    `wait_episode` can block exactly until the last image of an episode is on disk and report the
+    ones that failed, without touching the filesystem.
+
+    Each image is written in the format given by the suffix of its path (PNG, JPEG, raw or lz4
+    compressed .npy), with the JPEG quality and PNG compress level of `frame_format`.
     """
 
-    def __init__(self, num_processes: int = 0, num_threads: int = 1):
+    def __init__(
+        self,
+        num_processes: int = 0,
+        num_threads: int = 1,
+        max_queue_bytes: int | None = None,
+        overflow_policy: str = "backpressure",
+        spill_dir: Path | str | None = None,
+        frame_format: FrameFormat | None = None,
+    ):
         self.num_processes = num_processes
         self.num_threads = num_threads
+        self.frame_format = frame_format or FrameFormat()
         self.queue = None
         self.threads = []
         self.processes = []
         self._stopped = False
 
+        if overflow_policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow_policy '{overflow_policy}', expected one of {OVERFLOW_POLICIES}.")
+        if overflow_policy == "spill" and max_queue_bytes and spill_dir is None:
+            raise ValueError("overflow_policy='spill' requires a spill_dir.")
+        self.max_queue_bytes = max_queue_bytes or None
+        self.overflow_policy = overflow_policy
+        self._spill = _SpillArena(spill_dir) if overflow_policy == "spill" and self.max_queue_bytes else None
+
+        # Per (episode_index, image_key): images queued / images done, and failures per episode
+        self._progress_cond = threading.Condition()
+        self._queued = defaultdict(int)
+        self._done = defaultdict(int)
+        self._errors = defaultdict(list)
+        self._done_queue = None
+        self._done_thread = None
+
+        # Frames queued but not written yet: item id -> (tag, bytes held in memory, spilled image)
+        self._item_ids = itertools.count()
+        self._in_flight: dict[int, tuple] = {}
+        self._bytes_in_flight = 0
+        self._stats = {"spilled_frames": 0, "degraded_frames": 0, "backpressure_events": 0, "backpressure_s": 0.0}
+
         if num_threads <= 0 and num_processes <= 0:
             raise ValueError("Number of threads and processes must be greater than zero.")
 
         if self.num_processes == 0:
             # Use threading with UNBOUNDED queue to preserve recording timing
-            # Memory is managed by auto-stop in recording loop
+            # Memory is bounded by max_queue_bytes if set, and by auto-stop in recording loop
             self.queue = queue.Queue()
             for _ in range(self.num_threads):
-                t = threading.Thread(target=worker_thread_loop, args=(self.queue,))
+                t = threading.Thread(
+                    target=worker_thread_loop, args=(self.queue, self._image_done, self.frame_format)
+                )
                 t.daemon = True
                 t.start()
                 self.threads.append(t)
         else:
             # Use multiprocessing with UNBOUNDED queue
             self.queue = multiprocessing.JoinableQueue()
+            # Completions come back from the subprocesses through a second queue
+            self._done_queue = multiprocessing.Queue()
+            self._done_thread = threading.Thread(target=self._done_listener, daemon=True)
+            self._done_thread.start()
             for _ in range(self.num_processes):
-                p = multiprocessing.Process(target=worker_process, args=(self.queue, self.num_threads))
+                p = multiprocessing.Process(
+                    target=worker_process,
+                    args=(self.queue, self.num_threads, self._done_queue, self.frame_format),
+                )
                 p.daemon = True
                 p.start()
                 self.processes.append(p)
 
-    def save_image(self, image: torch.Tensor | np.ndarray | PIL.Image.Image, fpath: Path):
+    def save_image(
+        self,
+        image: torch.Tensor | np.ndarray | PIL.Image.Image,
+        fpath: Path,
+        episode_index: int | None = None,
+        image_key: str | None = None,
+    ):
         if isinstance(image, torch.Tensor):
             # Convert tensor to numpy array to minimize main process time
             image = image.cpu().numpy()
 
-        # Unbounded queue - never blocks, memory managed by auto-stop in recording loop
-        self.queue.put((image, fpath))
+        tag = None if episode_index is None else (episode_index, image_key)
+        nbytes = _image_nbytes(image)
+        compress_level = None
+        spilled = None
+
+        with self._progress_cond:
+            limit = self.max_queue_bytes
+            if limit and self._bytes_in_flight > 0 and self._bytes_in_flight + nbytes > limit:
+                if self._spill is not None:
+                    # Only the room is reserved here, the frame is written to disk below, without
+                    # holding the lock the writer threads and `wait_episode` need
+                    image = np.ascontiguousarray(image)
+                    spilled = self._spill.reserve(image)
+                    nbytes = 0
+                    self._stats["spilled_frames"] += 1
+                elif self.overflow_policy == "degrade":
+                    compress_level = DEGRADED_PNG_COMPRESS_LEVEL
+                    self._stats["degraded_frames"] += 1
+                    self._wait_for_room(nbytes, 2 * limit)
+                else:
+                    self._wait_for_room(nbytes, limit)
+
+            item_id = next(self._item_ids)
+            self._in_flight[item_id] = (tag, nbytes, spilled)
+            self._bytes_in_flight += nbytes
+            if tag is not None:
+                self._queued[tag] += 1
+
+        if spilled is not None:
+            try:
+                self._spill.write(spilled, image)
+            except OSError as e:
+                self._image_done(item_id, f"{fpath}: could not spill the frame: {e}")
+                raise
+            image = spilled
+
+        # Unbounded queue - never blocks, memory bounded by the accounting above if enabled
+        self.queue.put((image, fpath, item_id, compress_level))
+
+    def _wait_for_room(self, nbytes: int, limit: int) -> None:
+        """Block (holding `_progress_cond`) until `nbytes` more fit under `limit`."""
+        if self._bytes_in_flight + nbytes <= limit:
+            return
+        start = time.perf_counter()
+        while self._bytes_in_flight > 0 and self._bytes_in_flight + nbytes > limit:
+            self._progress_cond.wait()
+        stalled = time.perf_counter() - start
+        self._stats["backpressure_events"] += 1
+        self._stats["backpressure_s"] += stalled
+        logging.debug(f"[ImageWriter] Backpressure: caller blocked {stalled * 1000:.1f}ms")
+
+    def _image_done(self, item_id: int, error: str | None) -> None:
+        with self._progress_cond:
+            tag, nbytes, spilled = self._in_flight.pop(item_id)
+            self._bytes_in_flight -= nbytes
+            if spilled is not None:
+                self._spill.release(spilled)
+            self._progress_cond.notify_all()
+            if tag is None or tag not in self._queued:
+                # Untracked, or the episode was forgotten (discarded) while its images were still queued
+                return
+            self._done[tag] += 1
+            if error is not None:
+                self._errors[tag[0]].append(error)
+
+    def _done_listener(self) -> None:
+        while True:
+            item = self._done_queue.get()
+            if item is None:
+                break
+            self._image_done(*item)
+
+    def episode_progress(self, episode_index: int) -> dict[str, tuple[int, int]]:
+        """(written, queued) image counts per image key of an episode."""
+        with self._progress_cond:
+            return {
+                key: (self._done[(ep, key)], queued)
+                for (ep, key), queued in self._queued.items()
+                if ep == episode_index
+            }
+
+    def wait_episode(
+        self,
+        episode_index: int,
+        expected_counts: dict[str, int] | None = None,
+        timeout: float | None = None,
+    ) -> bool:
+        """
+        Block until every image queued for `episode_index` has been written.
+
+        Args:
+            episode_index: Episode to wait for.
+            expected_counts: Optional number of images per image key that must have been queued too.
+            timeout: Maximum time to wait in seconds (None waits forever).
+
+        Returns:
+            True once the episode is complete, False on timeout.
+
+        Raises:
+            ImageWriteError: if some images of the episode failed to be written.
+        """
+        expected_counts = expected_counts or {}
+
+        def is_complete():
+            for key, expected in expected_counts.items():
+                if self._queued.get((episode_index, key), 0) < expected:
+                    return False
+            return all(
+                self._done[tag] >= queued for tag, queued in self._queued.items() if tag[0] == episode_index
+            )
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._progress_cond:
+            while not is_complete():
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._progress_cond.wait(remaining)
+            errors = list(self._errors.get(episode_index, []))
+
+        if errors:
+            raise ImageWriteError(
+                f"{len(errors)} image(s) of episode {episode_index} could not be written, first: {errors[0]}"
+            )
+        return True
+
+    def forget_episode(self, episode_index: int) -> None:
+        """Drop the counters of an episode once it has been saved or discarded."""
+        with self._progress_cond:
+            for tag in [tag for tag in self._queued if tag[0] == episode_index]:
+                del self._queued[tag]
+                self._done.pop(tag, None)
+            self._errors.pop(episode_index, None)
 
     def get_queue_size(self) -> int:
         """Get current queue size for memory monitoring."""
         return self.queue.qsize()
 
+    def get_bytes_in_flight(self) -> int:
+        """Raw bytes of the frames held in memory until written (spilled frames excluded)."""
+        with self._progress_cond:
+            return self._bytes_in_flight
+
+    def get_stats(self) -> dict:
+        """Queue depth, memory/spill usage and overflow counters, for monitoring."""
+        with self._progress_cond:
+            return {
+                "queue_depth": len(self._in_flight),
+                "bytes_in_flight": self._bytes_in_flight,
+                "max_queue_bytes": self.max_queue_bytes,
+                "overflow_policy": self.overflow_policy,
+                "spilled_bytes": self._spill.bytes_on_disk if self._spill is not None else 0,
+                **self._stats,
+            }
+
     def wait_until_done(self):
         self.queue.join()
 
@@ -189,5 +540,9 @@ class AsyncImageWriter:
                     p.terminate()
             self.queue.close()
             self.queue.join_thread()
+            self._done_queue.put(None)
+            self._done_thread.join()
 
+        if self._spill is not None:
+            self._spill.close()
         self._stopped = True
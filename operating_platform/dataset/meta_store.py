@@ -0,0 +1,275 @@
+"""
+Indexed store for the per-episode metadata of a dataset being recorded.
+
+`meta/episodes.jsonl`, `meta/episodes_stats.jsonl` and `meta/op_dataid.jsonl` used to be re-read
+line by line to find one episode or data id, and rewritten in full to delete one line, so the
+bookkeeping after every save grew with the length of the session. `MetadataStore` keeps an index
+of those files in SQLite (`meta/meta.db`, WAL journal):
+
+- every JSONL row is indexed by file, episode index and data id, with its byte range in the file,
+  so lookups are index lookups instead of file scans
+- appends still append one line to the JSONL file, so the files stay in the usual layout and
+  readable by every other tool
+- deleting the last rows of a file (discarding the episode just recorded) truncates the file;
+  only deleting a row in the middle rewrites it, from the index
+- the size on disk of each saved episode is kept, instead of walking directories again
+
+The JSONL files remain the reference: if one was changed by something else than the store (its
+size or mtime differ from the ones recorded in the database), it is indexed again on next access.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+from pathlib import Path
+
+from operating_platform.utils.dataset import EPISODES_PATH, EPISODES_STATS_PATH
+
+DATAID_PATH = "meta/op_dataid.jsonl"
+STORE_PATH = "meta/meta.db"
+
+INDEXED_FILES = (EPISODES_PATH, EPISODES_STATS_PATH, DATAID_PATH)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS rows (
+    file TEXT NOT NULL,
+    episode_index INTEGER,
+    dataid TEXT,
+    offset INTEGER NOT NULL,
+    nbytes INTEGER NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS rows_episode ON rows (file, episode_index);
+CREATE INDEX IF NOT EXISTS rows_dataid ON rows (file, dataid);
+CREATE INDEX IF NOT EXISTS rows_offset ON rows (file, offset);
+CREATE TABLE IF NOT EXISTS files (
+    file TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS episode_sizes (
+    episode_index INTEGER PRIMARY KEY,
+    size_bytes INTEGER NOT NULL
+);
+"""
+
+
+def _dumps(data: dict) -> bytes:
+    # Same formatting as the jsonlines writer
+    return (json.dumps(data, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+class MetadataStore:
+    """SQLite index of the JSONL metadata files of the dataset at `root`. Thread-safe."""
+
+    def __init__(self, root: str | Path):
+        self.root = Path(root)
+        (self.root / "meta").mkdir(parents=True, exist_ok=True)
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(self.root / STORE_PATH, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    # -- JSONL rows -------------------------------------------------------------------------------
+
+    def append(self, file: str, data: dict) -> None:
+        """Append a row to a JSONL file (relative to root) and index it."""
+        line = _dumps(data)
+        with self._lock:
+            self._sync(file)
+            fpath = self.root / file
+            fpath.parent.mkdir(parents=True, exist_ok=True)
+            with open(fpath, "ab") as f:
+                offset = f.tell()
+                f.write(line)
+            with self._conn:
+                self._insert(file, data, offset, len(line))
+                self._record_signature(file)
+
+    def get(self, file: str, episode_index: int) -> dict | None:
+        """First row of `file` for an episode."""
+        with self._lock:
+            self._sync(file)
+            row = self._conn.execute(
+                "SELECT data FROM rows WHERE file = ? AND episode_index = ? ORDER BY offset LIMIT 1",
+                (file, episode_index),
+            ).fetchone()
+        return None if row is None else json.loads(row[0])
+
+    def rows(self, file: str) -> list[dict]:
+        """All rows of `file`, in file order."""
+        with self._lock:
+            self._sync(file)
+            cursor = self._conn.execute("SELECT data FROM rows WHERE file = ? ORDER BY offset", (file,))
+            return [json.loads(data) for (data,) in cursor]
+
+    def delete(self, file: str, episode_index: int, dataid: str | None = None) -> int:
+        """
+        Delete the rows of an episode (optionally only those with `dataid`) from `file`.
+
+        Rows at the end of the file are removed by truncating it, others by rewriting the file.
+        Returns the number of deleted rows.
+        """
+        query = "SELECT rowid, offset, nbytes FROM rows WHERE file = ? AND episode_index = ?"
+        params = [file, episode_index]
+        if dataid is not None:
+            query += " AND dataid = ?"
+            params.append(str(dataid))
+        with self._lock:
+            self._sync(file)
+            matches = self._conn.execute(query + " ORDER BY offset DESC", params).fetchall()
+            if not matches:
+                return 0
+            fpath = self.root / file
+            with self._conn:
+                self._conn.executemany("DELETE FROM rows WHERE rowid = ?", [(rowid,) for rowid, _, _ in matches])
+                end = os.path.getsize(fpath)
+                for _, offset, nbytes in matches:
+                    if offset + nbytes != end:
+                        break
+                    end = offset
+                else:
+                    os.truncate(fpath, end)
+                    self._record_signature(file)
+                    return len(matches)
+                logging.debug(f"[MetadataStore] Rewriting {file} to delete episode {episode_index}")
+                self._rewrite(file)
+            return len(matches)
+
+    def find_episode_index(self, dataid: str) -> int | None:
+        """Episode recorded for a data id (first match in op_dataid.jsonl)."""
+        with self._lock:
+            self._sync(DATAID_PATH)
+            row = self._conn.execute(
+                "SELECT episode_index FROM rows WHERE file = ? AND dataid = ? ORDER BY offset LIMIT 1",
+                (DATAID_PATH, str(dataid).strip()),
+            ).fetchone()
+        return None if row is None else row[0]
+
+    def export_jsonl(self, dest_root: str | Path | None = None) -> None:
+        """Write the indexed JSONL files from the database, under `dest_root` (default: in place)."""
+        with self._lock:
+            for file in INDEXED_FILES:
+                self._sync(file)
+                if dest_root is None:
+                    with self._conn:
+                        self._rewrite(file)
+                    continue
+                fpath = Path(dest_root) / file
+                fpath.parent.mkdir(parents=True, exist_ok=True)
+                with open(fpath, "wb") as f:
+                    for data in self.rows(file):
+                        f.write(_dumps(data))
+
+    # -- Episode sizes ----------------------------------------------------------------------------
+
+    def set_episode_size(self, episode_index: int, size_bytes: int) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO episode_sizes (episode_index, size_bytes) VALUES (?, ?)",
+                (episode_index, int(size_bytes)),
+            )
+
+    def get_episode_size(self, episode_index: int) -> int | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT size_bytes FROM episode_sizes WHERE episode_index = ?", (episode_index,)
+            ).fetchone()
+        return None if row is None else row[0]
+
+    def delete_episode_size(self, episode_index: int) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM episode_sizes WHERE episode_index = ?", (episode_index,))
+
+    # -- Internals (called with the lock held, _rewrite inside a transaction) ---------------------
+
+    def _insert(self, file: str, data: dict, offset: int, nbytes: int) -> None:
+        dataid = data.get("dataid")
+        self._conn.execute(
+            "INSERT INTO rows (file, episode_index, dataid, offset, nbytes, data) VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                file,
+                data.get("episode_index"),
+                None if dataid is None else str(dataid).strip(),
+                offset,
+                nbytes,
+                json.dumps(data, ensure_ascii=False),
+            ),
+        )
+
+    def _signature(self, file: str) -> tuple[int, int] | None:
+        try:
+            st = os.stat(self.root / file)
+        except FileNotFoundError:
+            return None
+        return st.st_size, st.st_mtime_ns
+
+    def _record_signature(self, file: str) -> None:
+        size, mtime_ns = self._signature(file) or (0, 0)
+        self._conn.execute(
+            "INSERT OR REPLACE INTO files (file, size, mtime_ns) VALUES (?, ?, ?)", (file, size, mtime_ns)
+        )
+
+    def _sync(self, file: str) -> None:
+        """Index `file` again if it changed behind the store's back (or was never indexed)."""
+        stored = self._conn.execute("SELECT size, mtime_ns FROM files WHERE file = ?", (file,)).fetchone()
+        current = self._signature(file) or (0, 0)
+        if stored is not None and tuple(stored) == current:
+            return
+        if stored is not None:
+            logging.info(f"[MetadataStore] {file} changed outside of the store, indexing it again")
+        fpath = self.root / file
+        with self._conn:
+            self._conn.execute("DELETE FROM rows WHERE file = ?", (file,))
+            if fpath.exists():
+                offset = 0
+                with open(fpath, "rb") as f:
+                    for line in f:
+                        try:
+                            data = json.loads(line)
+                        except json.JSONDecodeError:
+                            logging.warning(f"[MetadataStore] Skipping invalid line in {file}: {line!r}")
+                        else:
+                            self._insert(file, data, offset, len(line))
+                        offset += len(line)
+            self._record_signature(file)
+
+    def _rewrite(self, file: str) -> None:
+        fpath = self.root / file
+        rows = self._conn.execute(
+            "SELECT rowid, data FROM rows WHERE file = ? ORDER BY offset", (file,)
+        ).fetchall()
+        if not rows and not fpath.exists():
+            return
+        tmp_path = fpath.with_name(fpath.name + ".tmp")
+        offset = 0
+        with open(tmp_path, "wb") as f:
+            for rowid, data in rows:
+                line = _dumps(json.loads(data))
+                f.write(line)
+                self._conn.execute("UPDATE rows SET offset = ?, nbytes = ? WHERE rowid = ?", (offset, len(line), rowid))
+                offset += len(line)
+        os.replace(tmp_path, fpath)
+        self._record_signature(file)
+
+
+_stores: dict[tuple[int, Path], MetadataStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_metadata_store(root: str | Path) -> MetadataStore:
+    """Shared `MetadataStore` of the dataset at `root` (one per process)."""
+    key = (os.getpid(), Path(root).resolve())
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = MetadataStore(root)
+            _stores[key] = store
+        return store
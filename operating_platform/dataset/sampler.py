@@ -15,8 +15,11 @@
 # limitations under the License.
 from collections.abc import Iterator
 
+import numpy as np
 import torch
 
+SHUFFLE_MODES = ("full", "block", "episode")
+
 
 class EpisodeAwareSampler:
     def __init__(
@@ -26,9 +29,26 @@ class EpisodeAwareSampler:
         drop_n_first_frames: int = 0,
         drop_n_last_frames: int = 0,
         shuffle: bool = False,
+        shuffle_mode: str = "full",
+        block_size: int = 256,
+        window: int = 8,
+        num_workers: int = 0,
+        batch_size: int = 1,
     ):
         """Sampler that optionally incorporates episode boundary information.
 
+        A full shuffle scatters the frames of a batch over every episode of the dataset, so each
+        sample seeks in a different video. The other shuffle modes keep locality: the frames are cut
+        into blocks (`block_size` consecutive frames, or whole episodes), the blocks are shuffled, and
+        frames are shuffled across `window` consecutive blocks. Each stretch of samples then reads
+        from about `window` videos while every frame is still seen once per epoch in random order.
+
+        With `num_workers` > 0, each DataLoader worker owns a subset of the episodes (reshuffled every
+        epoch): the sampler orders batches so that batch i comes from the episodes of worker
+        i % num_workers, which is the order the DataLoader dispatches batches in. Its decoders then
+        only open the videos of its own episodes. `num_workers` and `batch_size` must match the
+        DataLoader.
+
         Args:
             episode_data_index: Dictionary with keys 'from' and 'to' containing the start and end indices of each episode.
             episode_indices_to_use: List of episode indices to use. If None, all episodes are used.
@@ -36,26 +56,148 @@ class EpisodeAwareSampler:
             drop_n_first_frames: Number of frames to drop from the start of each episode.
             drop_n_last_frames: Number of frames to drop from the end of each episode.
             shuffle: Whether to shuffle the indices.
+            shuffle_mode: "full" (random permutation), "block" or "episode" (see above).
+            block_size: Frames per block in "block" mode.
+            window: Blocks whose frames are shuffled together in "block" and "episode" modes.
+            num_workers: DataLoader workers to give each their own episodes (0 disables worker affinity).
+            batch_size: DataLoader batch size, used with `num_workers`.
         """
-        indices = []
+        if shuffle_mode not in SHUFFLE_MODES:
+            raise ValueError(f"Unknown shuffle_mode '{shuffle_mode}', expected one of {SHUFFLE_MODES}.")
+        if block_size < 1 or window < 1:
+            raise ValueError(f"block_size and window must be >= 1, got {block_size} and {window}.")
+
+        episodes = []
         for episode_idx, (start_index, end_index) in enumerate(
             zip(episode_data_index["from"], episode_data_index["to"], strict=True)
         ):
             if episode_indices_to_use is None or episode_idx in episode_indices_to_use:
-                indices.extend(
-                    range(start_index.item() + drop_n_first_frames, end_index.item() - drop_n_last_frames)
-                )
+                start, end = start_index.item() + drop_n_first_frames, end_index.item() - drop_n_last_frames
+                if end > start:
+                    episodes.append(np.arange(start, end, dtype=np.int64))
 
-        self.indices = indices
+        self.episodes = episodes
+        self.indices = np.concatenate(episodes) if episodes else np.empty(0, dtype=np.int64)
         self.shuffle = shuffle
+        self.shuffle_mode = shuffle_mode
+        self.block_size = block_size
+        self.window = window
+        self.num_workers = num_workers
+        self.batch_size = batch_size
+
+    def _blocks(self, episodes: list[np.ndarray]) -> list[np.ndarray]:
+        if self.shuffle_mode == "episode":
+            return episodes
+        return [ep[i : i + self.block_size] for ep in episodes for i in range(0, len(ep), self.block_size)]
+
+    def _shuffled(self, episodes: list[np.ndarray]) -> np.ndarray:
+        if not episodes:
+            return np.empty(0, dtype=np.int64)
+        if self.shuffle_mode == "full":
+            indices = np.concatenate(episodes)
+            return indices[torch.randperm(len(indices)).numpy()]
+        blocks = self._blocks(episodes)
+        blocks = [blocks[i] for i in torch.randperm(len(blocks)).tolist()]
+        windows = []
+        for i in range(0, len(blocks), self.window):
+            frames = np.concatenate(blocks[i : i + self.window])
+            windows.append(frames[torch.randperm(len(frames)).numpy()])
+        return np.concatenate(windows)
+
+    def _worker_affine(self) -> np.ndarray:
+        # Deal the (shuffled) episodes to workers, balancing their number of frames
+        order = torch.randperm(len(self.episodes)).tolist()
+        owned = [[] for _ in range(self.num_workers)]
+        sizes = np.zeros(self.num_workers, dtype=np.int64)
+        for ep in order:
+            worker = int(sizes.argmin())
+            owned[worker].append(self.episodes[ep])
+            sizes[worker] += len(self.episodes[ep])
+
+        # Batch i goes to worker i % num_workers, once a worker has no full batch left the others fill
+        # in. Only full batches are dealt: a short one would shift the boundaries of all the next
+        # batches. The last frames of each worker, less than a batch, come at the end of the epoch.
+        streams = [self._shuffled(episodes) for episodes in owned]
+        full_batches = [len(stream) // self.batch_size for stream in streams]
+        taken = [0] * self.num_workers
+        batches = []
+        worker = 0
+        while any(n < full for n, full in zip(taken, full_batches, strict=True)):
+            if taken[worker] >= full_batches[worker]:
+                worker = next(w for w in range(self.num_workers) if taken[w] < full_batches[w])
+            start = taken[worker] * self.batch_size
+            batches.append(streams[worker][start : start + self.batch_size])
+            taken[worker] += 1
+            worker = (worker + 1) % self.num_workers
+        batches += [stream[full * self.batch_size :] for stream, full in zip(streams, full_batches, strict=True)]
+        return np.concatenate(batches)
 
     def __iter__(self) -> Iterator[int]:
-        if self.shuffle:
-            for i in torch.randperm(len(self.indices)):
-                yield self.indices[i]
+        if not self.shuffle:
+            indices = self.indices
+        elif self.num_workers > 0:
+            indices = self._worker_affine()
         else:
-            for i in self.indices:
-                yield i
+            indices = self._shuffled(self.episodes)
+        yield from indices.tolist()
 
     def __len__(self) -> int:
         return len(self.indices)
+
+
+class WeightedDatasetSampler:
+    def __init__(
+        self,
+        samplers: list,
+        offsets: list[int],
+        weights: list[float] | None = None,
+        num_samples: int | None = None,
+        chunk_size: int = 4096,
+    ):
+        """Sampler that interleaves the datasets of a `MultiDoRobotDataset` according to sampling weights.
+
+        Each sample is drawn from dataset i with probability weights[i] / sum(weights), at the next index
+        of that dataset's own sampler (restarted when it runs out), shifted by the dataset's offset. No
+        global index list is built: the datasets are drawn `chunk_size` samples at a time.
+
+        Args:
+            samplers: One sampler (iterable of indices) per dataset, e.g. `EpisodeAwareSampler` or
+                `torch.utils.data.RandomSampler`.
+            offsets: Global index of the first frame of each dataset (`MultiDoRobotDataset.offsets`).
+            weights: Relative probability of drawing from each dataset. Defaults to the lengths of the
+                samplers, i.e. every frame is as likely to be drawn.
+            num_samples: Samples per epoch. Defaults to the total length of the samplers.
+            chunk_size: Dataset choices drawn at once.
+        """
+        if len(samplers) != len(offsets):
+            raise ValueError(f"Got {len(samplers)} samplers for {len(offsets)} datasets.")
+        lengths = [len(sampler) for sampler in samplers]
+        weights = [float(w) for w in (weights if weights is not None else lengths)]
+        if len(weights) != len(samplers):
+            raise ValueError(f"Got {len(weights)} weights for {len(samplers)} datasets.")
+        # Datasets without samples can't be drawn
+        weights = [w if length > 0 else 0.0 for w, length in zip(weights, lengths, strict=True)]
+        if min(weights) < 0 or sum(weights) <= 0:
+            raise ValueError(f"Weights must be non-negative and select a non-empty dataset, got {weights}.")
+
+        self.samplers = samplers
+        self.offsets = offsets
+        self.weights = torch.tensor(weights, dtype=torch.float64)
+        self.num_samples = num_samples if num_samples is not None else sum(lengths)
+        self.chunk_size = chunk_size
+
+    def __iter__(self) -> Iterator[int]:
+        iterators = [iter(sampler) for sampler in self.samplers]
+        remaining = self.num_samples
+        while remaining > 0:
+            choices = torch.multinomial(self.weights, min(self.chunk_size, remaining), replacement=True)
+            for dataset_idx in choices.tolist():
+                idx = next(iterators[dataset_idx], None)
+                if idx is None:
+                    iterators[dataset_idx] = iter(self.samplers[dataset_idx])
+                    idx = next(iterators[dataset_idx])
+                yield self.offsets[dataset_idx] + int(idx)
+            remaining -= len(choices)
+
+    def __len__(self) -> int:
+        return self.num_samples
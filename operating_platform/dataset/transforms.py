@@ -179,6 +179,9 @@ class ImageTransformsConfig:
     # By default, transforms are applied in Torchvision's suggested order (shown below).
     # Set this to True to apply them in a random order.
     random_order: bool = False
+    # Set this to True to apply the transforms to whole batches on the training device (`BatchImageTransforms`)
+    # instead of frame by frame in the dataloader workers. The dataset then returns uint8 frames.
+    on_device: bool = False
     tfs: dict[str, ImageTransformConfig] = field(
         default_factory=lambda: {
             "brightness": ImageTransformConfig(
@@ -250,3 +253,163 @@ class ImageTransforms(Transform):
 
     def forward(self, *inputs: Any) -> Any:
         return self.tf(*inputs)
+
+
+def _color_jitter_range(value, center: float = 1.0, bound: tuple[float, float] = (0.0, float("inf"))):
+    """Sampling range of a ColorJitter parameter, as `v2.ColorJitter` interprets it."""
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        value = [center - float(value), center + float(value)]
+        if center == 1.0:
+            value[0] = max(value[0], 0.0)
+    low, high = (float(v) for v in value)
+    if not bound[0] <= low <= high <= bound[1]:
+        raise ValueError(f"ColorJitter values should be in {bound}, but got {value}.")
+    return None if low == high == center else (low, high)
+
+
+def _blend(images: torch.Tensor, other: torch.Tensor, factor: torch.Tensor) -> torch.Tensor:
+    return (factor * images + (1.0 - factor) * other).clamp_(0.0, 1.0)
+
+
+def _grayscale(images: torch.Tensor) -> torch.Tensor:
+    r, g, b = images.unbind(dim=-3)
+    return (0.2989 * r + 0.587 * g + 0.114 * b).unsqueeze(dim=-3)
+
+
+def _adjust_hue(images: torch.Tensor, hue_factor: torch.Tensor) -> torch.Tensor:
+    # RGB -> HSV, shift the hue by a per-sample factor, HSV -> RGB (same formulas as torchvision)
+    r, g, b = images.unbind(dim=-3)
+    maxc, _ = images.max(dim=-3)
+    minc, _ = images.min(dim=-3)
+    eqc = maxc == minc
+    cr = maxc - minc
+    ones = torch.ones_like(maxc)
+    s = cr / torch.where(eqc, ones, maxc)
+    cr_divisor = torch.where(eqc, ones, cr)
+    rc, gc, bc = (maxc - r) / cr_divisor, (maxc - g) / cr_divisor, (maxc - b) / cr_divisor
+    hr = (maxc == r) * (bc - gc)
+    hg = ((maxc == g) & (maxc != r)) * (2.0 + rc - bc)
+    hb = ((maxc != g) & (maxc != r)) * (4.0 + gc - rc)
+    h = ((hr + hg + hb) / 6.0 + 1.0).fmod(1.0)
+    h = (h + hue_factor.squeeze(-3)).remainder(1.0)
+
+    h6 = h * 6.0
+    i = h6.floor()
+    f = h6 - i
+    i = i.to(torch.int64).remainder_(6)
+    v = maxc
+    p = (v * (1.0 - s)).clamp_(0.0, 1.0)
+    q = (v * (1.0 - s * f)).clamp_(0.0, 1.0)
+    t = (v * (1.0 - s * (1.0 - f))).clamp_(0.0, 1.0)
+    mask = i.unsqueeze(dim=-3) == torch.arange(6, device=i.device).view(-1, 1, 1)
+    a1 = torch.stack((v, q, p, p, t, v), dim=-3)
+    a2 = torch.stack((t, v, v, q, p, p), dim=-3)
+    a3 = torch.stack((p, p, t, v, v, q), dim=-3)
+    a4 = torch.stack((a1, a2, a3), dim=-4)
+    return (a4.mul_(mask.unsqueeze(dim=-4))).sum(dim=-3)
+
+
+def _adjust_sharpness(images: torch.Tensor, factor: torch.Tensor) -> torch.Tensor:
+    # Blend with a smoothed image, borders are kept as is (like F.adjust_sharpness)
+    shape = images.shape
+    flat = images.reshape(-1, 1, *shape[-2:])
+    kernel = torch.ones(1, 1, 3, 3, device=images.device, dtype=images.dtype)
+    kernel[0, 0, 1, 1] = 5.0
+    kernel /= kernel.sum()
+    blurred = torch.nn.functional.conv2d(flat, kernel).clamp_(0.0, 1.0)
+    degenerate = flat.clone()
+    degenerate[..., 1:-1, 1:-1] = blurred
+    return _blend(images, degenerate.reshape(shape), factor)
+
+
+class BatchImageTransforms(torch.nn.Module):
+    """`ImageTransforms` applied to a whole batch at once, on the device the batch is on.
+
+    Configured by the same `ImageTransformsConfig`: every sample gets its own random subset of
+    transforms (same multinomial sampling as `RandomSubsetApply`) and its own random parameters, and
+    the frames of a sample (e.g. a `delta_timestamps` window) share them, like `ImageTransforms` which
+    transforms the frames of a sample in one call. Transforms of a given type are applied to all the
+    samples that drew it in one batched operation.
+
+    Supports the `Identity`, `ColorJitter` and `SharpnessJitter` transforms. The brightness, contrast,
+    saturation and hue of a ColorJitter are applied in that order (v2.ColorJitter picks a random order).
+
+    Input: (B, ..., C, H, W) uint8 frames, or float frames in [0, 1]. Output: float32 in [0, 1].
+    """
+
+    def __init__(self, cfg: ImageTransformsConfig) -> None:
+        super().__init__()
+        self._cfg = cfg
+        self.transforms = []
+        weights = []
+        for tf_name, tf_cfg in cfg.tfs.items():
+            if tf_cfg.weight <= 0.0:
+                continue
+            self.transforms.append(self._make_params_ranges(tf_name, tf_cfg))
+            weights.append(tf_cfg.weight)
+        self.n_subset = min(len(self.transforms), cfg.max_num_transforms)
+        self.enabled = cfg.enable and self.n_subset > 0
+        self.register_buffer("p", torch.tensor(weights, dtype=torch.float32) / max(sum(weights), 1e-12), False)
+
+    @staticmethod
+    def _make_params_ranges(tf_name: str, cfg: ImageTransformConfig) -> dict[str, tuple[float, float]]:
+        if cfg.type == "Identity":
+            return {}
+        if cfg.type == "ColorJitter":
+            kwargs = cfg.kwargs
+            ranges = {
+                "brightness": _color_jitter_range(kwargs.get("brightness")),
+                "contrast": _color_jitter_range(kwargs.get("contrast")),
+                "saturation": _color_jitter_range(kwargs.get("saturation")),
+                "hue": _color_jitter_range(kwargs.get("hue"), center=0.0, bound=(-0.5, 0.5)),
+            }
+            return {name: r for name, r in ranges.items() if r is not None}
+        if cfg.type == "SharpnessJitter":
+            return {"sharpness": SharpnessJitter(**cfg.kwargs).sharpness}
+        raise ValueError(f"Transform '{cfg.type}' ({tf_name}) is not supported by BatchImageTransforms.")
+
+    def _select(self, batch_size: int, device: torch.device) -> torch.Tensor:
+        """(B, n_subset) indices of the transforms applied to each sample, in application order."""
+        selected = torch.multinomial(self.p.to(device).expand(batch_size, -1), self.n_subset)
+        if self._cfg.random_order:
+            return selected
+        return selected.sort(dim=1).values
+
+    def _apply(self, images: torch.Tensor, ranges: dict[str, tuple[float, float]]) -> torch.Tensor:
+        param_shape = (images.shape[0],) + (1,) * (images.ndim - 1)
+
+        def sample(low_high):
+            low, high = low_high
+            return torch.empty(param_shape, device=images.device).uniform_(low, high)
+
+        if "brightness" in ranges:
+            images = (images * sample(ranges["brightness"])).clamp_(0.0, 1.0)
+        if "contrast" in ranges:
+            mean = _grayscale(images).mean(dim=(-3, -2, -1), keepdim=True)
+            images = _blend(images, mean, sample(ranges["contrast"]))
+        if "saturation" in ranges:
+            images = _blend(images, _grayscale(images), sample(ranges["saturation"]))
+        if "hue" in ranges:
+            images = _adjust_hue(images, sample(ranges["hue"]))
+        if "sharpness" in ranges:
+            images = _adjust_sharpness(images, sample(ranges["sharpness"]))
+        return images
+
+    @torch.no_grad()
+    def forward(self, images: torch.Tensor) -> torch.Tensor:
+        if images.dtype == torch.uint8:
+            images = images.float().div_(255)
+        if not (self.enabled and self.training):
+            return images
+        images = images.clone()
+        selected = self._select(images.shape[0], images.device)
+        for slot in range(self.n_subset):
+            for tf_idx, ranges in enumerate(self.transforms):
+                if not ranges:
+                    continue
+                mask = selected[:, slot] == tf_idx
+                if mask.any():
+                    images[mask] = self._apply(images[mask], ranges)
+        return images
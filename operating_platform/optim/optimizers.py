@@ -174,7 +174,12 @@ def save_optimizer_state(
 
 def _save_single_optimizer_state(optimizer: torch.optim.Optimizer, save_dir: Path) -> None:
     """Save a single optimizer's state to disk."""
-    state = optimizer.state_dict()
+    write_optimizer_state_dict(optimizer.state_dict(), save_dir)
+
+
+def write_optimizer_state_dict(state: dict, save_dir: Path) -> None:
+    """Write an optimizer state_dict (e.g. a copy taken earlier) in the format of `save_optimizer_state`."""
+    state = dict(state)
     param_groups = state.pop("param_groups")
     flat_state = flatten_dict(state)
     save_file(flat_state, save_dir / OPTIMIZER_STATE)
@@ -219,52 +219,85 @@ class ACTTemporalEnsembler:
             avg /= exp_weights[: i + 1].sum()
         print("online", avg)
         ```
+
+        The online averages are kept in a ring buffer of `chunk_size` time steps, allocated on the first
+        update and updated in place, instead of concatenating and slicing new tensors at every step.
         """
         self.chunk_size = chunk_size
         self.ensemble_weights = torch.exp(-temporal_ensemble_coeff * torch.arange(chunk_size))
         self.ensemble_weights_cumsum = torch.cumsum(self.ensemble_weights, dim=0)
+        # At step t >= 1 of the episode, the pending action i steps ahead has been averaged over
+        # min(t, chunk_size - 1 - i) chunks. Row min(t, chunk_size - 1) holds, for each i, the weights of its
+        # online update: cumulative weight so far, weight of the new action and new cumulative weight.
+        steps = torch.arange(chunk_size)[:, None]
+        ahead = torch.arange(chunk_size - 1)[None, :]
+        counts = torch.minimum(steps, chunk_size - 1 - ahead).clamp(min=1)
+        self.update_weights = (
+            self.ensemble_weights_cumsum[counts - 1][..., None],
+            self.ensemble_weights[counts][..., None],
+            self.ensemble_weights_cumsum[counts][..., None],
+        )
+        # (batch, chunk_size, action_dim) ring of online averages, the next action is at `self.head`
+        self.ensembled_actions = None
         self.reset()
 
     def reset(self):
         """Resets the online computation variables."""
-        self.ensembled_actions = None
-        # (chunk_size,) count of how many actions are in the ensemble for each time step in the sequence.
-        self.ensembled_actions_count = None
+        self.head = 0
+        self.step = 0
+
+    def _allocate(self, actions: Tensor) -> None:
+        self.ensembled_actions = torch.empty_like(actions)
+        # The products with the weights, in the dtype they are computed in before being added
+        self._products = torch.empty(
+            actions.shape,
+            dtype=torch.result_type(actions, self.ensemble_weights),
+            device=actions.device,
+        )
+        self.update_weights = tuple(weights.to(device=actions.device) for weights in self.update_weights)
 
     def update(self, actions: Tensor) -> Tensor:
         """
         Takes a (batch, chunk_size, action_dim) sequence of actions, update the temporal ensemble for all
         time steps, and pop/return the next batch of actions in the sequence.
         """
-        self.ensemble_weights = self.ensemble_weights.to(device=actions.device)
-        self.ensemble_weights_cumsum = self.ensemble_weights_cumsum.to(device=actions.device)
-        if self.ensembled_actions is None:
-            # Initializes `self._ensembled_action` to the sequence of actions predicted during the first
-            # time step of the episode.
-            self.ensembled_actions = actions.clone()
-            # Note: The last dimension is unsqueeze to make sure we can broadcast properly for tensor
-            # operations later.
-            self.ensembled_actions_count = torch.ones(
-                (self.chunk_size, 1), dtype=torch.long, device=self.ensembled_actions.device
-            )
+        if (
+            self.ensembled_actions is None
+            or self.ensembled_actions.shape != actions.shape
+            or self.ensembled_actions.dtype != actions.dtype
+            or self.ensembled_actions.device != actions.device
+        ):
+            self._allocate(actions)
+            self.reset()
+
+        if self.step == 0:
+            # Initializes the ensemble to the sequence of actions predicted during the first time step of
+            # the episode.
+            self.ensembled_actions.copy_(actions)
         else:
-            # self.ensembled_actions will have shape (batch_size, chunk_size - 1, action_dim). Compute
-            # the online update for those entries.
-            self.ensembled_actions *= self.ensemble_weights_cumsum[self.ensembled_actions_count - 1]
-            self.ensembled_actions += actions[:, :-1] * self.ensemble_weights[self.ensembled_actions_count]
-            self.ensembled_actions /= self.ensemble_weights_cumsum[self.ensembled_actions_count]
-            self.ensembled_actions_count = torch.clamp(self.ensembled_actions_count + 1, max=self.chunk_size)
-            # The last action, which has no prior online average, needs to get concatenated onto the end.
-            self.ensembled_actions = torch.cat([self.ensembled_actions, actions[:, -1:]], dim=1)
-            self.ensembled_actions_count = torch.cat(
-                [self.ensembled_actions_count, torch.ones_like(self.ensembled_actions_count[-1:])]
-            )
-        # "Consume" the first action.
-        action, self.ensembled_actions, self.ensembled_actions_count = (
-            self.ensembled_actions[:, 0],
-            self.ensembled_actions[:, 1:],
-            self.ensembled_actions_count[1:],
-        )
+            # The chunk_size - 1 pending actions start at `self.head`, possibly wrapping around the end of
+            # the ring: update each contiguous part in place.
+            row = min(self.step, self.chunk_size - 1)
+            prev_cumsum, weights, cumsum = (w[row] for w in self.update_weights)
+            pending = self.chunk_size - 1
+            first = min(pending, self.chunk_size - self.head)
+            for slots, ahead in (
+                (slice(self.head, self.head + first), slice(0, first)),
+                (slice(0, pending - first), slice(first, pending)),
+            ):
+                ensembled = self.ensembled_actions[:, slots]
+                products = self._products[:, ahead]
+                ensembled *= prev_cumsum[ahead]
+                torch.mul(actions[:, ahead], weights[ahead], out=products)
+                ensembled += products
+                ensembled /= cumsum[ahead]
+            # The last action, which has no prior online average, takes the slot consumed at the last step.
+            self.ensembled_actions[:, (self.head + pending) % self.chunk_size] = actions[:, -1]
+
+        # "Consume" the first action. It is copied, its slot is reused by the next update.
+        action = self.ensembled_actions[:, self.head].clone()
+        self.head = (self.head + 1) % self.chunk_size
+        self.step += 1
         return action
 
 
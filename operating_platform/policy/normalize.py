@@ -13,6 +13,8 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+from contextlib import contextmanager
+
 import numpy as np
 import torch
 from torch import Tensor, nn
@@ -113,7 +115,107 @@ def _no_stats_error_str(name: str) -> str:
     )
 
 
-class Normalize(nn.Module):
+class _AffineNormalization(nn.Module):
+    """Base of the normalization modules: each normalized key is mapped as `x * scale + offset`.
+
+    The scale and offset of a key are computed from its statistics the first time the key is used, after
+    checking that the statistics were set, and reused until the statistics are loaded again
+    (`load_state_dict`) or moved (`.to()`). Checking the statistics on every call synchronized the device
+    with the host for each key. Statistics modified in place otherwise need a call to `refresh_stats`.
+    """
+
+    # Unnormalize instead of normalize
+    inverse = False
+
+    def __init__(self, features: dict[str, PolicyFeature], norm_map: dict[str, NormalizationMode]):
+        super().__init__()
+        self.features = features
+        self.norm_map = norm_map
+        self._affines: dict[str, tuple[Tensor, Tensor] | None] = {}
+        # Keys the caller already normalized, see `prenormalized`
+        self._prenormalized = frozenset()
+
+    def _stats(self, key: str, norm_mode: NormalizationMode) -> dict[str, Tensor]:
+        """Statistics of `key` ("mean" and "std", or "min" and "max"), from `buffer_{key}` by default."""
+        return dict(getattr(self, "buffer_" + key.replace(".", "_")).items())
+
+    def refresh_stats(self) -> None:
+        """Recompute the scales and offsets from the statistics on the next call."""
+        self._affines = {}
+
+    def _apply(self, *args, **kwargs):
+        self.refresh_stats()
+        return super()._apply(*args, **kwargs)
+
+    def _load_from_state_dict(self, *args, **kwargs):
+        self.refresh_stats()
+        super()._load_from_state_dict(*args, **kwargs)
+
+    def affine(self, key: str) -> tuple[Tensor, Tensor] | None:
+        """(scale, offset) such that (un)normalizing `key` is `x * scale + offset`, None if `key` isn't
+        normalized. Lets callers fold the normalization into their own preprocessing."""
+        if key not in self._affines:
+            self._affines[key] = self._compute_affine(key)
+        return self._affines[key]
+
+    # Regular tensors even when first called in inference mode, the training loop uses them too
+    @torch.inference_mode(False)
+    @torch.no_grad()
+    def _compute_affine(self, key: str) -> tuple[Tensor, Tensor] | None:
+        ft = self.features.get(key)
+        if ft is None:
+            return None
+        norm_mode = self.norm_map.get(ft.type, NormalizationMode.IDENTITY)
+        if norm_mode is NormalizationMode.IDENTITY:
+            return None
+
+        stats = self._stats(key, norm_mode)
+        for name, value in stats.items():
+            assert not torch.isinf(value).any(), _no_stats_error_str(name)
+
+        if norm_mode is NormalizationMode.MEAN_STD:
+            mean, std = stats["mean"], stats["std"]
+            if self.inverse:
+                return std, mean
+            scale = 1 / (std + 1e-8)
+            return scale, -mean * scale
+        if norm_mode is NormalizationMode.MIN_MAX:
+            min, max = stats["min"], stats["max"]
+            if self.inverse:
+                # [-1, 1] back to [min, max]
+                half_range = (max - min) / 2
+                return half_range, min + half_range
+            # [min, max] to [-1, 1]
+            scale = 2 / (max - min + 1e-8)
+            return scale, -min * scale - 1
+        raise ValueError(norm_mode)
+
+    @contextmanager
+    def prenormalized(self, keys):
+        """Leave `keys` of the batches as they are while in this context, for callers that normalized
+        them already (see `affine`)."""
+        previous = self._prenormalized
+        self._prenormalized = frozenset(keys)
+        try:
+            yield
+        finally:
+            self._prenormalized = previous
+
+    def forward(self, batch: dict[str, Tensor]) -> dict[str, Tensor]:
+        batch = dict(batch)  # shallow copy avoids mutating the input batch
+        for key in self.features:
+            if key not in batch or key in self._prenormalized:
+                # FIXME(aliberts, rcadene): This might lead to silent fail!
+                continue
+            affine = self.affine(key)
+            if affine is None:
+                continue
+            scale, offset = affine
+            batch[key] = torch.addcmul(offset, batch[key], scale)
+        return batch
+
+
+class Normalize(_AffineNormalization):
     """Normalizes data (e.g. "observation.image") for more stable and faster convergence during training."""
 
     def __init__(
@@ -140,9 +242,7 @@ class Normalize(nn.Module):
                 overwritten by a call to `policy.load_state_dict(state_dict)`. That way, initializing the
                 dataset is not needed to get the stats, since they are already in the policy state_dict.
         """
-        super().__init__()
-        self.features = features
-        self.norm_map = norm_map
+        super().__init__(features, norm_map)
         self.stats = stats
         stats_buffers = create_stats_buffers(features, norm_map, stats)
         for key, buffer in stats_buffers.items():
@@ -151,45 +251,17 @@ class Normalize(nn.Module):
     # TODO(rcadene): should we remove torch.no_grad?
     @torch.no_grad()
     def forward(self, batch: dict[str, Tensor]) -> dict[str, Tensor]:
-        # TODO: Remove this shallow copy
-        batch = dict(batch)  # shallow copy avoids mutating the input batch
-        for key, ft in self.features.items():
-            if key not in batch:
-                # FIXME(aliberts, rcadene): This might lead to silent fail!
-                continue
-
-            norm_mode = self.norm_map.get(ft.type, NormalizationMode.IDENTITY)
-            if norm_mode is NormalizationMode.IDENTITY:
-                continue
-
-            buffer = getattr(self, "buffer_" + key.replace(".", "_"))
-
-            if norm_mode is NormalizationMode.MEAN_STD:
-                mean = buffer["mean"]
-                std = buffer["std"]
-                assert not torch.isinf(mean).any(), _no_stats_error_str("mean")
-                assert not torch.isinf(std).any(), _no_stats_error_str("std")
-                batch[key] = (batch[key] - mean) / (std + 1e-8)
-            elif norm_mode is NormalizationMode.MIN_MAX:
-                min = buffer["min"]
-                max = buffer["max"]
-                assert not torch.isinf(min).any(), _no_stats_error_str("min")
-                assert not torch.isinf(max).any(), _no_stats_error_str("max")
-                # normalize to [0,1]
-                batch[key] = (batch[key] - min) / (max - min + 1e-8)
-                # normalize to [-1, 1]
-                batch[key] = batch[key] * 2 - 1
-            else:
-                raise ValueError(norm_mode)
-        return batch
+        return super().forward(batch)
 
 
-class Unnormalize(nn.Module):
+class Unnormalize(_AffineNormalization):
     """
     Similar to `Normalize` but unnormalizes output data (e.g. `{"action": torch.randn(b,c)}`) in their
     original range used by the environment.
     """
 
+    inverse = True
+
     def __init__(
         self,
         features: dict[str, PolicyFeature],
@@ -214,9 +286,7 @@ class Unnormalize(nn.Module):
                 overwritten by a call to `policy.load_state_dict(state_dict)`. That way, initializing the
                 dataset is not needed to get the stats, since they are already in the policy state_dict.
         """
-        super().__init__()
-        self.features = features
-        self.norm_map = norm_map
+        super().__init__(features, norm_map)
         self.stats = stats
         # `self.buffer_observation_state["mean"]` contains `torch.tensor(state_dim)`
         stats_buffers = create_stats_buffers(features, norm_map, stats)
@@ -226,33 +296,7 @@ class Unnormalize(nn.Module):
     # TODO(rcadene): should we remove torch.no_grad?
     @torch.no_grad()
     def forward(self, batch: dict[str, Tensor]) -> dict[str, Tensor]:
-        batch = dict(batch)  # shallow copy avoids mutating the input batch
-        for key, ft in self.features.items():
-            if key not in batch:
-                continue
-
-            norm_mode = self.norm_map.get(ft.type, NormalizationMode.IDENTITY)
-            if norm_mode is NormalizationMode.IDENTITY:
-                continue
-
-            buffer = getattr(self, "buffer_" + key.replace(".", "_"))
-
-            if norm_mode is NormalizationMode.MEAN_STD:
-                mean = buffer["mean"]
-                std = buffer["std"]
-                assert not torch.isinf(mean).any(), _no_stats_error_str("mean")
-                assert not torch.isinf(std).any(), _no_stats_error_str("std")
-                batch[key] = batch[key] * std + mean
-            elif norm_mode is NormalizationMode.MIN_MAX:
-                min = buffer["min"]
-                max = buffer["max"]
-                assert not torch.isinf(min).any(), _no_stats_error_str("min")
-                assert not torch.isinf(max).any(), _no_stats_error_str("max")
-                batch[key] = (batch[key] + 1) / 2
-                batch[key] = batch[key] * (max - min) + min
-            else:
-                raise ValueError(norm_mode)
-        return batch
+        return super().forward(batch)
 
 
 # TODO (azouitine): We should replace all normalization on the policies with register_buffer normalization
@@ -322,7 +366,7 @@ def _initialize_stats_buffers(
         raise ValueError(norm_mode)
 
 
-class NormalizeBuffer(nn.Module):
+class NormalizeBuffer(_AffineNormalization):
     """Same as `Normalize` but statistics are stored as registered buffers rather than parameters."""
 
     def __init__(
@@ -331,90 +375,32 @@ class NormalizeBuffer(nn.Module):
         norm_map: dict[str, NormalizationMode],
         stats: dict[str, dict[str, Tensor]] | None = None,
     ):
-        super().__init__()
-        self.features = features
-        self.norm_map = norm_map
+        super().__init__(features, norm_map)
 
         _initialize_stats_buffers(self, features, norm_map, stats)
 
-    def forward(self, batch: dict[str, Tensor]) -> dict[str, Tensor]:
-        batch = dict(batch)
-        for key, ft in self.features.items():
-            if key not in batch:
-                continue
-
-            norm_mode = self.norm_map.get(ft.type, NormalizationMode.IDENTITY)
-            if norm_mode is NormalizationMode.IDENTITY:
-                continue
-
-            prefix = key.replace(".", "_")
-
-            if norm_mode is NormalizationMode.MEAN_STD:
-                mean = getattr(self, f"{prefix}_mean")
-                std = getattr(self, f"{prefix}_std")
-                assert not torch.isinf(mean).any(), _no_stats_error_str("mean")
-                assert not torch.isinf(std).any(), _no_stats_error_str("std")
-                batch[key] = (batch[key] - mean) / (std + 1e-8)
-                continue
-
-            if norm_mode is NormalizationMode.MIN_MAX:
-                min_val = getattr(self, f"{prefix}_min")
-                max_val = getattr(self, f"{prefix}_max")
-                assert not torch.isinf(min_val).any(), _no_stats_error_str("min")
-                assert not torch.isinf(max_val).any(), _no_stats_error_str("max")
-                batch[key] = (batch[key] - min_val) / (max_val - min_val + 1e-8)
-                batch[key] = batch[key] * 2 - 1
-                continue
-
-            raise ValueError(norm_mode)
-
-        return batch
+    def _stats(self, key: str, norm_mode: NormalizationMode) -> dict[str, Tensor]:
+        prefix = key.replace(".", "_")
+        names = ("mean", "std") if norm_mode is NormalizationMode.MEAN_STD else ("min", "max")
+        return {name: getattr(self, f"{prefix}_{name}") for name in names}
 
 
-class UnnormalizeBuffer(nn.Module):
+class UnnormalizeBuffer(_AffineNormalization):
     """Inverse operation of `NormalizeBuffer`. Uses registered buffers for statistics."""
 
+    inverse = True
+
     def __init__(
         self,
         features: dict[str, PolicyFeature],
         norm_map: dict[str, NormalizationMode],
         stats: dict[str, dict[str, Tensor]] | None = None,
     ):
-        super().__init__()
-        self.features = features
-        self.norm_map = norm_map
+        super().__init__(features, norm_map)
 
         _initialize_stats_buffers(self, features, norm_map, stats)
 
-    def forward(self, batch: dict[str, Tensor]) -> dict[str, Tensor]:
-        # batch = dict(batch)
-        for key, ft in self.features.items():
-            if key not in batch:
-                continue
-
-            norm_mode = self.norm_map.get(ft.type, NormalizationMode.IDENTITY)
-            if norm_mode is NormalizationMode.IDENTITY:
-                continue
-
-            prefix = key.replace(".", "_")
-
-            if norm_mode is NormalizationMode.MEAN_STD:
-                mean = getattr(self, f"{prefix}_mean")
-                std = getattr(self, f"{prefix}_std")
-                assert not torch.isinf(mean).any(), _no_stats_error_str("mean")
-                assert not torch.isinf(std).any(), _no_stats_error_str("std")
-                batch[key] = batch[key] * std + mean
-                continue
-
-            if norm_mode is NormalizationMode.MIN_MAX:
-                min_val = getattr(self, f"{prefix}_min")
-                max_val = getattr(self, f"{prefix}_max")
-                assert not torch.isinf(min_val).any(), _no_stats_error_str("min")
-                assert not torch.isinf(max_val).any(), _no_stats_error_str("max")
-                batch[key] = (batch[key] + 1) / 2
-                batch[key] = batch[key] * (max_val - min_val) + min_val
-                continue
-
-            raise ValueError(norm_mode)
-
-        return batch
+    def _stats(self, key: str, norm_mode: NormalizationMode) -> dict[str, Tensor]:
+        prefix = key.replace(".", "_")
+        names = ("mean", "std") if norm_mode is NormalizationMode.MEAN_STD else ("min", "max")
+        return {name: getattr(self, f"{prefix}_{name}") for name in names}
@@ -26,6 +26,8 @@ from operating_platform.robot.robots.configs import PiperV1RobotConfig
 from operating_platform.config.cameras import CameraConfig, OpenCVCameraConfig
 
 from operating_platform.robot.robots.camera import Camera
+from operating_platform.robot.robots.shm_frame_ring import FrameRingPool
+from operating_platform.robot.robots.stream_sync import StreamHistory, align_sample
 
 
 ipc_address_image = "ipc:///tmp/dora-zeromq-piper-image"
@@ -33,8 +35,16 @@ ipc_address_joint = "ipc:///tmp/dora-zeromq-piper-joint"
 
 recv_images = {}
 recv_joint = {}
+# Timestamped per-stream history (event_id -> StreamHistory) for synchronized recording
+recv_history = {}
+# Cameras delivered through shared memory rings by dora_zeromq.py (event_id -> FrameRingReader)
+frame_rings = FrameRingPool()
 lock = threading.Lock()  # 线程锁
 
+# History lengths: ~2s of joint samples, ~250ms of camera frames at 30 Hz
+JOINT_HISTORY_LEN = 64
+IMAGE_HISTORY_LEN = 8
+
 running_recv_image_server = True
 running_recv_joint_server = True
 
@@ -108,6 +118,14 @@ def piper_zmq_send(event_id, buffer, wait_time_s):
         pass
     time.sleep(wait_time_s)
 
+def record_sample(event_id, value, maxlen, timestamp_ns=None, seq=None):
+    """Append a received sample to the history of its stream."""
+    history = recv_history.get(event_id)
+    if history is None:
+        history = recv_history.setdefault(event_id, StreamHistory(maxlen=maxlen))
+    history.append(value, timestamp_ns=timestamp_ns, seq=seq)
+
+
 def recv_image_server():
     """接收数据线程"""
     global _image_connected
@@ -117,6 +135,7 @@ def recv_image_server():
             continue
         try:
             message_parts = socket_image.recv_multipart()
+            receive_ns = time.monotonic_ns()
             if len(message_parts) < 2:
                 continue  # 协议错误
 
@@ -129,7 +148,18 @@ def recv_image_server():
                 _image_connected = True
                 print("[PiperV1] Camera data stream connected")
 
-            if 'image' in event_id:
+            if 'image' in event_id and "shm_name" in metadata:
+                # Frame already sits in shared memory as RGB, keep a zero-copy view
+                reader = frame_rings.attach(event_id, metadata["shm_name"])
+                seq = metadata["shm_seq"]
+                frame = reader.view(seq)
+                if frame is not None:
+                    with lock:
+                        recv_images[event_id] = frame
+                    # Capture time stamped by the bridge when it wrote the slot
+                    record_sample(event_id, frame, IMAGE_HISTORY_LEN, reader.timestamp_ns(seq), seq)
+
+            elif 'image' in event_id:
                 # 解码图像
                 img_array = np.frombuffer(buffer_bytes, dtype=np.uint8)
                 encoding = metadata["encoding"].lower()
@@ -157,6 +187,7 @@ def recv_image_server():
                     with lock:
                         # print(f"Received event_id = {event_id}")
                         recv_images[event_id] = frame
+                    record_sample(event_id, frame, IMAGE_HISTORY_LEN, receive_ns)
 
         except zmq.Again:
             # Timeout waiting for data, silently continue
@@ -166,6 +197,45 @@ def recv_image_server():
             break
 
 
+def read_aligned_image(name, timestamp_ns, mode):
+    """
+    Frame of a camera aligned to `timestamp_ns`, owned by the caller.
+
+    Returns `(frame, skew_ns)`, skew being the capture time of the frame minus the tick.
+    """
+    history = recv_history.get(name)
+    if history is None or len(history) == 0:
+        return read_image(name), 0
+    frame, seq, skew_ns = align_sample(history, timestamp_ns, mode)
+    reader = frame_rings.get(name)
+    if reader is not None:
+        result = reader.read(seq)
+        if result is None:
+            # The bridge already reused that slot, take the newest frame instead
+            result = reader.read()
+        if result is not None:
+            return result[2], result[1] - timestamp_ns
+    return (frame.copy() if not frame.flags.writeable else frame), skew_ns
+
+
+def read_image(name):
+    """
+    Latest frame of a camera, owned by the caller.
+
+    Frames received over ZeroMQ are fresh arrays and are returned as-is. Frames in a shared
+    memory ring are copied exactly once here: the dataset image writer keeps them queued
+    long after the bridge has reused the slot.
+    """
+    reader = frame_rings.get(name)
+    if reader is not None:
+        result = reader.read()
+        if result is not None:
+            return result[2]
+    with lock:
+        frame = recv_images[name]
+    return frame.copy() if not frame.flags.writeable else frame
+
+
 def recv_joint_server():
     """接收数据线程"""
     global _joint_connected
@@ -175,6 +245,7 @@ def recv_joint_server():
             continue
         try:
             message_parts = socket_joint.recv_multipart()
+            receive_ns = time.monotonic_ns()
             if len(message_parts) < 2:
                 continue  # 协议错误
 
@@ -192,6 +263,7 @@ def recv_joint_server():
                     # print(f"Received pose data for event_id: {event_id}")
                     with lock:
                         recv_joint[event_id] = joint_array
+                    record_sample(event_id, joint_array, JOINT_HISTORY_LEN, receive_ns)
 
         except zmq.Again:
             # Timeout waiting for data, silently continue
@@ -488,26 +560,72 @@ class PiperV1Manipulator:
         if not record_data:
             return
 
+        images = {}
+        for name in self.cameras:
+            now = time.perf_counter()
+            images[name] = read_image(name)
+            self.logs[f"read_camera_{name}_dt_s"] = time.perf_counter() - now
+
+        return self._build_step(recv_joint, images)
+
+    def synced_step(
+        self, timestamp_ns: int, mode: str = "nearest",
+    ) -> tuple[dict[str, Any], dict[str, Any], dict[str, float]]:
+        """
+        Like `teleop_step(record_data=True)`, but every stream is aligned to `timestamp_ns`
+        (a `time.monotonic_ns()` tick) using its timestamped history instead of taking the
+        latest value. Returns `(obs_dict, action_dict, skew_ms)` where `skew_ms` maps each
+        stream to the capture time of the value used minus the tick, in milliseconds.
+        """
+        if not self.is_connected:
+            raise RobotDeviceNotConnectedError(
+                "PiperV1 is not connected. You need to run `robot.connect()`."
+            )
+
+        skew_ms = {}
+        joints = {}
+        for event_id, history in list(recv_history.items()):
+            if "joint" not in event_id:
+                continue
+            aligned = align_sample(history, timestamp_ns, mode)
+            if aligned is not None:
+                joints[event_id] = aligned[0]
+                skew_ms[event_id] = aligned[2] / 1e6
+
+        images = {}
+        for name in self.cameras:
+            now = time.perf_counter()
+            images[name], skew_ns = read_aligned_image(name, timestamp_ns, mode)
+            skew_ms[name] = skew_ns / 1e6
+            self.logs[f"read_camera_{name}_dt_s"] = time.perf_counter() - now
+
+        obs_dict, action_dict = self._build_step(joints, images)
+        return obs_dict, action_dict, skew_ms
+
+    def _build_step(
+        self, joints: dict[str, np.ndarray], images: dict[str, np.ndarray],
+    ) -> tuple[dict[str, Any], dict[str, Any]]:
+        """Map raw joint arrays (keyed by event_id) and camera frames to observation/action dicts."""
         follower_joint = {}
         for name in self.follower_arms:
-            for match_name in recv_joint:
+            for match_name in joints:
                 if name in match_name:
                     now = time.perf_counter()
                     # Piper has 7 values: 6 joints + 1 gripper
                     byte_array = np.zeros(7, dtype=np.float32)
-                    pose_read = recv_joint[match_name]
+                    pose_read = joints[match_name]
                     byte_array[:7] = pose_read[:7]
                     byte_array = np.round(byte_array, 4)
                     follower_joint[name] = byte_array
                     self.logs[f"read_follower_{name}_joint_dt_s"] = time.perf_counter() - now
-                    
+
         leader_joint = {}
         for name in self.leader_arms:
-            for match_name in recv_joint:
+            for match_name in joints:
                 if name in match_name:
                     now = time.perf_counter()
                     byte_array = np.zeros(7, dtype=np.float32)
-                    pose_read = recv_joint[match_name]
+                    pose_read = joints[match_name]
                     byte_array[:7] = pose_read[:7]
                     byte_array = np.round(byte_array, 4)
                     leader_joint[name] = byte_array
@@ -531,9 +649,7 @@ class PiperV1Manipulator:
                         action_dict[f"{name}_{motor}.pos"] = leader_joint[name][idx]
 
         for name in self.cameras:
-            now = time.perf_counter()
-            obs_dict[f"{name}"] = recv_images[name]
-            self.logs[f"read_camera_{name}_dt_s"] = time.perf_counter() - now
+            obs_dict[f"{name}"] = images[name]
 
         return obs_dict, action_dict
 
@@ -557,7 +673,7 @@ class PiperV1Manipulator:
         # Fetch current images
         for name in self.cameras:
             if name in recv_images:
-                obs_dict[f"{name}"] = recv_images[name]
+                obs_dict[f"{name}"] = read_image(name)
         
         return obs_dict
 
@@ -611,6 +727,8 @@ class PiperV1Manipulator:
 
         recv_images.clear()
         recv_joint.clear()
+        recv_history.clear()
+        frame_rings.close()
 
         print("[PiperV1] Robot disconnected")
 
@@ -0,0 +1,277 @@
+"""
+Shared-memory frame ring for passing camera frames between processes.
+
+The dora bridge (`dora_zeromq.py`) writes each raw camera frame once into a
+slot of a per-camera ring living in `/dev/shm`, and only sends a small
+notification (ring name + sequence number) over the existing ZeroMQ image
+socket. The manipulator attaches to the ring and reads frames straight out of
+shared memory instead of receiving megabyte payloads through ZeroMQ.
+
+Layout of a ring (all integers little-endian):
+
+    header (64 bytes): magic u32, version u32, slot_count u32, height u32,
+                       width u32, channels u32, slot_stride u64, last_seq u64
+    slot i:            seq u64, timestamp_ns u64, <padding to 64 bytes>,
+                       height*width*channels bytes of uint8 pixels
+
+A slot whose `seq` is 0 is being written. Readers check the slot `seq`
+before and after copying to detect that the writer lapped them.
+"""
+
+import os
+import threading
+import time
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+RING_MAGIC = 0x52464F44  # "DOFR"
+RING_VERSION = 1
+
+HEADER_SIZE = 64
+SLOT_HEADER_SIZE = 64
+
+DEFAULT_SLOT_COUNT = int(os.getenv("DOROBOT_SHM_SLOTS", "4"))
+
+# Set DOROBOT_SHM_FRAMES=0 to force the legacy ZeroMQ payload path
+SHM_FRAMES_ENABLED = os.getenv("DOROBOT_SHM_FRAMES", "1") != "0"
+
+# Rings created by the writers of this process. Held with the lock while creating or attaching.
+_created_rings: set[str] = set()
+_created_rings_lock = threading.Lock()
+
+
+def _attach_untracked(name: str) -> shared_memory.SharedMemory:
+    """Attach to an existing segment without leaving it registered with the resource tracker, which
+    would unlink it when this process exits even though the bridge owns it."""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        pass
+    # Python < 3.13 has no `track`: drop the registration of this segment once attached. The tracker
+    # keeps one registration per name, so a ring created by a writer of this process keeps it, for
+    # the writer's `unlink` to remove.
+    with _created_rings_lock:
+        shm = shared_memory.SharedMemory(name=name)
+        if name not in _created_rings:
+            resource_tracker.unregister(shm._name, "shared_memory")
+    return shm
+
+
+def ring_nbytes(height: int, width: int, channels: int, slot_count: int) -> int:
+    """Total size in bytes of a ring with the given geometry."""
+    return HEADER_SIZE + slot_count * _slot_stride(height, width, channels)
+
+
+def ring_name(prefix: str, event_id: str, height: int, width: int) -> str:
+    """Shared memory name of a camera ring. The shape is part of the name so a resolution change
+    creates a new ring that readers re-attach to."""
+    return f"{prefix}-{event_id}-{width}x{height}"
+
+
+def shm_available_bytes() -> int | None:
+    """Free bytes in /dev/shm, or None if it cannot be determined."""
+    try:
+        st = os.statvfs("/dev/shm")
+    except (OSError, AttributeError):
+        return None
+    return st.f_bavail * st.f_frsize
+
+
+def _slot_stride(height: int, width: int, channels: int) -> int:
+    frame_nbytes = height * width * channels
+    # Keep every slot 64-byte aligned
+    return SLOT_HEADER_SIZE + (frame_nbytes + 63) // 64 * 64
+
+
+class _FrameRing:
+    def __init__(self, shm: shared_memory.SharedMemory, slot_count: int, height: int, width: int, channels: int):
+        self.shm = shm
+        self.name = shm.name
+        self.slot_count = slot_count
+        self.height = height
+        self.width = width
+        self.channels = channels
+        self.slot_stride = _slot_stride(height, width, channels)
+
+        buf = shm.buf
+        self._header = np.ndarray((8,), dtype=np.uint32, buffer=buf, offset=0)
+        self._last_seq = np.ndarray((1,), dtype=np.uint64, buffer=buf, offset=32)
+        self._slot_meta = np.ndarray(
+            (slot_count, 2), dtype=np.uint64, buffer=buf, offset=HEADER_SIZE, strides=(self.slot_stride, 8)
+        )
+        self._frames = np.ndarray(
+            (slot_count, height, width, channels),
+            dtype=np.uint8,
+            buffer=buf,
+            offset=HEADER_SIZE + SLOT_HEADER_SIZE,
+            strides=(self.slot_stride, width * channels, channels, 1),
+        )
+
+    @property
+    def frame_shape(self) -> tuple[int, int, int]:
+        return (self.height, self.width, self.channels)
+
+    @property
+    def last_seq(self) -> int:
+        return int(self._last_seq[0])
+
+    def close(self) -> None:
+        # Drop our numpy views first, otherwise the mmap can't be released
+        self._header = self._last_seq = self._slot_meta = self._frames = None
+        try:
+            self.shm.close()
+        except BufferError:
+            # A caller still holds a zero-copy view; the mapping is released when it is collected
+            pass
+
+
+class FrameRingWriter(_FrameRing):
+    """Producer side of a frame ring. Only one writer per ring is supported."""
+
+    def __init__(self, name: str, height: int, width: int, channels: int = 3, slot_count: int = DEFAULT_SLOT_COUNT):
+        if slot_count < 2:
+            raise ValueError(f"A frame ring needs at least 2 slots, got {slot_count}.")
+
+        nbytes = ring_nbytes(height, width, channels, slot_count)
+        available = shm_available_bytes()
+        if available is not None and available < nbytes:
+            # Writing past the tmpfs limit raises SIGBUS instead of an exception, so refuse early
+            raise MemoryError(f"Not enough space in /dev/shm for ring '{name}': need {nbytes}, have {available}.")
+
+        # Remove a stale ring left behind by a crashed bridge
+        try:
+            stale = shared_memory.SharedMemory(name=name)
+            stale.close()
+            stale.unlink()
+        except FileNotFoundError:
+            pass
+
+        with _created_rings_lock:
+            shm = shared_memory.SharedMemory(name=name, create=True, size=nbytes)
+            _created_rings.add(name)
+        super().__init__(shm, slot_count, height, width, channels)
+
+        self._header[:6] = (RING_MAGIC, RING_VERSION, slot_count, height, width, channels)
+        self._header[6:8] = np.array([self.slot_stride], dtype=np.uint64).view(np.uint32)
+        self._slot_meta[:] = 0
+        self._last_seq[0] = 0
+        self._next_seq = 1
+
+    def begin_write(self) -> tuple[int, np.ndarray]:
+        """Reserve the next slot. Returns its sequence number and a writable view of its pixels.
+        The caller fills the view (e.g. with `cv2.cvtColor(..., dst=view)`) and then calls `commit`."""
+        seq = self._next_seq
+        self._slot_meta[seq % self.slot_count, 0] = 0
+        return seq, self._frames[seq % self.slot_count]
+
+    def commit(self, seq: int, timestamp_ns: int | None = None) -> None:
+        """Publish a slot previously reserved with `begin_write`."""
+        slot = seq % self.slot_count
+        self._slot_meta[slot, 1] = time.monotonic_ns() if timestamp_ns is None else timestamp_ns
+        self._slot_meta[slot, 0] = seq
+        self._last_seq[0] = seq
+        self._next_seq = seq + 1
+
+    def write(self, frame: np.ndarray, timestamp_ns: int | None = None) -> int:
+        """Copy a HxWxC uint8 frame into the ring and publish it."""
+        seq, view = self.begin_write()
+        np.copyto(view, frame.reshape(view.shape), casting="no")
+        self.commit(seq, timestamp_ns)
+        return seq
+
+    def unlink(self) -> None:
+        self.close()
+        with _created_rings_lock:
+            _created_rings.discard(self.name)
+            try:
+                self.shm.unlink()
+            except FileNotFoundError:
+                pass
+
+
+class FrameRingReader(_FrameRing):
+    """Consumer side of a frame ring. Any number of readers can attach to the same ring."""
+
+    def __init__(self, name: str):
+        shm = _attach_untracked(name)
+
+        header = np.ndarray((8,), dtype=np.uint32, buffer=shm.buf, offset=0)
+        if header[0] != RING_MAGIC or header[1] != RING_VERSION:
+            shm.close()
+            raise ValueError(f"'{name}' is not a version {RING_VERSION} frame ring.")
+        slot_count, height, width, channels = (int(v) for v in header[2:6])
+        del header
+
+        super().__init__(shm, slot_count, height, width, channels)
+        self._frames.flags.writeable = False
+
+    def is_valid(self, seq: int) -> bool:
+        """True while the slot holding `seq` has not been reused by the writer."""
+        return seq > 0 and int(self._slot_meta[seq % self.slot_count, 0]) == seq
+
+    def timestamp_ns(self, seq: int) -> int | None:
+        """Capture timestamp (monotonic clock) of a frame, or None if it was overwritten."""
+        ts = int(self._slot_meta[seq % self.slot_count, 1])
+        return ts if self.is_valid(seq) else None
+
+    def view(self, seq: int | None = None) -> np.ndarray | None:
+        """Zero-copy, read-only view of a frame (latest if `seq` is None).
+
+        The view aliases shared memory: it stays valid only until the writer wraps around the
+        ring. Check `is_valid(seq)` after using it, or use `read` to get a private copy.
+        """
+        seq = self.last_seq if seq is None else seq
+        if not self.is_valid(seq):
+            return None
+        return self._frames[seq % self.slot_count]
+
+    def read(self, seq: int | None = None, out: np.ndarray | None = None) -> tuple[int, int, np.ndarray] | None:
+        """Copy a frame (latest if `seq` is None) out of the ring.
+
+        Returns `(seq, timestamp_ns, frame)`, or None if the requested frame was overwritten
+        before or during the copy.
+        """
+        for _ in range(3):
+            target = self.last_seq if seq is None else seq
+            if not self.is_valid(target):
+                if seq is not None:
+                    return None
+                continue
+            slot = target % self.slot_count
+            timestamp_ns = int(self._slot_meta[slot, 1])
+            frame = np.empty(self.frame_shape, dtype=np.uint8) if out is None else out
+            np.copyto(frame, self._frames[slot])
+            if self.is_valid(target):
+                return target, timestamp_ns, frame
+            if seq is not None:
+                return None
+        return None
+
+
+class FrameRingPool:
+    """Keeps one reader per camera and re-attaches when the bridge announces a new ring."""
+
+    def __init__(self):
+        self._readers: dict[str, FrameRingReader] = {}
+
+    def attach(self, key: str, name: str) -> FrameRingReader:
+        reader = self._readers.get(key)
+        if reader is not None and reader.name == name:
+            return reader
+        if reader is not None:
+            reader.close()
+        reader = FrameRingReader(name)
+        self._readers[key] = reader
+        return reader
+
+    def get(self, key: str) -> FrameRingReader | None:
+        return self._readers.get(key)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._readers
+
+    def close(self) -> None:
+        for reader in self._readers.values():
+            reader.close()
+        self._readers.clear()
@@ -9,11 +9,22 @@ import numpy as np
 import queue
 import json
 
+try:
+    import cv2
+    from operating_platform.robot.robots.shm_frame_ring import (
+        SHM_FRAMES_ENABLED,
+        FrameRingWriter,
+        ring_name,
+    )
+except ImportError:
+    SHM_FRAMES_ENABLED = False
+
 
 def cleanup_zmq():
     """Clean up ZeroMQ sockets and context on exit."""
     global running_server, socket_image, socket_joint, context
     running_server = False
+    cleanup_frame_rings()
     try:
         socket_image.close()
         socket_joint.close()
@@ -34,6 +45,10 @@ def signal_handler(signum, frame):
 ipc_address_image = "ipc:///tmp/dora-zeromq-so101-image"
 ipc_address_joint = "ipc:///tmp/dora-zeromq-so101-joint"
 
+# Shared memory frame rings, one per camera event_id
+shm_prefix = "dorobot-so101"
+frame_rings = {}
+
 context = zmq.Context()
 
 socket_image = context.socket(zmq.PAIR)
@@ -54,6 +69,55 @@ socket_joint.setsockopt(zmq.LINGER, 0)
 
 running_server = True
 
+def cleanup_frame_rings():
+    """Unlink all shared memory frame rings created by this bridge."""
+    for ring in frame_rings.values():
+        if ring is not None:
+            ring.unlink()
+    frame_rings.clear()
+
+
+def write_frame_ring(event_id, event):
+    """
+    Write a raw camera frame into its shared memory ring.
+
+    Returns the notification metadata to send instead of the pixel payload, or None when
+    the frame has to go through ZeroMQ (compressed encoding, shm disabled or unavailable).
+    """
+    metadata = event["metadata"]
+    encoding = metadata.get("encoding", "").lower()
+    if not SHM_FRAMES_ENABLED or encoding not in ("bgr8", "rgb8"):
+        return None
+
+    height, width = metadata["height"], metadata["width"]
+    name = ring_name(shm_prefix, event_id, height, width)
+    ring = frame_rings.get(event_id)
+    if ring is None or ring.name != name:
+        if ring is not None:
+            ring.unlink()
+        try:
+            ring = FrameRingWriter(name, height, width, 3)
+            print(f"[dora_zeromq] Created frame ring {name}")
+        except (OSError, MemoryError) as e:
+            # Remember the failure so we don't retry on every frame
+            print(f"[dora_zeromq] Frame ring unavailable for {event_id}, using ZeroMQ payloads: {e}")
+            ring = None
+        frame_rings[event_id] = ring
+    if ring is None:
+        return None
+
+    frame = event["value"].to_numpy(zero_copy_only=False).reshape((height, width, 3))
+    seq, slot = ring.begin_write()
+    # Store frames as RGB so the reader does not need any color conversion
+    if encoding == "bgr8":
+        cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=slot)
+    else:
+        np.copyto(slot, frame)
+    ring.commit(seq)
+
+    return {**metadata, "encoding": "rgb8", "shm_name": ring.name, "shm_seq": seq}
+
+
 # 创建线程安全队列 (在全局作用域)
 output_queue = queue.Queue()
 
@@ -105,6 +169,21 @@ if __name__ == "__main__":
 
             if event["type"] == "INPUT":
                 event_id = event["id"]
+
+                if "image" in event_id:
+                    shm_metadata = write_frame_ring(event_id, event)
+                    if shm_metadata is not None:
+                        # Frame is in shared memory, only send a small notification
+                        try:
+                            socket_image.send_multipart([
+                                event_id.encode('utf-8'),
+                                b"",
+                                json.dumps(shm_metadata).encode('utf-8'),
+                            ], flags=zmq.NOBLOCK)
+                        except zmq.Again:
+                            pass
+                        continue
+
                 buffer_bytes = event["value"].to_numpy().tobytes()
                 meta_bytes = json.dumps(event["metadata"]).encode('utf-8')
                             
@@ -138,6 +217,8 @@ if __name__ == "__main__":
         running_server = False
         server_thread.join()
 
+        cleanup_frame_rings()
+
         # Close zmq
         socket_image.close()
         socket_joint.close()
@@ -0,0 +1,124 @@
+"""
+Timestamped sample history and stream alignment for the recording path.
+
+Every sample received from the dora bridge (ZeroMQ / shared memory) or from Zenoh
+is tagged with a monotonic capture time (`time.monotonic_ns()`, which is shared by all
+processes on the host) and a per-stream sequence number, and kept in a short
+`StreamHistory`. At each recording tick the manipulator uses `align_sample` to pick,
+for every stream, the value closest to the tick instead of whatever arrived last.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+
+# Sync modes accepted by `align_sample`.
+#   latest:  newest sample, regardless of its time (legacy behaviour)
+#   nearest: sample whose capture time is closest to the tick
+#   linear:  linear interpolation between the two samples around the tick (numeric streams only,
+#            other streams fall back to nearest)
+SYNC_MODES = ("latest", "nearest", "linear")
+
+
+@dataclass
+class StampedSample:
+    value: Any
+    timestamp_ns: int
+    seq: int
+
+
+class StreamHistory:
+    """Bounded, thread-safe history of the last `maxlen` samples of one stream, ordered by capture time."""
+
+    def __init__(self, maxlen: int = 64):
+        self._samples: deque[StampedSample] = deque(maxlen=maxlen)
+        self._lock = threading.Lock()
+        self._next_seq = 0
+
+    def append(self, value: Any, timestamp_ns: int | None = None, seq: int | None = None) -> StampedSample:
+        """Add a sample. Without an explicit timestamp the receive time is used; without an explicit
+        sequence number a per-stream counter is used."""
+        if timestamp_ns is None:
+            timestamp_ns = time.monotonic_ns()
+        with self._lock:
+            if seq is None:
+                seq = self._next_seq
+            self._next_seq = seq + 1
+            sample = StampedSample(value, timestamp_ns, seq)
+            if self._samples and timestamp_ns < self._samples[-1].timestamp_ns:
+                # Out of order delivery, drop it rather than break the time ordering
+                return sample
+            self._samples.append(sample)
+        return sample
+
+    def latest(self) -> StampedSample | None:
+        with self._lock:
+            return self._samples[-1] if self._samples else None
+
+    def bracket(self, timestamp_ns: int) -> tuple[StampedSample | None, StampedSample | None]:
+        """Samples immediately at-or-before and after `timestamp_ns` (either may be None)."""
+        with self._lock:
+            samples = list(self._samples)
+        times = [s.timestamp_ns for s in samples]
+        i = bisect_left(times, timestamp_ns)
+        if i < len(samples) and times[i] == timestamp_ns:
+            return samples[i], samples[i]
+        before = samples[i - 1] if i > 0 else None
+        after = samples[i] if i < len(samples) else None
+        return before, after
+
+    def nearest(self, timestamp_ns: int) -> StampedSample | None:
+        before, after = self.bracket(timestamp_ns)
+        if before is None or after is None:
+            return before or after
+        if timestamp_ns - before.timestamp_ns <= after.timestamp_ns - timestamp_ns:
+            return before
+        return after
+
+    def clear(self) -> None:
+        with self._lock:
+            self._samples.clear()
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+
+def align_sample(history: StreamHistory, timestamp_ns: int, mode: str = "nearest") -> tuple[Any, int, int] | None:
+    """
+    Value of a stream at `timestamp_ns`.
+
+    Returns `(value, seq, skew_ns)` where `skew_ns` is the capture time of the value used minus the
+    tick time (0 for an interpolated value), and `seq` the sequence number of the sample used (the
+    earlier one when interpolating). Returns None if the stream has no samples yet.
+    """
+    if mode not in SYNC_MODES:
+        raise ValueError(f"Unknown sync mode '{mode}', expected one of {SYNC_MODES}.")
+
+    if mode == "latest":
+        sample = history.latest()
+        if sample is None:
+            return None
+        return sample.value, sample.seq, sample.timestamp_ns - timestamp_ns
+
+    if mode == "linear":
+        before, after = history.bracket(timestamp_ns)
+        if (
+            before is not None
+            and after is not None
+            and before is not after
+            and isinstance(before.value, np.ndarray)
+            and np.issubdtype(before.value.dtype, np.floating)
+        ):
+            alpha = (timestamp_ns - before.timestamp_ns) / (after.timestamp_ns - before.timestamp_ns)
+            value = before.value + (after.value - before.value) * np.asarray(alpha, dtype=before.value.dtype)
+            return value, before.seq, 0
+
+    sample = history.nearest(timestamp_ns)
+    if sample is None:
+        return None
+    return sample.value, sample.seq, sample.timestamp_ns - timestamp_ns
@@ -2,6 +2,9 @@ import os
 import datetime
 import json
 
+from operating_platform.dataset.meta_store import DATAID_PATH, get_metadata_store
+from operating_platform.utils.dataset import EPISODES_PATH
+
 
 def get_today_date():
     # 获取当前日期和时间
@@ -89,97 +92,63 @@ def file_size(path, n):
 
     return 0
 
+def _episode_size_from_dirs(task_path, episode_index):
+    """按目录遍历计算 episode 的文件大小（字节），仅在元数据库中没有记录时使用"""
+    size_bytes = 0
+    entries_1 = os.listdir(task_path)
+    for entry in entries_1:
+        if entry == "meta":
+            continue
+        if entry == "videos":
+            if "images" in entries_1:
+                continue
+            data_path = os.path.join(task_path,entry,"chunk-000")
+            size_bytes += file_size(data_path,episode_index)
+        if entry == "images":
+            data_path = os.path.join(task_path,entry)
+            size_bytes += file_size(data_path,episode_index)
+        if entry == "data":
+            data_path = os.path.join(task_path,entry,"chunk-000")
+            size_bytes += file_size(data_path,episode_index)
+        if entry == "audio":
+            data_path = os.path.join(task_path,entry,"chunk-000")
+            size_bytes += file_size(data_path,episode_index)
+    return size_bytes
+
+
+def _find_episode_index(store, task_data_id):
+    episode_index = store.find_episode_index(task_data_id)
+    if episode_index is None:
+        raise ValueError(f"未找到 task_data_id={task_data_id} 对应的 episode_index")
+    return episode_index
+
+
 def get_data_size(fold_path, data): # 文件大小单位(MB)
     try:
-        size_bytes = 0
-
-        # directory_path = os.path.join(fold_path, get_today_date())
-        # print(directory_path)
-        # #directory_path = os.path.join(fold_path1, "2025701")
-        # if not os.path.exists(directory_path):
-        #     return 400
-
-        # task_path = os.path.join(directory_path,f"{str(data['task_name'])}_{str(data['task_id'])}")
-
-        task_path=fold_path
-        opdata_path = os.path.join(task_path,"meta","op_dataid.jsonl")
-        with open(opdata_path, 'r', encoding='utf-8') as file:
-            for line in file:
-                try:
-                    # 去除行末的换行符，并解析为 JSON 对象
-                    json_object_data = json.loads(line.strip())
-                    if json_object_data["dataid"] == str(data["task_data_id"]):
-                        episode_index = json_object_data["episode_index"]
-                        break
-                except json.JSONDecodeError as e:
-                    print(f"解析 JSON 失败，行内容: {line.strip()}, 错误信息: {e}")
-        
-        entries_1 = os.listdir(task_path) 
-        for entry in entries_1:
-            if entry == "meta":
-                continue
-            if entry == "videos":
-                if "images" in entries_1:
-                    continue
-                data_path = os.path.join(task_path,entry,"chunk-000")
-                size_bytes += file_size(data_path,episode_index)
-            if entry == "images":
-                data_path = os.path.join(task_path,entry)
-                size_bytes += file_size(data_path,episode_index)
-            if entry == "data":
-                data_path = os.path.join(task_path,entry,"chunk-000")
-                size_bytes += file_size(data_path,episode_index)
-            if entry == "audio":
-                data_path = os.path.join(task_path,entry,"chunk-000")
-                size_bytes += file_size(data_path,episode_index)
+        # episode 的大小在保存时已记录在 meta/meta.db 中，不再每次遍历目录
+        store = get_metadata_store(fold_path)
+        episode_index = _find_episode_index(store, data["task_data_id"])
+        size_bytes = store.get_episode_size(episode_index)
+        if size_bytes is None:
+            size_bytes = _episode_size_from_dirs(fold_path, episode_index)
+            store.set_episode_size(episode_index, size_bytes)
         size_mb = round(size_bytes / (1024 * 1024), 2)
         return size_mb
 
-
     except Exception as e:
         print(str(e))
         return 500
-    
-
-
 
 
 def get_data_duration(fold_path,data):  # 文件时长单位(s)
     try:
-        # directory_path = os.path.join(fold_path, get_today_date())
-        # print(directory_path)
-        # #directory_path = os.path.join(fold_path1, "2025701")
-        # if not os.path.exists(directory_path):
-        #     return 30
-        
-        # task_path = os.path.join(directory_path,f"{str(data['task_name'])}_{str(data['task_id'])}")
-        task_path = fold_path
-        info_path = os.path.join(task_path,"meta","info.json")
-        opdata_path = os.path.join(task_path,"meta","op_dataid.jsonl")
-        episodes_path = os.path.join(task_path,"meta","episodes.jsonl")
+        info_path = os.path.join(fold_path,"meta","info.json")
         with open(info_path,"r",encoding="utf-8") as f:
             info_data = json.load(f)
             fps = info_data["fps"] # 
-        with open(opdata_path, 'r', encoding='utf-8') as file:
-            for line in file:
-                try:
-                    # 去除行末的换行符，并解析为 JSON 对象
-                    json_object_data = json.loads(line.strip())
-                    if json_object_data["dataid"] == str(data["task_data_id"]):
-                        episode_index = json_object_data["episode_index"]
-                        break
-                except json.JSONDecodeError as e:
-                    print(f"解析 JSON 失败，行内容: {line.strip()}, 错误信息: {e}")
-        with open(episodes_path, 'r', encoding='utf-8') as file:
-            for line in file:
-                try:
-                    # 去除行末的换行符，并解析为 JSON 对象
-                    json_object_data = json.loads(line.strip())
-                    if json_object_data["episode_index"] == episode_index:
-                        length= json_object_data["length"]
-                        break
-                except json.JSONDecodeError as e:
-                    print(f"解析 JSON 失败，行内容: {line.strip()}, 错误信息: {e}")
+        store = get_metadata_store(fold_path)
+        episode_index = _find_episode_index(store, data["task_data_id"])
+        length = store.get(EPISODES_PATH, episode_index)["length"]
         duration = round(length/fps,2)
         return duration        
     except Exception as e:
@@ -187,21 +156,16 @@ def get_data_duration(fold_path,data):  # 文件时长单位(s)
         return 30
 
 def update_dataid_json(path, episode_index, data):
-    opdata_path = os.path.join(path, "meta", "op_dataid.jsonl")
-
     append_data = {
         "episode_index": episode_index,
         "dataid": str(data["task_data_id"]),
     }
-    
-    # 以追加模式打开文件（如果不存在则创建）
-    with open(opdata_path, 'a', encoding='utf-8') as f:
-        # 写入一行 JSON 数据（每行一个 JSON 对象）
-        f.write(json.dumps(append_data, ensure_ascii=False) + '\n')
+    # 追加一行到 op_dataid.jsonl 并建立索引
+    get_metadata_store(path).append(DATAID_PATH, append_data)
 
 def find_epindex_from_dataid_json(path: str, task_data_id: str) -> int:
     """
-    根据 task_data_id 从 op_dataid.jsonl 文件中查询对应的 episode_index
+    根据 task_data_id 从 op_dataid.jsonl 文件中查询对应的 episode_index（通过 meta/meta.db 索引）
     
     Args:
         path: 数据根目录路径（包含 meta 子目录）
@@ -214,58 +178,20 @@ def find_epindex_from_dataid_json(path: str, task_data_id: str) -> int:
         FileNotFoundError: 当 op_dataid.jsonl 文件不存在时
         ValueError: 当指定 task_data_id 未找到时
     """
-    opdata_path = os.path.join(path, "meta", "op_dataid.jsonl")
+    opdata_path = os.path.join(path, DATAID_PATH)
     
     if not os.path.exists(opdata_path):
         raise FileNotFoundError(f"元数据文件不存在: {opdata_path}")
     
-    # 规范化 task_data_id 类型（确保字符串比较）
-    target_id = str(task_data_id).strip()
-    
-    with open(opdata_path, 'r', encoding='utf-8') as f:
-        for line in f:
-            try:
-                record = json.loads(line.strip())
-                # 严格匹配 dataid 字段（考虑大小写和空格）
-                if str(record.get("dataid", "")).strip() == target_id:
-                    return int(record["episode_index"])
-            except (json.JSONDecodeError, KeyError, ValueError) as e:
-                # 跳过无效行但记录警告（实际项目中可添加日志）
-                continue
-    
-    raise ValueError(f"未找到 task_data_id={task_data_id} 对应的 episode_index")
+    return _find_episode_index(get_metadata_store(path), task_data_id)
 
 def delete_dataid_json(path, episode_index, data):
-    opdata_path = os.path.join(path, "meta", "op_dataid.jsonl")
-    
-    # 构建要删除的匹配条件
-    target_episode = episode_index
-    target_dataid = str(data["task_data_id"])
-    
     # 如果文件不存在，直接返回（无内容可删除）
-    if not os.path.exists(opdata_path):
+    if not os.path.exists(os.path.join(path, DATAID_PATH)):
         return
-    
-    # 临时存储过滤后的数据
-    filtered_data = []
-    
-    # 读取并过滤文件内容
-    with open(opdata_path, 'r', encoding='utf-8') as f:
-        for line in f:
-            try:
-                entry = json.loads(line.strip())
-                # 定义匹配条件（同时匹配episode_index和dataid）
-                if (entry.get("episode_index") == target_episode and 
-                    entry.get("dataid") == target_dataid):
-                    continue  # 跳过匹配的条目（即删除）
-                filtered_data.append(entry)
-            except json.JSONDecodeError:
-                continue  # 跳过无效JSON行
-    
-    # 覆盖写回文件（不含匹配条目）
-    with open(opdata_path, 'w', encoding='utf-8') as f:
-        for entry in filtered_data:
-            f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+
+    # 同时匹配 episode_index 和 dataid；删除最后一行时只截断文件
+    get_metadata_store(path).delete(DATAID_PATH, episode_index, str(data["task_data_id"]))
 
 def update_common_record_json(path, data):
     opdata_path = os.path.join(path, "meta", "common_record.json")
@@ -20,6 +20,7 @@ from huggingface_hub import DatasetCard, DatasetCardData, HfApi
 from PIL import Image as PILImage
 from torchvision import transforms
 
+from operating_platform.utils.frame_format import read_frame
 from operating_platform.utils.utils import is_valid_numpy_dtype_string
 
 # from lerobot_lite.robots.utils import Robot
@@ -34,6 +35,8 @@ EPISODES_PATH = "meta/episodes.jsonl"
 STATS_PATH = "meta/stats.json"
 EPISODES_STATS_PATH = "meta/episodes_stats.jsonl"
 TASKS_PATH = "meta/tasks.jsonl"
+# Local record of the parquet files whose timestamps were checked, see `timestamps_validated`
+VALIDATION_PATH = "meta/validation.json"
 
 DEFAULT_VIDEO_PATH = "videos/chunk-{episode_chunk:03d}/{video_key}/episode_{episode_index:06d}.mp4"
 DEFAULT_AUDIO_PATH = "audio/chunk-{episode_chunk:03d}/{audio_key}/episode_{episode_index:06d}.wav"
@@ -251,8 +254,11 @@ def backward_compatible_episodes_stats(
 def load_image_as_numpy(
     fpath: str | Path, dtype: np.dtype = np.float32, channel_first: bool = True
 ) -> np.ndarray:
-    img = PILImage.open(fpath).convert("RGB")
-    img_array = np.array(img, dtype=dtype)
+    if str(fpath).endswith((".npy", ".npy.lz4")):
+        # Raw / lz4 compressed intermediate video frames, see utils/frame_format.py
+        img_array = read_frame(fpath).astype(dtype, copy=False)
+    else:
+        img_array = np.array(PILImage.open(fpath).convert("RGB"), dtype=dtype)
     if channel_first:  # (H, W, C) -> (C, H, W)
         img_array = np.transpose(img_array, (2, 0, 1))
     if np.issubdtype(dtype, np.floating):
@@ -593,6 +599,51 @@ def check_delta_timestamps(
     return True
 
 
+def parquet_signatures(root: Path, data_files: list[str]) -> dict[str, list[int]]:
+    """(size, mtime) of each parquet file, to tell whether it changed since it was validated."""
+    signatures = {}
+    for fpath in data_files:
+        st = (Path(root) / fpath).stat()
+        signatures[str(fpath)] = [st.st_size, st.st_mtime_ns]
+    return signatures
+
+
+def timestamps_validated(root: Path, data_files: list[str], fps: int, tolerance_s: float) -> bool:
+    """Whether `check_timestamps_sync` already passed on these (unchanged) parquet files, with the same
+    fps and a tolerance at most `tolerance_s`."""
+    manifest_path = Path(root) / VALIDATION_PATH
+    if not manifest_path.is_file():
+        return False
+    try:
+        manifest = load_json(manifest_path)
+        if manifest["fps"] != fps or manifest["tolerance_s"] > tolerance_s:
+            return False
+        validated = manifest["files"]
+        signatures = parquet_signatures(root, data_files)
+    except (OSError, ValueError, KeyError):
+        return False
+    return all(validated.get(fpath) == signature for fpath, signature in signatures.items())
+
+
+def record_timestamps_validated(root: Path, data_files: list[str], fps: int, tolerance_s: float) -> None:
+    """Add parquet files that passed `check_timestamps_sync` to the validation manifest."""
+    manifest_path = Path(root) / VALIDATION_PATH
+    files = {}
+    if manifest_path.is_file():
+        try:
+            manifest = load_json(manifest_path)
+            if manifest["fps"] == fps and manifest["tolerance_s"] == tolerance_s:
+                files = manifest["files"]
+        except (OSError, ValueError, KeyError):
+            pass
+    files.update(parquet_signatures(root, data_files))
+    try:
+        write_json({"fps": fps, "tolerance_s": tolerance_s, "files": files}, manifest_path)
+    except OSError as e:
+        # Read-only dataset (e.g. shared cache), the check simply runs again next time
+        logging.debug(f"Could not write {manifest_path}: {e}")
+
+
 def get_delta_indices(delta_timestamps: dict[str, list[float]], fps: int) -> dict[str, list[int]]:
     delta_indices = {}
     for key, delta_ts in delta_timestamps.items():
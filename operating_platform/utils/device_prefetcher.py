@@ -0,0 +1,128 @@
+"""
+Copy training batches to the device ahead of the optimizer step.
+
+Moving a batch to the device key by key in the training loop puts the host to device copies in
+series with the forward and backward passes. `DevicePrefetcher` wraps the dataloader iterator and
+keeps `depth` batches staged on the device: their copies are issued on a side stream while the
+current step computes, and the training loop only waits for the copy of the batch it takes, which
+is normally done by then.
+
+Copies are only asynchronous from pinned host memory. Tensors the DataLoader already pinned
+(`pin_memory=True`) are copied as they are; the others are first copied into pinned buffers that are
+reused across steps (one set per staged batch), instead of pinning new memory for every batch.
+
+CUDA and Ascend NPU (`torch_npu`) devices get a side stream. On other devices (CPU, MPS) batches are
+moved synchronously when they are taken, like the training loop did before.
+"""
+
+import logging
+from collections import deque
+
+import torch
+
+
+def _stream_backend(device: torch.device):
+    """torch.cuda or torch.npu for devices with streams, None otherwise."""
+    if device.type == "cuda" and torch.cuda.is_available():
+        return torch.cuda
+    npu = getattr(torch, "npu", None)  # registered by torch_npu
+    if device.type == "npu" and npu is not None and npu.is_available():
+        return npu
+    return None
+
+
+class DevicePrefetcher:
+    """Iterator over the batches of `iterable` (dicts of tensors), on `device`.
+
+    Args:
+        iterable: Batches, e.g. `cycle(dataloader)`.
+        device: Device to copy the tensors of the batches to.
+        depth: Batches staged on the device ahead of the one being used (0 copies each batch when it
+            is taken).
+        pin_memory: Copy tensors that are not pinned yet into reused pinned buffers before copying them
+            to the device.
+    """
+
+    def __init__(self, iterable, device: torch.device | str, depth: int = 2, pin_memory: bool = True):
+        self.iterator = iter(iterable)
+        self.device = torch.device(device)
+        self.depth = max(int(depth), 0)
+        self.backend = _stream_backend(self.device) if self.depth > 0 else None
+        self.stream = self.backend.Stream(device=self.device) if self.backend is not None else None
+        self.pin_memory = pin_memory and self.backend is not None
+
+        # Pinned host buffers of the batches in flight, and the event recorded after their copies
+        self._slots = [{} for _ in range(self.depth + 1)]
+        self._slot_events = [None] * (self.depth + 1)
+        self._next_slot = 0
+        self._staged = deque()
+        self._exhausted = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> dict:
+        if self.stream is None:
+            return self._to_device(next(self.iterator))
+
+        while not self._exhausted and len(self._staged) < self.depth:
+            self._stage_next()
+        if not self._staged:
+            raise StopIteration
+        batch, event = self._staged.popleft()
+        # Stage the next batch before handing this one out, so that its copy overlaps with the step
+        if not self._exhausted:
+            self._stage_next()
+
+        current = self.backend.current_stream(self.device)
+        current.wait_event(event)
+        for value in batch.values():
+            if isinstance(value, torch.Tensor):
+                # The memory was allocated on the side stream, don't reuse it before the step is done
+                value.record_stream(current)
+        return batch
+
+    def _to_device(self, batch: dict) -> dict:
+        return {
+            key: value.to(self.device) if isinstance(value, torch.Tensor) else value
+            for key, value in batch.items()
+        }
+
+    def _stage_next(self) -> None:
+        try:
+            batch = next(self.iterator)
+        except StopIteration:
+            self._exhausted = True
+            return
+
+        slot = self._next_slot
+        self._next_slot = (slot + 1) % len(self._slots)
+        # The pinned buffers of this slot are only reused once their last copy is done
+        if self._slot_events[slot] is not None:
+            self._slot_events[slot].synchronize()
+
+        staged = {}
+        with self.backend.stream(self.stream):
+            for key, value in batch.items():
+                if isinstance(value, torch.Tensor):
+                    if self.pin_memory and not value.is_pinned():
+                        value = self._pinned(self._slots[slot], key, value)
+                    value = value.to(self.device, non_blocking=True)
+                staged[key] = value
+            event = self.backend.Event()
+            event.record(self.stream)
+        self._slot_events[slot] = event
+        self._staged.append((staged, event))
+
+    def _pinned(self, buffers: dict, key: str, value: torch.Tensor) -> torch.Tensor:
+        buffer = buffers.get(key)
+        if buffer is None or buffer.shape != value.shape or buffer.dtype != value.dtype:
+            try:
+                buffer = torch.empty(value.shape, dtype=value.dtype, pin_memory=True)
+            except RuntimeError as e:
+                logging.warning(f"[DevicePrefetcher] Can't pin memory, copying from pageable memory: {e}")
+                self.pin_memory = False
+                return value
+            buffers[key] = buffer
+        buffer.copy_(value)
+        return buffer
@@ -128,7 +128,11 @@ def deserialize_rng_state(rng_state_dict: dict[str, torch.Tensor]) -> None:
 
 
 def save_rng_state(save_dir: Path) -> None:
-    rng_state_dict = serialize_rng_state()
+    write_rng_state(serialize_rng_state(), save_dir)
+
+
+def write_rng_state(rng_state_dict: dict[str, torch.Tensor], save_dir: Path) -> None:
+    """Write rng states produced by `serialize_rng_state()` (e.g. earlier in training)."""
     flat_rng_state_dict = flatten_dict(rng_state_dict)
     save_file(flat_rng_state_dict, save_dir / RNG_STATE)
 
@@ -13,9 +13,18 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import copy
 import logging
+import os
+import shutil
+from collections import deque
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
 
+import torch
+from huggingface_hub.constants import SAFETENSORS_SINGLE_FILE
+from safetensors.torch import _remove_duplicate_names, save_file
 from termcolor import colored
 from torch.optim import Optimizer
 from torch.optim.lr_scheduler import LRScheduler
@@ -25,14 +34,24 @@ from operating_platform.utils.constants import (
     CHECKPOINTS_DIR,
     LAST_CHECKPOINT_LINK,
     PRETRAINED_MODEL_DIR,
+    SCHEDULER_STATE,
     TRAINING_STATE_DIR,
     TRAINING_STEP,
 )
 from operating_platform.utils.dataset import load_json, write_json
-from operating_platform.optim.optimizers import load_optimizer_state, save_optimizer_state
+from operating_platform.optim.optimizers import (
+    load_optimizer_state,
+    save_optimizer_state,
+    write_optimizer_state_dict,
+)
 from operating_platform.optim.schedulers import load_scheduler_state, save_scheduler_state
 from operating_platform.policy.pretrained import PreTrainedPolicy
-from operating_platform.utils.random_utils import load_rng_state, save_rng_state
+from operating_platform.utils.random_utils import (
+    load_rng_state,
+    save_rng_state,
+    serialize_rng_state,
+    write_rng_state,
+)
 
 
 def log_output_dir(out_dir):
@@ -61,10 +80,14 @@ def load_training_step(save_dir: Path) -> int:
 
 def update_last_checkpoint(checkpoint_dir: Path) -> Path:
     last_checkpoint_dir = checkpoint_dir.parent / LAST_CHECKPOINT_LINK
-    if last_checkpoint_dir.is_symlink():
-        last_checkpoint_dir.unlink()
     relative_target = checkpoint_dir.relative_to(checkpoint_dir.parent)
-    last_checkpoint_dir.symlink_to(relative_target)
+    # Replace the link in one rename, so that `last` always points to a complete checkpoint
+    tmp_link = checkpoint_dir.parent / f".{LAST_CHECKPOINT_LINK}.tmp"
+    if tmp_link.is_symlink():
+        tmp_link.unlink()
+    tmp_link.symlink_to(relative_target)
+    os.replace(tmp_link, last_checkpoint_dir)
+    return last_checkpoint_dir
 
 
 def save_checkpoint(
@@ -129,6 +152,127 @@ def save_training_state(
         save_scheduler_state(scheduler, save_dir)
 
 
+def _to_cpu(obj):
+    """Copy of the tensors of a (nested) state dict in CPU memory."""
+    if isinstance(obj, torch.Tensor):
+        return obj.detach().to("cpu", copy=True).contiguous()
+    if isinstance(obj, dict):
+        return {key: _to_cpu(value) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return type(obj)(_to_cpu(value) for value in obj)
+    return obj
+
+
+class AsyncCheckpointWriter:
+    """Writes checkpoints on a background thread instead of blocking the training loop.
+
+    `save` takes a CPU copy of the model, optimizer, scheduler and rng states, writes the configs, and
+    leaves the safetensors and optimizer files to a background thread. Checkpoints are written to a
+    temporary directory renamed to `checkpoint_dir` once complete, then `last` is pointed to it, so an
+    interrupted write never leaves a partial checkpoint behind `last`. The files are the same as
+    `save_checkpoint`'s.
+
+    Args:
+        max_pending: Checkpoints snapshotted but not written yet. `save` waits for the oldest one to be
+            written beyond that, which bounds the CPU memory held by the copies.
+    """
+
+    def __init__(self, max_pending: int = 1):
+        self.max_pending = max(int(max_pending), 1)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="checkpoint_writer")
+        self._pending: deque[Future] = deque()
+
+    def save(
+        self,
+        checkpoint_dir: Path,
+        step: int,
+        cfg: TrainPipelineConfig,
+        policy: PreTrainedPolicy,
+        optimizer: Optimizer,
+        scheduler: LRScheduler | None = None,
+        on_done: Callable[[Path], None] | None = None,
+    ) -> Future:
+        """Snapshot the training state at `step` and write it to `checkpoint_dir` in the background.
+
+        `on_done(checkpoint_dir)` is called from the writer thread once the checkpoint is complete. Errors
+        of the background write are raised by the next `save` or by `wait`.
+        """
+        while len(self._pending) >= self.max_pending:
+            self._pending.popleft().result()
+
+        tmp_dir = checkpoint_dir.parent / f".{checkpoint_dir.name}.tmp"
+        if tmp_dir.exists():
+            shutil.rmtree(tmp_dir)
+        pretrained_dir = tmp_dir / PRETRAINED_MODEL_DIR
+        pretrained_dir.mkdir(parents=True)
+        # Configs are small, write them now
+        policy.config._save_pretrained(pretrained_dir)
+        cfg.save_pretrained(pretrained_dir)
+
+        # Same tensors as `save_model`: tied weights are saved once
+        model = policy.module if hasattr(policy, "module") else policy
+        model_state = model.state_dict()
+        metadata = {}
+        for kept_name, removed in _remove_duplicate_names(model_state).items():
+            for name in removed:
+                metadata.setdefault(name, kept_name)
+                del model_state[name]
+        snapshot = {
+            "model": _to_cpu(model_state),
+            "metadata": metadata or None,
+            # {name: state} for a dict of optimizers (one sub-directory each), {None: state} otherwise
+            "optimizer": (
+                {name: _to_cpu(opt.state_dict()) for name, opt in optimizer.items()}
+                if isinstance(optimizer, dict)
+                else {None: _to_cpu(optimizer.state_dict())}
+            ),
+            "scheduler": copy.deepcopy(scheduler.state_dict()) if scheduler is not None else None,
+            "rng": serialize_rng_state(),
+        }
+        future = self._executor.submit(self._write, tmp_dir, checkpoint_dir, step, snapshot, on_done)
+        self._pending.append(future)
+        return future
+
+    @staticmethod
+    def _write(
+        tmp_dir: Path, checkpoint_dir: Path, step: int, snapshot: dict, on_done: Callable[[Path], None] | None
+    ) -> None:
+        save_file(
+            snapshot["model"],
+            str(tmp_dir / PRETRAINED_MODEL_DIR / SAFETENSORS_SINGLE_FILE),
+            metadata=snapshot["metadata"],
+        )
+        save_dir = tmp_dir / TRAINING_STATE_DIR
+        save_dir.mkdir(parents=True, exist_ok=True)
+        save_training_step(step, save_dir)
+        write_rng_state(snapshot["rng"], save_dir)
+        for name, state in snapshot["optimizer"].items():
+            optimizer_dir = save_dir / name if name is not None else save_dir
+            optimizer_dir.mkdir(exist_ok=True, parents=True)
+            write_optimizer_state_dict(state, optimizer_dir)
+        if snapshot["scheduler"] is not None:
+            write_json(snapshot["scheduler"], save_dir / SCHEDULER_STATE)
+
+        if checkpoint_dir.exists():
+            shutil.rmtree(checkpoint_dir)
+        os.replace(tmp_dir, checkpoint_dir)
+        update_last_checkpoint(checkpoint_dir)
+        logging.info(f"Checkpoint {checkpoint_dir} written")
+        if on_done is not None:
+            on_done(checkpoint_dir)
+
+    def wait(self) -> None:
+        """Wait until all checkpoints are written."""
+        while self._pending:
+            self._pending.popleft().result()
+
+    def close(self) -> None:
+        try:
+            self.wait()
+        finally:
+            self._executor.shutdown(wait=True)
+
+
 def load_training_state(
     checkpoint_dir: Path, optimizer: Optimizer, scheduler: LRScheduler | None
 ) -> tuple[int, Optimizer, LRScheduler | None]:
@@ -1,6 +1,9 @@
 import json
 import logging
+import os
+import queue
 import subprocess
+import tempfile
 import threading
 import time
 import warnings
@@ -10,12 +13,21 @@ from pathlib import Path
 from typing import Any, ClassVar, Optional, Literal
 import re
 
+import numpy as np
 import pyarrow as pa
 import torch
 import torchvision
 from datasets.features.features import register_feature
 from PIL import Image
 
+from operating_platform.utils.frame_format import (
+    FFMPEG_READABLE_FORMATS,
+    FRAME_SUFFIXES,
+    frame_format_of,
+    list_frames,
+    read_frame,
+)
+
 
 # =============================================================================
 # NPU Encoder Resource Management
@@ -52,13 +64,91 @@ def set_npu_encoder_channels(num_channels: int) -> None:
     Args:
         num_channels: Number of concurrent NPU encoding channels (typically 2-4)
     """
-    global _npu_semaphore, NPU_ENCODER_CHANNELS
+    global _npu_semaphore, _npu_stream_semaphore, NPU_ENCODER_CHANNELS
     with _npu_semaphore_lock:
         NPU_ENCODER_CHANNELS = num_channels
         _npu_semaphore = threading.Semaphore(num_channels)
+        _npu_stream_semaphore = None
         logging.info(f"[VideoEncoder] Set NPU encoder channels to {num_channels}")
 
 
+# NPU channels streams may hold. A stream holds its channel for a whole episode (one per camera), so
+# one channel is always left to `encode_video_frames`: otherwise the episodes saved in the background
+# while the next one is recorded would wait `npu_retry_timeout` for a channel and end up on the CPU.
+# None = NPU_ENCODER_CHANNELS - 1.
+NPU_STREAMING_CHANNELS: Optional[int] = None
+
+_npu_stream_semaphore: Optional[threading.Semaphore] = None
+# Streams currently holding an NPU channel
+_npu_streams_holding = 0
+
+
+def _get_npu_stream_semaphore() -> threading.Semaphore:
+    """Get or create the semaphore of the NPU channels reserved for streams (thread-safe lazy init)."""
+    global _npu_stream_semaphore
+    if _npu_stream_semaphore is None:
+        with _npu_semaphore_lock:
+            if _npu_stream_semaphore is None:
+                channels = NPU_STREAMING_CHANNELS
+                if channels is None:
+                    channels = NPU_ENCODER_CHANNELS - 1
+                _npu_stream_semaphore = threading.Semaphore(max(min(channels, NPU_ENCODER_CHANNELS), 0))
+    return _npu_stream_semaphore
+
+
+def set_npu_streaming_channels(num_channels: int | None) -> None:
+    """
+    Configure how many NPU channels `StreamingVideoEncoder` streams may hold at the same time.
+
+    Args:
+        num_channels: Channels for streams, at most NPU_ENCODER_CHANNELS (None = all but one)
+
+    Raises:
+        RuntimeError: If streams are holding NPU channels.
+    """
+    global _npu_stream_semaphore, NPU_STREAMING_CHANNELS
+    with _npu_semaphore_lock:
+        if _npu_streams_holding:
+            raise RuntimeError(
+                f"Can't change the NPU streaming channels while {_npu_streams_holding} streams hold a channel"
+            )
+        NPU_STREAMING_CHANNELS = num_channels
+        _npu_stream_semaphore = None
+        logging.info(f"[VideoEncoder] Set NPU streaming channels to {num_channels}")
+
+
+# Concurrent software (libx264/libopenh264) encodes. Each ffmpeg process already uses several
+# threads, so running more than a couple at once on an edge CPU only slows all of them down.
+CPU_ENCODER_SLOTS = max(1, (os.cpu_count() or 2) // 4)
+
+_cpu_semaphore: Optional[threading.Semaphore] = None
+
+
+def _get_cpu_semaphore() -> threading.Semaphore:
+    """Get or create the CPU encoder semaphore (thread-safe lazy init)."""
+    global _cpu_semaphore
+    if _cpu_semaphore is None:
+        with _npu_semaphore_lock:
+            if _cpu_semaphore is None:
+                _cpu_semaphore = threading.Semaphore(CPU_ENCODER_SLOTS)
+                logging.info(f"[VideoEncoder] Initialized CPU encoder semaphore with {CPU_ENCODER_SLOTS} slots")
+    return _cpu_semaphore
+
+
+def set_cpu_encoder_slots(num_slots: int) -> None:
+    """
+    Configure how many software encodes may run at the same time.
+
+    Args:
+        num_slots: Number of concurrent libx264/libopenh264 encodes
+    """
+    global _cpu_semaphore, CPU_ENCODER_SLOTS
+    with _npu_semaphore_lock:
+        CPU_ENCODER_SLOTS = num_slots
+        _cpu_semaphore = threading.Semaphore(num_slots)
+        logging.info(f"[VideoEncoder] Set CPU encoder slots to {num_slots}")
+
+
 def get_available_encoders():
     """
     获取当前系统中 ffmpeg 支持的视频编码器列表。
@@ -235,13 +325,29 @@ def _build_ffmpeg_cmd(
     movement_scene: int = 0,
     # Progress output
     show_progress: bool = False,
+    # Raw RGB frames on stdin instead of an image sequence in imgs_dir, as (width, height)
+    raw_size: tuple[int, int] | None = None,
+    # Suffix of the image sequence in imgs_dir (.png or .jpg)
+    frame_suffix: str = ".png",
 ) -> list[str]:
     """Build ffmpeg command for video encoding."""
-    ffmpeg_args = OrderedDict(
-        [
+    if raw_size is not None:
+        input_args = [
+            ("-f", "rawvideo"),
+            ("-pix_fmt", "rgb24"),
+            ("-s", f"{raw_size[0]}x{raw_size[1]}"),
+            ("-r", str(fps)),
+            ("-i", "-"),
+        ]
+    else:
+        input_args = [
             ("-f", "image2"),
             ("-r", str(fps)),
-            ("-i", str(imgs_dir / "frame_%06d.png")),
+            ("-i", str(imgs_dir / f"frame_%06d{frame_suffix}")),
+        ]
+    # Input options are kept apart: the raw input has its own -pix_fmt
+    ffmpeg_args = OrderedDict(
+        [
             ("-vcodec", vcodec),
             ("-pix_fmt", pix_fmt),
         ]
@@ -289,7 +395,7 @@ def _build_ffmpeg_cmd(
         ffmpeg_args["-loglevel"] = "info"
         ffmpeg_args["-stats"] = ""
 
-    ffmpeg_args_list = []
+    ffmpeg_args_list = [arg for pair in input_args for arg in pair]
     for key, value in ffmpeg_args.items():
         ffmpeg_args_list.append(key)
         if value:  # Skip empty values (like -stats which has no value)
@@ -301,6 +407,67 @@ def _build_ffmpeg_cmd(
     return ["ffmpeg"] + ffmpeg_args_list + [str(video_path)]
 
 
+def _probe_frames(imgs_dir: Path) -> tuple[str, list[Path] | None, tuple[int, int] | None]:
+    """
+    Find how to feed the frames of `imgs_dir` to ffmpeg.
+
+    Returns the frame file suffix and, for formats ffmpeg can't read (raw / lz4 .npy), the frame
+    files to pipe in as raw RGB with their (width, height).
+    """
+    frames = list_frames(imgs_dir)
+    if not frames:
+        # Let ffmpeg fail on the missing PNG sequence as before
+        return FRAME_SUFFIXES["png"], None, None
+    fmt = frame_format_of(frames[0])
+    if fmt in FFMPEG_READABLE_FORMATS:
+        return FRAME_SUFFIXES[fmt], None, None
+    first = read_frame(frames[0])
+    return FRAME_SUFFIXES[fmt], frames, (first.shape[1], first.shape[0])
+
+
+def _run_ffmpeg(
+    cmd: list[str], raw_frames: list[Path] | None = None, capture_output: bool = False
+) -> None:
+    """
+    Run ffmpeg, raising `subprocess.CalledProcessError` (with stderr when captured) on failure.
+
+    With `raw_frames`, the frame files are decoded here and piped to ffmpeg's stdin as raw RGB.
+    """
+    if raw_frames is None:
+        subprocess.run(cmd, check=True, stdin=subprocess.DEVNULL, capture_output=capture_output, text=True)
+        return
+
+    stderr_file = tempfile.TemporaryFile() if capture_output else None
+    try:
+        proc = subprocess.Popen(
+            cmd,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.DEVNULL if capture_output else None,
+            stderr=stderr_file,
+        )
+        try:
+            for fpath in raw_frames:
+                proc.stdin.write(_as_rgb24(read_frame(fpath)).data)
+        except BrokenPipeError:
+            # ffmpeg exited early, its return code and stderr tell why
+            pass
+        finally:
+            try:
+                proc.stdin.close()
+            except BrokenPipeError:
+                pass
+        returncode = proc.wait()
+        if returncode != 0:
+            stderr = None
+            if stderr_file is not None:
+                stderr_file.seek(0)
+                stderr = stderr_file.read().decode(errors="replace")
+            raise subprocess.CalledProcessError(returncode, cmd, stderr=stderr)
+    finally:
+        if stderr_file is not None:
+            stderr_file.close()
+
+
 def _encode_with_cpu_fallback(
     imgs_dir: Path,
     video_path: Path,
@@ -313,7 +480,8 @@ def _encode_with_cpu_fallback(
 
     Uses ultrafast preset for speed on ARM CPUs.
     """
-    frame_count = len(list(imgs_dir.glob("frame_*.png")))
+    frame_suffix, raw_frames, raw_size = _probe_frames(imgs_dir)
+    frame_count = len(list_frames(imgs_dir))
     logging.info(f"[VideoEncoder] Encoding {frame_count} frames with libx264 (preset=ultrafast)...")
 
     fallback_cmd = _build_ffmpeg_cmd(
@@ -329,12 +497,15 @@ def _encode_with_cpu_fallback(
         overwrite=True,
         preset="ultrafast",
         show_progress=True,
+        raw_size=raw_size,
+        frame_suffix=frame_suffix,
     )
 
     logging.info(f"[VideoEncoder] Running: {' '.join(fallback_cmd)}")
 
     try:
-        subprocess.run(fallback_cmd, check=True, stdin=subprocess.DEVNULL)
+        with _get_cpu_semaphore():
+            _run_ffmpeg(fallback_cmd, raw_frames)
         logging.info(f"[VideoEncoder] CPU encoding successful: {video_path.name}")
     except subprocess.CalledProcessError as e:
         logging.error(f"[VideoEncoder] CPU encoding failed with return code: {e.returncode}")
@@ -353,6 +524,35 @@ def _is_npu_channel_error(stderr: str) -> bool:
     return any(indicator.lower() in stderr_lower for indicator in error_indicators)
 
 
+def _select_vcodec(vcodec: str) -> str:
+    """Return `vcodec` if ffmpeg supports it, otherwise the best available H.264 encoder."""
+    _ensure_encoders_loaded()
+    available_encoders = _AVAILABLE_ENCODERS
+
+    if vcodec in available_encoders:
+        return vcodec
+
+    supported_candidates = {"h264_ascend", "libopenh264", "libx264"} & set(available_encoders)
+    if not supported_candidates:
+        raise ValueError(
+            "None of the supported encoders are available. "
+            "Please ensure at least one of 'libopenh264' or 'libx264' is supported."
+        )
+    # Prefer h264_ascend > libx264 > libopenh264
+    if "h264_ascend" in supported_candidates:
+        selected_vcodec = "h264_ascend"
+    elif "libx264" in supported_candidates:
+        selected_vcodec = "libx264"
+    else:
+        selected_vcodec = "libopenh264"
+
+    warnings.warn(
+        f"vcodec '{vcodec}' not available. Automatically switched to '{selected_vcodec}'.",
+        UserWarning
+    )
+    return selected_vcodec
+
+
 def encode_video_frames(
     imgs_dir: Path | str,
     video_path: Path | str,
@@ -388,7 +588,8 @@ def encode_video_frames(
     NPU availability over immediately falling back to slow CPU encoding.
 
     Args:
-        imgs_dir: Directory containing frame_XXXXXX.png images
+        imgs_dir: Directory containing frame_XXXXXX images, in any format of `utils.frame_format`
+            (PNG/JPEG sequences are read by ffmpeg, .npy frames are piped in as raw RGB)
         video_path: Output video file path
         fps: Frames per second
         vcodec: Video codec (h264_ascend, libx264, libopenh264)
@@ -408,36 +609,15 @@ def encode_video_frames(
         npu_retry_interval: Initial retry interval (seconds)
         npu_retry_max_interval: Maximum retry interval (seconds)
     """
-    _ensure_encoders_loaded()
+    vcodec = _select_vcodec(vcodec)
     available_encoders = _AVAILABLE_ENCODERS
 
-    # Determine encoder to use
-    if vcodec not in available_encoders:
-        supported_candidates = {"h264_ascend", "libopenh264", "libx264"} & set(available_encoders)
-        if not supported_candidates:
-            raise ValueError(
-                "None of the supported encoders are available. "
-                "Please ensure at least one of 'libopenh264' or 'libx264' is supported."
-            )
-        # Prefer h264_ascend > libx264 > libopenh264
-        if "h264_ascend" in supported_candidates:
-            selected_vcodec = "h264_ascend"
-        elif "libx264" in supported_candidates:
-            selected_vcodec = "libx264"
-        else:
-            selected_vcodec = "libopenh264"
-
-        warnings.warn(
-            f"vcodec '{vcodec}' not available. Automatically switched to '{selected_vcodec}'.",
-            UserWarning
-        )
-        vcodec = selected_vcodec
-
     video_path = Path(video_path)
     imgs_dir = Path(imgs_dir)
     video_path.parent.mkdir(parents=True, exist_ok=True)
+    frame_suffix, raw_frames, raw_size = _probe_frames(imgs_dir)
 
-    # For non-NPU encoders, encode directly without semaphore
+    # For non-NPU encoders, encode directly without the NPU semaphore
     if vcodec != "h264_ascend":
         ffmpeg_cmd = _build_ffmpeg_cmd(
             imgs_dir=imgs_dir,
@@ -450,10 +630,12 @@ def encode_video_frames(
             fast_decode=fast_decode,
             log_level=log_level,
             overwrite=overwrite,
+            raw_size=raw_size,
+            frame_suffix=frame_suffix,
         )
         logging.info(f"[VideoEncoder] Encoding video: {video_path.name} (encoder={vcodec})")
-        subprocess.run(ffmpeg_cmd, check=True, stdin=subprocess.DEVNULL,
-                      capture_output=True, text=True)
+        with _get_cpu_semaphore():
+            _run_ffmpeg(ffmpeg_cmd, raw_frames, capture_output=True)
         if not video_path.exists():
             raise OSError(f"Video encoding failed. File not found: {video_path}")
         return
@@ -480,6 +662,8 @@ def encode_video_frames(
         rc_mode=rc_mode,
         max_bit_rate=max_bit_rate,
         movement_scene=movement_scene,
+        raw_size=raw_size,
+        frame_suffix=frame_suffix,
     )
 
     # Try to acquire semaphore (wait for NPU channel)
@@ -516,13 +700,7 @@ def encode_video_frames(
             )
 
             try:
-                result = subprocess.run(
-                    ffmpeg_cmd,
-                    check=True,
-                    stdin=subprocess.DEVNULL,
-                    capture_output=True,
-                    text=True,
-                )
+                _run_ffmpeg(ffmpeg_cmd, raw_frames, capture_output=True)
                 # Success!
                 logging.info(f"[VideoEncoder] NPU encoding successful: {video_path.name}")
                 break
@@ -577,6 +755,274 @@ def encode_video_frames(
             f"Try running the command manually to debug: `{' '.join(ffmpeg_cmd)}`"
         )
 
+def _as_rgb24(frame: np.ndarray) -> np.ndarray:
+    """HxWx3 contiguous uint8 view/copy of a frame (accepts CxHxW and float frames in [0, 1])."""
+    if frame.ndim != 3:
+        raise ValueError(f"The array has {frame.ndim} dimensions, but 3 is expected for an image.")
+    if frame.shape[0] == 3 and frame.shape[-1] != 3:
+        frame = frame.transpose(1, 2, 0)
+    if frame.shape[-1] != 3:
+        raise NotImplementedError(f"The image has {frame.shape[-1]} channels, but 3 is required for now.")
+    if frame.dtype != np.uint8:
+        frame = (frame * 255).astype(np.uint8)
+    return np.ascontiguousarray(frame)
+
+
+class StreamingVideoEncoder:
+    """
+    Encode a video while it is being recorded.
+
+    Frames given to `write` are piped as raw RGB into one long-lived ffmpeg process by a feeder
+    thread, so no PNGs are written and the mp4 is complete as soon as ffmpeg has flushed the last
+    frames after `close`.
+
+    h264_ascend is only used if an NPU channel is free when the first frame arrives, and the channel
+    is then held until the stream ends, i.e. for the episode; otherwise the stream is encoded with
+    libx264. Streams only take channels of the share reserved for them (`NPU_STREAMING_CHANNELS`,
+    all but one by default), so `encode_video_frames` always has a channel left. If the NPU
+    encoder fails before it starts producing output (e.g. channel exhaustion), the stream is
+    restarted on libx264 and the frames written so far are replayed.
+    """
+
+    def __init__(
+        self,
+        video_path: Path | str,
+        fps: int,
+        vcodec: Literal["h264_ascend", "libopenh264", "libx264"] = "h264_ascend",
+        pix_fmt: str = "yuv420p",
+        g: int | None = 1,
+        crf: int | None = None,
+        log_level: Optional[str] = "error",
+        max_pending_frames: int | None = None,
+        **encoder_kwargs,
+    ):
+        self.video_path = Path(video_path)
+        self.fps = fps
+        self.requested_vcodec = vcodec
+        self.vcodec = None
+        self.pix_fmt = pix_fmt
+        self.g = g
+        self.crf = crf
+        self.log_level = log_level
+        # Ascend specific arguments of `_build_ffmpeg_cmd` (device_id, channel_id, profile, ...)
+        self.encoder_kwargs = encoder_kwargs
+        # Frames kept for replay until the encoder has proven to be running
+        self.startup_frames = max(int(fps), 1)
+        self.frames_written = 0
+
+        # Bounded so that a stalled ffmpeg slows the recording loop down instead of filling memory
+        self._queue: queue.Queue = queue.Queue(maxsize=max_pending_frames or 2 * max(int(fps), 1))
+        self._size: tuple[int, int] | None = None
+        self._proc: subprocess.Popen | None = None
+        self._stderr = None
+        self._thread: threading.Thread | None = None
+        # (stream, NPU) semaphores the channel was taken from, released to the same ones
+        self._npu_semaphores: tuple[threading.Semaphore, threading.Semaphore] | None = None
+        self._replay: list[np.ndarray] | None = []
+        self._error: Exception | None = None
+        self._closed = False
+        self._aborted = False
+
+    def write(self, frame: np.ndarray) -> None:
+        """Queue one frame. Blocks only if ffmpeg falls `max_pending_frames` behind."""
+        if self._closed:
+            raise RuntimeError(f"Video stream {self.video_path.name} is already closed.")
+        frame = _as_rgb24(frame)
+        size = (frame.shape[1], frame.shape[0])
+        if self._thread is None:
+            self._size = size
+            self._thread = threading.Thread(target=self._run, name=f"VideoStream-{self.video_path.stem}", daemon=True)
+            self._thread.start()
+        elif size != self._size:
+            raise ValueError(f"Frame size {size} differs from the stream size {self._size} ({self.video_path.name}).")
+        self._queue.put(frame)
+        self.frames_written += 1
+
+    def close(self) -> None:
+        """Signal the end of the stream without waiting for ffmpeg to finish."""
+        if not self._closed:
+            self._closed = True
+            if self._thread is not None:
+                self._queue.put(None)
+
+    def finish(self, timeout: float | None = None) -> Path | None:
+        """Close the stream and wait until the mp4 is written. Returns its path (None if no frame was written)."""
+        self.close()
+        if self._thread is None:
+            return None
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            raise TimeoutError(f"Video stream {self.video_path.name} did not finish within {timeout}s.")
+        if self._error is not None:
+            raise RuntimeError(f"Streaming encoding of {self.video_path} failed: {self._error}") from self._error
+        return self.video_path
+
+    def abort(self) -> None:
+        """Stop encoding and delete the partial video."""
+        self._aborted = True
+        self._error = RuntimeError("aborted")
+        self.close()
+        self._kill()
+        if self._thread is not None:
+            self._thread.join()
+        self.video_path.unlink(missing_ok=True)
+
+    def _run(self) -> None:
+        while True:
+            frame = self._queue.get()
+            if frame is None:
+                break
+            if self._error is not None:
+                # Keep draining so that writers never block on a dead stream
+                continue
+            try:
+                self._feed(frame)
+            except Exception as e:
+                if not self._aborted:
+                    logging.error(f"[VideoEncoder] Stream {self.video_path.name} failed: {e}")
+                self._error = e
+                self._kill()
+
+        if self._error is None:
+            try:
+                self._finalize()
+            except Exception as e:
+                logging.error(f"[VideoEncoder] Stream {self.video_path.name} failed: {e}")
+                self._error = e
+        self._release_npu()
+        if self._stderr is not None:
+            self._stderr.close()
+
+    def _start_process(self, vcodec: str | None = None) -> None:
+        if vcodec is None:
+            vcodec = _select_vcodec(self.requested_vcodec)
+            if vcodec == "h264_ascend" and not self._acquire_npu():
+                if "libx264" in _AVAILABLE_ENCODERS:
+                    logging.info(f"[VideoEncoder] No free NPU channel, streaming {self.video_path.name} with libx264")
+                    vcodec = "libx264"
+                else:
+                    raise RuntimeError("NPU channels busy and no CPU fallback available.")
+
+        self.vcodec = vcodec
+        cmd = _build_ffmpeg_cmd(
+            imgs_dir=None,
+            video_path=self.video_path,
+            fps=self.fps,
+            vcodec=vcodec,
+            pix_fmt=self.pix_fmt,
+            g=self.g,
+            crf=self.crf,
+            log_level=self.log_level,
+            overwrite=True,
+            raw_size=self._size,
+            **(self.encoder_kwargs if vcodec == "h264_ascend" else {}),
+        )
+        self.video_path.parent.mkdir(parents=True, exist_ok=True)
+        # ffmpeg writes the container header only once the encoder is initialized, see `_output_started`
+        self.video_path.unlink(missing_ok=True)
+        if self._stderr is not None:
+            self._stderr.close()
+        self._stderr = tempfile.TemporaryFile()
+        logging.info(f"[VideoEncoder] Streaming video: {self.video_path.name} (encoder={vcodec})")
+        self._proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=self._stderr)
+
+    def _feed(self, frame: np.ndarray) -> None:
+        if self._proc is None:
+            self._start_process()
+        if self._replay is not None:
+            self._replay.append(frame)
+
+        try:
+            self._proc.stdin.write(frame.data)
+        except OSError:
+            if not self._fallback_to_cpu():
+                raise RuntimeError(f"ffmpeg exited: {self._read_stderr()}")
+            return
+
+        if self._replay is not None and len(self._replay) >= self.startup_frames:
+            if self._proc.poll() is not None:
+                if not self._fallback_to_cpu():
+                    raise RuntimeError(f"ffmpeg exited: {self._read_stderr()}")
+            elif self._output_started():
+                # Encoder is up, stop keeping frames around
+                self._replay = None
+            elif len(self._replay) >= 10 * self.startup_frames:
+                logging.warning(f"[VideoEncoder] {self.video_path.name}: no output yet, giving up on CPU fallback")
+                self._replay = None
+
+    def _finalize(self) -> None:
+        if self._proc is None:
+            return
+        while True:
+            try:
+                self._proc.stdin.close()
+            except OSError:
+                pass
+            if self._proc.wait() == 0:
+                break
+            if not self._fallback_to_cpu():
+                raise RuntimeError(f"ffmpeg exited with code {self._proc.returncode}: {self._read_stderr()}")
+        if not self.video_path.exists():
+            raise OSError(f"Video encoding failed. File not found: {self.video_path}")
+        logging.info(f"[VideoEncoder] Stream complete: {self.video_path.name} ({self.frames_written} frames)")
+
+    def _fallback_to_cpu(self) -> bool:
+        """Restart a failed NPU stream on libx264 and replay the frames written so far."""
+        if self._aborted or self._replay is None or self.vcodec != "h264_ascend" or "libx264" not in _AVAILABLE_ENCODERS:
+            return False
+        logging.warning(
+            f"[VideoEncoder] NPU stream failed, restarting {self.video_path.name} on libx264: {self._read_stderr()}"
+        )
+        self._kill()
+        self._release_npu()
+        self._start_process(vcodec="libx264")
+        for frame in self._replay:
+            self._proc.stdin.write(frame.data)
+        return True
+
+    def _output_started(self) -> bool:
+        try:
+            return self.video_path.stat().st_size > 0
+        except FileNotFoundError:
+            return False
+
+    def _read_stderr(self) -> str:
+        if self._stderr is None:
+            return ""
+        self._stderr.seek(0)
+        return self._stderr.read().decode(errors="replace").strip()[-2000:]
+
+    def _kill(self) -> None:
+        proc = self._proc
+        if proc is not None and proc.poll() is None:
+            proc.kill()
+            proc.wait()
+
+    def _acquire_npu(self) -> bool:
+        """Take a free NPU channel of the streaming share, without waiting."""
+        global _npu_streams_holding
+        stream_semaphore, npu_semaphore = _get_npu_stream_semaphore(), _get_npu_semaphore()
+        with _npu_semaphore_lock:
+            if not stream_semaphore.acquire(blocking=False):
+                return False
+            if not npu_semaphore.acquire(blocking=False):
+                stream_semaphore.release()
+                return False
+            _npu_streams_holding += 1
+        self._npu_semaphores = (stream_semaphore, npu_semaphore)
+        return True
+
+    def _release_npu(self) -> None:
+        global _npu_streams_holding
+        if self._npu_semaphores is not None:
+            stream_semaphore, npu_semaphore = self._npu_semaphores
+            self._npu_semaphores = None
+            with _npu_semaphore_lock:
+                _npu_streams_holding -= 1
+            npu_semaphore.release()
+            stream_semaphore.release()
+
+
 @dataclass
 class VideoFrame:
     # TODO(rcadene, lhoestq): move to Hugging Face `datasets` repo
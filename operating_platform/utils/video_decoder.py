@@ -0,0 +1,254 @@
+"""
+Persistent video decoding for `DoRobotDataset`.
+
+`decode_video_frames_torchvision` sets the torchvision backend, opens the video, seeks to the
+previous key frame, decodes and closes the container again for every camera of every sample, so
+neighbouring samples and `delta_timestamps` windows decode the same frames over and over.
+`VideoDecoderPool` (one per DataLoader worker, see `DoRobotDataset.video_decoder`) instead:
+
+- keeps the containers of the most recently used videos open, and keeps decoding forward from the
+  last decoded frame when the next request is just after it, instead of seeking again. Timestamps of
+  one request further apart than `MAX_FORWARD_DECODE_S` are decoded from their own key frames
+- keeps decoded uint8 frames in an LRU cache bounded in bytes, keyed by (episode, camera, frame
+  index), including the frames decoded on the way from the key frame to the requested one
+
+Results are the same as `decode_video_frames_torchvision`: float32 frames in [0, 1], channel first,
+closest decoded frame to each query timestamp within `tolerance_s`.
+"""
+
+import logging
+import os
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+import torch
+
+from operating_platform.utils.video import decode_video_frames_torchvision
+
+# Keep decoding forward instead of seeking when the next request is at most this far ahead (s)
+MAX_FORWARD_DECODE_S = 1.0
+
+
+@dataclass
+class _OpenVideo:
+    container: object
+    stream: object
+    frames: object | None = None  # decode iterator, positioned after last_ts
+    last_ts: float | None = None
+    path: str = ""
+
+
+@dataclass
+class _CacheStats:
+    hits: int = 0
+    misses: int = 0
+    decoded: int = 0
+    seeks: int = 0
+
+
+def _split_on_gaps(timestamps: list[float], max_gap_s: float) -> list[tuple[float, float]]:
+    """(first, last) timestamps of the runs of sorted `timestamps` with no gap larger than `max_gap_s`."""
+    timestamps = sorted(timestamps)
+    runs = [[timestamps[0], timestamps[0]]]
+    for ts in timestamps[1:]:
+        if ts - runs[-1][1] > max_gap_s:
+            runs.append([ts, ts])
+        else:
+            runs[-1][1] = ts
+    return [tuple(run) for run in runs]
+
+
+class DecodedFrameCache:
+    """LRU cache of decoded uint8 frames (H, W, C), bounded by their total size in bytes."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max(int(max_bytes), 0)
+        self.nbytes = 0
+        self._frames: OrderedDict[tuple, tuple[float, np.ndarray]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._frames)
+
+    def __contains__(self, key: tuple) -> bool:
+        return key in self._frames
+
+    def get(self, key: tuple) -> tuple[float, np.ndarray] | None:
+        entry = self._frames.get(key)
+        if entry is not None:
+            self._frames.move_to_end(key)
+        return entry
+
+    def put(self, key: tuple, ts: float, frame: np.ndarray) -> None:
+        if frame.nbytes > self.max_bytes:
+            return
+        old = self._frames.pop(key, None)
+        if old is not None:
+            self.nbytes -= old[1].nbytes
+        self._frames[key] = (ts, frame)
+        self.nbytes += frame.nbytes
+        while self.nbytes > self.max_bytes:
+            _, (_, evicted) = self._frames.popitem(last=False)
+            self.nbytes -= evicted.nbytes
+
+    def clear(self) -> None:
+        self._frames.clear()
+        self.nbytes = 0
+
+
+class VideoDecoderPool:
+    """Open video containers and decoded frames of one process.
+
+    Args:
+        backend: "pyav" keeps containers open; other torchvision backends ("video_reader") decode
+            through `decode_video_frames_torchvision` and only benefit from the frame cache.
+        cache_bytes: Size of the decoded frame cache (0 disables it).
+        max_open_videos: Containers kept open, the least recently used one is closed beyond that.
+    """
+
+    def __init__(self, backend: str = "pyav", cache_bytes: int = 256 * 1024**2, max_open_videos: int = 32):
+        self.backend = backend
+        self.max_open_videos = max(int(max_open_videos), 1)
+        self.cache = DecodedFrameCache(cache_bytes)
+        self.stats = _CacheStats()
+        self.pid = os.getpid()
+        self._videos: OrderedDict[tuple, _OpenVideo] = OrderedDict()
+
+    # Containers can't be pickled (DataLoader workers started with spawn), each worker opens its own
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_videos"] = OrderedDict()
+        state["cache"] = DecodedFrameCache(self.cache.max_bytes)
+        state["stats"] = _CacheStats()
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.pid = os.getpid()
+
+    def close(self) -> None:
+        for video in self._videos.values():
+            self._close_video(video)
+        self._videos.clear()
+        self.cache.clear()
+
+    def decode(
+        self,
+        key: tuple,
+        video_path: str | Path,
+        timestamps: list[float],
+        tolerance_s: float,
+        fps: float,
+        as_uint8: bool = False,
+    ) -> torch.Tensor:
+        """Frames closest to `timestamps` in the video at `video_path`, as a (N, C, H, W) float32 tensor
+        (uint8 with `as_uint8`).
+
+        `key` identifies the video in the cache, e.g. (episode_index, camera_key).
+        """
+        frame_indices = [int(round(ts * fps)) for ts in timestamps]
+        missing = [
+            ts for ts, idx in zip(timestamps, frame_indices, strict=True) if (*key, idx) not in self.cache
+        ]
+        self.stats.hits += len(timestamps) - len(missing)
+        self.stats.misses += len(missing)
+        # Frames decoded by this call, also looked up here in case the cache is too small to hold them
+        decoded = {}
+        if missing:
+            if self.backend == "pyav":
+                # Far apart timestamps (e.g. samples of a shuffled batch) are decoded from their own key
+                # frames, instead of decoding every frame between them
+                for first_ts, last_ts in _split_on_gaps(missing, MAX_FORWARD_DECODE_S):
+                    decoded.update(self._decode_pyav(key, str(video_path), first_ts, last_ts, fps))
+            else:
+                decoded = self._decode_torchvision(key, str(video_path), missing, tolerance_s, fps)
+
+        frames = []
+        for ts, idx in zip(timestamps, frame_indices, strict=True):
+            # The closest frame is at idx unless the video timestamps drift from frame_index / fps
+            candidates = [decoded.get(i) or self.cache.get((*key, i)) for i in (idx, idx - 1, idx + 1)]
+            candidates = [c for c in candidates if c is not None]
+            closest = min(candidates, key=lambda c: abs(c[0] - ts), default=None)
+            if closest is None or abs(closest[0] - ts) >= tolerance_s:
+                loaded = None if closest is None else closest[0]
+                raise AssertionError(
+                    f"Query timestamp {ts} unexpectedly violates the tolerance ({tolerance_s=}, closest "
+                    f"loaded timestamp: {loaded}). It means that the closest frame that can be loaded from "
+                    "the video is too far away in time. This might be due to synchronization issues with "
+                    f"timestamps during data collection.\nvideo: {video_path}\nbackend: {self.backend}"
+                )
+            frames.append(closest[1])
+
+        frames = torch.from_numpy(np.stack(frames)).permute(0, 3, 1, 2)
+        return frames.contiguous() if as_uint8 else frames.type(torch.float32) / 255
+
+    def _decode_pyav(self, key: tuple, video_path: str, first_ts: float, last_ts: float, fps: float) -> dict:
+        video = self._open(key, video_path)
+        resume = (
+            video.frames is not None
+            and video.last_ts is not None
+            and video.last_ts < first_ts <= video.last_ts + MAX_FORWARD_DECODE_S
+        )
+        if not resume:
+            # Closest key frame before first_ts, like VideoReader.seek(keyframes_only=True)
+            video.container.seek(
+                int(first_ts / video.stream.time_base), stream=video.stream, backward=True, any_frame=False
+            )
+            video.frames = video.container.decode(video.stream)
+            video.last_ts = None
+            self.stats.seeks += 1
+
+        decoded = {}
+        for frame in video.frames:
+            ts = float(frame.pts * video.stream.time_base)
+            video.last_ts = ts
+            idx = int(round(ts * fps))
+            decoded[idx] = (ts, frame.to_ndarray(format="rgb24"))
+            self.cache.put((*key, idx), *decoded[idx])
+            self.stats.decoded += 1
+            if ts >= last_ts:
+                return decoded
+        # End of the video, the next request has to seek
+        video.frames = None
+        return decoded
+
+    def _decode_torchvision(
+        self, key: tuple, video_path: str, timestamps: list[float], tolerance_s: float, fps: float
+    ) -> dict:
+        frames = decode_video_frames_torchvision(video_path, timestamps, tolerance_s, self.backend)
+        frames = (frames * 255).round().type(torch.uint8).permute(0, 2, 3, 1).numpy()
+        decoded = {}
+        for ts, frame in zip(timestamps, frames, strict=True):
+            idx = int(round(ts * fps))
+            decoded[idx] = (ts, frame)
+            self.cache.put((*key, idx), ts, frame)
+        self.stats.decoded += len(timestamps)
+        return decoded
+
+    def _open(self, key: tuple, video_path: str) -> _OpenVideo:
+        video = self._videos.get(key)
+        if video is not None and video.path == video_path:
+            self._videos.move_to_end(key)
+            return video
+        if video is not None:
+            self._close_video(self._videos.pop(key))
+
+        import av
+
+        container = av.open(video_path)
+        stream = container.streams.video[0]
+        stream.thread_type = "AUTO"
+        video = _OpenVideo(container=container, stream=stream, path=video_path)
+        self._videos[key] = video
+        while len(self._videos) > self.max_open_videos:
+            _, evicted = self._videos.popitem(last=False)
+            self._close_video(evicted)
+        return video
+
+    @staticmethod
+    def _close_video(video: _OpenVideo) -> None:
+        try:
+            video.container.close()
+        except Exception as e:
+            logging.debug(f"[VideoDecoderPool] Failed to close {video.path}: {e}")
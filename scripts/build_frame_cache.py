@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+build-frame-cache - Decode the videos of a dataset once for repeated training runs
+
+Writes the decoded frames of every video of the dataset into memory-mapped shards under
+{dataset}/frame_cache/ (see operating_platform/dataset/frame_cache.py). DoRobotDataset then reads
+frames from the cache instead of decoding the videos, as long as the videos don't change.
+Running the command again only decodes the videos that changed.
+
+Usage:
+    # Keep the video resolution
+    python scripts/build_frame_cache.py --dataset ~/DoRobot/dataset/my_repo_id
+
+    # Resize to the input resolution of the policy (height x width)
+    python scripts/build_frame_cache.py --dataset ~/DoRobot/dataset/my_repo_id --resolution 224x224
+
+    # Remove the cache
+    python scripts/build_frame_cache.py --dataset ~/DoRobot/dataset/my_repo_id --clear
+"""
+
+import argparse
+import logging
+import shutil
+import sys
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from operating_platform.dataset.dorobot_dataset import DoRobotDatasetMetadata
+from operating_platform.dataset.frame_cache import FRAME_CACHE_DIR, build_frame_cache
+
+logging.basicConfig(level=logging.INFO, format="[%(levelname)s] %(message)s")
+
+
+def parse_resolution(value: str) -> tuple[int, int]:
+    try:
+        height, width = (int(v) for v in value.lower().split("x"))
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(f"Expected HEIGHTxWIDTH, got '{value}'") from e
+    return height, width
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Decode the videos of a dataset into a frame cache")
+    parser.add_argument("--dataset", type=Path, required=True, help="Dataset root directory")
+    parser.add_argument(
+        "--resolution",
+        type=parse_resolution,
+        default=None,
+        help="Resize frames to HEIGHTxWIDTH (default: keep the video resolution)",
+    )
+    parser.add_argument(
+        "--workers", type=int, default=None, help="Videos decoded in parallel (default: half the CPUs)"
+    )
+    parser.add_argument("--clear", action="store_true", help="Delete the frame cache of the dataset")
+    args = parser.parse_args()
+
+    dataset_root = args.dataset.expanduser().resolve()
+    if args.clear:
+        shutil.rmtree(dataset_root / FRAME_CACHE_DIR, ignore_errors=True)
+        logging.info(f"Removed {dataset_root / FRAME_CACHE_DIR}")
+        return 0
+
+    meta = DoRobotDatasetMetadata(dataset_root.name, root=dataset_root)
+    if not meta.video_keys:
+        logging.error(f"{dataset_root} has no video features")
+        return 1
+
+    index = build_frame_cache(
+        dataset_root,
+        meta.episodes,
+        meta.video_keys,
+        meta.get_video_file_path,
+        resolution=args.resolution,
+        num_workers=args.workers,
+    )
+    logging.info(f"Frame cache ready: {len(index['shards'])} videos in {dataset_root / FRAME_CACHE_DIR}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
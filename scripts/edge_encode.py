@@ -488,10 +488,17 @@ def run_retry_workflow(
             logger.error("This script is for raw image datasets (CLOUD=2 mode)")
             return False
 
-        # Count images
-        png_count = len(list(images_dir.rglob("*.png")))
-        jpg_count = len(list(images_dir.rglob("*.jpg")))
-        image_count = png_count + jpg_count
+        # Count images, per frame format (see operating_platform/utils/frame_format.py)
+        from collections import Counter
+        from operating_platform.utils.frame_format import frame_format_of
+
+        format_counts = Counter()
+        for f in images_dir.rglob("frame_*"):
+            try:
+                format_counts[frame_format_of(f)] += 1
+            except ValueError:
+                continue
+        image_count = sum(format_counts.values())
 
         if image_count == 0:
             logger.error(f"No images found in {images_dir}")
@@ -501,7 +508,8 @@ def run_retry_workflow(
         total_size = sum(f.stat().st_size for f in dataset_path.rglob("*") if f.is_file())
 
         logger.info(f"\nDataset info:")
-        logger.info(f"  Images:   {image_count} ({png_count} PNG, {jpg_count} JPG)")
+        formats = ", ".join(f"{count} {fmt}" for fmt, count in sorted(format_counts.items()))
+        logger.info(f"  Images:   {image_count} ({formats})")
         logger.info(f"  Size:     {total_size / 1024 / 1024:.2f} MB")
 
     # Step 1: Upload to edge server
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Unit tests for ACTTemporalEnsembler
+
+Tests:
+- The ring buffer ensembler gives exactly the actions of the previous implementation (growing tensors
+  concatenated and sliced at every step), for several coefficients, chunk sizes and batch sizes
+- reset starts a new episode
+- Returned actions are not modified by the next updates
+"""
+
+import sys
+import unittest
+from pathlib import Path
+
+import torch
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from operating_platform.policy.act.modeling_act import ACTTemporalEnsembler
+
+
+class ReferenceEnsembler:
+    """The previous implementation of ACTTemporalEnsembler."""
+
+    def __init__(self, temporal_ensemble_coeff: float, chunk_size: int) -> None:
+        self.chunk_size = chunk_size
+        self.ensemble_weights = torch.exp(-temporal_ensemble_coeff * torch.arange(chunk_size))
+        self.ensemble_weights_cumsum = torch.cumsum(self.ensemble_weights, dim=0)
+        self.reset()
+
+    def reset(self):
+        self.ensembled_actions = None
+        self.ensembled_actions_count = None
+
+    def update(self, actions: torch.Tensor) -> torch.Tensor:
+        if self.ensembled_actions is None:
+            self.ensembled_actions = actions.clone()
+            self.ensembled_actions_count = torch.ones((self.chunk_size, 1), dtype=torch.long)
+        else:
+            self.ensembled_actions *= self.ensemble_weights_cumsum[self.ensembled_actions_count - 1]
+            self.ensembled_actions += actions[:, :-1] * self.ensemble_weights[self.ensembled_actions_count]
+            self.ensembled_actions /= self.ensemble_weights_cumsum[self.ensembled_actions_count]
+            self.ensembled_actions_count = torch.clamp(self.ensembled_actions_count + 1, max=self.chunk_size)
+            self.ensembled_actions = torch.cat([self.ensembled_actions, actions[:, -1:]], dim=1)
+            self.ensembled_actions_count = torch.cat(
+                [self.ensembled_actions_count, torch.ones_like(self.ensembled_actions_count[-1:])]
+            )
+        action, self.ensembled_actions, self.ensembled_actions_count = (
+            self.ensembled_actions[:, 0],
+            self.ensembled_actions[:, 1:],
+            self.ensembled_actions_count[1:],
+        )
+        return action
+
+
+class TestACTTemporalEnsembler(unittest.TestCase):
+    """Test ACTTemporalEnsembler."""
+
+    def _compare(self, coeff: float, chunk_size: int, batch_size: int, num_steps: int, reset_at: int = -1):
+        generator = torch.Generator().manual_seed(chunk_size * 100 + batch_size)
+        ensembler = ACTTemporalEnsembler(coeff, chunk_size)
+        reference = ReferenceEnsembler(coeff, chunk_size)
+        returned = []
+        for step in range(num_steps):
+            if step == reset_at:
+                ensembler.reset()
+                reference.reset()
+            actions = torch.randn(batch_size, chunk_size, 3, generator=generator)
+            action = ensembler.update(actions)
+            expected = reference.update(actions.clone())
+            self.assertTrue(torch.equal(action, expected), f"{coeff=} {chunk_size=} {batch_size=} {step=}")
+            returned.append((action, expected.clone()))
+        for action, expected in returned:
+            self.assertTrue(torch.equal(action, expected))
+
+    def test_identical_to_reference(self):
+        for coeff in (0.0, 0.01, -0.1):
+            for chunk_size in (1, 2, 7, 20):
+                for batch_size in (1, 3):
+                    self._compare(coeff, chunk_size, batch_size, num_steps=3 * chunk_size + 2)
+
+    def test_reset(self):
+        self._compare(0.01, chunk_size=10, batch_size=2, num_steps=30, reset_at=13)
+
+
+if __name__ == "__main__":
+    unittest.main()
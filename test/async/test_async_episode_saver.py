@@ -400,6 +400,46 @@ class TestThreadSafety(unittest.TestCase):
         self.patcher1.stop()
         self.patcher2.stop()
 
+    def test_parallel_workers_commit_in_order(self):
+        """Test that parallel saves overlap but commit their metadata in episode order."""
+        saver = AsyncEpisodeSaver(max_queue_size=10, num_workers=2)
+        saver.start(initial_episode_index=0)
+        self.assertEqual(len(saver.worker_threads), 2)
+
+        started = []
+        committed = []
+        lock = threading.Lock()
+
+        def save_episode(episode_data, skip_encoding, commit_order):
+            ep_idx = episode_data["episode_index"]
+            with lock:
+                started.append(ep_idx)
+            # Episode 0 takes longer to encode than episode 1
+            time.sleep(0.5 if ep_idx == 0 else 0.05)
+            with commit_order:
+                with lock:
+                    committed.append(ep_idx)
+            return ep_idx
+
+        mock_dataset = Mock()
+        mock_dataset.meta = Mock(total_episodes=0)
+        mock_dataset.save_episode = Mock(side_effect=save_episode)
+
+        for _ in range(2):
+            saver.queue_save(
+                episode_buffer={"episode_index": saver.allocate_next_index(), "size": 10},
+                dataset=mock_dataset,
+                record_cfg=Mock(root="/tmp/test"),
+                record_cmd={"task_id": "test", "task_data_id": "001"},
+            )
+        time.sleep(0.2)
+        with lock:
+            self.assertEqual(sorted(started), [0, 1])  # Both saving at once
+
+        self.assertTrue(saver.wait_all_complete(timeout=5.0))
+        self.assertEqual(committed, [0, 1])
+        saver.stop(wait_for_completion=False)
+
     def test_concurrent_queue_saves(self):
         """Test that multiple threads can queue saves concurrently."""
         import threading
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Unit tests for AsyncCheckpointWriter
+
+Tests without requiring robot hardware:
+- The background writer produces the same files as save_checkpoint, with the states of the step it
+  was called at even if training continues in the meantime
+- `last` points to the checkpoint once it is written
+"""
+
+import shutil
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+import torch
+from safetensors.torch import load_file
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from operating_platform.config.default import DatasetConfig
+from operating_platform.config.train import TrainPipelineConfig
+from operating_platform.config.types import FeatureType, PolicyFeature
+from operating_platform.optim.factory import make_optimizer_and_scheduler
+from operating_platform.policy.act.configuration_act import ACTConfig
+from operating_platform.policy.act.modeling_act import ACTPolicy
+from operating_platform.utils.constants import (
+    LAST_CHECKPOINT_LINK,
+    OPTIMIZER_STATE,
+    PRETRAINED_MODEL_DIR,
+    RNG_STATE,
+    TRAINING_STATE_DIR,
+    TRAINING_STEP,
+)
+from operating_platform.utils.dataset import load_json
+from operating_platform.utils.train_utils import AsyncCheckpointWriter, save_checkpoint
+
+FEATURES = {"observation.state": 4, "observation.environment_state": 2, "action": 3}
+
+
+class TestAsyncCheckpointWriter(unittest.TestCase):
+    """Test AsyncCheckpointWriter."""
+
+    def setUp(self):
+        self.tmp_dir = Path(tempfile.mkdtemp())
+        policy_cfg = ACTConfig(
+            input_features={
+                key: PolicyFeature(FeatureType.ENV if "environment" in key else FeatureType.STATE, (dim,))
+                for key, dim in FEATURES.items()
+                if key != "action"
+            },
+            output_features={"action": PolicyFeature(FeatureType.ACTION, (FEATURES["action"],))},
+            dim_model=32,
+            n_heads=2,
+            dim_feedforward=64,
+            n_encoder_layers=1,
+            n_decoder_layers=1,
+            chunk_size=5,
+            n_action_steps=5,
+            device="cpu",
+            pretrained_backbone_weights=None,
+        )
+        self.cfg = TrainPipelineConfig(
+            dataset=DatasetConfig(repo_id="test"), policy=policy_cfg, output_dir=self.tmp_dir / "run"
+        )
+        self.cfg.validate()
+        stats = {key: {"mean": np.zeros(dim), "std": np.ones(dim)} for key, dim in FEATURES.items()}
+        self.policy = ACTPolicy(policy_cfg, dataset_stats=stats)
+        self.optimizer, self.scheduler = make_optimizer_and_scheduler(self.cfg, self.policy)
+        self._train_step()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def _train_step(self):
+        batch = {key: torch.randn(2, dim) for key, dim in FEATURES.items() if key != "action"}
+        batch["action"] = torch.randn(2, 5, FEATURES["action"])
+        batch["action_is_pad"] = torch.zeros(2, 5, dtype=torch.bool)
+        loss, _ = self.policy.forward(batch)
+        loss.backward()
+        self.optimizer.step()
+        self.optimizer.zero_grad()
+
+    def test_same_files_as_save_checkpoint(self):
+        sync_dir = self.tmp_dir / "sync" / "000001"
+        async_dir = self.tmp_dir / "async" / "000001"
+        save_checkpoint(sync_dir, 1, self.cfg, self.policy, self.optimizer, self.scheduler)
+
+        writer = AsyncCheckpointWriter(max_pending=1)
+        done = []
+        writer.save(async_dir, 1, self.cfg, self.policy, self.optimizer, self.scheduler, on_done=done.append)
+        # Training goes on while the checkpoint is written
+        self._train_step()
+        writer.close()
+
+        self.assertEqual(done, [async_dir])
+        self.assertEqual((async_dir.parent / LAST_CHECKPOINT_LINK).resolve(), async_dir.resolve())
+        self.assertFalse(any(p.name.endswith(".tmp") for p in async_dir.parent.iterdir()))
+        sync_files = sorted(p.relative_to(sync_dir) for p in sync_dir.rglob("*"))
+        self.assertEqual(sorted(p.relative_to(async_dir) for p in async_dir.rglob("*")), sync_files)
+        for name in (
+            Path(PRETRAINED_MODEL_DIR) / "model.safetensors",
+            Path(TRAINING_STATE_DIR) / OPTIMIZER_STATE,
+            Path(TRAINING_STATE_DIR) / RNG_STATE,
+        ):
+            expected, actual = load_file(sync_dir / name), load_file(async_dir / name)
+            self.assertEqual(expected.keys(), actual.keys())
+            for key in expected:
+                self.assertTrue(torch.equal(expected[key], actual[key]), f"{name}: {key}")
+        for path in sync_files:
+            if path.suffix == ".json":
+                self.assertEqual(load_json(async_dir / path), load_json(sync_dir / path), path)
+
+    def test_max_pending(self):
+        writer = AsyncCheckpointWriter(max_pending=1)
+        for step in range(1, 4):
+            writer.save(self.tmp_dir / "run" / f"{step:06d}", step, self.cfg, self.policy, self.optimizer)
+            self.assertLessEqual(len(writer._pending), 1)
+        writer.close()
+        last_dir = self.tmp_dir / "run" / "000003"
+        self.assertEqual(load_json(last_dir / TRAINING_STATE_DIR / TRAINING_STEP), {"step": 3})
+        self.assertEqual((self.tmp_dir / "run" / LAST_CHECKPOINT_LINK).resolve(), last_dir.resolve())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the memory-mapped column store
+
+Tests without requiring robot hardware:
+- Numeric parquet columns are stored in index order with the dtypes of hf_transform_to_torch
+- The store is rebuilt when the parquet files change
+- DoRobotDataset items read through the store match the hf_dataset reads, with delta_timestamps
+  windows, their _is_pad masks and an `episodes=` subset
+"""
+
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+
+import datasets
+import numpy as np
+import torch
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from operating_platform.dataset.column_store import ColumnStore
+from operating_platform.utils.dataset import get_hf_features_from_features
+
+try:
+    from operating_platform.dataset.dorobot_dataset import DoRobotDataset
+except (ImportError, OSError):  # e.g. PortAudio missing for sounddevice
+    DoRobotDataset = None
+
+FEATURES = {
+    "observation.state": {"dtype": "float32", "shape": (3,)},
+    "observation.images.top": {"dtype": "video", "shape": (4, 4, 3)},
+    "timestamp": {"dtype": "float32", "shape": (1,)},
+    "index": {"dtype": "int64", "shape": (1,)},
+}
+
+
+class TestColumnStore(unittest.TestCase):
+    """Test ColumnStore."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        self.files = []
+        self.states = []
+        for ep_idx, start in enumerate([0, 5]):
+            state = np.random.default_rng(ep_idx).random((5, 3), dtype=np.float32)
+            self.states.append(state)
+            self._write_episode(ep_idx, start, state)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _write_episode(self, ep_idx, start, state):
+        fpath = f"data/chunk-000/episode_{ep_idx:06d}.parquet"
+        (self.root / fpath).parent.mkdir(parents=True, exist_ok=True)
+        datasets.Dataset.from_dict(
+            {
+                "observation.state": state.tolist(),
+                "timestamp": (np.arange(len(state)) / 30).tolist(),
+                "index": list(range(start, start + len(state))),
+            },
+            features=get_hf_features_from_features(FEATURES),
+        ).to_parquet(self.root / fpath)
+        if fpath not in self.files:
+            self.files.append(fpath)
+
+    def test_columns(self):
+        # Episodes given out of index order are still stored in index order
+        store = ColumnStore.load_or_build(self.root, FEATURES, self.files[::-1])
+        self.assertEqual(set(store.keys()), {"observation.state", "timestamp", "index"})
+        self.assertIsInstance(store["observation.state"], np.memmap)
+        np.testing.assert_array_equal(store["index"], np.arange(10))
+        np.testing.assert_array_equal(store["observation.state"], np.concatenate(self.states))
+        self.assertEqual(store["timestamp"].dtype, np.float32)
+        self.assertEqual(store["timestamp"].shape, (10,))
+
+    def test_rebuilt_on_change(self):
+        ColumnStore.load_or_build(self.root, FEATURES, self.files)
+        self._write_episode(1, 5, np.zeros((5, 3), dtype=np.float32))
+        store = ColumnStore.load_or_build(self.root, FEATURES, self.files)
+        np.testing.assert_array_equal(store["observation.state"][5:], 0)
+
+
+@unittest.skipIf(DoRobotDataset is None, "DoRobotDataset can't be imported")
+class TestColumnStoreDataset(unittest.TestCase):
+    """Test DoRobotDataset with column_store on against the hf_dataset reads."""
+
+    FPS = 10
+    EPISODE_LENGTHS = [4, 6, 3]
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        cls.root = Path(cls.tmp.name) / "dataset"
+        features = {
+            "observation.state": {"dtype": "float32", "shape": (2,), "names": None},
+            "action": {"dtype": "float32", "shape": (3,), "names": None},
+        }
+        robot = SimpleNamespace(robot_type="test", cameras={}, microphones={})
+        dataset = DoRobotDataset.create("test/columns", cls.FPS, root=cls.root, robot=robot, features=features)
+        rng = np.random.default_rng(0)
+        for length in cls.EPISODE_LENGTHS:
+            for _ in range(length):
+                frame = {
+                    "observation.state": rng.random(2, dtype=np.float32),
+                    "action": rng.random(3, dtype=np.float32),
+                }
+                dataset.add_frame(frame, task="pick")
+            dataset.save_episode()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+
+    def assert_same_items(self, **kwargs):
+        reference = DoRobotDataset("test/columns", root=self.root, **kwargs)
+        dataset = DoRobotDataset("test/columns", root=self.root, column_store=True, **kwargs)
+        self.assertIsNotNone(dataset.column_store)
+        self.assertEqual(len(dataset), len(reference))
+
+        indices = list(range(len(reference)))
+        for batch in (dataset.__getitems__(indices), [dataset[idx] for idx in indices]):
+            for idx, item in zip(indices, batch, strict=True):
+                expected = reference[idx]
+                self.assertEqual(list(item), list(expected), idx)
+                for key, value in expected.items():
+                    if isinstance(value, torch.Tensor):
+                        self.assertEqual(item[key].dtype, value.dtype, (idx, key))
+                        self.assertTrue(torch.equal(item[key], value), (idx, key))
+                    else:
+                        self.assertEqual(item[key], value, (idx, key))
+
+    def test_all_episodes(self):
+        self.assert_same_items()
+
+    def test_delta_timestamps_subset(self):
+        delta_timestamps = {
+            "observation.state": [-2 / self.FPS, -1 / self.FPS, 0.0],
+            "action": [0.0, 1 / self.FPS, 2 / self.FPS],
+        }
+        self.assert_same_items(delta_timestamps=delta_timestamps, episodes=[0, 2])
+        self.assert_same_items(delta_timestamps=delta_timestamps, episodes=[1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Unit tests for DoRobotDataset.__getitems__
+
+Tests on small datasets written to a temporary directory, without requiring robot hardware:
+- __getitems__ returns the items of __getitem__, with the same keys in the same order
+- delta_timestamps windows and their _is_pad masks at the edges of the episodes
+- Datasets loaded with an `episodes=` subset
+- Video frames, decoded once per batch (requires PyAV)
+"""
+
+import importlib.util
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+import torch
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+try:
+    from operating_platform.dataset.dorobot_dataset import DoRobotDataset
+except (ImportError, OSError):  # e.g. PortAudio missing for sounddevice
+    DoRobotDataset = None
+
+HAS_AV = importlib.util.find_spec("av") is not None
+FPS = 10
+EPISODE_LENGTHS = [4, 6, 3]
+CAMERA = "observation.images.top"
+HEIGHT, WIDTH = 16, 16
+
+
+def write_dataset(root: Path, with_video: bool = False) -> None:
+    """Episodes of EPISODE_LENGTHS frames whose values encode (episode, frame)."""
+    features = {
+        "observation.state": {"dtype": "float32", "shape": (2,), "names": None},
+        "action": {"dtype": "float32", "shape": (3,), "names": None},
+    }
+    if with_video:
+        features[CAMERA] = {
+            "dtype": "video",
+            "shape": (HEIGHT, WIDTH, 3),
+            "names": ["height", "width", "channels"],
+            "info": {"video.fps": FPS},
+        }
+    robot = SimpleNamespace(robot_type="test", cameras={}, microphones={})
+    dataset = DoRobotDataset.create("test/getitems", FPS, root=root, robot=robot, features=features)
+    for ep_idx, length in enumerate(EPISODE_LENGTHS):
+        frames = []
+        for i in range(length):
+            value = 100 * ep_idx + i
+            frame = {
+                "observation.state": np.full(2, value, dtype=np.float32),
+                "action": np.full(3, -value, dtype=np.float32),
+            }
+            if with_video:
+                frames.append(np.full((HEIGHT, WIDTH, 3), 20 * i + 60 * ep_idx, dtype=np.uint8))
+                frame[CAMERA] = frames[-1]
+            dataset.add_frame(frame, task=f"task {ep_idx % 2}")
+        dataset.save_episode(skip_encoding=with_video)
+        if with_video:
+            write_video(root / dataset.meta.get_video_file_path(ep_idx, CAMERA), frames)
+
+
+def write_video(path: Path, frames: list[np.ndarray]) -> None:
+    import av
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with av.open(str(path), "w") as container:
+        stream = container.add_stream("mpeg4", rate=FPS)
+        stream.width, stream.height, stream.pix_fmt = WIDTH, HEIGHT, "yuv420p"
+        for frame in frames:
+            for packet in stream.encode(av.VideoFrame.from_ndarray(frame, format="rgb24")):
+                container.mux(packet)
+        for packet in stream.encode():
+            container.mux(packet)
+
+
+@unittest.skipIf(DoRobotDataset is None, "DoRobotDataset can't be imported")
+class TestGetItems(unittest.TestCase):
+    """Test that DoRobotDataset.__getitems__ matches __getitem__."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        cls.root = Path(cls.tmp.name) / "dataset"
+        write_dataset(cls.root)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+
+    def assert_items_equal(self, dataset, indices: list[int]) -> None:
+        batch = dataset.__getitems__(indices)
+        self.assertEqual(len(batch), len(indices))
+        for idx, item in zip(indices, batch, strict=True):
+            expected = dataset[idx]
+            self.assertEqual(list(item), list(expected), idx)
+            for key, value in expected.items():
+                if isinstance(value, torch.Tensor):
+                    self.assertEqual(item[key].dtype, value.dtype, (idx, key))
+                    self.assertTrue(torch.equal(item[key], value), (idx, key))
+                else:
+                    self.assertEqual(item[key], value, (idx, key))
+
+    def test_plain(self):
+        dataset = DoRobotDataset("test/getitems", root=self.root)
+        self.assert_items_equal(dataset, [5, 0, 12, 5, 3])
+
+    def test_delta_timestamps(self):
+        delta_timestamps = {
+            "observation.state": [-2 / FPS, -1 / FPS, 0.0],
+            "action": [0.0, 1 / FPS, 2 / FPS, 3 / FPS],
+        }
+        dataset = DoRobotDataset("test/getitems", root=self.root, delta_timestamps=delta_timestamps)
+        # First and last frames of each episode, padded on either side
+        self.assert_items_equal(dataset, list(range(len(dataset))))
+
+        item = dataset.__getitems__([4])[0]  # First frame of episode 1
+        self.assertEqual(item["observation.state_is_pad"].tolist(), [True, True, False])
+        self.assertEqual(item["observation.state"][:, 0].tolist(), [100.0, 100.0, 100.0])
+        self.assertEqual(item["action"][:, 0].tolist(), [-100.0, -101.0, -102.0, -103.0])
+
+    def test_episode_subset(self):
+        delta_timestamps = {"action": [-1 / FPS, 0.0, 1 / FPS]}
+        dataset = DoRobotDataset(
+            "test/getitems", root=self.root, episodes=[0, 2], delta_timestamps=delta_timestamps
+        )
+        self.assertEqual(len(dataset), EPISODE_LENGTHS[0] + EPISODE_LENGTHS[2])
+        self.assert_items_equal(dataset, list(range(len(dataset))))
+
+        # First frame of episode 2, the second episode of the subset
+        item = dataset.__getitems__([EPISODE_LENGTHS[0]])[0]
+        self.assertEqual(item["episode_index"].item(), 2)
+        self.assertEqual(item["action_is_pad"].tolist(), [True, False, False])
+        self.assertEqual(item["action"][:, 0].tolist(), [-200.0, -200.0, -201.0])
+
+
+@unittest.skipIf(DoRobotDataset is None, "DoRobotDataset can't be imported")
+@unittest.skipUnless(HAS_AV, "PyAV is not installed")
+class TestGetItemsVideo(TestGetItems):
+    """Test __getitems__ on a dataset with a video."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        cls.root = Path(cls.tmp.name) / "dataset"
+        write_dataset(cls.root, with_video=True)
+
+    def test_video_delta_timestamps(self):
+        delta_timestamps = {CAMERA: [-1 / FPS, 0.0], "action": [0.0, 1 / FPS]}
+        dataset = DoRobotDataset("test/getitems", root=self.root, delta_timestamps=delta_timestamps)
+        self.assert_items_equal(dataset, [0, 1, 2, 4, 9, 10, 12])
+
+        item = dataset.__getitems__([5])[0]
+        self.assertEqual(item[CAMERA].shape, (2, 3, HEIGHT, WIDTH))
+        self.assertEqual(item[f"{CAMERA}_is_pad"].tolist(), [False, False])
+
+
+if __name__ == "__main__":
+    unittest.main()
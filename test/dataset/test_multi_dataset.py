@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Unit tests for MultiDoRobotDataset
+
+Tests on small datasets written to a temporary directory, without requiring robot hardware:
+- Global indices (negative ones included) map to the right row of the right dataset, in input order,
+  through __getitem__ and __getitems__
+- Out of range indices raise IndexError
+- Features not common to all the datasets are dropped
+- episode_data_index, meta.info and meta.stats describe the merged datasets
+"""
+
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+import torch
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from operating_platform.dataset.compute_stats import aggregate_stats
+
+try:
+    from operating_platform.dataset.dorobot_dataset import DoRobotDataset, MultiDoRobotDataset
+except (ImportError, OSError):  # e.g. PortAudio missing for sounddevice
+    DoRobotDataset = MultiDoRobotDataset = None
+
+FPS = 10
+# Episode lengths of each dataset
+EPISODE_LENGTHS = {"a": [4, 6], "b": [3, 5, 2]}
+
+
+def state_value(dataset_idx: int, ep_idx: int, frame_index: int) -> float:
+    return 1000 * dataset_idx + 100 * ep_idx + frame_index
+
+
+def write_dataset(root: Path, dataset_idx: int, lengths: list[int], extra_feature: bool) -> None:
+    features = {
+        "observation.state": {"dtype": "float32", "shape": (2,), "names": None},
+        "action": {"dtype": "float32", "shape": (2,), "names": None},
+    }
+    if extra_feature:
+        features["observation.extra"] = {"dtype": "float32", "shape": (2,), "names": None}
+    robot = SimpleNamespace(robot_type="test", cameras={}, microphones={})
+    dataset = DoRobotDataset.create(root.name, FPS, root=root, robot=robot, features=features)
+    for ep_idx, length in enumerate(lengths):
+        for i in range(length):
+            value = state_value(dataset_idx, ep_idx, i)
+            frame = {
+                "observation.state": np.full(2, value, dtype=np.float32),
+                "action": np.full(2, -value, dtype=np.float32),
+            }
+            if extra_feature:
+                frame["observation.extra"] = np.zeros(2, dtype=np.float32)
+            dataset.add_frame(frame, task="pick")
+        dataset.save_episode()
+
+
+@unittest.skipIf(DoRobotDataset is None, "DoRobotDataset can't be imported")
+class TestMultiDoRobotDataset(unittest.TestCase):
+    """Test MultiDoRobotDataset."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        cls.root = Path(cls.tmp.name)
+        for dataset_idx, (repo_id, lengths) in enumerate(EPISODE_LENGTHS.items()):
+            write_dataset(cls.root / repo_id, dataset_idx, lengths, extra_feature=repo_id == "b")
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+
+    def make_dataset(self, **kwargs) -> MultiDoRobotDataset:
+        return MultiDoRobotDataset(list(EPISODE_LENGTHS), root=self.root, **kwargs)
+
+    def expected_rows(self, episodes: dict | None = None) -> list[tuple[int, float]]:
+        """(dataset_index, state value) of each global index."""
+        rows = []
+        for dataset_idx, (repo_id, lengths) in enumerate(EPISODE_LENGTHS.items()):
+            selected = episodes[repo_id] if episodes else range(len(lengths))
+            for ep_idx in selected:
+                rows += [(dataset_idx, state_value(dataset_idx, ep_idx, i)) for i in range(lengths[ep_idx])]
+        return rows
+
+    def assert_rows(self, dataset, indices, items, rows) -> None:
+        self.assertEqual(len(items), len(indices))
+        for idx, item in zip(indices, items, strict=True):
+            dataset_idx, value = rows[idx]
+            self.assertEqual(item["dataset_index"].item(), dataset_idx, idx)
+            self.assertEqual(item["observation.state"][0].item(), value, idx)
+            self.assertNotIn("observation.extra", item)
+
+    def test_indices(self):
+        dataset = self.make_dataset()
+        rows = self.expected_rows()
+        self.assertEqual(len(dataset), len(rows))
+
+        indices = list(range(len(dataset)))
+        self.assert_rows(dataset, indices, [dataset[idx] for idx in indices], rows)
+        # Mixed datasets, out of order, with repeats
+        indices = [12, 0, 9, 10, 3, 19, 0, 11]
+        self.assert_rows(dataset, indices, dataset.__getitems__(indices), rows)
+
+        # Negative indices count from the end
+        self.assert_rows(dataset, [len(rows) - 1], [dataset[-1]], rows)
+        self.assert_rows(dataset, [len(rows) - 1, 0], dataset.__getitems__([-1, -len(rows)]), rows)
+        for idx in (len(rows), -len(rows) - 1):
+            with self.assertRaises(IndexError):
+                dataset[idx]
+            with self.assertRaises(IndexError):
+                dataset.__getitems__([0, idx])
+
+    def test_episode_subset(self):
+        episodes = {"a": [1], "b": [0, 2]}
+        dataset = self.make_dataset(episodes=episodes)
+        rows = self.expected_rows(episodes)
+        self.assertEqual(len(dataset), len(rows))
+        self.assertEqual(dataset.offsets, [0, 6])
+
+        indices = list(range(len(dataset)))
+        self.assert_rows(dataset, indices, [dataset[idx] for idx in indices], rows)
+        self.assert_rows(dataset, indices[::-1], dataset.__getitems__(indices[::-1]), rows)
+
+        self.assertEqual(dataset.episode_data_index["from"].tolist(), [0, 6, 9])
+        self.assertEqual(dataset.episode_data_index["to"].tolist(), [6, 9, 11])
+
+    def test_meta(self):
+        dataset = self.make_dataset(episodes={"a": [0, 1], "b": [1, 2]})
+        sub_datasets = dataset.sub_datasets
+
+        self.assertEqual(dataset.meta.info["total_frames"], 10 + 7)
+        self.assertEqual(dataset.meta.info["total_episodes"], 4)
+        self.assertNotIn("observation.extra", dataset.meta.features)
+        # The metadata of the first dataset is left as it is
+        self.assertEqual(sub_datasets[0].meta.info["total_frames"], 10)
+        self.assertIn("observation.extra", sub_datasets[1].meta.features)
+
+        expected = aggregate_stats([ds.meta.stats for ds in sub_datasets])
+        self.assertNotIn("observation.extra", dataset.meta.stats)
+        self.assertIs(dataset.meta.stats, dataset.stats)
+        for key in ("observation.state", "action"):
+            for stat, value in expected[key].items():
+                np.testing.assert_allclose(dataset.meta.stats[key][stat], value, err_msg=f"{key} {stat}")
+        self.assertEqual(dataset.meta.stats["observation.state"]["max"][0], state_value(1, 2, 1))
+        self.assertIsNot(sub_datasets[0].meta.stats, dataset.meta.stats)
+
+
+if __name__ == "__main__":
+    unittest.main()
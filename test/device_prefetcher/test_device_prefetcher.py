@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Unit tests for DevicePrefetcher
+
+Tests without requiring robot hardware:
+- Batches come out in order, with non-tensor values passed through, until the loader runs out
+- On CUDA, staged batches are on the device and match the loader batches
+"""
+
+import sys
+import unittest
+from pathlib import Path
+
+import torch
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from operating_platform.utils.device_prefetcher import DevicePrefetcher
+
+
+def make_batches(num_batches: int, batch_size: int = 4) -> list[dict]:
+    return [
+        {
+            "observation.state": torch.arange(batch_size * 3, dtype=torch.float32).reshape(batch_size, 3) + i,
+            "index": torch.arange(batch_size) + i * batch_size,
+            "task": ["pick"] * batch_size,
+        }
+        for i in range(num_batches)
+    ]
+
+
+class TestDevicePrefetcher(unittest.TestCase):
+    """Test DevicePrefetcher."""
+
+    def _check(self, device: str, depth: int):
+        batches = make_batches(5)
+        out = list(DevicePrefetcher(batches, device, depth=depth))
+        self.assertEqual(len(out), len(batches))
+        for expected, batch in zip(batches, out, strict=True):
+            self.assertEqual(list(batch), list(expected))
+            self.assertEqual(batch["task"], expected["task"])
+            for key in ("observation.state", "index"):
+                self.assertEqual(batch[key].device.type, torch.device(device).type)
+                self.assertTrue(torch.equal(batch[key].cpu(), expected[key]))
+
+    def test_cpu(self):
+        for depth in (0, 2):
+            self._check("cpu", depth)
+
+    @unittest.skipUnless(torch.cuda.is_available(), "CUDA is not available")
+    def test_cuda(self):
+        for depth in (0, 1, 3):
+            self._check("cuda", depth)
+
+
+if __name__ == "__main__":
+    unittest.main()
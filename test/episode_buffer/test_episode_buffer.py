@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the columnar episode buffer
+
+Tests without requiring robot hardware:
+- Columns grow past their initial capacity and match np.stack of the appended values
+- Sealing hands over array views without copying
+- Stats accumulated frame by frame match compute_episode_stats
+"""
+
+import sys
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from operating_platform.dataset.compute_stats import compute_episode_stats
+from operating_platform.dataset.episode_buffer import EpisodeBuffer, GrowableColumn
+
+FEATURES = {
+    "observation.state": {"dtype": "float32", "shape": (6,)},
+    "observation.images.top": {"dtype": "video", "shape": (4, 4, 3)},
+    "timestamp": {"dtype": "float32", "shape": (1,)},
+    "frame_index": {"dtype": "int64", "shape": (1,)},
+    "episode_index": {"dtype": "int64", "shape": (1,)},
+}
+
+
+class TestGrowableColumn(unittest.TestCase):
+    """Test GrowableColumn."""
+
+    def test_growth_matches_stack(self):
+        column = GrowableColumn(capacity=2)
+        values = [np.arange(6, dtype=np.float32) + i for i in range(9)]
+        for value in values:
+            column.append(value)
+
+        self.assertEqual(len(column), 9)
+        np.testing.assert_array_equal(column[-1], values[-1])
+        stacked = np.stack(values)
+        np.testing.assert_array_equal(np.asarray(column), stacked)
+        self.assertEqual(np.asarray(column).dtype, stacked.dtype)
+
+    def test_scalars(self):
+        column = GrowableColumn(capacity=4)
+        for i in range(5):
+            column.append(i / 30)
+        self.assertEqual(np.asarray(column).shape, (5,))
+        self.assertEqual(np.asarray(column).dtype, np.float64)
+
+
+class TestEpisodeBuffer(unittest.TestCase):
+    """Test EpisodeBuffer layout and sealing."""
+
+    def test_layout(self):
+        buffer = EpisodeBuffer(FEATURES, episode_index=3, capacity=4)
+        self.assertEqual(buffer["episode_index"], 3)
+        self.assertEqual(buffer["size"], 0)
+        self.assertIsInstance(buffer["observation.images.top"], list)
+        self.assertIsInstance(buffer["observation.state"], GrowableColumn)
+        self.assertEqual(set(buffer) - {"size", "task"}, set(FEATURES))
+
+    def test_seal_is_a_view(self):
+        buffer = EpisodeBuffer(FEATURES, episode_index=0, capacity=4)
+        for i in range(10):
+            buffer["observation.state"].append(np.full(6, i, dtype=np.float32))
+            buffer["timestamp"].append(i / 30)
+            buffer["size"] += 1
+        column = buffer["observation.state"]
+
+        sealed = buffer.seal()
+        self.assertIs(sealed, buffer)
+        self.assertTrue(sealed.sealed)
+        self.assertIsInstance(sealed["observation.state"], np.ndarray)
+        self.assertEqual(sealed["observation.state"].shape, (10, 6))
+        self.assertTrue(np.shares_memory(sealed["observation.state"], column.array))
+        self.assertEqual(sealed["timestamp"][-1], 9 / 30)
+
+
+class TestOnlineEpisodeStats(unittest.TestCase):
+    """Test the stats accumulated by EpisodeBuffer.stats."""
+
+    def test_matches_compute_episode_stats(self):
+        rng = np.random.default_rng(0)
+        buffer = EpisodeBuffer(FEATURES, episode_index=0, capacity=4)
+        frames = rng.integers(0, 256, size=(20, 4, 4, 3), dtype=np.uint8)
+        for i in range(20):
+            values = {
+                "observation.state": rng.normal(size=6).astype(np.float32),
+                "observation.images.top": frames[i],
+                "timestamp": i / 30,
+                "frame_index": i,
+            }
+            for key, value in values.items():
+                buffer.stats.add(key, value)
+                if key != "observation.images.top":
+                    buffer[key].append(value)
+            buffer["size"] += 1
+        buffer.seal()
+        buffer["episode_index"] = np.zeros(20, dtype=np.int64)
+
+        ep_stats = buffer.stats.finalize({k: v for k, v in buffer.items() if k in FEATURES}, 20)
+        expected = compute_episode_stats(
+            {
+                "observation.state": buffer["observation.state"],
+                "observation.images.top": frames.transpose(0, 3, 1, 2),
+                "timestamp": buffer["timestamp"],
+                "frame_index": buffer["frame_index"],
+                "episode_index": buffer["episode_index"],
+            },
+            FEATURES,
+        )
+
+        self.assertEqual(list(ep_stats), list(expected))
+        for key in expected:
+            for stat in expected[key]:
+                self.assertEqual(ep_stats[key][stat].shape, expected[key][stat].shape, f"{key}/{stat}")
+                np.testing.assert_allclose(ep_stats[key][stat], expected[key][stat], rtol=1e-5, atol=1e-6)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the pre-decoded frame cache
+
+Tests without requiring robot hardware:
+- Frames closest to the query timestamps are read from the shards
+- Shards of videos that changed since they were decoded are not used
+- build_frame_cache decodes and resizes every frame of a video (requires PyAV)
+"""
+
+import importlib.util
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from operating_platform.dataset.frame_cache import (
+    FRAME_CACHE_DIR,
+    INDEX_NAME,
+    FrameCache,
+    _shard_paths,
+    _video_signature,
+    build_frame_cache,
+)
+from operating_platform.utils.dataset import write_json
+
+HAS_AV = importlib.util.find_spec("av") is not None
+FPS = 30
+KEY = "observation.images.top"
+
+
+def video_path_fn(ep_idx, vid_key):
+    return f"videos/chunk-000/{vid_key}/episode_{ep_idx:06d}.mp4"
+
+
+class TestFrameCache(unittest.TestCase):
+    """Test FrameCache with hand-written shards."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        self.video = self.root / video_path_fn(0, KEY)
+        self.video.parent.mkdir(parents=True)
+        self.video.write_bytes(b"not a real video")
+
+        cache_dir = self.root / FRAME_CACHE_DIR
+        frames_path, ts_path = _shard_paths(cache_dir, KEY, 0)
+        frames_path.parent.mkdir(parents=True)
+        self.frames = np.arange(10, dtype=np.uint8)[:, None, None, None] * np.ones((1, 3, 2, 2), dtype=np.uint8)
+        np.save(frames_path, self.frames)
+        np.save(ts_path, np.arange(10) / FPS)
+        write_json(
+            {"resolution": None, "shards": {f"{KEY}/0": {"num_frames": 10, "video": _video_signature(self.video)}}},
+            cache_dir / INDEX_NAME,
+        )
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_frames(self):
+        cache = FrameCache.load(self.root, [KEY], video_path_fn)
+        self.assertIn((0, KEY), cache)
+        frames = cache.frames(0, KEY, [0.0, 3 / FPS, 9 / FPS], 1e-4, FPS)
+        self.assertEqual(frames.shape, (3, 3, 2, 2))
+        np.testing.assert_allclose(frames[:, 0, 0, 0].numpy(), np.array([0, 3, 9]) / 255)
+        with self.assertRaises(AssertionError):
+            cache.frames(0, KEY, [0.5 / FPS], 1e-4, FPS)
+
+    def test_stale_shard(self):
+        self.video.write_bytes(b"re-encoded, longer video")
+        cache = FrameCache.load(self.root, [KEY], video_path_fn)
+        self.assertNotIn((0, KEY), cache)
+
+
+@unittest.skipUnless(HAS_AV, "PyAV is not installed")
+class TestBuildFrameCache(unittest.TestCase):
+    """Test build_frame_cache on a small video."""
+
+    def test_build(self):
+        import av
+
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            video = root / video_path_fn(0, KEY)
+            video.parent.mkdir(parents=True)
+            with av.open(str(video), "w") as container:
+                stream = container.add_stream("mpeg4", rate=FPS)
+                stream.width, stream.height, stream.pix_fmt = 64, 48, "yuv420p"
+                for i in range(12):
+                    image = np.full((48, 64, 3), 20 * i, dtype=np.uint8)
+                    for packet in stream.encode(av.VideoFrame.from_ndarray(image, format="rgb24")):
+                        container.mux(packet)
+                for packet in stream.encode():
+                    container.mux(packet)
+
+            index = build_frame_cache(root, {0: {"length": 12}}, [KEY], video_path_fn, resolution=(24, 32))
+            self.assertEqual(index["shards"][f"{KEY}/0"]["num_frames"], 12)
+            frames = FrameCache.load(root, [KEY], video_path_fn).frames(0, KEY, [5 / FPS], 1e-4, FPS)
+            self.assertEqual(frames.shape, (1, 3, 24, 32))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""
+Unit tests for AsyncImageWriter per-episode completion tracking
+
+Tests without requiring robot hardware:
+- wait_episode returns once every image of the episode is written
+- Expected counts that were not queued yet keep it waiting
+- Write errors are reported back to the waiter
+- DoRobotDataset forgets the counters of an episode once waited for, also on error or timeout
+- Byte-bounded queue overflow policies (spill, degrade, backpressure), spills written outside the lock
+- Intermediate frame formats selected by the file suffix
+"""
+
+import sys
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+import PIL.Image
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from operating_platform.dataset.image_writer import AsyncImageWriter, ImageWriteError
+from operating_platform.utils.dataset import load_image_as_numpy
+from operating_platform.utils.frame_format import FrameFormat, list_frames, read_frame
+
+try:
+    from operating_platform.dataset.dorobot_dataset import DoRobotDataset
+except (ImportError, OSError):  # e.g. PortAudio missing for sounddevice
+    DoRobotDataset = None
+
+try:
+    import lz4  # noqa: F401
+
+    HAS_LZ4 = True
+except ImportError:
+    HAS_LZ4 = False
+
+
+class TestEpisodeTracking(unittest.TestCase):
+    """Test AsyncImageWriter.wait_episode."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _save_episode(self, writer, episode_index, key, num_frames):
+        for i in range(num_frames):
+            fpath = self.root / key / f"episode_{episode_index:06d}" / f"frame_{i:06d}.png"
+            fpath.parent.mkdir(parents=True, exist_ok=True)
+            writer.save_image(np.zeros((8, 8, 3), dtype=np.uint8), fpath, episode_index, key)
+
+    def _check_episode_complete(self, writer):
+        self._save_episode(writer, 0, "top", 5)
+        self._save_episode(writer, 0, "wrist", 5)
+        self._save_episode(writer, 1, "top", 3)
+
+        self.assertTrue(writer.wait_episode(0, expected_counts={"top": 5, "wrist": 5}, timeout=10.0))
+        self.assertEqual(len(list((self.root / "top" / "episode_000000").glob("*.png"))), 5)
+        self.assertEqual(writer.episode_progress(0), {"top": (5, 5), "wrist": (5, 5)})
+
+        writer.forget_episode(0)
+        self.assertEqual(writer.episode_progress(0), {})
+
+    def test_threads(self):
+        writer = AsyncImageWriter(num_processes=0, num_threads=2)
+        try:
+            self._check_episode_complete(writer)
+        finally:
+            writer.stop()
+
+    def test_processes(self):
+        writer = AsyncImageWriter(num_processes=1, num_threads=2)
+        try:
+            self._check_episode_complete(writer)
+        finally:
+            writer.stop()
+
+    def test_missing_frames_time_out(self):
+        writer = AsyncImageWriter(num_processes=0, num_threads=1)
+        try:
+            self._save_episode(writer, 0, "top", 2)
+            self.assertFalse(writer.wait_episode(0, expected_counts={"top": 3}, timeout=0.2))
+        finally:
+            writer.stop()
+
+    def test_write_error_reported(self):
+        writer = AsyncImageWriter(num_processes=0, num_threads=1)
+        try:
+            writer.save_image(np.zeros((8, 8, 3), dtype=np.uint8), self.root / "missing" / "frame.png", 0, "top")
+            with self.assertRaises(ImageWriteError):
+                writer.wait_episode(0, timeout=10.0)
+        finally:
+            writer.stop()
+
+
+@unittest.skipIf(DoRobotDataset is None, "DoRobotDataset can't be imported")
+class TestWaitEpisodeImages(unittest.TestCase):
+    """Test that DoRobotDataset._wait_episode_images always forgets the episode."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _wait(self, writer, episode_length, timeout_s=10.0):
+        dataset = SimpleNamespace(
+            image_writer=writer, streaming_encoding=False, meta=SimpleNamespace(camera_keys=["top"])
+        )
+        DoRobotDataset._wait_episode_images(dataset, 0, episode_length, timeout_s=timeout_s)
+
+    def test_forgotten_after_error(self):
+        writer = AsyncImageWriter(num_processes=0, num_threads=1)
+        try:
+            writer.save_image(np.zeros((8, 8, 3), dtype=np.uint8), self.root / "missing" / "frame.png", 0, "top")
+            with self.assertRaises(ImageWriteError):
+                self._wait(writer, 1)
+            self.assertEqual(writer.episode_progress(0), {})
+            self.assertEqual(dict(writer._errors), {})
+        finally:
+            writer.stop()
+
+    def test_forgotten_after_timeout(self):
+        writer = AsyncImageWriter(num_processes=0, num_threads=1)
+        try:
+            for i in range(2):
+                writer.save_image(np.zeros((8, 8, 3), dtype=np.uint8), self.root / f"frame_{i:06d}.png", 0, "top")
+            with self.assertLogs(level="WARNING"):
+                self._wait(writer, 3, timeout_s=0.2)
+            self.assertEqual(writer.episode_progress(0), {})
+        finally:
+            writer.stop()
+
+
+class TestOverflowPolicies(unittest.TestCase):
+    """Test AsyncImageWriter with max_queue_bytes."""
+
+    FRAME_BYTES = 16 * 16 * 3
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _write_frames(self, writer, num_frames):
+        frames = [np.full((16, 16, 3), i, dtype=np.uint8) for i in range(num_frames)]
+        for i, frame in enumerate(frames):
+            writer.save_image(frame, self.root / f"frame_{i:06d}.png", 0, "top")
+        self.assertTrue(writer.wait_episode(0, timeout=10.0))
+        for i, frame in enumerate(frames):
+            np.testing.assert_array_equal(np.asarray(PIL.Image.open(self.root / f"frame_{i:06d}.png")), frame)
+        stats = writer.get_stats()
+        self.assertEqual(stats["queue_depth"], 0)
+        self.assertEqual(stats["bytes_in_flight"], 0)
+        return stats
+
+    def test_spill(self):
+        spill_dir = self.root / ".spill"
+        writer = AsyncImageWriter(
+            num_threads=1, max_queue_bytes=2 * self.FRAME_BYTES, overflow_policy="spill", spill_dir=spill_dir
+        )
+        try:
+            stats = self._write_frames(writer, 20)
+            self.assertGreater(stats["spilled_frames"], 0)
+        finally:
+            writer.stop()
+        self.assertFalse(spill_dir.exists())
+
+    def test_spill_outside_lock(self):
+        """Spilled frames are written to disk without holding the lock of the writer threads."""
+        writer = AsyncImageWriter(
+            num_threads=1, max_queue_bytes=2 * self.FRAME_BYTES, overflow_policy="spill", spill_dir=self.root / ".spill"
+        )
+        # Several spill files
+        writer._spill.chunk_bytes = 3 * self.FRAME_BYTES
+        spill_write = writer._spill.write
+        lock_free = []
+
+        def write(spilled, image):
+            checker = threading.Thread(target=writer.episode_progress, args=(0,))
+            checker.start()
+            checker.join(timeout=5.0)
+            lock_free.append(not checker.is_alive())
+            spill_write(spilled, image)
+
+        writer._spill.write = write
+        try:
+            self._write_frames(writer, 20)
+        finally:
+            writer.stop()
+        self.assertTrue(lock_free)
+        self.assertTrue(all(lock_free))
+
+    def test_degrade(self):
+        writer = AsyncImageWriter(num_threads=1, max_queue_bytes=self.FRAME_BYTES, overflow_policy="degrade")
+        try:
+            self.assertGreater(self._write_frames(writer, 20)["degraded_frames"], 0)
+        finally:
+            writer.stop()
+
+    def test_backpressure(self):
+        writer = AsyncImageWriter(num_threads=1, max_queue_bytes=self.FRAME_BYTES, overflow_policy="backpressure")
+        try:
+            self._write_frames(writer, 20)
+        finally:
+            writer.stop()
+
+    def test_unknown_policy(self):
+        with self.assertRaises(ValueError):
+            AsyncImageWriter(num_threads=1, overflow_policy="drop")
+
+
+class TestFrameFormats(unittest.TestCase):
+    """Test frames written in each format through AsyncImageWriter."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        rng = np.random.default_rng(0)
+        self.frames = [rng.integers(0, 256, (12, 16, 3), dtype=np.uint8) for _ in range(3)]
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _round_trip(self, frame_format):
+        writer = AsyncImageWriter(num_threads=2, frame_format=frame_format)
+        try:
+            for i, frame in enumerate(self.frames):
+                # Channel-first frames are transposed like for PNG
+                image = frame.transpose(2, 0, 1) if i == 0 else frame
+                writer.save_image(image, self.root / f"frame_{i:06d}{frame_format.suffix}", 0, "top")
+            self.assertTrue(writer.wait_episode(0, timeout=10.0))
+        finally:
+            writer.stop()
+        paths = list_frames(self.root)
+        self.assertEqual([p.name for p in paths], [f"frame_{i:06d}{frame_format.suffix}" for i in range(3)])
+        return [read_frame(p) for p in paths]
+
+    def test_npy_lossless(self):
+        for frame, read in zip(self.frames, self._round_trip(FrameFormat("npy")), strict=True):
+            np.testing.assert_array_equal(read, frame)
+        chw = load_image_as_numpy(self.root / "frame_000000.npy", dtype=np.uint8, channel_first=True)
+        np.testing.assert_array_equal(chw, self.frames[0].transpose(2, 0, 1))
+
+    @unittest.skipUnless(HAS_LZ4, "lz4 is not installed")
+    def test_npy_lz4_lossless(self):
+        for frame, read in zip(self.frames, self._round_trip(FrameFormat("npy.lz4")), strict=True):
+            np.testing.assert_array_equal(read, frame)
+
+    def test_png_compress_level(self):
+        for frame, read in zip(self.frames, self._round_trip(FrameFormat("png", png_compress_level=0)), strict=True):
+            np.testing.assert_array_equal(read, frame)
+
+    def test_jpeg(self):
+        for read in self._round_trip(FrameFormat("jpeg", jpeg_quality=90)):
+            self.assertEqual(read.shape, (12, 16, 3))
+            self.assertEqual(read.dtype, np.uint8)
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            FrameFormat("bmp")
+        with self.assertRaises(ValueError):
+            FrameFormat("jpeg", jpeg_quality=0)
+
+
+if __name__ == "__main__":
+    unittest.main()
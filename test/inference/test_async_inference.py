@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Unit tests for AsyncInferenceRunner
+
+Tests without requiring robot hardware:
+- The control loop gets an action every tick while chunks are computed in the background
+- Latency compensation drops the actions meant for the ticks elapsed during the inference, but keeps
+  the last action of a chunk, so 1-action chunks still reach the robot
+- reset drops the queued actions and the chunk in flight
+"""
+
+import sys
+import threading
+import time
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from operating_platform.core.async_inference import AsyncInferenceRunner
+
+CHUNK_SIZE = 20
+
+
+def chunk_from(observation: dict) -> np.ndarray:
+    """Chunk whose action i is meant for tick (observation tick + i), as [tick]."""
+    return (observation["tick"] + np.arange(CHUNK_SIZE, dtype=np.float64))[:, None]
+
+
+class TestAsyncInferenceRunner(unittest.TestCase):
+    """Test AsyncInferenceRunner."""
+
+    def _run(self, runner: AsyncInferenceRunner, num_ticks: int, tick_s: float = 0.005) -> list:
+        actions = []
+        for tick in range(num_ticks):
+            actions.append(runner.step({"tick": tick}))
+            time.sleep(tick_s)
+        return actions
+
+    def test_latency_compensation(self):
+        def slow_chunk(observation):
+            time.sleep(0.02)  # about 4 ticks
+            return chunk_from(observation)
+
+        runner = AsyncInferenceRunner(slow_chunk, refill_threshold=8, latency_compensation=True)
+        runner.start()
+        try:
+            actions = self._run(runner, 200)
+        finally:
+            runner.stop()
+
+        # No action until the first chunk arrives, then one every tick
+        first = next(i for i, action in enumerate(actions) if action is not None)
+        self.assertTrue(all(action is not None for action in actions[first:]))
+        self.assertEqual(runner.starved_ticks, first)
+        # Every action is the one meant for its tick
+        for tick, action in enumerate(actions[first:], start=first):
+            self.assertEqual(action[0], tick)
+
+    def test_without_latency_compensation(self):
+        def slow_chunk(observation):
+            time.sleep(0.02)
+            return chunk_from(observation)
+
+        runner = AsyncInferenceRunner(slow_chunk, refill_threshold=8, latency_compensation=False)
+        runner.start()
+        try:
+            actions = self._run(runner, 30)
+        finally:
+            runner.stop()
+        first = next(i for i, action in enumerate(actions) if action is not None)
+        # The chunk starts at the action for the tick of its observation (0), which is stale
+        self.assertEqual(actions[first][0], 0)
+        self.assertGreater(first, 0)
+
+    def test_single_action_chunks(self):
+        # Like ACT with temporal ensembling: one action per inference, always at least a tick late
+        runner = AsyncInferenceRunner(lambda observation: chunk_from(observation)[:1], refill_threshold=1)
+        runner.start()
+        try:
+            with self.assertNoLogs(level="WARNING"):
+                actions = self._run(runner, 30)
+        finally:
+            runner.stop()
+
+        received = [(tick, action) for tick, action in enumerate(actions) if action is not None]
+        self.assertGreater(len(received), len(actions) // 2)
+        self.assertEqual(runner.starved_ticks, len(actions) - len(received))
+        # Each action comes from the observation of an earlier tick, newest chunk first
+        sources = [action[0] for _, action in received]
+        self.assertTrue(all(source < tick for (tick, _), source in zip(received, sources, strict=True)))
+        self.assertEqual(sources, sorted(sources))
+
+    def test_late_chunk_keeps_last_action(self):
+        runner = AsyncInferenceRunner(chunk_from)
+        runner.tick = 25
+        with self.assertLogs(level="WARNING"):
+            runner._switch_to(chunk_from({"tick": 0}), obs_tick=0)
+        self.assertEqual([action[0] for action in runner.actions], [CHUNK_SIZE - 1])
+
+    def test_reset(self):
+        release = threading.Event()
+
+        def blocking_chunk(observation):
+            release.wait()
+            return chunk_from(observation)
+
+        runner = AsyncInferenceRunner(blocking_chunk, refill_threshold=8)
+        runner.start()
+        try:
+            self.assertIsNone(runner.step({"tick": 100}))
+            time.sleep(0.01)
+            resets = []
+            release.set()
+            runner.reset(on_reset=lambda: resets.append(True))
+            self.assertEqual(resets, [True])
+            # The chunk of the observation before the reset is never used
+            actions = self._run(runner, 20)
+        finally:
+            runner.stop()
+        self.assertTrue(all(action is None or action[0] < 100 for action in actions))
+        self.assertIsNotNone(actions[-1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Unit tests for ObservationStager
+
+Tests on CPU:
+- Staged observations match the previous preprocessing followed by the normalization of the policy
+- The staged tensors of the last `history` observations are not overwritten
+- ACT gives the same actions through predict_action / predict_action_chunk with and without a stager
+"""
+
+import sys
+import unittest
+from pathlib import Path
+
+import numpy as np
+import torch
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from operating_platform.config.types import FeatureType, NormalizationMode, PolicyFeature
+from operating_platform.core.observation_stager import ObservationStager
+from operating_platform.policy.act.configuration_act import ACTConfig
+from operating_platform.policy.act.modeling_act import ACTPolicy
+from operating_platform.policy.normalize import Normalize
+
+try:
+    from operating_platform.core.inference import predict_action, predict_action_chunk
+except (ImportError, OSError):  # e.g. cv2, or PortAudio for sounddevice, missing
+    predict_action = predict_action_chunk = None
+
+FEATURES = {
+    "observation.images.top": PolicyFeature(type=FeatureType.VISUAL, shape=(3, 8, 10)),
+    "observation.images.wrist": PolicyFeature(type=FeatureType.VISUAL, shape=(3, 8, 10)),
+    "observation.state": PolicyFeature(type=FeatureType.STATE, shape=(6,)),
+}
+NORM_MAP = {FeatureType.VISUAL: NormalizationMode.MEAN_STD, FeatureType.STATE: NormalizationMode.MIN_MAX}
+
+
+def make_normalize() -> Normalize:
+    stats = {}
+    for name, ft in FEATURES.items():
+        shape = (ft.shape[0], 1, 1) if ft.type is FeatureType.VISUAL else ft.shape
+        stats[name] = {
+            "mean": torch.rand(shape),
+            "std": torch.rand(shape) + 0.1,
+            "min": -torch.rand(shape),
+            "max": torch.rand(shape) + 0.1,
+        }
+    return Normalize(FEATURES, NORM_MAP, stats)
+
+
+def make_observation(rng: np.random.Generator) -> dict[str, np.ndarray]:
+    return {
+        "observation.images.top": rng.integers(0, 256, (8, 10, 3), dtype=np.uint8),
+        "observation.images.wrist": rng.integers(0, 256, (8, 10, 3), dtype=np.uint8),
+        "observation.state": rng.standard_normal(6).astype(np.float32),
+    }
+
+
+def reference(observation: dict[str, np.ndarray]) -> dict[str, torch.Tensor]:
+    """Preprocessing of `predict_action` without a stager."""
+    batch = {}
+    for name, value in observation.items():
+        tensor = torch.from_numpy(value)
+        if "image" in name:
+            tensor = (tensor.type(torch.float32) / 255).permute(2, 0, 1).contiguous()
+        batch[name] = tensor.unsqueeze(0)
+    return batch
+
+
+class TestObservationStager(unittest.TestCase):
+    """Test ObservationStager."""
+
+    def test_matches_normalized_preprocessing(self):
+        rng = np.random.default_rng(0)
+        normalize = make_normalize()
+        stager = ObservationStager("cpu", normalize=normalize)
+
+        with torch.inference_mode():
+            for _ in range(3):
+                observation = make_observation(rng)
+                expected = normalize(reference(observation))
+                staged = stager.stage(observation)
+                with stager.prenormalized():
+                    staged = normalize(staged)
+
+                self.assertEqual(stager.normalized_keys, set(FEATURES))
+                for name in FEATURES:
+                    self.assertEqual(staged[name].shape, expected[name].shape)
+                    torch.testing.assert_close(staged[name], expected[name], rtol=1e-5, atol=1e-4)
+
+    def test_without_normalize(self):
+        rng = np.random.default_rng(1)
+        stager = ObservationStager("cpu")
+
+        with torch.inference_mode():
+            observation = make_observation(rng)
+            staged = stager.stage(observation)
+            for name, tensor in reference(observation).items():
+                torch.testing.assert_close(staged[name], tensor)
+        self.assertFalse(stager.normalized_keys)
+
+    def test_history_is_kept(self):
+        rng = np.random.default_rng(2)
+        stager = ObservationStager("cpu", history=2)
+
+        with torch.inference_mode():
+            observations = [make_observation(rng) for _ in range(4)]
+            staged = [stager.stage(observation) for observation in observations]
+            # The last two staged observations are intact
+            for observation, batch in zip(observations[-2:], staged[-2:], strict=True):
+                for name, tensor in reference(observation).items():
+                    torch.testing.assert_close(batch[name], tensor)
+
+
+def make_act_policy(**kwargs) -> ACTPolicy:
+    torch.manual_seed(0)
+    policy_cfg = ACTConfig(
+        input_features={name: ft for name, ft in FEATURES.items()},
+        output_features={"action": PolicyFeature(type=FeatureType.ACTION, shape=(3,))},
+        dim_model=32,
+        n_heads=2,
+        dim_feedforward=64,
+        n_encoder_layers=1,
+        n_decoder_layers=1,
+        chunk_size=4,
+        device="cpu",
+        pretrained_backbone_weights=None,
+        **kwargs,
+    )
+    stats = {}
+    for name, ft in FEATURES.items():
+        shape = (ft.shape[0], 1, 1) if ft.type is FeatureType.VISUAL else ft.shape
+        stats[name] = {"mean": torch.rand(shape), "std": torch.rand(shape) + 0.1}
+    stats["action"] = {"mean": torch.rand(3), "std": torch.rand(3) + 0.1}
+    return ACTPolicy(policy_cfg, dataset_stats=stats).eval()
+
+
+@unittest.skipIf(predict_action is None, "core.inference can't be imported")
+class TestStagedInference(unittest.TestCase):
+    """Test predict_action with a stager against the unstaged preprocessing, on ACT."""
+
+    def run_episode(self, policy, observations, stager, chunks=False):
+        policy.reset()
+        device = torch.device("cpu")
+        predict = predict_action_chunk if chunks else predict_action
+        return [predict(observation, policy, device, use_amp=False, stager=stager) for observation in observations]
+
+    def assert_same_actions(self, policy, chunks=False):
+        rng = np.random.default_rng(3)
+        observations = [make_observation(rng) for _ in range(6)]
+        expected = self.run_episode(policy, observations, None, chunks)
+        stager = ObservationStager.for_policy(policy, "cpu")
+        actions = self.run_episode(policy, observations, stager, chunks)
+
+        self.assertEqual(stager.normalized_keys, set(FEATURES))
+        for action, reference_action in zip(actions, expected, strict=True):
+            self.assertEqual(action.shape, reference_action.shape)
+            torch.testing.assert_close(action, reference_action, rtol=1e-5, atol=1e-5)
+
+    def test_action_queue(self):
+        self.assert_same_actions(make_act_policy(n_action_steps=2))
+
+    def test_temporal_ensembling(self):
+        self.assert_same_actions(make_act_policy(n_action_steps=1, temporal_ensemble_coeff=0.01))
+
+    def test_chunks(self):
+        self.assert_same_actions(make_act_policy(n_action_steps=4), chunks=True)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+Unit tests for PolicyServer / PolicyClient
+
+Tests on CPU with a small ACT policy, without robot hardware:
+- Concurrent requests of several robots are answered from one forward pass, each robot gets the chunk
+  of its own observation
+- Each robot has its own temporal ensembler, reset separately
+- Ensembled actions served to AsyncInferenceRunner, as in `inference`, reach the robot
+- Policies served robot by robot give the same chunks
+- Messages are JSON headers with raw array buffers, malformed ones are answered with an error
+- Only local endpoints are accepted
+"""
+
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+
+import numpy as np
+import torch
+import zmq
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from operating_platform.config.types import FeatureType, PolicyFeature
+from operating_platform.core.async_inference import AsyncInferenceRunner
+from operating_platform.core.policy_server import (
+    PolicyClient,
+    PolicyServer,
+    check_local_endpoint,
+    decode_message,
+    encode_message,
+)
+from operating_platform.policy.act.configuration_act import ACTConfig
+from operating_platform.policy.act.modeling_act import ACTPolicy
+
+FEATURES = {"observation.state": 4, "observation.environment_state": 2, "action": 3}
+
+
+def make_policy(**kwargs) -> ACTPolicy:
+    torch.manual_seed(0)
+    policy_cfg = ACTConfig(
+        input_features={
+            key: PolicyFeature(FeatureType.ENV if "environment" in key else FeatureType.STATE, (dim,))
+            for key, dim in FEATURES.items()
+            if key != "action"
+        },
+        output_features={"action": PolicyFeature(FeatureType.ACTION, (FEATURES["action"],))},
+        dim_model=32,
+        n_heads=2,
+        dim_feedforward=64,
+        n_encoder_layers=1,
+        n_decoder_layers=1,
+        chunk_size=8,
+        device="cpu",
+        pretrained_backbone_weights=None,
+        **kwargs,
+    )
+    stats = {key: {"mean": np.zeros(dim), "std": np.ones(dim)} for key, dim in FEATURES.items()}
+    return ACTPolicy(policy_cfg, dataset_stats=stats).eval()
+
+
+def make_observation(rng: np.random.Generator) -> dict[str, np.ndarray]:
+    return {
+        key: rng.standard_normal(dim).astype(np.float32) for key, dim in FEATURES.items() if key != "action"
+    }
+
+
+def to_batch(observation: dict[str, np.ndarray]) -> dict[str, torch.Tensor]:
+    return {key: torch.from_numpy(value)[None] for key, value in observation.items()}
+
+
+class TestPolicyServer(unittest.TestCase):
+    """Test PolicyServer and PolicyClient."""
+
+    def setUp(self):
+        self.tmp_dir = Path(tempfile.mkdtemp())
+        self.endpoint = f"ipc://{self.tmp_dir}/policy-server"
+        self.server = None
+
+    def tearDown(self):
+        if self.server is not None:
+            self.server.stop()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def _serve(self, policy: ACTPolicy, **kwargs) -> PolicyServer:
+        self.server = PolicyServer(policy, "cpu", endpoint=self.endpoint, **kwargs)
+        self.server.start()
+        return self.server
+
+    def test_concurrent_requests_are_batched(self):
+        policy = make_policy(n_action_steps=6)
+        server = self._serve(policy, batch_window_s=0.5)
+        rng = np.random.default_rng(0)
+        observations = [make_observation(rng) for _ in range(3)]
+        clients = [PolicyClient(self.endpoint, robot_id=f"robot{i}") for i in range(3)]
+
+        chunks = [None] * len(clients)
+
+        def request(i):
+            chunks[i] = clients[i].predict_chunk(observations[i], task="pick")
+
+        threads = [threading.Thread(target=request, args=(i,)) for i in range(len(clients))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(server.forward_passes, 1)
+        self.assertEqual(server.batched_observations, 3)
+        with torch.inference_mode():
+            for observation, chunk in zip(observations, chunks, strict=True):
+                expected = policy.predict_action_chunk(to_batch(observation))[0, :6].numpy()
+                self.assertEqual(chunk.shape, (6, FEATURES["action"]))
+                np.testing.assert_allclose(chunk, expected, rtol=1e-5, atol=1e-5)
+        for client in clients:
+            client.close()
+
+    def test_temporal_ensembler_per_robot(self):
+        policy = make_policy(n_action_steps=1, temporal_ensemble_coeff=0.01)
+        self._serve(policy, batch_window_s=0.0)
+        rng = np.random.default_rng(1)
+        episodes = {
+            "a": [make_observation(rng) for _ in range(5)],
+            "b": [make_observation(rng) for _ in range(3)],
+        }
+        clients = {robot_id: PolicyClient(self.endpoint, robot_id=robot_id) for robot_id in episodes}
+
+        # Interleaved requests, robot "a" restarts its episode in the middle
+        received = {"a": [], "b": []}
+        for step in range(5):
+            if step == 3:
+                clients["a"].reset()
+            for robot_id, observations in episodes.items():
+                if step < len(observations):
+                    received[robot_id].append(clients[robot_id].predict_chunk(observations[step]))
+
+        reference = make_policy(n_action_steps=1, temporal_ensemble_coeff=0.01)
+        with torch.inference_mode():
+            for robot_id, observations in episodes.items():
+                reference.reset()
+                for step, observation in enumerate(observations):
+                    if robot_id == "a" and step == 3:
+                        reference.reset()
+                    expected = reference.select_action(to_batch(observation)).numpy()
+                    np.testing.assert_allclose(received[robot_id][step], expected, rtol=1e-5, atol=1e-5)
+        for client in clients.values():
+            client.close()
+
+    def test_temporal_ensembling_through_async_runner(self):
+        # One ensembled action per request, consumed like the policy_server branch of `inference`
+        policy = make_policy(n_action_steps=1, temporal_ensemble_coeff=0.01)
+        self._serve(policy, batch_window_s=0.0)
+        rng = np.random.default_rng(4)
+        observations = [make_observation(rng) for _ in range(30)]
+        client = PolicyClient(self.endpoint, robot_id="robot")
+        requested = []
+
+        def compute_chunk(observation):
+            requested.append(observation)
+            return client.predict_chunk(observation)
+
+        runner = AsyncInferenceRunner(compute_chunk, refill_threshold=1)
+        runner.start()
+        try:
+            with self.assertNoLogs(level="WARNING"):
+                actions = []
+                for observation in observations:
+                    actions.append(runner.step(observation))
+                    time.sleep(0.02)
+                # Wait for the last chunk in flight before closing the client
+                time.sleep(0.1)
+        finally:
+            runner.stop()
+            client.close()
+
+        received = [action for action in actions if action is not None]
+        self.assertGreater(len(received), len(actions) // 2)
+        self.assertEqual(runner.starved_ticks, len(actions) - len(received))
+        # The first action sent to the robot is the ensembled action of the first observation
+        reference = make_policy(n_action_steps=1, temporal_ensemble_coeff=0.01)
+        with torch.inference_mode():
+            expected = reference.select_action(to_batch(requested[0]))[0].numpy()
+        self.assertEqual(received[0].shape, (FEATURES["action"],))
+        np.testing.assert_allclose(received[0], expected, rtol=1e-5, atol=1e-5)
+
+    def test_robot_by_robot(self):
+        policy = make_policy(n_action_steps=6)
+        server = PolicyServer(policy, "cpu", endpoint=self.endpoint)
+        server.batched = False
+        server.start()
+        self.server = server
+        rng = np.random.default_rng(2)
+        client = PolicyClient(self.endpoint, robot_id="robot")
+
+        for _ in range(2):
+            observation = make_observation(rng)
+            chunk = client.predict_chunk(observation)
+            with torch.inference_mode():
+                expected = policy.predict_action_chunk(to_batch(observation))[0, :6].numpy()
+            np.testing.assert_allclose(chunk, expected, rtol=1e-5, atol=1e-5)
+        client.close()
+
+    def test_malformed_messages(self):
+        self._serve(make_policy(n_action_steps=6), batch_window_s=0.0)
+        socket = zmq.Context.instance().socket(zmq.REQ)
+        socket.setsockopt(zmq.LINGER, 0)
+        socket.setsockopt(zmq.RCVTIMEO, 5000)
+        socket.connect(self.endpoint)
+        header = b'{"command": "act", "robot_id": "robot", "observation": {"observation.state": '
+        requests = [
+            [b"\x80\x04not json"],
+            [b'["act"]'],
+            [b'{"command": "act", "robot_id": "robot", "observation": "state"}'],
+            # Array of objects, and buffer not matching its shape
+            [header + b'{"__array__": 0, "dtype": "|O", "shape": [1]}}}', b"\x00" * 8],
+            [header + b'{"__array__": 0, "dtype": "<f4", "shape": [4]}}}', b"\x00" * 12],
+        ]
+        for frames in requests:
+            socket.send_multipart(frames)
+            self.assertIn("error", decode_message(socket.recv_multipart()))
+        socket.close()
+
+        # Still serving
+        client = PolicyClient(self.endpoint, robot_id="robot")
+        chunk = client.predict_chunk(make_observation(np.random.default_rng(3)))
+        self.assertEqual(chunk.shape, (6, FEATURES["action"]))
+        client.close()
+
+
+class TestMessages(unittest.TestCase):
+    """Test the message format and the endpoint check."""
+
+    def test_round_trip(self):
+        observation = {
+            "observation.images.top": np.arange(24, dtype=np.uint8).reshape(2, 4, 3),
+            "observation.state": np.linspace(0, 1, 5, dtype=np.float32)[::2],
+        }
+        message = {"command": "act", "robot_id": "robot", "task": None, "observation": observation}
+        decoded = decode_message(encode_message(message))
+        self.assertEqual(decoded["command"], "act")
+        self.assertIsNone(decoded["task"])
+        for name, value in observation.items():
+            self.assertEqual(decoded["observation"][name].dtype, value.dtype)
+            np.testing.assert_array_equal(decoded["observation"][name], value)
+
+    def test_object_arrays_are_refused(self):
+        with self.assertRaises(TypeError):
+            encode_message({"observation": {"x": np.array([object()])}})
+
+    def test_local_endpoints(self):
+        local = ("ipc:///tmp/policy", "tcp://127.0.0.1:5560", "tcp://localhost:5560", "tcp://[::1]:5560")
+        for endpoint in local:
+            check_local_endpoint(endpoint)
+        for endpoint in ("tcp://0.0.0.0:5560", "tcp://*:5560", "tcp://192.168.1.2:5560", "udp://127.0.0.1:1"):
+            with self.assertRaises(ValueError):
+                check_local_endpoint(endpoint)
+            with self.assertRaises(ValueError):
+                PolicyClient(endpoint)
+
+
+if __name__ == "__main__":
+    unittest.main()
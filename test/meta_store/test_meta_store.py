@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the indexed metadata store
+
+Tests without requiring robot hardware:
+- Rows appended through the store are found by episode index and data id
+- Deleting the last episode truncates the JSONL file, deleting another one rewrites it
+- JSONL files changed outside of the store are indexed again
+- data_file helpers (data id lookups, episode size and duration) go through the store
+"""
+
+import json
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from operating_platform.dataset.meta_store import DATAID_PATH, MetadataStore
+from operating_platform.utils.data_file import (
+    delete_dataid_json,
+    find_epindex_from_dataid_json,
+    get_data_duration,
+    get_data_size,
+    update_dataid_json,
+)
+from operating_platform.utils.dataset import EPISODES_PATH, load_jsonlines
+
+
+class TestMetadataStore(unittest.TestCase):
+    """Test MetadataStore."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        self.store = MetadataStore(self.root)
+        for i in range(4):
+            self.store.append(EPISODES_PATH, {"episode_index": i, "tasks": ["抓取"], "length": 10 + i})
+
+    def tearDown(self):
+        self.store.close()
+        self.tmp.cleanup()
+
+    def _episode_indices(self):
+        return [row["episode_index"] for row in load_jsonlines(self.root / EPISODES_PATH)]
+
+    def test_lookup(self):
+        self.assertEqual(self.store.get(EPISODES_PATH, 2)["length"], 12)
+        self.assertIsNone(self.store.get(EPISODES_PATH, 7))
+
+    def test_delete_last_truncates(self):
+        size_before = (self.root / EPISODES_PATH).stat().st_size
+        self.assertEqual(self.store.delete(EPISODES_PATH, 3), 1)
+        self.assertLess((self.root / EPISODES_PATH).stat().st_size, size_before)
+        self.assertEqual(self._episode_indices(), [0, 1, 2])
+
+    def test_delete_middle_rewrites(self):
+        self.store.delete(EPISODES_PATH, 1)
+        self.assertEqual(self._episode_indices(), [0, 2, 3])
+        # Offsets were updated, so deleting the new last row still truncates correctly
+        self.store.delete(EPISODES_PATH, 3)
+        self.assertEqual(self._episode_indices(), [0, 2])
+
+    def test_external_change_is_indexed(self):
+        with open(self.root / EPISODES_PATH, "a") as f:
+            f.write(json.dumps({"episode_index": 9, "tasks": [], "length": 1}) + "\n")
+        self.assertEqual(self.store.get(EPISODES_PATH, 9)["length"], 1)
+
+    def test_reopen(self):
+        self.store.close()
+        self.store = MetadataStore(self.root)
+        self.assertEqual(self.store.get(EPISODES_PATH, 3)["length"], 13)
+
+
+class TestDataFile(unittest.TestCase):
+    """Test the data id helpers of utils/data_file.py."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        (self.root / "meta").mkdir()
+        (self.root / "meta" / "info.json").write_text(json.dumps({"fps": 30}))
+        store = MetadataStore(self.root)
+        for i in range(3):
+            store.append(EPISODES_PATH, {"episode_index": i, "tasks": [], "length": 30 * (i + 1)})
+            update_dataid_json(str(self.root), i, {"task_data_id": 100 + i})
+        store.set_episode_size(1, 3 * 1024 * 1024)
+        store.close()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_lookups(self):
+        self.assertEqual(find_epindex_from_dataid_json(str(self.root), "101"), 1)
+        self.assertEqual(get_data_duration(str(self.root), {"task_data_id": 102}), 3.0)
+        self.assertEqual(get_data_size(str(self.root), {"task_data_id": 101}), 3.0)
+
+    def test_delete(self):
+        delete_dataid_json(str(self.root), 2, {"task_data_id": 102})
+        with self.assertRaises(ValueError):
+            find_epindex_from_dataid_json(str(self.root), "102")
+        self.assertEqual(len(load_jsonlines(self.root / DATAID_PATH)), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the normalization modules
+
+Tests:
+- Normalize / Unnormalize give the formulas of the statistics (mean/std, min/max) and invert each other
+- Statistics loaded with load_state_dict replace the precomputed scales and offsets
+- Unset statistics are still reported
+"""
+
+import sys
+import unittest
+from pathlib import Path
+
+import torch
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from operating_platform.config.types import FeatureType, NormalizationMode, PolicyFeature
+from operating_platform.policy.normalize import Normalize, NormalizeBuffer, Unnormalize, UnnormalizeBuffer
+
+FEATURES = {
+    "observation.image": PolicyFeature(type=FeatureType.VISUAL, shape=(3, 8, 8)),
+    "observation.state": PolicyFeature(type=FeatureType.STATE, shape=(5,)),
+    "action": PolicyFeature(type=FeatureType.ACTION, shape=(4,)),
+}
+NORM_MAP = {
+    FeatureType.VISUAL: NormalizationMode.MEAN_STD,
+    FeatureType.STATE: NormalizationMode.MIN_MAX,
+    FeatureType.ACTION: NormalizationMode.MEAN_STD,
+}
+
+
+def make_stats() -> dict[str, dict[str, torch.Tensor]]:
+    stats = {}
+    for key, ft in FEATURES.items():
+        shape = (ft.shape[0], 1, 1) if ft.type is FeatureType.VISUAL else ft.shape
+        stats[key] = {
+            "mean": torch.randn(shape),
+            "std": torch.rand(shape) + 0.1,
+            "min": -torch.rand(shape) - 0.1,
+            "max": torch.rand(shape) + 0.1,
+        }
+    return stats
+
+
+def make_batch() -> dict[str, torch.Tensor]:
+    return {
+        "observation.image": torch.rand(2, 3, 8, 8),
+        "observation.state": torch.randn(2, 5),
+        "action": torch.randn(2, 7, 4),
+    }
+
+
+class TestNormalize(unittest.TestCase):
+    """Test Normalize and Unnormalize."""
+
+    def test_formulas(self):
+        stats = make_stats()
+        batch = make_batch()
+        for normalize_cls, unnormalize_cls in ((Normalize, Unnormalize), (NormalizeBuffer, UnnormalizeBuffer)):
+            normalized = normalize_cls(FEATURES, NORM_MAP, stats)(batch)
+
+            image = stats["observation.image"]
+            expected = (batch["observation.image"] - image["mean"]) / (image["std"] + 1e-8)
+            torch.testing.assert_close(normalized["observation.image"], expected)
+            state = stats["observation.state"]
+            expected = (batch["observation.state"] - state["min"]) / (state["max"] - state["min"] + 1e-8) * 2 - 1
+            torch.testing.assert_close(normalized["observation.state"], expected)
+
+            restored = unnormalize_cls(FEATURES, NORM_MAP, stats)(normalized)
+            for key in FEATURES:
+                torch.testing.assert_close(restored[key], batch[key], rtol=1e-4, atol=1e-5)
+
+    def test_load_state_dict_refreshes_stats(self):
+        batch = make_batch()
+        normalize = Normalize(FEATURES, NORM_MAP, make_stats())
+        normalize(batch)
+
+        stats = make_stats()
+        reference = Normalize(FEATURES, NORM_MAP, stats)
+        normalize.load_state_dict(reference.state_dict())
+        self.assertEqual(normalize.state_dict().keys(), reference.state_dict().keys())
+        for key, value in normalize(batch).items():
+            torch.testing.assert_close(value, reference(batch)[key])
+
+    def test_missing_stats(self):
+        normalize = Normalize(FEATURES, NORM_MAP)
+        with self.assertRaises(AssertionError):
+            normalize(make_batch())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Unit tests for EpisodeAwareSampler
+
+Tests without requiring robot hardware:
+- Every shuffle mode yields each frame exactly once per epoch
+- Block mode keeps stretches of samples within a few blocks
+- With worker affinity, the batches of a worker come from its own episodes
+- WeightedDatasetSampler draws datasets by weight and covers each dataset before repeating it
+"""
+
+import sys
+import unittest
+from pathlib import Path
+
+import numpy as np
+import torch
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from operating_platform.dataset.sampler import EpisodeAwareSampler, WeightedDatasetSampler
+
+LENGTHS = [50, 80, 30, 120, 60, 45]
+EPISODE_DATA_INDEX = {
+    "from": torch.LongTensor(np.cumsum([0] + LENGTHS[:-1])),
+    "to": torch.LongTensor(np.cumsum(LENGTHS)),
+}
+EPISODE_OF_FRAME = np.repeat(np.arange(len(LENGTHS)), LENGTHS)
+
+
+class TestEpisodeAwareSampler(unittest.TestCase):
+    """Test EpisodeAwareSampler."""
+
+    def test_permutation(self):
+        for mode in ("full", "block", "episode"):
+            sampler = EpisodeAwareSampler(
+                EPISODE_DATA_INDEX, drop_n_last_frames=2, shuffle=True, shuffle_mode=mode, block_size=16
+            )
+            indices = list(sampler)
+            self.assertEqual(len(indices), len(sampler))
+            self.assertEqual(sorted(indices), sampler.indices.tolist(), mode)
+
+    def test_block_locality(self):
+        torch.manual_seed(0)
+        sampler = EpisodeAwareSampler(
+            EPISODE_DATA_INDEX, shuffle=True, shuffle_mode="block", block_size=10, window=2
+        )
+        indices = np.array(list(sampler))
+        # A window mixes 2 blocks of 10 frames, each overlapping at most 2 aligned groups of 10 frames
+        for window in indices[: 20 * (len(indices) // 20)].reshape(-1, 20):
+            self.assertLessEqual(len(set((window // 10).tolist())), 4)
+
+    def test_worker_affinity(self):
+        torch.manual_seed(0)
+        sampler = EpisodeAwareSampler(
+            EPISODE_DATA_INDEX, shuffle=True, shuffle_mode="episode", num_workers=2, batch_size=8
+        )
+        indices = np.array(list(sampler))
+        self.assertEqual(sorted(indices.tolist()), list(range(sum(LENGTHS))))
+        batches = [indices[i : i + 8] for i in range(0, len(indices), 8)]
+        episodes = [set(), set()]
+        # Each worker owns more than 64 frames, so the first 8 batches of each come from its own episodes
+        for i, batch in enumerate(batches[:16]):
+            episodes[i % 2].update(EPISODE_OF_FRAME[batch].tolist())
+        self.assertFalse(episodes[0] & episodes[1])
+
+    def test_worker_affinity_uneven_lengths(self):
+        """Streams that are not a multiple of batch_size don't shift the batches of the other workers."""
+        lengths = [13, 29, 7, 41, 22, 17, 35, 11]
+        episode_of_frame = np.repeat(np.arange(len(lengths)), lengths)
+        episode_data_index = {
+            "from": torch.LongTensor(np.cumsum([0] + lengths[:-1])),
+            "to": torch.LongTensor(np.cumsum(lengths)),
+        }
+        num_workers, batch_size = 3, 6
+        for seed in range(10):
+            torch.manual_seed(seed)
+            sampler = EpisodeAwareSampler(
+                episode_data_index,
+                shuffle=True,
+                shuffle_mode="episode",
+                num_workers=num_workers,
+                batch_size=batch_size,
+            )
+            indices = np.array(list(sampler))
+            self.assertEqual(sorted(indices.tolist()), list(range(sum(lengths))))
+
+            # The last frames of each worker, less than a batch, are the last num_workers batches at most
+            batches = [indices[i : i + batch_size] for i in range(0, len(indices), batch_size)]
+            full_batches = batches[:-num_workers]
+            # Episodes read by the same batch belong to the same worker
+            worker_of = list(range(len(lengths)))
+
+            def find(ep):
+                while worker_of[ep] != ep:
+                    ep = worker_of[ep]
+                return ep
+
+            for batch in full_batches:
+                first, *others = np.unique(episode_of_frame[batch]).tolist()
+                for ep in others:
+                    worker_of[find(ep)] = find(first)
+            groups = {find(int(episode_of_frame[batch[0]])) for batch in full_batches}
+            self.assertEqual(len(groups), num_workers, seed)
+
+            # While every worker has batches, they take turns
+            workers = [find(int(episode_of_frame[batch[0]])) for batch in full_batches]
+            for i in range(num_workers, 2 * num_workers):
+                self.assertEqual(workers[i], workers[i - num_workers], seed)
+
+
+class TestWeightedDatasetSampler(unittest.TestCase):
+    """Test WeightedDatasetSampler."""
+
+    def test_default_weights_cover_every_frame(self):
+        sizes = [40, 100, 60]
+        offsets = [0, 40, 140]
+        sampler = WeightedDatasetSampler([torch.utils.data.RandomSampler(range(n)) for n in sizes], offsets)
+        indices = np.asarray(list(sampler))
+        self.assertEqual(len(indices), sum(sizes))
+        self.assertTrue(((indices >= 0) & (indices < sum(sizes))).all())
+        # Each dataset is drawn about in proportion to its size
+        counts = np.bincount(np.searchsorted(offsets, indices, side="right") - 1, minlength=3)
+        np.testing.assert_allclose(counts / len(indices), np.asarray(sizes) / sum(sizes), atol=0.1)
+
+    def test_weights(self):
+        sizes = [10, 1000]
+        sampler = WeightedDatasetSampler(
+            [torch.utils.data.RandomSampler(range(n)) for n in sizes], [0, 10], weights=[1, 1], num_samples=4000
+        )
+        indices = np.asarray(list(sampler))
+        self.assertEqual(len(indices), 4000)
+        small = indices[indices < 10]
+        self.assertAlmostEqual(len(small) / len(indices), 0.5, delta=0.05)
+        # The small dataset is cycled: every frame is seen before any is repeated
+        self.assertEqual(sorted(small[:10].tolist()), list(range(10)))
+
+    def test_empty_dataset_is_skipped(self):
+        sampler = WeightedDatasetSampler([[], [0, 1, 2]], [0, 0], weights=[5, 1])
+        self.assertEqual(sorted(sampler), [0, 1, 2])
+
+
+if __name__ == "__main__":
+    unittest.main()
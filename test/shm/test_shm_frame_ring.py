@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the shared-memory frame ring
+
+Tests the ring used between dora_zeromq.py and the manipulators without
+requiring dora or cameras:
+- Writer/reader round trip
+- Sequence validation when the writer laps a reader
+- Re-attaching when the ring is recreated
+- A reader process exiting leaves the ring of the writer alone
+"""
+
+import os
+import subprocess
+import sys
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from operating_platform.robot.robots.shm_frame_ring import (
+    FrameRingPool,
+    FrameRingReader,
+    FrameRingWriter,
+    ring_name,
+)
+
+
+class TestFrameRing(unittest.TestCase):
+    """Test FrameRingWriter / FrameRingReader."""
+
+    def setUp(self):
+        self.name = f"dorobot-test-{os.getpid()}"
+        self.writer = FrameRingWriter(self.name, height=4, width=6, channels=3, slot_count=3)
+        self.reader = FrameRingReader(self.name)
+
+    def tearDown(self):
+        self.reader.close()
+        self.writer.unlink()
+
+    def test_geometry(self):
+        """Reader picks up the geometry from the ring header."""
+        self.assertEqual(self.reader.frame_shape, (4, 6, 3))
+        self.assertEqual(self.reader.slot_count, 3)
+        self.assertEqual(self.reader.last_seq, 0)
+        self.assertIsNone(self.reader.read())
+
+    def test_round_trip(self):
+        """Frames written are read back with their sequence number and timestamp."""
+        frame = np.arange(4 * 6 * 3, dtype=np.uint8).reshape(4, 6, 3)
+        seq = self.writer.write(frame, timestamp_ns=1234)
+
+        result = self.reader.read()
+        self.assertIsNotNone(result)
+        read_seq, timestamp_ns, copy = result
+        self.assertEqual(read_seq, seq)
+        self.assertEqual(timestamp_ns, 1234)
+        np.testing.assert_array_equal(copy, frame)
+
+        view = self.reader.view(seq)
+        np.testing.assert_array_equal(view, frame)
+        self.assertFalse(view.flags.writeable)
+
+    def test_lapped_reader(self):
+        """A frame overwritten by the writer is reported as invalid."""
+        for i in range(5):
+            self.writer.write(np.full((4, 6, 3), i, dtype=np.uint8))
+
+        self.assertFalse(self.reader.is_valid(1))
+        self.assertIsNone(self.reader.view(2))
+        self.assertIsNone(self.reader.read(2))
+        self.assertTrue(self.reader.is_valid(5))
+        self.assertEqual(int(self.reader.read()[2][0, 0, 0]), 4)
+
+    def test_reader_process_exit_keeps_ring(self):
+        name = f"dorobot-test-{os.getpid()}-exit"
+        writer = FrameRingWriter(name, height=2, width=2, channels=3, slot_count=2)
+        try:
+            writer.write(np.full((2, 2, 3), 7, dtype=np.uint8))
+            code = (
+                "from operating_platform.robot.robots.shm_frame_ring import FrameRingReader\n"
+                f"reader = FrameRingReader({name!r})\n"
+                "assert reader.read() is not None\n"
+                "reader.close()\n"
+            )
+            root = Path(__file__).parent.parent.parent
+            result = subprocess.run([sys.executable, "-c", code], cwd=root, capture_output=True, text=True)
+            self.assertEqual(result.returncode, 0, result.stderr)
+            # The resource tracker of the reader process neither unlinked the ring nor warned about it
+            self.assertNotIn("leaked", result.stderr)
+            reader = FrameRingReader(name)
+            reader.close()
+        finally:
+            writer.unlink()
+
+
+class TestFrameRingPool(unittest.TestCase):
+    """Test re-attaching to recreated rings."""
+
+    def test_reattach_on_new_name(self):
+        prefix = f"dorobot-test-{os.getpid()}"
+        pool = FrameRingPool()
+
+        small = FrameRingWriter(ring_name(prefix, "image_top", 2, 2), 2, 2, 3, slot_count=2)
+        reader = pool.attach("image_top", small.name)
+        self.assertIs(pool.attach("image_top", small.name), reader)
+
+        large = FrameRingWriter(ring_name(prefix, "image_top", 4, 4), 4, 4, 3, slot_count=2)
+        reader = pool.attach("image_top", large.name)
+        self.assertEqual(reader.frame_shape, (4, 4, 3))
+
+        pool.close()
+        self.assertNotIn("image_top", pool)
+        small.unlink()
+        large.unlink()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Unit tests for stream history and alignment used by synchronized recording.
+"""
+
+import sys
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from operating_platform.robot.robots.stream_sync import StreamHistory, align_sample
+
+
+def make_history(maxlen=8, count=5, period_ns=100):
+    history = StreamHistory(maxlen=maxlen)
+    for i in range(count):
+        history.append(np.array([float(i), 10.0 * i], dtype=np.float32), timestamp_ns=i * period_ns)
+    return history
+
+
+class TestStreamHistory(unittest.TestCase):
+    """Test StreamHistory."""
+
+    def test_bounded_and_sequenced(self):
+        history = make_history(maxlen=3, count=5)
+        self.assertEqual(len(history), 3)
+        self.assertEqual(history.latest().seq, 4)
+        self.assertEqual(history.latest().timestamp_ns, 400)
+
+    def test_out_of_order_dropped(self):
+        history = make_history(count=3)
+        history.append(np.zeros(2, dtype=np.float32), timestamp_ns=50)
+        self.assertEqual(len(history), 3)
+        self.assertEqual(history.latest().timestamp_ns, 200)
+
+    def test_nearest(self):
+        history = make_history()
+        self.assertEqual(history.nearest(140).seq, 1)
+        self.assertEqual(history.nearest(160).seq, 2)
+        self.assertEqual(history.nearest(-10).seq, 0)
+        self.assertEqual(history.nearest(1000).seq, 4)
+        self.assertIsNone(StreamHistory().nearest(0))
+
+
+class TestAlignSample(unittest.TestCase):
+    """Test align_sample modes."""
+
+    def test_latest(self):
+        value, seq, skew = align_sample(make_history(), 250, "latest")
+        self.assertEqual(seq, 4)
+        self.assertEqual(skew, 150)
+
+    def test_nearest(self):
+        value, seq, skew = align_sample(make_history(), 260, "nearest")
+        self.assertEqual(seq, 3)
+        self.assertEqual(skew, 40)
+        np.testing.assert_array_equal(value, [3.0, 30.0])
+
+    def test_linear(self):
+        value, seq, skew = align_sample(make_history(), 250, "linear")
+        self.assertEqual(skew, 0)
+        np.testing.assert_allclose(value, [2.5, 25.0])
+
+    def test_linear_falls_back_outside_history(self):
+        value, seq, skew = align_sample(make_history(), 700, "linear")
+        self.assertEqual(seq, 4)
+        self.assertEqual(skew, -300)
+
+    def test_linear_non_numeric_uses_nearest(self):
+        history = StreamHistory()
+        history.append(np.zeros((2, 2, 3), dtype=np.uint8), timestamp_ns=0)
+        history.append(np.ones((2, 2, 3), dtype=np.uint8), timestamp_ns=100)
+        value, seq, skew = align_sample(history, 70, "linear")
+        self.assertEqual(seq, 1)
+        self.assertEqual(value.dtype, np.uint8)
+
+    def test_unknown_mode(self):
+        with self.assertRaises(ValueError):
+            align_sample(make_history(), 0, "cubic")
+
+
+if __name__ == "__main__":
+    unittest.main()
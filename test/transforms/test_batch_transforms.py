@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the batched image transforms
+
+Tests without requiring robot hardware:
+- Batched kernels with per-sample factors match the torchvision functional ones
+- uint8 batches come out as float in [0, 1], unchanged when transforms are disabled
+- The frames of a sample share their random parameters
+"""
+
+import sys
+import unittest
+from pathlib import Path
+
+import torch
+from torchvision.transforms.v2 import functional as F  # noqa: N812
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from operating_platform.dataset.transforms import (
+    BatchImageTransforms,
+    ImageTransformConfig,
+    ImageTransformsConfig,
+    _adjust_hue,
+    _adjust_sharpness,
+)
+
+
+class TestBatchImageTransforms(unittest.TestCase):
+    """Test BatchImageTransforms."""
+
+    def test_kernels_match_torchvision(self):
+        images = torch.rand(4, 3, 16, 20)
+        factors = torch.tensor([0.0, 0.5, 1.3, 2.0]).view(4, 1, 1, 1)
+        hues = torch.tensor([-0.4, -0.05, 0.1, 0.5]).view(4, 1, 1, 1)
+        sharp = _adjust_sharpness(images, factors)
+        hue = _adjust_hue(images, hues)
+        for i in range(4):
+            torch.testing.assert_close(sharp[i], F.adjust_sharpness(images[i], factors[i].item()))
+            torch.testing.assert_close(hue[i], F.adjust_hue(images[i], hues[i].item()), atol=1e-5, rtol=0)
+
+    def test_uint8_input(self):
+        images = torch.randint(0, 256, (2, 3, 8, 8), dtype=torch.uint8)
+        transforms = BatchImageTransforms(ImageTransformsConfig(enable=False))
+        out = transforms(images)
+        self.assertEqual(out.dtype, torch.float32)
+        torch.testing.assert_close(out, images.float() / 255)
+
+    def test_sample_frames_share_params(self):
+        cfg = ImageTransformsConfig(
+            enable=True,
+            max_num_transforms=1,
+            tfs={"brightness": ImageTransformConfig(type="ColorJitter", kwargs={"brightness": (0.5, 1.5)})},
+        )
+        frame = torch.full((3, 4, 4), 0.5)
+        images = frame.expand(6, 2, 3, 4, 4)  # 6 samples of 2 identical frames
+        out = BatchImageTransforms(cfg)(images)
+        torch.testing.assert_close(out[:, 0], out[:, 1])
+        self.assertGreater(out[:, 0, 0, 0, 0].unique().numel(), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the timestamp validation manifest
+
+Tests without requiring robot hardware:
+- Validated parquet files are recognised as long as they don't change
+- fps and tolerance changes invalidate the manifest
+"""
+
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from operating_platform.utils.dataset import record_timestamps_validated, timestamps_validated
+
+FILES = ["data/chunk-000/episode_000000.parquet", "data/chunk-000/episode_000001.parquet"]
+
+
+class TestValidationManifest(unittest.TestCase):
+    """Test timestamps_validated / record_timestamps_validated."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        for fpath in FILES:
+            (self.root / fpath).parent.mkdir(parents=True, exist_ok=True)
+            (self.root / fpath).write_bytes(b"parquet")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_unchanged_files(self):
+        self.assertFalse(timestamps_validated(self.root, FILES, 30, 1e-4))
+        record_timestamps_validated(self.root, FILES[:1], 30, 1e-4)
+        self.assertTrue(timestamps_validated(self.root, FILES[:1], 30, 1e-4))
+        self.assertFalse(timestamps_validated(self.root, FILES, 30, 1e-4))
+
+        record_timestamps_validated(self.root, FILES[1:], 30, 1e-4)
+        self.assertTrue(timestamps_validated(self.root, FILES, 30, 1e-4))
+
+        (self.root / FILES[1]).write_bytes(b"rewritten parquet")
+        self.assertFalse(timestamps_validated(self.root, FILES, 30, 1e-4))
+
+    def test_settings(self):
+        record_timestamps_validated(self.root, FILES, 30, 1e-4)
+        self.assertTrue(timestamps_validated(self.root, FILES, 30, 1e-3))
+        self.assertFalse(timestamps_validated(self.root, FILES, 30, 1e-5))
+        self.assertFalse(timestamps_validated(self.root, FILES, 15, 1e-4))
+
+
+if __name__ == "__main__":
+    unittest.main()
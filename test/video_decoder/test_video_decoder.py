@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the persistent video decoder pool
+
+Tests without requiring robot hardware:
+- The decoded frame cache evicts least recently used frames past its size in bytes
+- Frames decoded through the pool match decode_video_frames_torchvision (requires PyAV)
+- Far apart timestamps of one request are decoded from their own key frames (requires PyAV)
+"""
+
+import importlib.util
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from operating_platform.utils.video_decoder import DecodedFrameCache, VideoDecoderPool
+
+HAS_AV = importlib.util.find_spec("av") is not None
+
+
+class TestDecodedFrameCache(unittest.TestCase):
+    """Test DecodedFrameCache."""
+
+    def test_lru_eviction(self):
+        frame = np.zeros((4, 4, 3), dtype=np.uint8)
+        cache = DecodedFrameCache(max_bytes=3 * frame.nbytes)
+        for i in range(3):
+            cache.put((0, "top", i), i / 30, frame)
+        cache.get((0, "top", 0))  # 0 becomes the most recently used
+        cache.put((0, "top", 3), 3 / 30, frame)
+
+        self.assertEqual(len(cache), 3)
+        self.assertEqual(cache.nbytes, 3 * frame.nbytes)
+        self.assertIn((0, "top", 0), cache)
+        self.assertNotIn((0, "top", 1), cache)
+
+    def test_disabled(self):
+        cache = DecodedFrameCache(max_bytes=0)
+        cache.put((0, "top", 0), 0.0, np.zeros((4, 4, 3), dtype=np.uint8))
+        self.assertEqual(len(cache), 0)
+
+
+@unittest.skipUnless(HAS_AV, "PyAV is not installed")
+class TestVideoDecoderPool(unittest.TestCase):
+    """Test VideoDecoderPool against decode_video_frames_torchvision."""
+
+    FPS = 30
+
+    @classmethod
+    def setUpClass(cls):
+        import av
+
+        cls.tmp = tempfile.TemporaryDirectory()
+        cls.video_path = Path(cls.tmp.name) / "episode_000000.mp4"
+        rng = np.random.default_rng(0)
+        with av.open(str(cls.video_path), "w") as container:
+            stream = container.add_stream("mpeg4", rate=cls.FPS)
+            stream.width, stream.height, stream.pix_fmt = 64, 48, "yuv420p"
+            stream.gop_size = 10
+            for _ in range(120):
+                image = rng.integers(0, 256, size=(48, 64, 3), dtype=np.uint8)
+                for packet in stream.encode(av.VideoFrame.from_ndarray(image, format="rgb24")):
+                    container.mux(packet)
+            for packet in stream.encode():
+                container.mux(packet)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+
+    def test_matches_torchvision(self):
+        from operating_platform.utils.video import decode_video_frames_torchvision
+
+        pool = VideoDecoderPool(cache_bytes=1024**2)
+        for timestamps in ([0.0], [0.5, 0.6], [0.6, 0.7], [1.9], [0.1]):
+            expected = decode_video_frames_torchvision(self.video_path, timestamps, 1e-4)
+            frames = pool.decode((0, "top"), self.video_path, timestamps, 1e-4, self.FPS)
+            self.assertTrue(np.array_equal(frames.numpy(), expected.numpy()), timestamps)
+        self.assertGreater(pool.stats.hits, 0)
+        pool.close()
+
+    def test_far_apart_timestamps_seek(self):
+        timestamps = [3.5, 0.1, 0.2]
+        pool = VideoDecoderPool(cache_bytes=1024**2)
+        frames = pool.decode((0, "top"), self.video_path, timestamps, 1e-4, self.FPS)
+        # Key frame 0 to frame 6, and key frame 100 to frame 105, instead of every frame up to 105
+        self.assertEqual(pool.stats.seeks, 2)
+        self.assertLessEqual(pool.stats.decoded, 2 * 10)
+        pool.close()
+
+        for i, ts in enumerate(timestamps):
+            single = VideoDecoderPool(cache_bytes=0)
+            expected = single.decode((0, "top"), self.video_path, [ts], 1e-4, self.FPS)
+            self.assertTrue(np.array_equal(frames[i : i + 1].numpy(), expected.numpy()), ts)
+            single.close()
+
+    def test_close_timestamps_decode_forward(self):
+        pool = VideoDecoderPool(cache_bytes=1024**2)
+        pool.decode((0, "top"), self.video_path, [0.1, 0.9], 1e-4, self.FPS)
+        # One seek, then every frame from 0.1 to 0.9 s
+        self.assertEqual(pool.stats.seeks, 1)
+        self.assertGreaterEqual(pool.stats.decoded, 25)
+        pool.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
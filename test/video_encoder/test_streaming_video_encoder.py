@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+"""
+Unit tests for StreamingVideoEncoder
+
+Tests without ffmpeg or NPU hardware, ffmpeg processes are replaced by a fake reading stdin:
+- Frames are piped as raw rgb24 of the stream size, with the selected encoder
+- h264_ascend only takes a channel of the streaming share, released when the stream ends to the
+  semaphores it was taken from
+- A stream whose NPU encoder dies at startup is restarted on libx264 with every frame replayed
+- abort kills ffmpeg, deletes the partial video and releases the channel
+- DoRobotDataset with streaming_encoding pipes video frames in add_frame and finishes in save_episode
+"""
+
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import numpy as np
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from operating_platform.utils import video
+from operating_platform.utils.video import (
+    StreamingVideoEncoder,
+    _get_npu_semaphore,
+    _get_npu_stream_semaphore,
+    set_npu_encoder_channels,
+    set_npu_streaming_channels,
+)
+
+try:
+    from operating_platform.dataset.dorobot_dataset import DoRobotDataset
+except (ImportError, OSError):  # e.g. PortAudio missing for sounddevice
+    DoRobotDataset = None
+
+FPS = 4
+HEIGHT, WIDTH = 4, 6
+
+
+class FakeFFmpeg:
+    """Stands in for `subprocess.Popen` of an ffmpeg reading raw frames on stdin.
+
+    h264_ascend processes die after their first frame when `npu_fails` is set, like an encoder
+    failing to create its venc channel. Others write the output file once they got a frame.
+    """
+
+    npu_fails = False
+
+    def __init__(self, cmd, stdin=None, stdout=None, stderr=None):
+        self.cmd = cmd
+        self.vcodec = cmd[cmd.index("-vcodec") + 1]
+        self.output = Path(cmd[-1])
+        self.stderr = stderr
+        self.data = bytearray()
+        self.returncode = None
+        self.killed = False
+        self.stdin = self
+        FakeFFmpeg.processes.append(self)
+
+    def write(self, data) -> None:
+        if self.returncode is not None:
+            raise BrokenPipeError("ffmpeg exited")
+        self.data += bytes(data)
+        if self.vcodec == "h264_ascend" and FakeFFmpeg.npu_fails:
+            self.stderr.write(b"Failed to create venc channel")
+            self.returncode = 1
+        else:
+            self.output.write_bytes(b"mp4")
+
+    def close(self) -> None:
+        if self.returncode is None:
+            self.returncode = 0
+
+    def poll(self):
+        return self.returncode
+
+    def wait(self):
+        if self.returncode is None:
+            self.returncode = 0
+        return self.returncode
+
+    def kill(self) -> None:
+        self.killed = True
+        self.returncode = -9
+
+
+def make_frames(n: int) -> list[np.ndarray]:
+    rng = np.random.default_rng(0)
+    return [rng.integers(0, 256, (HEIGHT, WIDTH, 3), dtype=np.uint8) for _ in range(n)]
+
+
+class StreamingTestCase(unittest.TestCase):
+    encoders = {"h264_ascend", "libx264"}
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.video_path = Path(self.tmp.name) / "videos" / "episode_000000.mp4"
+        FakeFFmpeg.processes = []
+        FakeFFmpeg.npu_fails = False
+        set_npu_encoder_channels(2)
+        set_npu_streaming_channels(None)
+        patches = [
+            patch.object(video, "_AVAILABLE_ENCODERS", self.encoders),
+            patch.object(video.subprocess, "Popen", FakeFFmpeg),
+        ]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+
+    def tearDown(self):
+        set_npu_encoder_channels(2)
+        set_npu_streaming_channels(None)
+        self.tmp.cleanup()
+
+
+class TestStreamingVideoEncoder(StreamingTestCase):
+    """Test StreamingVideoEncoder."""
+
+    def test_rgb24_command(self):
+        frames = make_frames(3)
+        stream = StreamingVideoEncoder(self.video_path, FPS, vcodec="libx264")
+        # Channel first float frames are converted
+        stream.write(frames[0].transpose(2, 0, 1).astype(np.float32) / 255)
+        for frame in frames[1:]:
+            stream.write(frame)
+        self.assertEqual(stream.finish(timeout=5), self.video_path)
+
+        (proc,) = FakeFFmpeg.processes
+        cmd = proc.cmd
+        input_args = cmd[: cmd.index("-i") + 2]
+        self.assertEqual(
+            input_args,
+            ["ffmpeg", "-f", "rawvideo", "-pix_fmt", "rgb24", "-s", f"{WIDTH}x{HEIGHT}", "-r", str(FPS), "-i", "-"],
+        )
+        # Output pixel format comes after the codec
+        output_args = cmd[cmd.index("-vcodec") : cmd.index("-vcodec") + 4]
+        self.assertEqual(output_args, ["-vcodec", "libx264", "-pix_fmt", "yuv420p"])
+        self.assertEqual(cmd[-1], str(self.video_path))
+        self.assertEqual(bytes(proc.data), b"".join(frame.tobytes() for frame in frames))
+        self.assertEqual(stream.frames_written, 3)
+
+    def test_unavailable_codec_falls_back(self):
+        with patch.object(video, "_AVAILABLE_ENCODERS", {"libx264"}):
+            stream = StreamingVideoEncoder(self.video_path, FPS, vcodec="h264_ascend")
+            stream.write(make_frames(1)[0])
+            stream.finish(timeout=5)
+        self.assertEqual(stream.vcodec, "libx264")
+
+    def test_npu_channel_held_for_the_stream(self):
+        stream = StreamingVideoEncoder(self.video_path, FPS, vcodec="h264_ascend")
+        for frame in make_frames(2 * FPS):
+            stream.write(frame)
+        stream.close()
+        stream._thread.join(5)
+
+        self.assertEqual(FakeFFmpeg.processes[0].vcodec, "h264_ascend")
+        self.assertIn("-device_id", FakeFFmpeg.processes[0].cmd)
+        stream.finish(timeout=5)
+        self.assertEqual(_get_npu_semaphore()._value, 2)
+        self.assertEqual(_get_npu_stream_semaphore()._value, 1)
+
+    def test_streams_leave_a_channel_to_encode_video_frames(self):
+        streams = [
+            StreamingVideoEncoder(self.video_path.with_name(f"episode_{i:06d}.mp4"), FPS, vcodec="h264_ascend")
+            for i in range(2)
+        ]
+        for stream in streams:
+            stream.write(make_frames(1)[0])
+        # Wait for both streams to start their encoder
+        for stream in streams:
+            while stream.vcodec is None:
+                stream._thread.join(0.01)
+
+        self.assertEqual(sorted(stream.vcodec for stream in streams), ["h264_ascend", "libx264"])
+        # The second NPU channel is still free for the episodes encoded in the background
+        self.assertTrue(_get_npu_semaphore().acquire(blocking=False))
+        _get_npu_semaphore().release()
+        for stream in streams:
+            stream.finish(timeout=5)
+        self.assertEqual(_get_npu_semaphore()._value, 2)
+
+    def test_streaming_channels(self):
+        set_npu_streaming_channels(0)
+        stream = StreamingVideoEncoder(self.video_path, FPS, vcodec="h264_ascend")
+        stream.write(make_frames(1)[0])
+        stream.finish(timeout=5)
+        self.assertEqual(stream.vcodec, "libx264")
+
+    def test_channel_count_changed_during_a_stream(self):
+        stream = StreamingVideoEncoder(self.video_path, FPS, vcodec="h264_ascend")
+        stream.write(make_frames(1)[0])
+        while stream.vcodec is None:
+            stream._thread.join(0.01)
+        with self.assertRaises(RuntimeError):
+            set_npu_streaming_channels(0)
+
+        set_npu_encoder_channels(3)
+        stream.finish(timeout=5)
+        self.assertEqual(stream.vcodec, "h264_ascend")
+        # The channel went back to the semaphores it was taken from, not to the new ones
+        self.assertEqual(_get_npu_semaphore()._value, 3)
+        self.assertEqual(_get_npu_stream_semaphore()._value, 2)
+        set_npu_streaming_channels(0)
+
+    def test_npu_failure_replays_frames_on_libx264(self):
+        FakeFFmpeg.npu_fails = True
+        frames = make_frames(FPS + 2)
+        stream = StreamingVideoEncoder(self.video_path, FPS, vcodec="h264_ascend")
+        for frame in frames:
+            stream.write(frame)
+        self.assertEqual(stream.finish(timeout=5), self.video_path)
+
+        npu, cpu = FakeFFmpeg.processes
+        self.assertEqual((npu.vcodec, cpu.vcodec), ("h264_ascend", "libx264"))
+        self.assertEqual(stream.vcodec, "libx264")
+        self.assertEqual(bytes(cpu.data), b"".join(frame.tobytes() for frame in frames))
+        self.assertEqual(_get_npu_semaphore()._value, 2)
+        self.assertEqual(_get_npu_stream_semaphore()._value, 1)
+
+    def test_abort(self):
+        stream = StreamingVideoEncoder(self.video_path, FPS, vcodec="h264_ascend")
+        stream.write(make_frames(1)[0])
+        while stream.vcodec is None:
+            stream._thread.join(0.01)
+        stream.abort()
+
+        (proc,) = FakeFFmpeg.processes
+        self.assertTrue(proc.killed)
+        self.assertFalse(self.video_path.exists())
+        self.assertEqual(_get_npu_semaphore()._value, 2)
+        self.assertEqual(_get_npu_stream_semaphore()._value, 1)
+        with self.assertRaises(RuntimeError):
+            stream.write(make_frames(1)[0])
+        with self.assertRaises(RuntimeError):
+            stream.finish(timeout=5)
+
+    def test_close_without_frames(self):
+        stream = StreamingVideoEncoder(self.video_path, FPS)
+        self.assertIsNone(stream.finish(timeout=5))
+        self.assertEqual(FakeFFmpeg.processes, [])
+
+    def test_frame_size_change(self):
+        stream = StreamingVideoEncoder(self.video_path, FPS, vcodec="libx264")
+        stream.write(make_frames(1)[0])
+        with self.assertRaises(ValueError):
+            stream.write(np.zeros((HEIGHT + 2, WIDTH, 3), dtype=np.uint8))
+        stream.finish(timeout=5)
+
+
+@unittest.skipIf(DoRobotDataset is None, "DoRobotDataset can't be imported")
+class TestDatasetStreaming(StreamingTestCase):
+    """Test the streaming path of DoRobotDataset.add_frame / save_episode."""
+
+    encoders = {"libx264"}
+    KEY = "observation.images.top"
+
+    def make_dataset(self) -> DoRobotDataset:
+        features = {
+            self.KEY: {
+                "dtype": "video",
+                "shape": (HEIGHT, WIDTH, 3),
+                "names": ["height", "width", "channels"],
+                # Skips the ffprobe of the fake video
+                "info": {"video.fps": FPS},
+            },
+            "observation.state": {"dtype": "float32", "shape": (2,), "names": None},
+            "action": {"dtype": "float32", "shape": (2,), "names": None},
+        }
+        robot = SimpleNamespace(robot_type="test", cameras={}, microphones={})
+        return DoRobotDataset.create(
+            "test/streaming",
+            FPS,
+            root=Path(self.tmp.name) / "dataset",
+            robot=robot,
+            features=features,
+            streaming_encoding=True,
+        )
+
+    def add_frames(self, dataset: DoRobotDataset, frames: list[np.ndarray]) -> None:
+        for frame in frames:
+            state = np.ones(2, dtype=np.float32)
+            dataset.add_frame({self.KEY: frame, "observation.state": state, "action": state}, task="pick")
+
+    def test_save_episode(self):
+        dataset = self.make_dataset()
+        frames = make_frames(5)
+        self.add_frames(dataset, frames)
+        self.assertEqual(len(dataset.video_streams), 1)
+        dataset.save_episode()
+
+        (proc,) = FakeFFmpeg.processes
+        video_path = dataset.root / dataset.meta.get_video_file_path(0, self.KEY)
+        self.assertEqual(Path(proc.cmd[-1]), video_path)
+        self.assertTrue(video_path.is_file())
+        self.assertEqual(bytes(proc.data), b"".join(frame.tobytes() for frame in frames))
+        self.assertEqual(dataset.video_streams, {})
+        # No frame was written as an image
+        self.assertFalse((dataset.root / "images").exists())
+        self.assertEqual(dataset.meta.total_frames, 5)
+        self.assertIn(self.KEY, dataset.meta.episodes_stats[0])
+
+    def test_clear_episode_buffer(self):
+        dataset = self.make_dataset()
+        self.add_frames(dataset, make_frames(3))
+        (stream,) = dataset.video_streams.values()
+        while stream.vcodec is None:
+            stream._thread.join(0.01)
+        dataset.clear_episode_buffer()
+
+        self.assertTrue(FakeFFmpeg.processes[0].killed)
+        self.assertFalse(stream.video_path.exists())
+        self.assertEqual(dataset.video_streams, {})
+
+
+if __name__ == "__main__":
+    unittest.main()